@@ -0,0 +1,364 @@
+"""
+Cliente assíncrono (asyncio) para a API do PNCP.
+
+Este módulo implementa a classe AsyncPNCPClient, com a mesma superfície de métodos
+do PNCPClient (get_editais, get_itens_edital_count, get_itens_edital_paginated, ...)
+em versão `async`. Todas as requisições compartilham uma única sessão HTTP com pool
+de conexões keep-alive e passam por um semáforo que limita a concorrência, de modo
+que um único processo consegue manter centenas de requisições de itens em voo sem
+uma thread por requisição.
+
+Antes de cada requisição o cliente aguarda sua vez no limitador de taxa AIMD
+compartilhado pelo processo (rate_limiter.py), que também aplica o Retry-After a
+todas as requisições. Retries de falhas usam backoff exponencial com
+`asyncio.sleep` (sem bloquear threads). Respostas passam pelo mesmo cache HTTP
+condicional do PNCPClient (http_cache.py); como ele é síncrono (SQLite sob um lock
+do processo), as consultas e gravações rodam em threads (`asyncio.to_thread`), fora
+do event loop e depois de liberar o slot do semáforo. As esperas e o início de cada requisição checam
+`is_cancelled()`, e `watch_cancellation` cancela as tasks pendentes assim que o
+cancelamento global (Ctrl+C) é sinalizado.
+
+Requer o pacote opcional `aiohttp` (extra "async" do pyproject).
+"""
+
+import asyncio
+import json
+import logging
+import math
+import time
+from backend.config import (
+    API_BASE_URL, API_ITEMS_BASE_URL, PAGE_SIZE, MAX_RETRIES, RETRY_DELAY,
+    RETRY_BACKOFF_MULTIPLIER, ITEMS_FETCH_CONCURRENCY, is_cancelled
+)
+from backend.api_client.rate_limiter import get_rate_limiter, parse_retry_after
+from backend.api_client.http_cache import get_http_cache
+from backend.api_client.pncp_client import (
+    API_RATE_LIMITED, API_REQUEST_DURATION, API_RESPONSES, API_RETRIES, endpoint_label,
+)
+
+try:
+    import aiohttp
+except ImportError:  # Dependência opcional (extra "async")
+    aiohttp = None
+
+
+logger = logging.getLogger(__name__)
+
+# Intervalo (segundos) entre checagens de cancelamento durante esperas
+CANCEL_POLL_INTERVAL = 0.2
+
+
+class PNCPRequestError(Exception):
+    """
+    Erro HTTP (status >= 400) ou rate limit persistente em uma requisição assíncrona.
+    """
+    def __init__(self, status, url):
+        super().__init__(f"HTTP {status}: {url}")
+        self.status = status
+        self.url = url
+
+
+# Erros que disparam nova tentativa (cancelamento nunca entra aqui: é BaseException)
+_RETRY_ERRORS = (PNCPRequestError, asyncio.TimeoutError, ValueError, OSError)
+if aiohttp is not None:
+    _RETRY_ERRORS += (aiohttp.ClientError,)
+
+
+def is_available():
+    """
+    Indica se o cliente assíncrono pode ser usado (aiohttp instalado).
+    """
+    return aiohttp is not None
+
+
+async def watch_cancellation(tasks, interval=CANCEL_POLL_INTERVAL):
+    """
+    Cancela as tasks pendentes assim que is_cancelled() for sinalizado.
+    Deve rodar como task própria e ser cancelada quando as tasks terminarem.
+    """
+    while not is_cancelled():
+        await asyncio.sleep(interval)
+    pending = [task for task in tasks if not task.done()]
+    if pending:
+        logger.warning(f"Cancelamento solicitado. Cancelando {len(pending)} requisições pendentes...")
+    for task in pending:
+        task.cancel()
+
+
+class AsyncPNCPClient:
+    """
+    Cliente HTTP assíncrono para a API do PNCP.
+
+    Uso:
+        async with AsyncPNCPClient(concurrency=200) as client:
+            itens = await client.get_itens_edital(cnpj, ano, sequencial)
+
+    Args:
+        concurrency: Máximo de requisições simultâneas (padrão: ITEMS_FETCH_CONCURRENCY)
+        session: Sessão compatível com aiohttp.ClientSession (opcional; o cliente
+                 cria e fecha a própria sessão quando não informada)
+        rate_limiter: Limitador de taxa (padrão: o compartilhado pelo processo)
+        http_cache: Cache HTTP condicional (padrão: o compartilhado; False desativa)
+    """
+    def __init__(self, concurrency=None, session=None, rate_limiter=None, http_cache=None):
+        # URLs base para endpoints de editais/contratações e itens
+        self.base_url = API_BASE_URL
+        self.items_base_url = API_ITEMS_BASE_URL
+        self.concurrency = max(1, int(concurrency or ITEMS_FETCH_CONCURRENCY))
+        self._session = session
+        self._owns_session = session is None
+        self._semaphore = None
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.http_cache = get_http_cache() if http_cache is None else (http_cache or None)
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def open(self):
+        """
+        Cria a sessão HTTP (pool keep-alive dimensionado pela concorrência) e o semáforo.
+        Deve ser chamado dentro do event loop que fará as requisições.
+        """
+        if self._session is None:
+            if aiohttp is None:
+                raise RuntimeError("aiohttp não está instalado. Instale o extra 'async' (pip install .[async]).")
+            connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.concurrency, ttl_dns_cache=300)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=30),
+                headers={"Accept": "application/json", "User-Agent": "PNCP-Collector/1.0"},
+            )
+            self._owns_session = True
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+
+    async def close(self):
+        # Fecha a sessão apenas se foi criada pelo próprio cliente
+        if self._session is not None and self._owns_session:
+            await self._session.close()
+            self._session = None
+
+    def _calculate_backoff_delay(self, attempt, base_delay=None):
+        """
+        Calcula o tempo de espera usando backoff exponencial (mesma fórmula do PNCPClient).
+        """
+        if base_delay is None:
+            base_delay = RETRY_DELAY
+        return base_delay * (RETRY_BACKOFF_MULTIPLIER ** attempt)
+
+    def _handle_rate_limit(self, retry_after, attempt):
+        # O limitador compartilhado já reduziu a taxa e aplicou o Retry-After ao processo todo
+        if retry_after is not None:
+            logger.warning(f"Rate limited (429). Server requested wait: {retry_after:.0f}s (applied globally)")
+        else:
+            logger.warning(f"Rate limited (429). Reducing shared rate to {self.rate_limiter.rate:.2f} req/s (attempt {attempt + 1}/{MAX_RETRIES})")
+
+    @staticmethod
+    def _check_cancelled():
+        if is_cancelled():
+            raise asyncio.CancelledError()
+
+    async def _sleep(self, delay):
+        """
+        Espera assíncrona interrompível: acorda periodicamente para checar is_cancelled().
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + delay
+        while True:
+            self._check_cancelled()
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return
+            await asyncio.sleep(min(remaining, CANCEL_POLL_INTERVAL))
+
+    async def _request(self, url, params=None, allow_404=False):
+        """
+        GET com limite de concorrência, limitador de taxa, backoff exponencial e tratamento de rate limit.
+        Retorna (status, corpo JSON). Com allow_404=True, 404 retorna (404, None) sem retry.
+        O slot do semáforo é liberado durante as esperas entre tentativas.
+        """
+        if self._semaphore is None:
+            await self.open()
+        key = entry = headers = None
+        if self.http_cache is not None:
+            key = self.http_cache.make_key(url, params)
+            entry = await asyncio.to_thread(self.http_cache.lookup, key)
+            if entry is not None:
+                headers = entry.conditional_headers()
+        endpoint = endpoint_label(url)
+        for attempt in range(MAX_RETRIES):
+            self._check_cancelled()
+            # Resposta obtida nesta tentativa: (status, corpo, ETag, Last-Modified)
+            fresh = None
+            try:
+                async with self._semaphore:
+                    # Reserva dentro do semáforo: no máximo `concurrency` reservas pendentes
+                    await self._sleep(self.rate_limiter.reserve())
+                    started = time.perf_counter()
+                    async with self._session.get(url, params=params, headers=headers) as response:
+                        status = response.status
+                        API_REQUEST_DURATION.observe(time.perf_counter() - started, endpoint=endpoint)
+                        API_RESPONSES.inc(endpoint=endpoint, status=status)
+                        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                        self.rate_limiter.record_status(status, retry_after)
+                        if status == 404 and allow_404:
+                            return status, None
+                        if status == 304:
+                            if entry is None:
+                                # 304 sem cópia em cache: trata como miss e repete sem cabeçalhos condicionais
+                                logger.warning(f"304 Not Modified without a cached copy for {url}; retrying unconditionally")
+                                headers = None
+                                continue
+                            fresh = (status, None, None, None)
+                        elif status == 429:
+                            API_RATE_LIMITED.inc(endpoint=endpoint)
+                            self._handle_rate_limit(retry_after, attempt)
+                        elif status >= 400:
+                            raise PNCPRequestError(status, url)
+                        else:
+                            body = await response.read()
+                            fresh = (status, body, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+                if fresh is not None:
+                    status, body, etag, last_modified = fresh
+                    if status == 304:
+                        await asyncio.to_thread(self.http_cache.hit, key, entry)
+                        return 200, json.loads(entry.body) if entry.body else None
+                    if self.http_cache is not None and status == 200:
+                        await asyncio.to_thread(self.http_cache.miss, key, body, etag, last_modified)
+                    return status, (json.loads(body) if body else None)
+                if attempt < MAX_RETRIES - 1:
+                    API_RETRIES.inc(endpoint=endpoint, reason="429")
+                    continue
+                logger.error(f"Rate limit exceeded after {MAX_RETRIES} attempts for {url}")
+                raise PNCPRequestError(429, url)
+            except _RETRY_ERRORS as e:
+                if isinstance(e, PNCPRequestError) and e.status == 429:
+                    raise
+                if not isinstance(e, PNCPRequestError):
+                    # Falha de conexão/timeout também indica sobrecarga (5xx já foi registrado)
+                    API_RESPONSES.inc(endpoint=endpoint, status="error")
+                    self.rate_limiter.on_error()
+                logger.warning(f"Attempt {attempt + 1}/{MAX_RETRIES} failed for {url}: {e}")
+                if attempt < MAX_RETRIES - 1:
+                    API_RETRIES.inc(endpoint=endpoint, reason="error")
+                    await self._sleep(self._calculate_backoff_delay(attempt))
+                else:
+                    logger.error(f"All retries failed for {url}")
+                    raise
+        return None, None
+
+    async def _make_request(self, endpoint, params=None):
+        # Requisição ao endpoint de editais/contratos (API_BASE_URL)
+        _, data = await self._request(f"{self.base_url}{endpoint}", params)
+        return data
+
+    async def get_contratos(self, page=1, size=PAGE_SIZE, data_inicial=None, data_final=None):
+        # Lista contratos com paginação e filtro por datas
+        params = {"pagina": page, "tamanhoPagina": size}
+        if data_inicial:
+            params["dataInicial"] = data_inicial
+        if data_final:
+            params["dataFinal"] = data_final
+        try:
+            return await self._make_request("/contratos", params)
+        except Exception as e:
+            logger.error(f"Error fetching contratos page {page}: {e}")
+            return None
+
+    async def get_contrato_by_id(self, cnpj, ano, sequencial):
+        # Obtém um contrato específico por identificadores
+        try:
+            return await self._make_request(f"/orgaos/{cnpj}/contratos/{ano}/{sequencial}")
+        except Exception as e:
+            logger.error(f"Error fetching contrato {cnpj}/{ano}/{sequencial}: {e}")
+            return None
+
+    async def get_itens_contrato(self, cnpj, ano, sequencial):
+        # Obtém itens de um contrato
+        try:
+            result = await self._make_request(f"/orgaos/{cnpj}/contratos/{ano}/{sequencial}/itens")
+            return result if result else []
+        except Exception as e:
+            logger.error(f"Error fetching itens for contrato {cnpj}/{ano}/{sequencial}: {e}")
+            return []
+
+    async def get_editais(self, page=1, size=PAGE_SIZE, data_inicial=None, data_final=None, codigo_modalidade=None):
+        """Lista editais (contratações A RECEBER/RECEBENDO PROPOSTAS) com filtros (ver PNCPClient.get_editais)."""
+        params = {"pagina": page, "tamanhoPagina": size}
+        if data_inicial:
+            params["dataInicial"] = data_inicial
+        if data_final:
+            params["dataFinal"] = data_final
+        if codigo_modalidade:
+            params["codigoModalidadeContratacao"] = codigo_modalidade
+        try:
+            return await self._make_request("/contratacoes/proposta", params)
+        except Exception as e:
+            logger.error(f"Error fetching editais page {page}: {e}")
+            return None
+
+    async def get_itens_edital_count(self, cnpj, ano, sequencial):
+        """Retorna a quantidade de itens para um edital (0 em caso de 404 ou falha)."""
+        url = f"{self.items_base_url}/orgaos/{cnpj}/compras/{ano}/{sequencial}/itens/quantidade"
+        try:
+            status, data = await self._request(url, allow_404=True)
+        except Exception as e:
+            logger.error(f"Error fetching items count for {cnpj}/{ano}/{sequencial}: {e}")
+            return 0
+        if status == 404:
+            logger.debug(f"Items count endpoint not found for {cnpj}/{ano}/{sequencial} (404)")
+            return 0
+        try:
+            return int(data) if data is not None else 0
+        except (TypeError, ValueError):
+            return 0
+
+    async def get_itens_edital_paginated(self, cnpj, ano, sequencial, page=1, size=PAGE_SIZE):
+        """Obtém itens paginados de um edital ([] em caso de 404 ou falha)."""
+        url = f"{self.items_base_url}/orgaos/{cnpj}/compras/{ano}/{sequencial}/itens"
+        params = {"pagina": page, "tamanhoPagina": size}
+        try:
+            status, result = await self._request(url, params, allow_404=True)
+        except Exception as e:
+            logger.error(f"Error fetching itens page {page} for {cnpj}/{ano}/{sequencial}: {e}")
+            return []
+        if status == 404:
+            logger.debug(f"Items endpoint not found for {cnpj}/{ano}/{sequencial} (404)")
+            return []
+        if isinstance(result, list):
+            return result
+        if isinstance(result, dict):
+            data = result.get("data", result.get("itens", result.get("items", [])))
+            return data if isinstance(data, list) else []
+        return []
+
+    async def get_itens_edital(self, cnpj, ano, sequencial, item_count=None, size=PAGE_SIZE):
+        """
+        Obtém todos os itens de um edital.
+
+        Com item_count conhecido, as páginas previstas são buscadas em paralelo
+        (limitadas pelo semáforo); depois a paginação segue sequencialmente
+        enquanto houver páginas cheias, como no PNCPClient.
+        """
+        pages = math.ceil(item_count / size) if item_count else 0
+        all_itens = []
+        if pages:
+            results = await asyncio.gather(*(
+                self.get_itens_edital_paginated(cnpj, ano, sequencial, page=page, size=size)
+                for page in range(1, pages + 1)
+            ))
+            for page_items in results:
+                all_itens.extend(page_items)
+            if not results[-1] or len(results[-1]) < size:
+                return all_itens
+        page = pages + 1
+        while True:
+            page_items = await self.get_itens_edital_paginated(cnpj, ano, sequencial, page=page, size=size)
+            if not page_items:
+                break
+            all_itens.extend(page_items)
+            page += 1
+        return all_itens
@@ -0,0 +1,207 @@
+"""
+Cache HTTP em disco com requisições condicionais para a API do PNCP.
+
+Este módulo implementa a classe HTTPCache, usada pelo PNCPClient e pelo
+AsyncPNCPClient. Respostas 200 que trazem ETag ou Last-Modified são guardadas
+em um banco SQLite (data/http_cache.db), indexadas por URL + parâmetros.
+Na requisição seguinte o cliente envia If-None-Match/If-Modified-Since e, se a
+API responder 304 Not Modified, reaproveita o corpo em cache sem baixá-lo de novo.
+
+O cache tem tamanho máximo (HTTP_CACHE_MAX_MB): ao excedê-lo, as entradas
+acessadas há mais tempo são removidas (LRU). Contadores de hits/misses e de
+bytes economizados ficam disponíveis em stats() para medir o ganho de cada coleta.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+import logging
+from urllib.parse import urlencode
+from backend.config import HTTP_CACHE_ENABLED, HTTP_CACHE_FILE, HTTP_CACHE_MAX_MB
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses (last_access);
+"""
+
+# Ao exceder o limite, remove entradas até ficar nesta fração do tamanho máximo
+_EVICT_TARGET = 0.9
+
+
+class CachedResponse:
+    """
+    Entrada do cache: corpo da resposta e seus validadores (ETag / Last-Modified).
+    """
+    def __init__(self, body, etag=None, last_modified=None):
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def conditional_headers(self):
+        # Headers da requisição condicional correspondente a esta entrada
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class HTTPCache:
+    """
+    Cache de respostas HTTP em SQLite com limite de tamanho (LRU) e contadores.
+
+    Args:
+        db_path: Caminho do banco SQLite
+        max_bytes: Tamanho máximo somado dos corpos em cache
+    """
+    def __init__(self, db_path, max_bytes):
+        self.db_path = db_path
+        self.max_bytes = int(max_bytes)
+        self._lock = threading.Lock()
+        self._conn = None
+        self._total_bytes = 0
+        self._counters = {
+            "hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "bytes_saved": 0,
+            "bytes_downloaded": 0,
+        }
+
+    def _connection(self):
+        # Conexão única protegida por self._lock (aberta sob demanda)
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._total_bytes = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def make_key(url, params=None):
+        """
+        Chave do cache: URL + parâmetros em ordem canônica.
+        """
+        if not params:
+            return url
+        return f"{url}?{urlencode(sorted((str(k), str(v)) for k, v in params.items()))}"
+
+    def lookup(self, key):
+        """
+        Retorna a CachedResponse de `key` (ou None) para montar a requisição condicional.
+        """
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT body, etag, last_modified FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return CachedResponse(bytes(row[0]), row[1], row[2])
+
+    def hit(self, key, entry):
+        """
+        Registra um 304 Not Modified: o corpo em cache foi reaproveitado.
+        """
+        with self._lock:
+            self._connection().execute(
+                "UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key)
+            )
+            self._conn.commit()
+            self._counters["hits"] += 1
+            self._counters["bytes_saved"] += len(entry.body)
+
+    def miss(self, key, body, etag=None, last_modified=None):
+        """
+        Registra uma resposta completa (200). Se houver ETag ou Last-Modified,
+        guarda o corpo para futuras requisições condicionais; caso contrário,
+        remove uma eventual entrada antiga da mesma chave.
+        """
+        with self._lock:
+            conn = self._connection()
+            self._counters["misses"] += 1
+            self._counters["bytes_downloaded"] += len(body)
+            old = conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            if old is not None:
+                self._total_bytes -= old[0]
+            if (not etag and not last_modified) or len(body) > self.max_bytes:
+                if old is not None:
+                    conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    conn.commit()
+                return
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, etag, last_modified, body, size, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, etag, last_modified, sqlite3.Binary(body), len(body), time.time()),
+            )
+            self._total_bytes += len(body)
+            self._counters["stores"] += 1
+            if self._total_bytes > self.max_bytes:
+                self._evict(conn)
+            conn.commit()
+
+    def _evict(self, conn):
+        # Remove as entradas menos recentemente usadas até _EVICT_TARGET do limite
+        target = self.max_bytes * _EVICT_TARGET
+        rows = conn.execute("SELECT key, size FROM responses ORDER BY last_access").fetchall()
+        removed = []
+        for key, size in rows:
+            if self._total_bytes <= target:
+                break
+            removed.append((key,))
+            self._total_bytes -= size
+        conn.executemany("DELETE FROM responses WHERE key = ?", removed)
+        self._counters["evictions"] += len(removed)
+        logger.debug(f"HTTP cache: evicted {len(removed)} entries ({self._total_bytes} bytes remaining)")
+
+    def clear(self):
+        # Remove todas as entradas (os contadores são mantidos)
+        with self._lock:
+            self._connection().execute("DELETE FROM responses")
+            self._conn.commit()
+            self._total_bytes = 0
+
+    def stats(self):
+        """
+        Retorna contadores de hits/misses, bytes economizados e ocupação do cache.
+        """
+        with self._lock:
+            self._connection()
+            stats = dict(self._counters)
+            stats["size_bytes"] = self._total_bytes
+            stats["max_bytes"] = self.max_bytes
+        requests_total = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = round(stats["hits"] / requests_total, 4) if requests_total else 0.0
+        return stats
+
+
+_http_cache = None
+_http_cache_guard = threading.Lock()
+
+
+def get_http_cache():
+    """
+    Retorna o cache HTTP compartilhado pelo processo, ou None se HTTP_CACHE_ENABLED=false.
+    """
+    global _http_cache
+    if not HTTP_CACHE_ENABLED:
+        return None
+    if _http_cache is None:
+        with _http_cache_guard:
+            if _http_cache is None:
+                _http_cache = HTTPCache(HTTP_CACHE_FILE, HTTP_CACHE_MAX_MB * 1024 * 1024)
+    return _http_cache
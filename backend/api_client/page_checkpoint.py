@@ -0,0 +1,162 @@
+"""
+Checkpoint de paginação por página (conjunto exato de páginas concluídas).
+
+Este módulo implementa a classe PageCheckpoint, usada por PNCPClient.get_all_editais
+para retomar a coleta de editais. Como as páginas são buscadas fora de ordem
+(as_completed), um único "última página" não basta: o checkpoint guarda o conjunto
+exato de páginas concluídas (como lista de intervalos [início, fim]) e a contagem
+de falhas por página.
+
+Formato do arquivo (.editais_checkpoint.json):
+
+    {
+        "last_checkpoint_page": 12,          # maior prefixo contíguo concluído (compatibilidade)
+        "query": {"data_inicial": ..., "data_final": ..., "codigo_modalidade": ...},
+        "total_pages": 140,
+        "run_date": "2026-10-17",             # dia em que a coleta começou
+        "completed": [[1, 12], [15, 40]],
+        "retries": {"13": 2, "14": 1}
+    }
+
+Checkpoints no formato antigo (apenas last_checkpoint_page) são interpretados como
+páginas 1..N concluídas. Se a consulta, o total de páginas ou o dia mudar, o
+checkpoint é descartado e a coleta recomeça: a rotina diária repete a mesma consulta
+e não deve reaproveitar uma coleta parcial de dias anteriores (as páginas mudaram).
+"""
+
+import json
+import os
+import logging
+from datetime import date
+
+logger = logging.getLogger(__name__)
+
+
+def pages_to_ranges(pages):
+    """
+    Compacta um conjunto de páginas em intervalos ordenados: {1,2,3,7} -> [[1, 3], [7, 7]].
+    """
+    ranges = []
+    for page in sorted(pages):
+        if ranges and page == ranges[-1][1] + 1:
+            ranges[-1][1] = page
+        else:
+            ranges.append([page, page])
+    return ranges
+
+
+def ranges_to_pages(ranges):
+    """
+    Expande intervalos [início, fim] em um conjunto de páginas.
+    """
+    pages = set()
+    for start, end in ranges or []:
+        pages.update(range(int(start), int(end) + 1))
+    return pages
+
+
+class PageCheckpoint:
+    """
+    Conjunto de páginas concluídas e contagem de falhas por página de uma consulta.
+    """
+    def __init__(self, path, query, total_pages, completed=None, retries=None, run_date=None):
+        self.path = path
+        self.query = query
+        self.total_pages = total_pages
+        self.run_date = run_date or date.today().isoformat()
+        self.completed = set(completed or ())
+        self.retries = dict(retries or {})
+
+    @classmethod
+    def load(cls, path, query, total_pages):
+        """
+        Carrega o checkpoint de `path` se ele corresponder à mesma consulta, ao mesmo
+        total de páginas e ao dia de hoje; caso contrário, retorna um checkpoint vazio.
+        """
+        data = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r") as f:
+                    data = json.load(f)
+            except Exception as e:
+                logger.warning(f"Erro ao ler arquivo de checkpoint: {e}")
+                data = {}
+
+        if "completed" not in data:
+            # Formato antigo: páginas 1..last_checkpoint_page concluídas
+            last_page = int(data.get("last_checkpoint_page", 1) or 1)
+            if 1 < last_page <= total_pages:
+                logger.info(f"Checkpoint antigo encontrado (page {last_page}). Convertendo para conjunto de páginas.")
+                return cls(path, query, total_pages, completed=range(1, last_page + 1))
+            return cls(path, query, total_pages)
+
+        if data.get("query") != query or data.get("total_pages") != total_pages:
+            logger.info(
+                f"Checkpoint obsoleto (consulta ou total de páginas mudou: {data.get('total_pages')} -> {total_pages}). "
+                "Reiniciando do início."
+            )
+            return cls(path, query, total_pages)
+
+        if data.get("run_date") != date.today().isoformat():
+            logger.info(f"Checkpoint de outro dia ({data.get('run_date')}). Reiniciando do início.")
+            return cls(path, query, total_pages)
+
+        retries = {int(page): int(count) for page, count in (data.get("retries") or {}).items()}
+        return cls(path, query, total_pages, completed=ranges_to_pages(data["completed"]), retries=retries)
+
+    def mark_done(self, page):
+        self.completed.add(page)
+        self.retries.pop(page, None)
+
+    def mark_failed(self, page):
+        """
+        Registra uma falha da página e retorna o total de falhas acumuladas.
+        """
+        self.retries[page] = self.retries.get(page, 0) + 1
+        return self.retries[page]
+
+    def missing(self, start=1):
+        """
+        Páginas ainda não concluídas (a partir de `start`), em ordem.
+        """
+        return [page for page in range(start, self.total_pages + 1) if page not in self.completed]
+
+    def last_contiguous_page(self):
+        """
+        Maior página N tal que 1..N estão concluídas (0 se a página 1 não estiver).
+        """
+        page = 0
+        while page + 1 in self.completed:
+            page += 1
+        return page
+
+    def save(self):
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            data = {
+                "last_checkpoint_page": max(1, self.last_contiguous_page()),
+                "query": self.query,
+                "total_pages": self.total_pages,
+                "run_date": self.run_date,
+                "completed": pages_to_ranges(self.completed),
+                "retries": {str(page): count for page, count in sorted(self.retries.items())},
+            }
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.error(f"Erro ao salvar arquivo de checkpoint: {e}")
+
+    def reset(self):
+        """
+        Coleta completa: zera o checkpoint (a próxima execução começa do início).
+        """
+        self.completed.clear()
+        self.retries.clear()
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "w") as f:
+                json.dump({"last_checkpoint_page": 1}, f)
+        except Exception as e:
+            logger.error(f"Erro ao salvar arquivo de checkpoint: {e}")
@@ -1,27 +1,53 @@
 import requests
 import time
 import logging
-import json
-import os
+import re
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from backend.config import (
     API_BASE_URL, API_ITEMS_BASE_URL, PAGE_SIZE, MAX_RETRIES, RETRY_DELAY, 
-    RETRY_BACKOFF_MULTIPLIER, EDITAIS_CHECKPOINT_FILE, request_cancel, reset_cancel, is_cancelled
+    RETRY_BACKOFF_MULTIPLIER, EDITAIS_CHECKPOINT_FILE, EDITAIS_PAGE_MAX_RETRIES, request_cancel, reset_cancel, is_cancelled
 )
+from backend.api_client.rate_limiter import get_rate_limiter, parse_retry_after
+from backend.api_client.http_cache import get_http_cache
+from backend.api_client.page_checkpoint import PageCheckpoint
+from backend.monitoring import metrics
 
 
 # Logger para registrar eventos e erros do cliente PNCP
 logger = logging.getLogger(__name__)
 
+API_REQUEST_DURATION = metrics.histogram(
+    "pncp_api_request_duration_seconds", "Latência das requisições HTTP à API do PNCP", ("endpoint",)
+)
+API_RESPONSES = metrics.counter(
+    "pncp_api_responses_total", "Respostas da API do PNCP por status (error = falha de conexão)", ("endpoint", "status")
+)
+API_RATE_LIMITED = metrics.counter("pncp_api_rate_limited_total", "Respostas 429 (rate limit) da API do PNCP", ("endpoint",))
+API_RETRIES = metrics.counter("pncp_api_retries_total", "Novas tentativas de requisições à API do PNCP", ("endpoint", "reason"))
+
+# Segmentos numéricos (CNPJ, ano, sequencial) viram ":id" no rótulo do endpoint
+_NUMERIC_SEGMENT_RE = re.compile(r"/\d+(?=/|$)")
+
+
+def endpoint_label(url):
+    """
+    Rótulo de métrica do endpoint: caminho sem host/query e sem identificadores numéricos.
+    """
+    path = url.split("://", 1)[-1]
+    path = "/" + path.split("/", 1)[1] if "/" in path else "/"
+    return _NUMERIC_SEGMENT_RE.sub("/:id", path.split("?", 1)[0])
+
 class PNCPClient:
     """
     Cliente HTTP para a API do PNCP.
 
     Este cliente centraliza as requisições para a API do PNCP, incluindo tratamento de erros,
     tentativas automáticas com backoff exponencial, checkpoint de paginação e integração com
-    arquivos locais para persistência do progresso.
+    arquivos locais para persistência do progresso. Todas as requisições passam pelo
+    limitador de taxa adaptativo compartilhado pelo processo (rate_limiter.py) e pelo
+    cache HTTP condicional em disco (http_cache.py; http_cache=False desativa).
     """
-    def __init__(self):
+    def __init__(self, rate_limiter=None, http_cache=None):
         # URLs base para endpoints de editais/contratações e itens
         self.base_url = API_BASE_URL
         self.items_base_url = API_ITEMS_BASE_URL
@@ -31,32 +57,10 @@ class PNCPClient:
             "Accept": "application/json",
             "User-Agent": "PNCP-Collector/1.0"
         })
-    
-    def _get_last_checkpoint_page(self):
-        """
-        Carrega a última página salva no arquivo de checkpoint de editais.
-        Retorna 1 caso não exista checkpoint salvo.
-        """
-        if os.path.exists(EDITAIS_CHECKPOINT_FILE):
-            try:
-                with open(EDITAIS_CHECKPOINT_FILE, 'r') as f:
-                    data = json.load(f)
-                    return data.get('last_checkpoint_page', 1)
-            except Exception as e:
-                logger.warning(f"Erro ao ler arquivo de checkpoint: {e}")
-        return 1
-    
-    def _save_checkpoint_page(self, page):
-        """
-        Salva a página atual no arquivo de checkpoint de editais.
-        Permite retomar a coleta a partir do último progresso salvo.
-        """
-        try:
-            os.makedirs(os.path.dirname(EDITAIS_CHECKPOINT_FILE) or '.', exist_ok=True)
-            with open(EDITAIS_CHECKPOINT_FILE, 'w') as f:
-                json.dump({'last_checkpoint_page': page}, f)
-        except Exception as e:
-            logger.error(f"Erro ao salvar arquivo de checkpoint: {e}")
+        # Limitador de taxa AIMD (compartilhado entre instâncias e threads)
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        # Cache HTTP com ETag/Last-Modified (None se desativado)
+        self.http_cache = get_http_cache() if http_cache is None else (http_cache or None)
     
     def _calculate_backoff_delay(self, attempt, base_delay=None):
         """
@@ -68,23 +72,55 @@ class PNCPClient:
     
     def _handle_rate_limit(self, response, attempt):
         """
-        Trata erro 429 (Too Many Requests) com backoff inteligente.
-        Se o servidor retornar o header Retry-After, respeita o tempo sugerido.
-        Caso contrário, utiliza backoff exponencial mais agressivo.
+        Trata erro 429 (Too Many Requests).
+        O backoff é global: _get já reduziu a taxa do limitador compartilhado e, se o
+        servidor enviou Retry-After, pausou todas as requisições do processo até o prazo.
+        A próxima tentativa apenas aguarda sua vez no limitador.
         """
-        # Tenta obter o tempo de espera do header Retry-After
-        retry_after = response.headers.get('Retry-After')
-        if retry_after:
-            try:
-                wait_time = int(retry_after)
-                logger.warning(f"Rate limited (429). Server requested wait: {wait_time}s")
-                return wait_time
-            except ValueError:
-                pass
-        # Se não tiver Retry-After, usa backoff exponencial mais agressivo
-        wait_time = self._calculate_backoff_delay(attempt, base_delay=RETRY_DELAY * 2)
-        logger.warning(f"Rate limited (429). Usando backoff exponencial: {wait_time:.1f}s")
-        return wait_time
+        retry_after = parse_retry_after(response.headers.get('Retry-After'))
+        if retry_after is not None:
+            logger.warning(f"Rate limited (429). Server requested wait: {retry_after:.0f}s (applied globally)")
+        else:
+            logger.warning(f"Rate limited (429). Reducing shared rate to {self.rate_limiter.rate:.2f} req/s (attempt {attempt + 1}/{MAX_RETRIES})")
+    
+    def _get(self, url, params=None):
+        """
+        GET passando pelo limitador de taxa compartilhado e pelo cache HTTP.
+        O resultado (sucesso, 429/5xx ou falha de conexão) realimenta a taxa do processo.
+        Se houver resposta em cache, envia If-None-Match/If-Modified-Since e, em caso
+        de 304, devolve o corpo em cache como uma resposta 200.
+        """
+        key = entry = headers = None
+        if self.http_cache is not None:
+            key = self.http_cache.make_key(url, params)
+            entry = self.http_cache.lookup(key)
+            if entry is not None:
+                headers = entry.conditional_headers()
+        self.rate_limiter.acquire()
+        endpoint = endpoint_label(url)
+        started = time.perf_counter()
+        try:
+            response = self.session.get(url, params=params, headers=headers, timeout=30)
+        except requests.exceptions.RequestException:
+            API_REQUEST_DURATION.observe(time.perf_counter() - started, endpoint=endpoint)
+            API_RESPONSES.inc(endpoint=endpoint, status="error")
+            self.rate_limiter.on_error()
+            raise
+        API_REQUEST_DURATION.observe(time.perf_counter() - started, endpoint=endpoint)
+        API_RESPONSES.inc(endpoint=endpoint, status=response.status_code)
+        if response.status_code == 429:
+            API_RATE_LIMITED.inc(endpoint=endpoint)
+        self.rate_limiter.record_status(response.status_code, parse_retry_after(response.headers.get('Retry-After')))
+        if self.http_cache is not None:
+            if response.status_code == 304 and entry is not None:
+                self.http_cache.hit(key, entry)
+                # Reaproveita o objeto da resposta 304 com o corpo em cache
+                response.status_code = 200
+                response._content = entry.body
+                return response
+            if response.status_code == 200:
+                self.http_cache.miss(key, response.content, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+        return response
     
     def _make_request(self, endpoint, params=None):
         """
@@ -94,13 +130,13 @@ class PNCPClient:
         url = f"{self.base_url}{endpoint}"
         for attempt in range(MAX_RETRIES):
             try:
-                response = self.session.get(url, params=params, timeout=30)
+                response = self._get(url, params=params)
                 
                 # Tratamento específico para rate limiting (429)
                 if response.status_code == 429:
                     if attempt < MAX_RETRIES - 1:
-                        wait_time = self._handle_rate_limit(response, attempt)
-                        time.sleep(wait_time)
+                        self._handle_rate_limit(response, attempt)
+                        API_RETRIES.inc(endpoint=endpoint_label(url), reason="429")
                         continue
                     else:
                         logger.error(f"Rate limit exceeded after {MAX_RETRIES} attempts for {url}")
@@ -111,6 +147,7 @@ class PNCPClient:
             except requests.exceptions.RequestException as e:
                 logger.warning(f"Attempt {attempt + 1}/{MAX_RETRIES} failed for {url}: {e}")
                 if attempt < MAX_RETRIES - 1:
+                    API_RETRIES.inc(endpoint=endpoint_label(url), reason="error")
                     wait_time = self._calculate_backoff_delay(attempt)
                     logger.info(f"Retrying in {wait_time:.1f}s...")
                     time.sleep(wait_time)
@@ -170,7 +207,7 @@ class PNCPClient:
         url = f"{self.items_base_url}{endpoint}"
         for attempt in range(MAX_RETRIES):
             try:
-                response = self.session.get(url, timeout=30)
+                response = self._get(url)
                 # If endpoint doesn't exist for this orgao/period, return 0 without retrying
                 if response.status_code == 404:
                     logger.debug(f"Items count endpoint not found for {cnpj}/{ano}/{sequencial} (404)")
@@ -179,8 +216,8 @@ class PNCPClient:
                 # Tratamento de rate limiting (429)
                 if response.status_code == 429:
                     if attempt < MAX_RETRIES - 1:
-                        wait_time = self._handle_rate_limit(response, attempt)
-                        time.sleep(wait_time)
+                        self._handle_rate_limit(response, attempt)
+                        API_RETRIES.inc(endpoint=endpoint_label(url), reason="429")
                         continue
                     else:
                         logger.error(f"Rate limit exceeded for {url}")
@@ -192,6 +229,7 @@ class PNCPClient:
             except requests.exceptions.RequestException as e:
                 logger.warning(f"Attempt {attempt+1}/{MAX_RETRIES} failed for {url}: {e}")
                 if attempt < MAX_RETRIES - 1:
+                    API_RETRIES.inc(endpoint=endpoint_label(url), reason="error")
                     wait_time = self._calculate_backoff_delay(attempt)
                     time.sleep(wait_time)
                 else:
@@ -206,7 +244,7 @@ class PNCPClient:
         
         for attempt in range(MAX_RETRIES):
             try:
-                response = self.session.get(url, params=params, timeout=30)
+                response = self._get(url, params=params)
                 # If the items endpoint doesn't exist for this orgao/period, treat as no items
                 if response.status_code == 404:
                     logger.debug(f"Items endpoint not found for {cnpj}/{ano}/{sequencial} (404)")
@@ -215,8 +253,8 @@ class PNCPClient:
                 # Tratamento de rate limiting (429)
                 if response.status_code == 429:
                     if attempt < MAX_RETRIES - 1:
-                        wait_time = self._handle_rate_limit(response, attempt)
-                        time.sleep(wait_time)
+                        self._handle_rate_limit(response, attempt)
+                        API_RETRIES.inc(endpoint=endpoint_label(url), reason="429")
                         continue
                     else:
                         logger.error(f"Rate limit exceeded for {url}")
@@ -238,6 +276,7 @@ class PNCPClient:
                 # For non-404 errors, log and retry
                 logger.warning(f"Attempt {attempt+1}/{MAX_RETRIES} failed for {url}: {e}")
                 if attempt < MAX_RETRIES - 1:
+                    API_RETRIES.inc(endpoint=endpoint_label(url), reason="error")
                     wait_time = self._calculate_backoff_delay(attempt)
                     time.sleep(wait_time)
                     continue
@@ -329,7 +368,7 @@ class PNCPClient:
         logger.info(f"Finished fetching contratos. Total collected: {len(all_contratos)}")
         return all_contratos
     
-    def get_all_editais(self, data_inicial=None, data_final=None, codigo_modalidade=None, on_checkpoint=None, max_workers=5):
+    def get_all_editais(self, data_inicial=None, data_final=None, codigo_modalidade=None, on_checkpoint=None, max_workers=5, on_page=None, on_progress=None):
         """
         Busca todos os editais com paralelização e checkpoint periódico.
         
@@ -337,8 +376,15 @@ class PNCPClient:
             data_inicial: Data inicial (formato YYYYMMDD)
             data_final: Data final (formato YYYYMMDD)
             codigo_modalidade: Código da modalidade (ex.: 6 para Pregão Eletrônico)
-            on_checkpoint: Callback opcional (editais_list, current_page) para salvar progresso
+            on_checkpoint: Callback opcional (editais_list, current_page) para salvar progresso.
+                           Só depois que ele grava os editais as páginas entram no checkpoint
+                           de retomada (sem ele, uma execução interrompida recomeça do início)
             max_workers: Número de threads paralelas (padrão: 5)
+            on_page: Callback opcional (page_num, editais_da_pagina) chamado assim que cada
+                     página chega (após cada batch, fora da espera dos futures), permitindo
+                     processar editais em streaming. Pode bloquear para aplicar backpressure.
+            on_progress: Callback opcional (páginas concluídas, total de páginas) chamado após
+                         a primeira página e após cada batch
         """
         from backend.config import PAGE_SIZE
         
@@ -356,33 +402,66 @@ class PNCPClient:
         
         logger.info(f"Total pages: {total_pages}, Total records: {total_records}")
         
+        def deliver_page(page_num, page_data):
+            # Entrega a página ao consumidor em streaming (erros não interrompem a coleta)
+            if on_page and page_data:
+                try:
+                    on_page(page_num, page_data)
+                except Exception as e:
+                    logger.error(f"Error in page callback for page {page_num}: {e}")
+        
+        def report_progress(pages_done):
+            if on_progress:
+                try:
+                    on_progress(pages_done, total_pages)
+                except Exception as e:
+                    logger.error(f"Error in progress callback: {e}")
+        
+        deliver_page(1, first_page_data if isinstance(first_page_data, list) else [])
+        
         if total_pages <= 1:
+            report_progress(1)
             return first_page_data if isinstance(first_page_data, list) else []
         
         # Inicializa com dados da primeira página
         all_editais = list(first_page_data) if isinstance(first_page_data, list) else []
         
-        # Get starting page from checkpoint
-        last_checkpoint_page = self._get_last_checkpoint_page()
+        # Checkpoint por página: conjunto exato de páginas concluídas + falhas por página
+        query = {"data_inicial": data_inicial, "data_final": data_final, "codigo_modalidade": codigo_modalidade}
+        checkpoint = PageCheckpoint.load(EDITAIS_CHECKPOINT_FILE, query, total_pages)
+        # Páginas buscadas cujos editais ainda não foram gravados por on_checkpoint
+        unsaved = {1}
+        
+        def pages_done():
+            return len(checkpoint.completed | unsaved)
         
-        # Se checkpoint é maior que total de páginas, está obsoleto — reseta
-        if last_checkpoint_page > total_pages:
-            logger.info(f"Checkpoint obsoleto (page {last_checkpoint_page} > total {total_pages}). Reiniciando do início.")
-            last_checkpoint_page = 1
-            self._save_checkpoint_page(1)
+        def persist_pages():
+            # on_checkpoint grava os editais; só então as páginas viram concluídas no checkpoint
+            if not on_checkpoint:
+                return
+            try:
+                on_checkpoint(all_editais, max(unsaved | {checkpoint.last_contiguous_page()}))
+            except Exception as e:
+                logger.error(f"Error in checkpoint callback: {e}")
+                return
+            for page in unsaved:
+                checkpoint.mark_done(page)
+            unsaved.clear()
+            checkpoint.save()
         
-        start_page = max(2, last_checkpoint_page) if last_checkpoint_page > 1 else 2
+        report_progress(pages_done())
         
-        if start_page > 2:
-            logger.info(f"Resuming from page {start_page} (checkpoint was at page {last_checkpoint_page})")
+        remaining_pages = checkpoint.missing(start=2)
+        if len(remaining_pages) < total_pages - 1:
+            logger.info(f"Resuming from checkpoint: {total_pages - 1 - len(remaining_pages)} pages already completed, {len(remaining_pages)} missing")
         
-        # Define função para buscar uma página
+        # Define função para buscar uma página (None = falha, [] = página vazia)
         def fetch_page(page_num):
             if is_cancelled():
-                return page_num, []
+                return page_num, None
             result = self.get_editais(page=page_num, data_inicial=data_inicial, data_final=data_final, codigo_modalidade=codigo_modalidade)
             if result is None:
-                return page_num, []
+                return page_num, None
             if isinstance(result, list):
                 return page_num, result
             elif isinstance(result, dict):
@@ -390,11 +469,20 @@ class PNCPClient:
                 return page_num, data if isinstance(data, list) else []
             return page_num, []
         
+        def page_failed(page_num):
+            # Re-enfileira a página no fim da execução até EDITAIS_PAGE_MAX_RETRIES falhas
+            failures = checkpoint.mark_failed(page_num)
+            if failures < EDITAIS_PAGE_MAX_RETRIES:
+                logger.warning(f"Page {page_num} failed ({failures}/{EDITAIS_PAGE_MAX_RETRIES}). Re-queued for a later retry.")
+                remaining_pages.append(page_num)
+            else:
+                logger.error(f"Page {page_num} failed {failures} times. Kept in checkpoint for the next run.")
+        
         # Busca páginas em paralelo em batches
-        remaining_pages = list(range(start_page, total_pages + 1))
         batch_size = max_workers * 2  # Processa em batches maiores para manter threads ocupadas
-        checkpoint_interval = 50  # Salva checkpoint a cada 50 páginas
+        checkpoint_interval = 50  # Chama on_checkpoint a cada 50 páginas
         pages_fetched = 0
+        pages_since_checkpoint = 0
         cancelled = False
         
         logger.info(f"Fetching {len(remaining_pages)} remaining pages with {max_workers} parallel workers...")
@@ -405,7 +493,9 @@ class PNCPClient:
             
             while remaining_pages and not is_cancelled():
                 batch = remaining_pages[:batch_size]
-                remaining_pages = remaining_pages[batch_size:]
+                del remaining_pages[:batch_size]
+                batch_pages = []
+                batch_done = []
                 
                 with ThreadPoolExecutor(max_workers=max_workers) as executor:
                     futures = {executor.submit(fetch_page, page): page for page in batch}
@@ -417,13 +507,21 @@ class PNCPClient:
                             page_num = futures[future]
                             try:
                                 _, page_data = future.result(timeout=5)
-                                if page_data:
-                                    all_editais.extend(page_data)
-                                pages_fetched += 1
-                                if pages_fetched % 10 == 0:
-                                    logger.info(f"Progress: {pages_fetched + 1}/{total_pages} pages, {len(all_editais)} editais collected")
                             except Exception as e:
                                 logger.error(f"Error fetching page {page_num}: {e}")
+                                page_data = None
+                            if page_data is None:
+                                if not is_cancelled():
+                                    page_failed(page_num)
+                                continue
+                            batch_done.append(page_num)
+                            if page_data:
+                                all_editais.extend(page_data)
+                                batch_pages.append((page_num, page_data))
+                            pages_fetched += 1
+                            pages_since_checkpoint += 1
+                            if pages_fetched % 10 == 0:
+                                logger.info(f"Progress: {pages_done() + len(batch_done)}/{total_pages} pages, {len(all_editais)} editais collected")
                     except TimeoutError as te:
                         unfinished = [futures[f] for f in futures if not f.done()]
                         logger.error(f"Timeout: {len(unfinished)} (of {len(futures)}) futures unfinished: {unfinished}")
@@ -439,18 +537,24 @@ class PNCPClient:
                         cancelled = True
                         break
                 
+                # Falhas do batch ficam registradas mesmo se interrompido
+                checkpoint.save()
+                
                 if cancelled or is_cancelled():
+                    # Páginas do batch não entregues ao consumidor serão buscadas de novo
+                    report_progress(pages_done())
                     break
                 
-                # Checkpoint após cada batch
-                if pages_fetched % checkpoint_interval == 0 or not remaining_pages:
-                    current_page = batch[-1] if batch else start_page
-                    self._save_checkpoint_page(current_page)
-                    if on_checkpoint:
-                        try:
-                            on_checkpoint(all_editais, current_page)
-                        except Exception as e:
-                            logger.error(f"Error in checkpoint callback: {e}")
+                # Entrega as páginas do batch ao consumidor (pode bloquear: backpressure)
+                for page_num, page_data in batch_pages:
+                    deliver_page(page_num, page_data)
+                unsaved.update(batch_done)
+                report_progress(pages_done())
+                
+                # Checkpoint de editais a cada N páginas e ao final
+                if pages_since_checkpoint >= checkpoint_interval or not remaining_pages:
+                    pages_since_checkpoint = 0
+                    persist_pages()
                 
                 # Pequena pausa entre batches para não sobrecarregar a API
                 if remaining_pages:
@@ -461,19 +565,20 @@ class PNCPClient:
             request_cancel()
             cancelled = True
         
-        if cancelled:
+        if cancelled or is_cancelled():
             logger.info(f"Operação interrompida. Salvando {len(all_editais)} editais coletados até agora...")
-            # Salva checkpoint final
+            # Grava os editais e só então salva o checkpoint final (páginas efetivamente gravadas)
             if all_editais:
-                self._save_checkpoint_page(pages_fetched + start_page)
-                if on_checkpoint:
-                    try:
-                        on_checkpoint(all_editais, pages_fetched + start_page)
-                    except Exception as e:
-                        logger.error(f"Error in final checkpoint callback: {e}")
-        else:
+                persist_pages()
+            checkpoint.save()
+        elif not [page for page in checkpoint.missing() if page not in unsaved]:
             # Busca completa — reseta checkpoint para próxima execução começar do zero
-            self._save_checkpoint_page(1)
+            checkpoint.reset()
+        else:
+            # Páginas que esgotaram as tentativas ficam pendentes para a próxima execução
+            missing = [page for page in checkpoint.missing() if page not in unsaved]
+            logger.warning(f"Finished with {len(missing)} pages still missing after retries: {missing[:20]}")
+            checkpoint.save()
         
         logger.info(f"Finished fetching editais. Total collected: {len(all_editais)}")
         return all_editais
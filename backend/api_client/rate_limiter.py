@@ -0,0 +1,196 @@
+"""
+Limitador de taxa adaptativo (AIMD) compartilhado pelas requisições ao PNCP.
+
+Este módulo implementa a classe AdaptiveRateLimiter, um token bucket cuja taxa
+(requisições/segundo) se ajusta pelo esquema AIMD (additive increase /
+multiplicative decrease):
+
+- cada resposta bem-sucedida aumenta a taxa aos poucos (≈ +increase req/s a cada
+  segundo de sucessos contínuos), até max_rate;
+- respostas 429/5xx e falhas de conexão multiplicam a taxa por decrease_factor
+  (no máximo uma redução por janela de cooldown, para que uma rajada de erros
+  simultâneos não derrube a taxa até o mínimo de uma vez);
+- um Retry-After recebido pausa todas as requisições do processo até o prazo.
+
+Uma única instância por processo (get_rate_limiter) é usada pelo PNCPClient e
+pelo AsyncPNCPClient. O limitador apenas calcula quanto cada chamador deve
+esperar (reserve); a espera em si fica com o cliente (time.sleep ou asyncio).
+"""
+
+import threading
+import time
+import logging
+from backend.config import (
+    API_RATE_LIMIT_INITIAL, API_RATE_LIMIT_MIN, API_RATE_LIMIT_MAX,
+    API_RATE_LIMIT_INCREASE, API_RATE_LIMIT_DECREASE
+)
+
+logger = logging.getLogger(__name__)
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket thread-safe com taxa ajustada por AIMD.
+
+    Args:
+        initial_rate: Taxa inicial (req/s)
+        min_rate: Taxa mínima (req/s)
+        max_rate: Taxa máxima (req/s)
+        increase: Aumento aditivo (req/s por segundo de sucessos)
+        decrease_factor: Fator multiplicativo aplicado em 429/5xx (0 < f < 1)
+        burst: Capacidade do bucket em tokens (padrão: 1 segundo da taxa atual)
+        decrease_cooldown: Intervalo mínimo (s) entre reduções consecutivas
+        clock: Função de tempo monotônico (injetável em testes)
+    """
+    def __init__(self, initial_rate, min_rate, max_rate, increase=1.0, decrease_factor=0.5,
+                 burst=None, decrease_cooldown=1.0, clock=time.monotonic):
+        self.min_rate = float(min_rate)
+        self.max_rate = float(max_rate)
+        self.increase = float(increase)
+        self.decrease_factor = float(decrease_factor)
+        self.burst = burst
+        self.decrease_cooldown = decrease_cooldown
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._rate = min(max(float(initial_rate), self.min_rate), self.max_rate)
+        self._tokens = self._capacity()
+        self._updated_at = clock()
+        self._blocked_until = 0.0
+        self._last_decrease = None
+        self._successes = 0
+        self._throttled = 0
+        self._errors = 0
+
+    def _capacity(self):
+        return float(self.burst) if self.burst else max(1.0, self._rate)
+
+    def _refill(self, now):
+        # Tokens só voltam a acumular depois de uma eventual pausa global (Retry-After)
+        start = max(self._updated_at, self._blocked_until)
+        if now > start:
+            self._tokens = min(self._capacity(), self._tokens + (now - start) * self._rate)
+            self._updated_at = now
+
+    def reserve(self):
+        """
+        Reserva um token e retorna quantos segundos o chamador deve esperar antes
+        de enviar a requisição (0 se puder enviar imediatamente). As reservas são
+        atendidas em ordem: o saldo pode ficar negativo e a espera cresce com a fila.
+        """
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            self._tokens -= 1.0
+            wait = max(0.0, self._blocked_until - now)
+            if self._tokens < 0:
+                wait += -self._tokens / self._rate
+            return wait
+
+    def acquire(self):
+        # Versão bloqueante de reserve() para clientes síncronos
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def on_success(self):
+        # Aumento aditivo: +increase/rate por resposta ≈ +increase req/s por segundo
+        with self._lock:
+            self._successes += 1
+            self._rate = min(self.max_rate, self._rate + self.increase / self._rate)
+
+    def _decrease(self, now):
+        if self._last_decrease is not None and now - self._last_decrease < self.decrease_cooldown:
+            return
+        self._last_decrease = now
+        old_rate = self._rate
+        self._rate = max(self.min_rate, self._rate * self.decrease_factor)
+        # Descarta a rajada acumulada para a nova taxa valer imediatamente
+        self._tokens = min(self._tokens, 0.0)
+        logger.info(f"Rate limiter: reduzindo taxa de {old_rate:.2f} para {self._rate:.2f} req/s")
+
+    def on_throttle(self, retry_after=None):
+        """
+        Registra um 429. Reduz a taxa e, com Retry-After (segundos), pausa todas as
+        requisições do processo até o prazo indicado.
+        """
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            self._throttled += 1
+            self._decrease(now)
+            if retry_after:
+                self._blocked_until = max(self._blocked_until, now + float(retry_after))
+
+    def on_error(self):
+        # Registra um 5xx ou falha de conexão (sinal de sobrecarga): só reduz a taxa
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            self._errors += 1
+            self._decrease(now)
+
+    def record_status(self, status, retry_after=None):
+        """
+        Ajusta a taxa a partir do status HTTP de uma resposta.
+        """
+        if status == 429:
+            self.on_throttle(retry_after)
+        elif status >= 500:
+            self.on_error()
+        else:
+            self.on_success()
+
+    @property
+    def rate(self):
+        return self._rate
+
+    def stats(self):
+        """
+        Retorna o estado atual do limitador (para monitoramento).
+        """
+        with self._lock:
+            now = self._clock()
+            return {
+                "rate": round(self._rate, 3),
+                "min_rate": self.min_rate,
+                "max_rate": self.max_rate,
+                "blocked_for": round(max(0.0, self._blocked_until - now), 3),
+                "successes": self._successes,
+                "throttled": self._throttled,
+                "errors": self._errors,
+            }
+
+
+def parse_retry_after(value):
+    """
+    Converte o header Retry-After (segundos) em float; None se ausente ou inválido.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+_rate_limiter = None
+_rate_limiter_guard = threading.Lock()
+
+
+def get_rate_limiter():
+    """
+    Retorna o limitador de taxa compartilhado pelo processo (criado com as configurações do .env).
+    """
+    global _rate_limiter
+    if _rate_limiter is None:
+        with _rate_limiter_guard:
+            if _rate_limiter is None:
+                _rate_limiter = AdaptiveRateLimiter(
+                    initial_rate=API_RATE_LIMIT_INITIAL,
+                    min_rate=API_RATE_LIMIT_MIN,
+                    max_rate=API_RATE_LIMIT_MAX,
+                    increase=API_RATE_LIMIT_INCREASE,
+                    decrease_factor=API_RATE_LIMIT_DECREASE,
+                )
+    return _rate_limiter
@@ -12,14 +12,32 @@ from .settings import (
     MAX_RETRIES,
     RETRY_DELAY,
     RETRY_BACKOFF_MULTIPLIER,
+    API_RATE_LIMIT_INITIAL,
+    API_RATE_LIMIT_MIN,
+    API_RATE_LIMIT_MAX,
+    API_RATE_LIMIT_INCREASE,
+    API_RATE_LIMIT_DECREASE,
     ITEMS_FETCH_THREADS,
-    ITEMS_FETCH_DELAY_PER_THREAD,
     ITEMS_FETCH_CHECKPOINT,
     ITEMS_SKIP_EXISTING,
+    SYNC_PIPELINE,
+    SYNC_PIPELINE_QUEUE_SIZE,
+    ITEMS_FETCH_ASYNC,
+    ITEMS_FETCH_CONCURRENCY,
     DATA_DIR,
     LOGS_DIR,
     EXPORT_DIR,
     EDITAIS_CHECKPOINT_FILE,
+    EDITAIS_PAGE_MAX_RETRIES,
+    HTTP_CACHE_ENABLED,
+    HTTP_CACHE_FILE,
+    HTTP_CACHE_MAX_MB,
+    STATIC_ASSETS_MAX_AGE,
+    COMPRESSION_ENABLED,
+    COMPRESSION_MIN_SIZE,
+    METRICS_ENABLED,
+    METRICS_TOKEN,
+    STORAGE_BACKEND,
     SCHEDULER_HOUR,
     SCHEDULER_MINUTE,
     LOG_LEVEL,
@@ -43,14 +61,32 @@ __all__ = [
     "MAX_RETRIES",
     "RETRY_DELAY",
     "RETRY_BACKOFF_MULTIPLIER",
+    "API_RATE_LIMIT_INITIAL",
+    "API_RATE_LIMIT_MIN",
+    "API_RATE_LIMIT_MAX",
+    "API_RATE_LIMIT_INCREASE",
+    "API_RATE_LIMIT_DECREASE",
     "ITEMS_FETCH_THREADS",
-    "ITEMS_FETCH_DELAY_PER_THREAD",
     "ITEMS_FETCH_CHECKPOINT",
     "ITEMS_SKIP_EXISTING",
+    "SYNC_PIPELINE",
+    "SYNC_PIPELINE_QUEUE_SIZE",
+    "ITEMS_FETCH_ASYNC",
+    "ITEMS_FETCH_CONCURRENCY",
     "DATA_DIR",
     "LOGS_DIR",
     "EXPORT_DIR",
     "EDITAIS_CHECKPOINT_FILE",
+    "EDITAIS_PAGE_MAX_RETRIES",
+    "HTTP_CACHE_ENABLED",
+    "HTTP_CACHE_FILE",
+    "HTTP_CACHE_MAX_MB",
+    "STATIC_ASSETS_MAX_AGE",
+    "COMPRESSION_ENABLED",
+    "COMPRESSION_MIN_SIZE",
+    "METRICS_ENABLED",
+    "METRICS_TOKEN",
+    "STORAGE_BACKEND",
     "SCHEDULER_HOUR",
     "SCHEDULER_MINUTE",
     "LOG_LEVEL",
@@ -73,12 +73,26 @@ MAX_RETRIES = int(_get_env("MAX_RETRIES", "5"))  # Número de tentativas antes d
 RETRY_DELAY = float(_get_env("RETRY_DELAY", "5"))  # Delay inicial entre tentativas (segundos)
 RETRY_BACKOFF_MULTIPLIER = float(_get_env("RETRY_BACKOFF_MULTIPLIER", "2.0"))  # Multiplicador exponencial para backoff
 
+# Limitador de taxa adaptativo (AIMD) compartilhado por todas as requisições ao PNCP
+API_RATE_LIMIT_INITIAL = float(_get_env("API_RATE_LIMIT_INITIAL", "5"))  # Taxa inicial (requisições/segundo)
+API_RATE_LIMIT_MIN = float(_get_env("API_RATE_LIMIT_MIN", "0.5"))  # Taxa mínima após reduções
+API_RATE_LIMIT_MAX = float(_get_env("API_RATE_LIMIT_MAX", "50"))  # Taxa máxima
+API_RATE_LIMIT_INCREASE = float(_get_env("API_RATE_LIMIT_INCREASE", "1.0"))  # Aumento aditivo (req/s por segundo de sucessos)
+API_RATE_LIMIT_DECREASE = float(_get_env("API_RATE_LIMIT_DECREASE", "0.5"))  # Fator multiplicativo em 429/5xx
+
 # Configuração de busca paralela de itens (configuráveis via .env)
 ITEMS_FETCH_THREADS = int(_get_env("ITEMS_FETCH_THREADS"))  # Número de threads paralelas (reduza se tiver muitos 429)
-ITEMS_FETCH_DELAY_PER_THREAD = float(_get_env("ITEMS_FETCH_DELAY"))  # Delay por thread para evitar rate limit
 ITEMS_FETCH_CHECKPOINT = 100  # Salvar progresso a cada N editais
 ITEMS_SKIP_EXISTING = _get_env("ITEMS_SKIP_EXISTING", "true").lower() in ("true", "1", "yes")  # Pular editais com itens já salvos
 
+# Sincronização em pipeline: itens de editais novos são buscados enquanto as páginas de editais ainda chegam
+SYNC_PIPELINE = _get_env("SYNC_PIPELINE", "true").lower() in ("true", "1", "yes")
+SYNC_PIPELINE_QUEUE_SIZE = int(_get_env("SYNC_PIPELINE_QUEUE_SIZE", "200"))  # Editais aguardando busca de itens (backpressure)
+
+# Coleta assíncrona de itens (asyncio + aiohttp; instale o extra "async")
+ITEMS_FETCH_ASYNC = _get_env("ITEMS_FETCH_ASYNC", "false").lower() in ("true", "1", "yes")  # Usa AsyncPNCPClient em vez de threads
+ITEMS_FETCH_CONCURRENCY = int(_get_env("ITEMS_FETCH_CONCURRENCY", "100"))  # Máximo de requisições simultâneas no modo assíncrono
+
 # Pastas padrão (paths absolutos)
 DATA_DIR = os.path.join(BASE_DIR, "data")
 LOGS_DIR = os.path.join(BASE_DIR, "logs")
@@ -86,6 +100,27 @@ EXPORT_DIR = DATA_DIR
 
 # Arquivo de checkpoint (metadados de progresso)
 EDITAIS_CHECKPOINT_FILE = os.path.join(DATA_DIR, ".editais_checkpoint.json")
+EDITAIS_PAGE_MAX_RETRIES = int(_get_env("EDITAIS_PAGE_MAX_RETRIES", "3"))  # Falhas por página antes de deixá-la para a próxima execução
+
+# Cache HTTP em disco (ETag/Last-Modified + requisições condicionais) das respostas do PNCP
+HTTP_CACHE_ENABLED = _get_env("HTTP_CACHE_ENABLED", "true").lower() in ("true", "1", "yes")
+HTTP_CACHE_FILE = os.path.join(DATA_DIR, "http_cache.db")
+HTTP_CACHE_MAX_MB = int(_get_env("HTTP_CACHE_MAX_MB", "512"))  # Tamanho máximo (LRU) em MB
+
+# Cache no navegador dos arquivos estáticos com hash no nome (build do Vite), em segundos
+STATIC_ASSETS_MAX_AGE = int(_get_env("STATIC_ASSETS_MAX_AGE", "31536000"))
+
+# Compressão gzip/brotli das respostas (brotli requer o extra "compression")
+COMPRESSION_ENABLED = _get_env("COMPRESSION_ENABLED", "true").lower() in ("true", "1", "yes")
+COMPRESSION_MIN_SIZE = int(_get_env("COMPRESSION_MIN_SIZE", "1024"))  # Respostas menores (bytes) seguem sem compressão
+
+# Métricas no formato do Prometheus em /metrics: só expostas com METRICS_TOKEN definido
+# (o scrape envia "Authorization: Bearer <token>"); sem token a rota responde 404
+METRICS_ENABLED = _get_env("METRICS_ENABLED", "true").lower() in ("true", "1", "yes")
+METRICS_TOKEN = _get_env("METRICS_TOKEN", "")
+
+# Engine de armazenamento de editais/itens/contratos: "json" (arquivos JSON) ou "sqlite" (data/pncp.db)
+STORAGE_BACKEND = _get_env("PNCP_STORAGE_BACKEND", "json").lower()
 
 # Horário padrão do agendador
 SCHEDULER_HOUR = 3
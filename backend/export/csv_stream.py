@@ -0,0 +1,133 @@
+"""
+Exportação CSV em streaming (editais + itens) sem montar DataFrames.
+
+Este módulo reúne as peças usadas para gravar o editais.csv a partir dos
+registros do armazenamento (DataManager.iter_itens):
+
+- CsvSchema: as colunas achatadas (chaves aninhadas unidas por ".", como no
+  pd.json_normalize) na ordem em que aparecem, primeiro nos editais e depois
+  nos itens — a mesma ordem do pd.concat usado antes.
+- cell_value/csv_text: cada célula sanitizada na hora (normalize_str), com
+  números preservados para o XLSX e o texto equivalente ao do pandas no CSV.
+- CsvLineFormatter/write_lines: linhas CSV já formatadas (guardadas no cache
+  de exportação, export_cache) gravadas em sequência.
+
+A memória fica limitada ao esquema e à linha atual, independentemente da
+quantidade de itens. O arquivo é gravado em um .tmp e substituído
+atomicamente, então downloads em andamento nunca veem um CSV pela metade.
+"""
+
+import csv
+import io
+import os
+
+from backend.export.normalizer import normalize_dict, normalize_str
+
+TYPE_COLUMN = "tipo"
+
+
+def _flatten_nested(value, prefix, out):
+    for key, child in value.items():
+        if isinstance(child, dict):
+            _flatten_nested(child, f"{prefix}{key}.", out)
+        else:
+            out[f"{prefix}{key}"] = child
+
+
+def flatten(record):
+    """
+    Achata dicionários aninhados em {"orgaoEntidade.cnpj": ...} na ordem do
+    pd.json_normalize: campos simples primeiro, depois os aninhados; dicionários
+    vazios são descartados e listas ficam como valor.
+    """
+    nested = [key for key, value in record.items() if isinstance(value, dict)]
+    if not nested:
+        # Registro sem aninhamento (caso comum dos itens): já está achatado
+        return record
+    out = {key: value for key, value in record.items() if not isinstance(value, dict)}
+    for key in nested:
+        _flatten_nested(record[key], f"{key}.", out)
+    return out
+
+
+class CsvSchema:
+    """
+    Colunas achatadas na ordem da primeira ocorrência entre os registros observados.
+    """
+    def __init__(self):
+        self._columns = {}
+
+    def observe(self, record):
+        columns = self._columns
+        for name in flatten(record):
+            if name not in columns:
+                columns[name] = None
+
+    def observe_all(self, records):
+        for record in records:
+            self.observe(record)
+        return self
+
+    @property
+    def columns(self):
+        return list(self._columns)
+
+
+def cell_value(value):
+    # Valor sanitizado da célula: números/booleanos como estão, textos normalizados, None para vazio/NaN
+    cls = type(value)
+    if cls is str:
+        return normalize_str(value)
+    if value is None:
+        return None
+    if cls is float:
+        return None if value != value else value
+    if cls is int or cls is bool:
+        return value
+    if cls is list:
+        return str([normalize_dict(v) if isinstance(v, dict) else normalize_str(v) for v in value])
+    return str(value)
+
+
+def csv_text(value):
+    # Texto de uma célula já sanitizada (cell_value) como o pandas grava no CSV
+    if value is None:
+        return ""
+    if type(value) is float:
+        return repr(value)
+    return str(value)
+
+
+class CsvLineFormatter:
+    """
+    Converte listas de células em linhas CSV (aspas e escapes do csv.writer).
+    """
+    def __init__(self):
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer, lineterminator="\n")
+
+    def line(self, values):
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        self._writer.writerow(values)
+        return self._buffer.getvalue()
+
+
+def write_lines(path, lines, encoding="utf-8-sig"):
+    """
+    Grava as linhas já formatadas em `path` (substituído atomicamente ao final).
+    Retorna a quantidade de linhas gravadas.
+    """
+    count = 0
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, "w", encoding=encoding, newline="") as f:
+            for line in lines:
+                f.write(line)
+                count += 1
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return count
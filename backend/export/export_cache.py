@@ -0,0 +1,321 @@
+"""
+Cache incremental das exportações de editais (editais.csv / editais.xlsx).
+
+Este módulo implementa a classe EditaisExportCache, usada pelo Exporter para não
+regerar as exportações do zero a cada execução (startup, jobs diário e
+incremental, download sob demanda):
+
+- Cada exportação é marcada com a chave da origem que a produziu: hash do
+  conteúdo dos editais + assinatura do dataset de itens no armazenamento
+  (mtime/tamanho dos arquivos no JSON, contador de geração no SQLite). Se a
+  chave não mudou e os arquivos existem, a exportação é pulada sem ler os itens.
+- As linhas ficam em blocos por edital (a linha do edital + as linhas dos seus
+  itens), já achatadas e sanitizadas, em um banco SQLite ao lado das
+  exportações, cada bloco com o hash do conteúdo de origem. Quando algo mudou,
+  apenas os blocos cujo hash mudou são recalculados; os demais vão do cache
+  direto para os arquivos (CSV como texto pronto, XLSX como células).
+- Uma mudança no esquema de colunas (campo novo) invalida todos os blocos.
+
+Itens sem edital correspondente ficam em um bloco próprio, depois dos editais.
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+
+from backend.export.csv_stream import TYPE_COLUMN, CsvLineFormatter, CsvSchema, cell_value, csv_text, flatten
+from backend.storage.indexes import index_key
+
+logger = logging.getLogger(__name__)
+
+# Versão do formato das linhas em cache (mudar invalida todos os blocos)
+CACHE_VERSION = "1"
+
+# Bloco dos itens sem edital correspondente
+ORPHANS = "orfaos"
+
+# Linhas de itens acumuladas antes de cada executemany
+_BATCH = 1000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS blocks (
+    key TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    hash TEXT NOT NULL,
+    edital_row TEXT,
+    edital_csv TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_blocks_position ON blocks (position);
+CREATE TABLE IF NOT EXISTS item_rows (
+    block TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    row TEXT NOT NULL,
+    csv TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_item_rows_block ON item_rows (block, seq);
+"""
+
+_encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), check_circular=False, default=str)
+
+
+def _encode(record):
+    return _encoder.encode(record).encode("utf-8")
+
+
+def _hasher(data=b""):
+    return hashlib.blake2b(data, digest_size=16)
+
+
+def _schema_text(plan):
+    return json.dumps([CACHE_VERSION, plan.editais_columns, plan.itens_columns], ensure_ascii=False)
+
+
+class ExportPlan:
+    """
+    Resultado da comparação entre os dados atuais e o cache.
+
+    Attributes:
+        source: chave da origem (conteúdo dos editais + assinatura dos itens)
+        up_to_date: True se o cache já corresponde a `source`
+        keys: blocos na ordem de exportação (editais e, se houver, órfãos)
+        changed: blocos a recalcular
+        full: True se o esquema mudou (todos os blocos são recalculados)
+    """
+    def __init__(self, source, editais):
+        self.source = source
+        self.editais = editais
+        self.up_to_date = False
+        self.keys = []
+        self.by_id = {}
+        self.by_numero = {}
+        self.edital_digests = []
+        self.hashes = {}
+        self.changed = set()
+        self.removed = set()
+        self.full = False
+        self.itens_ok = True
+        self.editais_columns = []
+        self.itens_columns = []
+
+    @property
+    def columns(self):
+        # Colunas do CSV: as dos editais seguidas das novas dos itens (ordem do pd.concat)
+        known = set(self.editais_columns)
+        return self.editais_columns + [c for c in self.itens_columns if c not in known]
+
+    def item_block(self, item):
+        block = self.by_id.get(index_key(item.get("edital_ID_C_PNCP")))
+        if block is None:
+            block = self.by_numero.get(index_key(item.get("edital_numeroControlePNCP")), ORPHANS)
+        return block
+
+
+class EditaisExportCache:
+    """
+    Blocos de linhas por edital em SQLite, com o hash de origem de cada bloco.
+
+    Args:
+        db_path: Caminho do banco SQLite do cache
+    """
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._conn = sqlite3.connect(db_path)
+        # WAL: leitores (editais_export_tag nos downloads) não esperam o rebuild em andamento
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def _get_meta(self, name):
+        row = self._conn.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, name, value):
+        self._conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)", (name, value))
+
+    @property
+    def source(self):
+        # Chave da origem da última exportação concluída (None se nunca exportou)
+        return self._get_meta("source")
+
+    def plan(self, editais, iter_itens, itens_signature, check_source=True):
+        """
+        Compara os dados atuais com o cache.
+
+        Args:
+            editais: Lista de editais a exportar.
+            iter_itens: Função que devolve um iterador novo dos itens (ex.: DataManager.iter_itens).
+            itens_signature: Assinatura do dataset de itens no armazenamento.
+            check_source: Se False, compara os blocos mesmo com a origem inalterada
+                          (ex.: um dos arquivos exportados foi removido).
+        """
+        editais_hash = _hasher(CACHE_VERSION.encode())
+        plan = ExportPlan(None, editais)
+        schema = CsvSchema()
+        for pos, edital in enumerate(editais):
+            digest = _hasher(_encode(edital)).digest()
+            editais_hash.update(digest)
+            plan.edital_digests.append(digest)
+            schema.observe(edital)
+            uid = index_key(edital.get("ID_C_PNCP"))
+            numero = index_key(edital.get("numeroControlePNCP"))
+            key = f"id:{uid}" if uid else f"num:{numero}" if numero else f"pos:{pos}"
+            if key in plan.hashes:
+                key = f"{key}#{pos}"
+            plan.keys.append(key)
+            plan.hashes[key] = None
+            if uid:
+                plan.by_id.setdefault(uid, key)
+            if numero:
+                plan.by_numero.setdefault(numero, key)
+        plan.editais_columns = schema.columns
+        plan.source = hashlib.sha256(f"{editais_hash.hexdigest()}|{itens_signature!r}".encode()).hexdigest()
+        if check_source and self.source == plan.source:
+            plan.up_to_date = True
+            return plan
+
+        # Hash dos itens de cada bloco + esquema dos itens (1ª passada nos itens)
+        item_hashers = {}
+        itens_schema = CsvSchema()
+        try:
+            for item in iter_itens():
+                block = plan.item_block(item)
+                hasher = item_hashers.get(block)
+                if hasher is None:
+                    hasher = item_hashers[block] = _hasher()
+                hasher.update(_encode(item))
+                itens_schema.observe(item)
+        except Exception as e:
+            logger.warning(f"Could not load/export itens: {e}")
+            item_hashers, itens_schema, plan.itens_ok = {}, CsvSchema(), False
+        plan.itens_columns = itens_schema.columns
+
+        for key, digest in zip(plan.keys, plan.edital_digests):
+            items = item_hashers.get(key)
+            plan.hashes[key] = _hasher(digest + (items.digest() if items else b"")).hexdigest()
+        if ORPHANS in item_hashers:
+            plan.keys.append(ORPHANS)
+            plan.hashes[ORPHANS] = item_hashers[ORPHANS].hexdigest()
+
+        stored = dict(self._conn.execute("SELECT key, hash FROM blocks"))
+        plan.full = self._get_meta("schema") != _schema_text(plan)
+        plan.changed = set(plan.keys) if plan.full else {k for k in plan.keys if stored.get(k) != plan.hashes[k]}
+        plan.removed = set(stored) - set(plan.keys)
+        return plan
+
+    def rebuild(self, plan, iter_itens):
+        """
+        Recalcula os blocos alterados do plano (2ª passada nos itens, só os desses
+        blocos vão para o cache) e atualiza a ordem de todos os blocos.
+        """
+        editais_columns, itens_columns, columns = plan.editais_columns, plan.itens_columns, plan.columns
+        padding = [""] * (len(columns) - len(editais_columns))
+        formatter = CsvLineFormatter()
+        positions = {key: pos for pos, key in enumerate(plan.keys)}
+        with self._conn:
+            if plan.full:
+                self._conn.execute("DELETE FROM blocks")
+                self._conn.execute("DELETE FROM item_rows")
+                self._set_meta("schema", _schema_text(plan))
+            stale = list(plan.changed | plan.removed)
+            self._conn.executemany("DELETE FROM blocks WHERE key = ?", [(k,) for k in stale])
+            self._conn.executemany("DELETE FROM item_rows WHERE block = ?", [(k,) for k in stale])
+
+            # Hash recalculado com os itens efetivamente gravados (o armazenamento
+            # pode ter mudado entre as passadas)
+            hashers = {}
+            for key, digest in zip(plan.keys, plan.edital_digests):
+                if key in plan.changed:
+                    hashers[key] = [digest, None]
+            if ORPHANS in plan.changed:
+                hashers[ORPHANS] = [b"", None]
+
+            if plan.itens_ok and hashers:
+                batch = []
+                for seq, item in enumerate(iter_itens()):
+                    block = plan.item_block(item)
+                    if block not in hashers:
+                        continue
+                    entry = hashers[block]
+                    if entry[1] is None:
+                        entry[1] = _hasher()
+                    entry[1].update(_encode(item))
+                    get = flatten(item).get
+                    values = {column: cell_value(get(column)) for column in itens_columns}
+                    row = ["item"] + [values[column] for column in itens_columns]
+                    line = formatter.line(["item"] + [csv_text(values.get(column)) for column in columns])
+                    batch.append((block, seq, _encoder.encode(row), line))
+                    if len(batch) >= _BATCH:
+                        self._conn.executemany("INSERT INTO item_rows (block, seq, row, csv) VALUES (?, ?, ?, ?)", batch)
+                        batch = []
+                if batch:
+                    self._conn.executemany("INSERT INTO item_rows (block, seq, row, csv) VALUES (?, ?, ?, ?)", batch)
+
+            blocks = []
+            for key, edital in zip(plan.keys, plan.editais):
+                if key not in hashers:
+                    continue
+                get = flatten(edital).get
+                values = [cell_value(get(column)) for column in editais_columns]
+                digest, items = hashers[key]
+                block_hash = _hasher(digest + (items.digest() if items else b"")).hexdigest()
+                line = formatter.line(["edital"] + [csv_text(v) for v in values] + padding)
+                blocks.append((key, positions[key], block_hash, _encoder.encode(["edital"] + values), line))
+            if ORPHANS in hashers:
+                items = hashers[ORPHANS][1] or _hasher()
+                blocks.append((ORPHANS, positions[ORPHANS], items.hexdigest(), None, None))
+            self._conn.executemany(
+                "INSERT INTO blocks (key, position, hash, edital_row, edital_csv) VALUES (?, ?, ?, ?, ?)", blocks
+            )
+            self._conn.executemany(
+                "UPDATE blocks SET position = ? WHERE key = ?",
+                [(pos, key) for key, pos in positions.items() if key not in hashers],
+            )
+            # A origem só é registrada depois que os arquivos forem gravados (mark_exported)
+            self._conn.execute("DELETE FROM meta WHERE name = 'source'")
+
+    def mark_exported(self, plan):
+        # Registra a origem dos arquivos gravados (as próximas exportações iguais são puladas)
+        with self._conn:
+            self._set_meta("source", plan.source)
+
+    def csv_lines(self, plan):
+        """
+        Linhas do editais.csv: cabeçalho, editais e itens na ordem dos blocos.
+        """
+        yield CsvLineFormatter().line([TYPE_COLUMN] + plan.columns)
+        for (line,) in self._conn.execute(
+            "SELECT edital_csv FROM blocks WHERE edital_csv IS NOT NULL ORDER BY position"
+        ):
+            yield line
+        for (line,) in self._conn.execute(
+            "SELECT i.csv FROM blocks b JOIN item_rows i ON i.block = b.key ORDER BY b.position, i.seq"
+        ):
+            yield line
+
+    def _rows(self, query):
+        for (row,) in self._conn.execute(query):
+            yield json.loads(row)
+
+    def xlsx_sheets(self, plan):
+        """
+        Abas do editais.xlsx no formato de xlsx_stream.write_workbook.
+        """
+        return [
+            (
+                "Editais",
+                [TYPE_COLUMN] + plan.editais_columns,
+                self._rows("SELECT edital_row FROM blocks WHERE edital_row IS NOT NULL ORDER BY position"),
+            ),
+            (
+                "Itens Editais",
+                [TYPE_COLUMN] + plan.itens_columns,
+                self._rows("SELECT i.row FROM blocks b JOIN item_rows i ON i.block = b.key ORDER BY b.position, i.seq"),
+            ),
+        ]
@@ -5,20 +5,44 @@ Fornece a classe Exporter, responsável por exportar dados de contratos, editais
 em formatos CSV e Excel, utilizando pandas e openpyxl.
 
 Antes da exportação, os dados são normalizados pelo módulo normalizer para remover
-caracteres ilegais que causam erros no openpyxl.
+caracteres ilegais que causam erros no openpyxl. Os arquivos de editais (CSV e
+XLSX) são gravados em streaming a partir do armazenamento (csv_stream, xlsx_stream),
+normalizando cada célula na escrita, e só os blocos de editais alterados desde a
+última exportação são recalculados (export_cache). Com o pyarrow instalado, a
+exportação de editais também grava editais.parquet e itens.parquet com esquemas
+tipados (storage.parquet_snapshot).
 """
 
 import pandas as pd
 import os
 import logging
+import sqlite3
+import threading
 from backend.config import EXPORT_DIR
-import re
-from openpyxl.utils.exceptions import IllegalCharacterError
 from backend.storage.data_manager import DataManager
-from backend.export.normalizer import normalize_records
+from backend.storage import parquet_snapshot
+from backend.export.csv_stream import write_lines
+from backend.export.export_cache import EditaisExportCache
+from backend.export.xlsx_stream import write_workbook
+from backend.monitoring import metrics
 
 logger = logging.getLogger(__name__)
 
+EXPORT_DURATION = metrics.histogram(
+    "export_duration_seconds", "Duração das exportações (stage=total ou etapa da exportação)", ("export", "stage")
+)
+EXPORT_ROWS_PER_SECOND = metrics.gauge(
+    "export_rows_per_second", "Linhas por segundo da última exportação", ("export", "format")
+)
+EXPORT_CACHE_RESULTS = metrics.counter(
+    "export_cache_results_total", "Exportações de editais por resultado do cache (skipped, incremental, full)", ("result",)
+)
+
+# Cache dos blocos de linhas por edital (ver export_cache), no diretório de exportação
+EXPORT_CACHE_FILE = "editais_export_cache.db"
+
+_editais_export_lock = threading.Lock()
+
 class Exporter:
     """
     Classe responsável por exportar dados do sistema PNCP em formatos CSV e XLSX.
@@ -38,6 +62,7 @@ class Exporter:
             os.makedirs(self.export_dir)
             logger.info(f"Diretório de exportação criado: {self.export_dir}")
 
+    @EXPORT_DURATION.time(export="contratos", stage="total")
     def export_contratos(self, contratos):
         """
         Exporta a lista de contratos para arquivos CSV e XLSX.
@@ -62,73 +87,105 @@ class Exporter:
             logger.error(f"Error exporting contratos: {e}")
             raise
     
+    @EXPORT_DURATION.time(export="editais", stage="total")
     def export_editais(self, editais):
         # Exporta editais + itens para um único CSV e um XLSX (com abas separadas)
         if not editais:
             logger.warning("No editais to export")
             return
         
-        try:
-            # Normaliza editais
-            logger.info("Normalizing editais data for export...")
-            editais_clean = normalize_records(editais)
-            df = pd.json_normalize(editais_clean)
-            df.insert(0, 'tipo', 'edital')
-
-            # Carrega e normaliza itens
-            df_itens = pd.DataFrame()
+        # Startup, jobs e download podem exportar ao mesmo tempo: uma exportação por vez
+        with _editais_export_lock:
+            cache = EditaisExportCache(os.path.join(self.export_dir, EXPORT_CACHE_FILE))
             try:
-                dm = DataManager()
-                itens = dm.load_itens()
-                if itens:
-                    logger.info("Normalizing itens data for export...")
-                    itens_clean = normalize_records(itens)
-                    df_itens = pd.json_normalize(itens_clean)
-                    df_itens.insert(0, 'tipo', 'item')
+                self._export_editais(editais, cache)
             except Exception as e:
-                logger.warning(f"Could not load/export itens: {e}")
+                logger.error(f"Error exporting editais: {e}")
+                raise
+            finally:
+                cache.close()
+
+    def _export_editais(self, editais, cache):
+        dm = DataManager()
+        csv_path = os.path.join(self.export_dir, "editais.csv")
+        xlsx_path = os.path.join(self.export_dir, "editais.xlsx")
+        outputs = [csv_path, xlsx_path] + self._parquet_paths()
 
-            # CSV único: editais + itens concatenados (com coluna 'tipo' distinguindo)
-            csv_path = os.path.join(self.export_dir, "editais.csv")
-            df_combined = pd.concat([df, df_itens], ignore_index=True, sort=False)
-            df_combined.to_csv(csv_path, index=False, encoding="utf-8-sig")
-            logger.info(f"Exported {len(df)} editais + {len(df_itens)} itens to {csv_path}")
+        # Origem inalterada (mesmos editais e itens) e arquivos presentes: nada a fazer
+        plan = cache.plan(editais, dm.iter_itens, dm.dataset_signature("itens"))
+        if plan.up_to_date and all(os.path.exists(path) for path in outputs):
+            EXPORT_CACHE_RESULTS.inc(result="skipped")
+            logger.info(f"Export files already up to date (source {plan.source[:12]}), skipping")
+            return
+        if plan.up_to_date:
+            # Arquivo removido: regrava a partir dos blocos em cache
+            plan = cache.plan(editais, dm.iter_itens, dm.dataset_signature("itens"), check_source=False)
+        result = "full" if plan.full else "incremental"
+        EXPORT_CACHE_RESULTS.inc(result=result)
+        logger.info(f"Export cache ({result}): {len(plan.changed)} of {len(plan.keys)} blocks to rebuild")
+        with EXPORT_DURATION.time(export="editais", stage="blocks"):
+            cache.rebuild(plan, dm.iter_itens)
 
-            # Exporta XLSX com ambas as abas
-            xlsx_path = os.path.join(self.export_dir, "editais.xlsx")
-            def _write_xlsx(df_main, df_items, path):
-                with pd.ExcelWriter(path, engine="openpyxl") as writer:
-                    df_main.to_excel(writer, sheet_name="Editais", index=False)
-                    df_items.to_excel(writer, sheet_name="Itens Editais", index=False)
+        # CSV único: editais + itens (com coluna 'tipo' distinguindo), a partir das linhas em cache
+        with EXPORT_DURATION.time(export="editais", stage="csv"):
+            lines = write_lines(csv_path, cache.csv_lines(plan))
+        logger.info(f"Exported {lines - 1} rows (editais + itens) to {csv_path}")
 
+        # XLSX com abas Editais e Itens Editais (continuação em novas abas acima do limite do Excel)
+        try:
+            with EXPORT_DURATION.time(export="editais", stage="xlsx"):
+                stats = write_workbook(xlsx_path, cache.xlsx_sheets(plan))
+            EXPORT_ROWS_PER_SECOND.set(stats["rows_per_second"] or 0, export="editais", format="xlsx")
+            logger.info(
+                f"Exported editais and itens to {xlsx_path} "
+                f"(abas: {', '.join(t for s in stats['sheets'].values() for t in s['titles'])})"
+            )
+        except Exception as e:
+            # Sem registrar a origem: a próxima exportação tenta o XLSX de novo
+            logger.error(f"Unexpected error exporting XLSX: {e}. CSV available at {csv_path}")
+            return
+
+        # Parquet tipado de editais e itens (row groups por mês de publicação), também usado como snapshot
+        if parquet_snapshot.is_available():
             try:
-                _write_xlsx(df, df_itens, xlsx_path)
-                logger.info(f"Exported editais and itens to {xlsx_path}")
-            except IllegalCharacterError as e:
-                logger.warning(f"Illegal characters after normalization: {e}. Attempting printable-only fallback...")
-                try:
-                    def printable_only(v):
-                        try:
-                            s = str(v)
-                        except Exception:
-                            return ''
-                        return ''.join(c for c in s if c.isprintable() or c in (' ', '\t'))
-
-                    for dframe in [df, df_itens]:
-                        for col in dframe.columns:
-                            if dframe[col].dtype == "object":
-                                dframe[col] = dframe[col].map(printable_only)
-                    _write_xlsx(df, df_itens, xlsx_path)
-                    logger.info(f"Exported editais and itens to {xlsx_path} after printable-only fallback")
-                except Exception as e2:
-                    logger.error(f"Failed to export XLSX even after fallback: {e2}. CSV available at {csv_path}")
+                with EXPORT_DURATION.time(export="editais", stage="parquet"):
+                    counts = parquet_snapshot.write_snapshots(
+                        self.export_dir, editais, dm.iter_itens,
+                        metadata={"pncp.export_source": plan.source, **dm.snapshot_signatures()},
+                    )
+                logger.info(f"Exported {counts['editais']} editais and {counts['itens']} itens to Parquet")
             except Exception as e:
-                logger.error(f"Unexpected error exporting XLSX: {e}")
-            
-        except Exception as e:
-            logger.error(f"Error exporting editais: {e}")
-            raise
-    
+                logger.error(f"Unexpected error exporting Parquet: {e}. CSV/XLSX available")
+                return
+        cache.mark_exported(plan)
+
+    def _parquet_paths(self):
+        # editais.parquet/itens.parquet, quando o pyarrow (extra "parquet") está instalado
+        if not parquet_snapshot.is_available():
+            return []
+        return [parquet_snapshot.snapshot_path(self.export_dir, dataset) for dataset in ("editais", "itens")]
+
+    def editais_export_tag(self):
+        """
+        Chave da origem (conteúdo dos editais + geração dos itens) dos arquivos
+        editais.csv/editais.xlsx (e Parquet) atuais, ou None se ainda não foram gerados.
+        """
+        path = os.path.join(self.export_dir, EXPORT_CACHE_FILE)
+        if not os.path.exists(path):
+            return None
+        # Sem o lock de exportação: a leitura não espera uma exportação em andamento;
+        # se o cache estiver indisponível, o download segue sem a tag (ETag do arquivo)
+        try:
+            cache = EditaisExportCache(path)
+            try:
+                return cache.source
+            finally:
+                cache.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Export cache unavailable for tagging: {e}")
+            return None
+
+    @EXPORT_DURATION.time(export="itens_contratos", stage="total")
     def export_itens(self, itens):
         # Exporta itens (contratos) para CSV e XLSX
         if not itens:
@@ -13,10 +13,13 @@ Caracteres tratados:
 - Quebras de linha (\r\n, \r, \n) → substituídas por espaço
 - Espaços múltiplos consecutivos → um único espaço
 - Espaços em branco no início/fim → removidos (trim)
+
+Strings que já estão normalizadas (caso mais comum) são reconhecidas por uma
+verificação rápida (is_normalized) e devolvidas sem passar pelas regex.
 """
 
-import re
 import logging
+import re
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +33,12 @@ _ILLEGAL_CHARS_RE = re.compile(
 _MULTI_SPACES_RE = re.compile(r' {2,}')
 
 
+def is_normalized(value):
+    # Verificação rápida: sem caracteres não imprimíveis (ilegais, quebras de linha,
+    # outros espaços), sem espaços duplos nem nas pontas, a string já está normalizada
+    return value.isprintable() and "  " not in value and value[:1] != " " and value[-1:] != " "
+
+
 def normalize_str(value):
     """
     Normaliza uma string individual:
@@ -40,6 +49,8 @@ def normalize_str(value):
     """
     if not isinstance(value, str):
         return value
+    if is_normalized(value):
+        return value
     # 1. Remove caracteres ilegais
     s = _ILLEGAL_CHARS_RE.sub('', value)
     # 2. Quebras de linha → espaço
@@ -0,0 +1,125 @@
+"""
+Exportação XLSX em streaming (workbook write-only do openpyxl).
+
+Este módulo grava o editais.xlsx sem montar DataFrames nem manter o workbook
+em memória: cada aba é escrita linha a linha com Workbook(write_only=True), que
+serializa as linhas em arquivos temporários à medida que chegam. As colunas
+vêm do mesmo esquema achatado do CSV (csv_stream.CsvSchema).
+
+As células chegam sanitizadas (csv_stream.cell_value remove com normalize_str os
+caracteres que o openpyxl rejeita), então não há mais a segunda exportação
+completa com printable_only depois de um IllegalCharacterError. Textos que
+começam com "=" são gravados como texto, não como fórmula.
+
+O Excel aceita no máximo 1.048.576 linhas por aba: ao atingir o limite, as
+linhas seguintes continuam em uma nova aba ("Itens Editais (2)", ...), cada
+uma com o próprio cabeçalho. O progresso (linhas/segundo) vai para o log.
+"""
+
+import logging
+import os
+import time
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+
+logger = logging.getLogger(__name__)
+
+# Limite de linhas por aba do Excel (incluindo o cabeçalho)
+MAX_SHEET_ROWS = 1_048_576
+
+# Intervalo (linhas) entre as mensagens de progresso no log
+PROGRESS_EVERY = 100_000
+
+# Tamanho máximo do nome de uma aba no Excel
+_MAX_TITLE = 31
+
+
+def sheet_title(title, part):
+    # Título da aba `part` (1 = original, 2 = "Título (2)", ...), dentro do limite do Excel
+    if part == 1:
+        return title[:_MAX_TITLE]
+    suffix = f" ({part})"
+    return title[:_MAX_TITLE - len(suffix)] + suffix
+
+
+class _SheetWriter:
+    # Escreve as linhas de uma aba lógica, abrindo abas de continuação no limite de linhas
+    def __init__(self, workbook, title, header, max_rows):
+        self.workbook = workbook
+        self.title = title
+        self.header = header
+        self.max_rows = max_rows
+        self.titles = []
+        self.rows = 0
+        self._sheet = None
+        self._sheet_rows = 0
+
+    def _next_sheet(self):
+        self._sheet = self.workbook.create_sheet(sheet_title(self.title, len(self.titles) + 1))
+        self.titles.append(self._sheet.title)
+        self._sheet.append(self.header)
+        self._sheet_rows = 1
+
+    def append(self, values):
+        if self._sheet is None or self._sheet_rows >= self.max_rows:
+            self._next_sheet()
+        sheet = self._sheet
+        for i, value in enumerate(values):
+            if type(value) is str and value[:1] == "=":
+                # Texto iniciado por "=" seria gravado como fórmula
+                cell = WriteOnlyCell(sheet, value=value)
+                cell.data_type = "s"
+                values[i] = cell
+        sheet.append(values)
+        self._sheet_rows += 1
+        self.rows += 1
+
+    def finish(self):
+        if self._sheet is None:
+            # Aba vazia ainda recebe o cabeçalho
+            self._next_sheet()
+
+
+def write_workbook(path, sheets, max_rows=MAX_SHEET_ROWS, progress_every=PROGRESS_EVERY):
+    """
+    Grava um XLSX com uma aba lógica por item de `sheets`.
+
+    Args:
+        path: Arquivo de destino (substituído atomicamente ao final).
+        sheets: Sequência de (título, cabeçalho, iterável de linhas); cada linha
+                é uma lista de células já sanitizadas (csv_stream.cell_value).
+        max_rows: Linhas por aba (incluindo o cabeçalho) antes da continuação.
+        progress_every: Intervalo de linhas entre as mensagens de progresso.
+
+    Returns:
+        Dicionário com rows, seconds, rows_per_second e, por título, as linhas
+        gravadas e as abas usadas.
+    """
+    started = time.perf_counter()
+    workbook = Workbook(write_only=True)
+    stats = {"sheets": {}}
+    total = 0
+    for title, header, rows in sheets:
+        writer = _SheetWriter(workbook, title, list(header), max_rows)
+        for row in rows:
+            writer.append(row)
+            total += 1
+            if progress_every and total % progress_every == 0:
+                elapsed = time.perf_counter() - started
+                logger.info(f"XLSX {os.path.basename(path)}: {total} rows ({total / elapsed:.0f} rows/s)")
+        writer.finish()
+        stats["sheets"][title] = {"rows": writer.rows, "titles": writer.titles}
+
+    tmp_path = path + ".tmp"
+    try:
+        workbook.save(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    seconds = time.perf_counter() - started
+    stats.update(rows=total, seconds=round(seconds, 3), rows_per_second=round(total / seconds, 1) if seconds else None)
+    logger.info(f"XLSX {os.path.basename(path)}: {total} rows in {seconds:.1f}s ({stats['rows_per_second']} rows/s)")
+    return stats
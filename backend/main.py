@@ -82,6 +82,8 @@ def main():
         logger.warning(f"Falha ao verificar/atualizar editais e itens: {e}")
 
     data_manager = DataManager()
+    # Incorpora ao itens.json segmentos deixados por uma coleta interrompida
+    data_manager.compact_itens(background=True)
     # Carrega editais locais (se existirem)
     editais = data_manager.load_editais()
     logger.info(f"Loaded {len(editais)} editais from local storage")
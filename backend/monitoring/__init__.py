@@ -0,0 +1,8 @@
+"""
+Observabilidade do sistema PNCP.
+
+Este pacote contém o registro de métricas em memória (contadores, gauges e
+histogramas) usado para instrumentar o cliente da API, o armazenamento, os
+serviços, a exportação e as rotas Flask, exposto no formato de texto do
+Prometheus em /metrics.
+"""
@@ -7,6 +7,7 @@ Utiliza APScheduler para agendamento em background.
 """
 
 import logging
+import threading
 import uuid
 from datetime import datetime, timedelta
 from apscheduler.schedulers.background import BackgroundScheduler
@@ -14,6 +15,8 @@ from apscheduler.triggers.cron import CronTrigger
 from backend.services.editais_service import EditaisService
 from backend.services.itens_service import ItensService
 from backend.export.exporter import Exporter
+from backend.api_client.http_cache import get_http_cache
+from backend.scheduler.progress import get_progress_registry
 from backend.config import SCHEDULER_HOUR, SCHEDULER_MINUTE, ITEMS_SKIP_EXISTING
 
 logger = logging.getLogger(__name__)
@@ -31,26 +34,51 @@ class DailyJob:
         self.exporter = Exporter()
         self.last_run = None
         self.is_running = False
+        # Protege a reserva da execução (is_running + current_update_id)
+        self._run_lock = threading.Lock()
         # IDs para rastrear execuções (ex.: via API)
         self.current_update_id = None
         self.last_completed_update_id = None
 
-    def run_daily_update(self):
+    def _claim_run(self, update_id):
+        # Reserva a execução para update_id; False se outra execução está em andamento.
+        # Uma execução já reservada por _prepare_async (mesmo update_id) prossegue normalmente
+        with self._run_lock:
+            if self.is_running and (update_id is None or update_id != self.current_update_id):
+                return False
+            self.is_running = True
+            self.current_update_id = update_id or str(uuid.uuid4())
+            return True
+
+    def _start_progress(self, update_id, kind):
+        # Progresso observável da execução (/api/updates/<id>/events), compartilhado com o service
+        registry = get_progress_registry()
+        progress = registry.get(update_id) or registry.start(update_id, kind)
+        self.editais_service.progress = progress
+        return progress
+
+    def _finish_progress(self, progress, error=None):
+        progress.finish(error)
+        self.editais_service.progress = None
+
+    def run_daily_update(self, update_id=None):
         """
         Executa a atualização diária dos editais e itens.
         Evita execuções concorrentes e exporta os dados ao final.
+        Publica o progresso de cada fase em get_progress_registry() (update_id).
         """
         # Evita execuções concorrentes
-        if self.is_running:
+        if not self._claim_run(update_id):
             logger.warning("Job já está em execução, pulando...")
             return
 
-        self.is_running = True
-        # Identificador único desta execução
-        self.current_update_id = str(uuid.uuid4())
+        progress = self._start_progress(self.current_update_id, "daily")
+        error = None
         logger.info("=" * 50)
         logger.info("Iniciando job de atualização diária...")
         logger.info("=" * 50)
+        http_cache = get_http_cache()
+        cache_before = http_cache.stats() if http_cache else None
         
         try:
             logger.info(f"Daily sync: fetching all editais 'A Receber/Recebendo Proposta' with codigo_modalidade 6 (Pregão - Eletrônico)")
@@ -62,6 +90,7 @@ class DailyJob:
             data_final = "20261231"  # December 31, 2026 - includes all open editais
 
             # Busca e salva todos os editais filtrados
+            progress.update(phase="editais")
             self.editais_service.sync_editais(
                 data_inicial=None,  # No initial date limit - fetch ALL editais
                 data_final=data_final,      # Far future date to include all open proposals
@@ -72,8 +101,11 @@ class DailyJob:
 
             # Remove editais e itens cujo prazo de propostas já expirou
             logger.info("Removendo editais e itens expirados...")
+            progress.update(phase="expirados")
             result = self.editais_service.remove_expired_editais()
             logger.info(f"Limpeza de expirados: {result}")
+            if isinstance(result, dict):
+                progress.update(editais_removed=result.get("editais_removidos", 0))
 
             # Após salvar todos os editais, busca itens
             # Usa ITEMS_SKIP_EXISTING do .env para decidir se pula editais com itens já salvos
@@ -81,11 +113,20 @@ class DailyJob:
             data_manager = DataManager()
             editais = data_manager.load_editais()
             logger.info(f"Buscando itens para editais (de {len(editais)} editais, ITEMS_SKIP_EXISTING={ITEMS_SKIP_EXISTING})...")
+            progress.update(phase="itens")
             self.editais_service.fetch_itens_for_all_editais(editais)
             logger.info("Busca de itens concluída.")
+            if http_cache:
+                cache_after = http_cache.stats()
+                logger.info(
+                    f"HTTP cache nesta execução: {cache_after['hits'] - cache_before['hits']} hits (304), "
+                    f"{cache_after['misses'] - cache_before['misses']} misses, "
+                    f"{(cache_after['bytes_saved'] - cache_before['bytes_saved']) / (1024 * 1024):.1f} MB economizados"
+                )
 
             # Regenera arquivos de exportação (CSV/XLSX) com dados atualizados
             try:
+                progress.update(phase="exportacao")
                 editais_updated = data_manager.load_editais()
                 logger.info("Regenerating export files after daily update...")
                 self.exporter.export_editais(editais_updated)
@@ -97,9 +138,11 @@ class DailyJob:
             logger.info(f"Daily update completed at {self.last_run}")
             
         except Exception as e:
+            error = e
             logger.error(f"Error in daily update job: {e}")
         finally:
             # Marca o fim da execução
+            self._finish_progress(progress, error)
             self.last_completed_update_id = self.current_update_id
             self.current_update_id = None
             self.is_running = False
@@ -122,28 +165,37 @@ class DailyJob:
         self.scheduler.shutdown()
         logger.info("Scheduler stopped")
     
+    def _prepare_async(self, kind):
+        # Reserva a execução e define o update_id antes de iniciar a thread: a API o retorna
+        # imediatamente e o cliente pode assinar os eventos antes de a execução começar.
+        # Retorna None se outra execução está em andamento (nenhum progresso é registrado)
+        update_id = str(uuid.uuid4())
+        if not self._claim_run(update_id):
+            return None
+        get_progress_registry().start(update_id, kind)
+        return update_id
+
     def run_now_async(self):
-        # Executa em thread separada
-        import threading
-        if self.is_running:
+        # Executa em thread separada; retorna o update_id (None se já em execução)
+        update_id = self._prepare_async("daily")
+        if update_id is None:
             logger.warning("Job already running, cannot start another")
-            return False
-        thread = threading.Thread(target=self.run_daily_update, daemon=True)
+            return None
+        thread = threading.Thread(target=self.run_daily_update, kwargs={"update_id": update_id}, daemon=True)
         thread.start()
         logger.info("Manual trigger: update started in background thread")
-        return True
+        return update_id
 
-    def run_incremental_update(self):
+    def run_incremental_update(self, update_id=None):
         """
         Executa um sync incremental (últimos 15 dias) comparando remoto e local.
         """
-        if self.is_running:
+        if not self._claim_run(update_id):
             logger.warning("Job already running, skipping incremental update...")
             return
 
-        self.is_running = True
-        # Identificador único desta execução
-        self.current_update_id = str(uuid.uuid4())
+        progress = self._start_progress(self.current_update_id, "incremental")
+        error = None
         logger.info("Starting incremental update job...")
         try:
             today = datetime.now()
@@ -151,6 +203,7 @@ class DailyJob:
             data_inicial = (today - timedelta(days=15)).strftime("%Y%m%d")
 
             logger.info(f"Incremental sync: fetching editais from {data_inicial} to {data_final}")
+            progress.update(phase="editais")
             summary = self.editais_service.sync_editais(
                 data_inicial=data_inicial,
                 data_final=data_final,
@@ -160,6 +213,7 @@ class DailyJob:
 
             # Regenera arquivos de exportação (CSV/XLSX) com dados atualizados
             try:
+                progress.update(phase="exportacao")
                 from backend.storage.data_manager import DataManager
                 data_manager = DataManager()
                 editais_updated = data_manager.load_editais()
@@ -171,22 +225,24 @@ class DailyJob:
 
             self.last_run = datetime.now()
         except Exception as e:
+            error = e
             logger.error(f"Error in incremental update job: {e}")
         finally:
+            self._finish_progress(progress, error)
             self.last_completed_update_id = self.current_update_id
             self.current_update_id = None
             self.is_running = False
 
     def run_incremental_async(self):
-        # Executa incremental em thread separada
-        import threading
-        if self.is_running:
+        # Executa incremental em thread separada; retorna o update_id (None se já em execução)
+        update_id = self._prepare_async("incremental")
+        if update_id is None:
             logger.warning("Job already running, cannot start incremental update")
-            return False
-        thread = threading.Thread(target=self.run_incremental_update, daemon=True)
+            return None
+        thread = threading.Thread(target=self.run_incremental_update, kwargs={"update_id": update_id}, daemon=True)
         thread.start()
         logger.info("Manual trigger: incremental update started in background thread")
-        return True
+        return update_id
     
     def run_now(self):
         # Execução síncrona imediata
@@ -0,0 +1,180 @@
+"""
+Progresso das execuções de atualização (/api/updates/<id>/events).
+
+Este módulo define a classe UpdateProgress, que guarda o estado de uma execução
+do DailyJob (fase, páginas buscadas, editais processados, itens coletados,
+estado do limitador de taxa e estimativa de término) e notifica os assinantes a
+cada mudança. Cada evento é o estado completo da execução, então um assinante
+lento recebe apenas o estado mais recente (eventos intermediários são
+descartados) e a memória não cresce com a duração do job.
+
+O registro do processo (get_progress_registry) mantém as últimas execuções, de
+modo que um cliente que se conecta depois do término ainda recebe o estado final.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+from backend.api_client.rate_limiter import get_rate_limiter
+
+# Execuções mantidas no registro (as mais antigas são descartadas)
+MAX_TRACKED_UPDATES = 20
+
+# Fases de uma execução, na ordem em que ocorrem
+PHASES = ("iniciando", "editais", "expirados", "itens", "exportacao", "concluido")
+
+# Campos de contagem: (feito, total) usados na estimativa de término da fase
+_PHASE_PROGRESS = {
+    "editais": ("pages_fetched", "pages_total"),
+    "itens": ("itens_editais_done", "itens_editais_total"),
+}
+
+
+class UpdateProgress:
+    """
+    Estado observável de uma execução de atualização.
+
+    Attributes:
+        update_id: identificador da execução (retornado por /api/trigger-update)
+        sequence: número do último evento publicado (Last-Event-ID do SSE)
+        finished: True depois do evento final (status completed/failed)
+    """
+    def __init__(self, update_id, kind, clock=time.monotonic):
+        self.update_id = update_id
+        self._clock = clock
+        self._condition = threading.Condition()
+        self._started = clock()
+        self._phase_started = self._started
+        self.sequence = 0
+        self.finished = False
+        self.state = {
+            "update_id": update_id,
+            "kind": kind,
+            "status": "running",
+            "phase": "iniciando",
+            "started_at": datetime.now().isoformat(),
+            "pages_fetched": 0,
+            "pages_total": None,
+            "editais_processed": 0,
+            "editais_added": 0,
+            "editais_updated": 0,
+            "editais_removed": 0,
+            "itens_editais_done": 0,
+            "itens_editais_total": None,
+            "itens_collected": 0,
+            "elapsed_seconds": 0.0,
+            "eta_seconds": None,
+            "rate_limit": None,
+            "error": None,
+        }
+
+    def _eta(self, now):
+        # Estimativa da fase atual: tempo decorrido na fase * trabalho restante / feito
+        fields = _PHASE_PROGRESS.get(self.state["phase"])
+        if not fields:
+            return None
+        done, total = self.state[fields[0]], self.state[fields[1]]
+        if not total or not done:
+            return None
+        remaining = max(0, total - done)
+        return round((now - self._phase_started) * remaining / done, 1)
+
+    def _publish(self):
+        now = self._clock()
+        self.state["elapsed_seconds"] = round(now - self._started, 1)
+        self.state["eta_seconds"] = self._eta(now)
+        self.state["rate_limit"] = get_rate_limiter().stats()
+        self.sequence += 1
+        self._condition.notify_all()
+
+    def update(self, phase=None, **fields):
+        """
+        Atualiza os campos informados (e a fase, se mudou) e publica um evento.
+        """
+        with self._condition:
+            if self.finished:
+                return
+            if phase and phase != self.state["phase"]:
+                self.state["phase"] = phase
+                self._phase_started = self._clock()
+            self.state.update(fields)
+            self._publish()
+
+    def increment(self, **deltas):
+        """
+        Soma `deltas` aos contadores (chamado por threads de busca concorrentes).
+        """
+        with self._condition:
+            if self.finished:
+                return
+            for name, delta in deltas.items():
+                self.state[name] = (self.state[name] or 0) + delta
+            self._publish()
+
+    def finish(self, error=None):
+        """
+        Publica o evento final (status completed ou failed).
+        """
+        with self._condition:
+            if self.finished:
+                return
+            self.state["status"] = "failed" if error else "completed"
+            self.state["error"] = str(error) if error else None
+            self.state["phase"] = "concluido"
+            self.finished = True
+            self._publish()
+
+    def snapshot(self):
+        with self._condition:
+            return self.sequence, dict(self.state)
+
+    def wait(self, after, timeout):
+        """
+        Espera um evento posterior a `after` (ou o término) por até `timeout` segundos.
+        Retorna (sequência, estado) do evento mais recente, ou None se nada mudou.
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self.sequence > after, timeout)
+            if self.sequence > after:
+                return self.sequence, dict(self.state)
+            return None
+
+
+class ProgressRegistry:
+    """
+    Execuções recentes por update_id (thread-safe, limitado a MAX_TRACKED_UPDATES).
+    """
+    def __init__(self, limit=MAX_TRACKED_UPDATES):
+        self._limit = limit
+        self._lock = threading.Lock()
+        self._updates = OrderedDict()
+
+    def start(self, update_id, kind):
+        progress = UpdateProgress(update_id, kind)
+        with self._lock:
+            self._updates[update_id] = progress
+            while len(self._updates) > self._limit:
+                self._updates.popitem(last=False)
+        return progress
+
+    def get(self, update_id):
+        with self._lock:
+            return self._updates.get(update_id)
+
+
+_registry = None
+_registry_guard = threading.Lock()
+
+
+def get_progress_registry():
+    """
+    Retorna o registro de progresso compartilhado pelo processo.
+    """
+    global _registry
+    if _registry is None:
+        with _registry_guard:
+            if _registry is None:
+                _registry = ProgressRegistry()
+    return _registry
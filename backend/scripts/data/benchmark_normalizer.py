@@ -0,0 +1,137 @@
+"""
+Benchmark da normalização de texto dos registros exportados (normalize_records).
+
+Gera um conjunto sintético de editais (campos aninhados, listas e uma fração de
+textos "sujos" com quebras de linha, espaços duplos e caracteres de controle) e
+compara a vazão (registros/s) de:
+
+- normalização sem a verificação rápida (todas as strings passam pelas regex)
+- normalização padrão (strings já normalizadas são devolvidas sem as regex)
+
+As duas variantes precisam produzir o mesmo resultado.
+
+Uso:
+    python backend/scripts/data/benchmark_normalizer.py
+    python backend/scripts/data/benchmark_normalizer.py --records 200000
+    python backend/scripts/data/benchmark_normalizer.py --dirty 0.5 --repeat 5
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+
+# Adiciona a pasta raiz ao sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from backend.export import normalizer
+
+WORDS = ["aquisição", "material", "de", "expediente", "serviço", "contratação", "papel", "caneta", "órgão", "municipal"]
+DIRT = ["\n", "\r\n", "  ", "\x0b", "\x01", " "]
+
+
+def _text(rng, dirty):
+    # Texto com 3-12 palavras; uma fração recebe sujeira (quebras, espaços, controles)
+    text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 12)))
+    if rng.random() < dirty:
+        pos = rng.randint(0, len(text))
+        text = text[:pos] + rng.choice(DIRT) + text[pos:]
+    return text
+
+
+def synthetic_editais(count, dirty, seed=42):
+    """Gera `count` editais sintéticos com a forma aproximada dos dados do PNCP."""
+    rng = random.Random(seed)
+    return [
+        {
+            "numeroControlePNCP": f"00000000000000-1-{i:06d}/2024",
+            "objetoCompra": _text(rng, dirty),
+            "informacaoComplementar": _text(rng, dirty),
+            "valorTotalEstimado": round(rng.random() * 100000, 2),
+            "srp": rng.random() < 0.5,
+            "orgaoEntidade": {"cnpj": f"{i:014d}", "razaoSocial": _text(rng, dirty), "poderId": "E"},
+            "unidadeOrgao": {"nomeUnidade": _text(rng, dirty), "municipioNome": _text(rng, dirty), "ufSigla": "SP"},
+            "amparoLegal": {"nome": _text(rng, dirty), "descricao": _text(rng, dirty), "codigo": rng.randint(1, 100)},
+            "fontesOrcamentarias": [_text(rng, dirty) for _ in range(rng.randint(0, 3))],
+        }
+        for i in range(count)
+    ]
+
+
+def _count_strings(records):
+    # Total de strings e quantas já estão normalizadas (passam pela verificação rápida)
+    total = clean = 0
+    stack = list(records)
+    while stack:
+        value = stack.pop()
+        if isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, list):
+            stack.extend(value)
+        elif isinstance(value, str):
+            total += 1
+            clean += normalizer.is_normalized(value)
+    return total, clean
+
+
+def _best_time(func, repeat):
+    best, result = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def _without_precheck(records):
+    # Desliga a verificação rápida: todas as strings passam pelas regex
+    original = normalizer.is_normalized
+    normalizer.is_normalized = lambda value: False
+    try:
+        return normalizer.normalize_records(records)
+    finally:
+        normalizer.is_normalized = original
+
+
+def run(records_count, dirty, repeat):
+    records = synthetic_editais(records_count, dirty)
+    total, clean = _count_strings(records)
+    print("\n" + "=" * 60)
+    print("BENCHMARK: normalize_records")
+    print("=" * 60)
+    print(f"Registros: {records_count} | Strings: {total} ({clean / total:.0%} já normalizadas)")
+    print(f"Melhor de {repeat}")
+    print("-" * 60)
+
+    variants = [
+        ("sem verificação rápida", lambda: _without_precheck(records)),
+        ("com verificação rápida", lambda: normalizer.normalize_records(records)),
+    ]
+    baseline, expected = None, None
+    for name, func in variants:
+        seconds, result = _best_time(func, repeat)
+        if expected is None:
+            expected = result
+        elif result != expected:
+            print(f"✗ {name}: resultado diferente da normalização sem verificação rápida")
+            return 1
+        baseline = baseline or seconds
+        print(f"{name:<32} {seconds:8.3f}s {records_count / seconds:12,.0f} registros/s  {baseline / seconds:5.2f}x")
+    print("=" * 60)
+    return 0
+
+
+def main():
+    """Função principal com suporte a argumentos CLI."""
+    parser = argparse.ArgumentParser(description='Benchmark da normalização de registros (com x sem verificação rápida)')
+    parser.add_argument('--records', type=int, default=50000, help='Quantidade de editais sintéticos (padrão: 50000)')
+    parser.add_argument('--dirty', type=float, default=0.1, help='Fração de textos com sujeira (padrão: 0.1)')
+    parser.add_argument('--repeat', type=int, default=3, help='Repetições por variante; vale a melhor (padrão: 3)')
+    args = parser.parse_args()
+    return run(args.records, args.dirty, args.repeat)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -24,6 +24,7 @@ if ROOT_DIR not in sys.path:
     sys.path.insert(0, ROOT_DIR)
 
 from backend.config import DATA_DIR, EDITAIS_CHECKPOINT_FILE
+from backend.storage.data_manager import DataManager
 
 logging.basicConfig(
     level=logging.INFO,
@@ -80,6 +81,9 @@ def clean_itens_data(backup=True):
     itens_file = os.path.join(DATA_DIR, 'itens.json')
     backup_dir = os.path.join(DATA_DIR, 'backup_itens')
     os.makedirs(backup_dir, exist_ok=True)
+    # Incorpora os segmentos pendentes (itens.segments) ao itens.json: o backup fica
+    # completo e nenhum segmento sobra para trazer itens de volta
+    DataManager(backend="json").compact_itens()
 
     if not os.path.exists(itens_file):
         msg = f"Arquivo de itens não encontrado: {itens_file}"
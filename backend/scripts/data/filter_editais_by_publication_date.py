@@ -111,6 +111,8 @@ def main(days=15, dry_run=False):
     # Faz backup dos arquivos
     print("\n" + "-"*60)
     print("Realizando backups...")
+    # Segmentos pendentes (itens.segments) entram no itens.json antes do backup
+    data_manager.compact_itens()
     backup_file(os.path.join(DATA_DIR, "editais.json"))
     backup_file(os.path.join(DATA_DIR, "itens.json"))
     
@@ -10,6 +10,7 @@ import os
 import sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 from backend.config import DATA_DIR
+from backend.storage.data_manager import DataManager
 ITENS_PATH = os.path.join(DATA_DIR, "itens.json")
 
 
@@ -17,6 +18,9 @@ def main():
     """
     Função principal que padroniza os campos de identificação dos itens para string.
     """
+    # Incorpora os segmentos pendentes (itens.segments) ao itens.json antes de corrigi-lo;
+    # senão os registros dos segmentos desfariam a correção
+    DataManager(backend="json").compact_itens()
     if not os.path.exists(ITENS_PATH):
         print(f"Arquivo não encontrado: {ITENS_PATH}")
         return
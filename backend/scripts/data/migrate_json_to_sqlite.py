@@ -0,0 +1,31 @@
+"""
+Script para migrar editais.json, itens.json e contratos.json para o banco SQLite (data/pncp.db).
+
+Execute uma vez antes de ativar PNCP_STORAGE_BACKEND=sqlite no .env.
+Os arquivos JSON originais não são alterados e continuam servindo como backup.
+"""
+import os
+import sys
+
+# Garante que o diretório raiz do projeto esteja no sys.path
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..'))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from backend.config import DATA_DIR
+from backend.storage.sqlite_store import migrate_json_to_sqlite
+
+
+def main():
+    """
+    Função principal que importa os arquivos JSON de DATA_DIR para o SQLite.
+    """
+    db_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(DATA_DIR, "pncp.db")
+    result = migrate_json_to_sqlite(DATA_DIR, db_path)
+    print(f"Migração concluída: {result['editais']} editais, {result['itens']} itens e {result['contratos']} contratos em {db_path}")
+    print("Defina PNCP_STORAGE_BACKEND=sqlite no .env para usar o novo armazenamento.")
+
+
+if __name__ == "__main__":
+    # Permite execução direta do script
+    main()
@@ -17,6 +17,7 @@ if PROJECT_ROOT not in sys.path:
 
 #sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 from backend.config import DATA_DIR
+from backend.storage.data_manager import DataManager
 EDITAIS_PATH = os.path.join(DATA_DIR, "editais.json")
 ITENS_PATH = os.path.join(DATA_DIR, "itens.json")
 BACKUP_SUFFIX = datetime.now().strftime("_%Y%m%d_%H%M%S")
@@ -58,6 +59,9 @@ def main():
     Realiza backup dos arquivos antes de sobrescrever.
     """
     now = datetime.now()
+    # Incorpora os segmentos pendentes (itens.segments) ao itens.json: senão eles
+    # seriam aplicados sobre o arquivo reescrito e trariam de volta itens removidos
+    DataManager(backend="json").compact_itens()
     editais = load_json(EDITAIS_PATH)
     itens = load_json(ITENS_PATH)
 
@@ -17,6 +17,11 @@ import glob
 import sys
 import argparse
 
+# Garante que o diretório raiz do projeto esteja no sys.path
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..'))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
 
 def list_backups(backup_dir, data_type):
     """
@@ -51,6 +56,11 @@ def restore_backup(backup_file, dest_file, data_type):
     """
     try:
         print(f'Restaurando backup de {data_type}: {os.path.basename(backup_file)} -> {os.path.basename(dest_file)}')
+        if data_type == 'itens':
+            # Incorpora os segmentos pendentes (itens.segments) ao itens.json que será
+            # substituído: senão eles seriam aplicados sobre o backup restaurado
+            from backend.storage.data_manager import DataManager
+            DataManager(backend="json").compact_itens()
         shutil.copy2(backup_file, dest_file)
         print(f'✓ Restauração de {data_type} concluída com sucesso.')
         return True, f"Backup de {data_type} restaurado"
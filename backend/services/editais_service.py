@@ -6,15 +6,23 @@ os editais do PNCP, tanto via API quanto no armazenamento local.
 Inclui lógica de checkpoint, filtros e integração com DataManager.
 """
 
+import asyncio
 import logging
+import threading
 from backend.api_client.pncp_client import PNCPClient
+from backend.api_client import async_client
+from backend.services.sync_pipeline import ItemFetchPipeline
 from backend.storage.data_manager import DataManager
-import time
+from backend.monitoring import metrics
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 
 logger = logging.getLogger(__name__)
 
+PHASE_DURATION = metrics.histogram(
+    "service_phase_duration_seconds", "Duração das fases de sincronização do EditaisService", ("phase",)
+)
+
 class EditaisService:
     def _generate_edital_key(self, edital):
         """
@@ -31,7 +39,21 @@ class EditaisService:
         # Cliente da API e gerenciador de dados locais
         self.client = PNCPClient()
         self.data_manager = DataManager()
+        # Progresso da execução em andamento (UpdateProgress definido pelo DailyJob) ou None
+        self.progress = None
+
+    def _report_progress(self, **fields):
+        if self.progress is not None:
+            self.progress.update(**fields)
+
+    def _count_progress(self, **deltas):
+        if self.progress is not None:
+            self.progress.increment(**deltas)
+
+    def _report_pages(self, pages_done, total_pages):
+        self._report_progress(pages_fetched=pages_done, pages_total=total_pages)
     
+    @PHASE_DURATION.time(phase="fetch_all_editais")
     def fetch_all_editais(self, data_inicial=None, data_final=None, codigo_modalidade=6, filter_by_publication_date=True, days_publication=15):
         """
         Busca editais com checkpoint incremental e filtro opcional de data de publicação.
@@ -54,9 +76,11 @@ class EditaisService:
             data_inicial, 
             data_final, 
             codigo_modalidade,
-            on_checkpoint=save_editais_checkpoint
+            on_checkpoint=save_editais_checkpoint,
+            on_progress=self._report_pages
         )
         logger.info(f"Fetched {len(editais)} editais from API")
+        self._report_progress(editais_processed=len(editais))
 
         # Aplica filtro de data de publicação se solicitado
         if filter_by_publication_date:
@@ -203,6 +227,7 @@ class EditaisService:
         
         return filtered
 
+    @PHASE_DURATION.time(phase="fetch_itens")
     def fetch_itens_for_all_editais(self, editais, skip_existing=None):
         """
         Busca itens de todos os editais com threads e salvamento incremental.
@@ -216,7 +241,7 @@ class EditaisService:
             skip_existing: Se True, pula editais que já têm itens salvos.
                           Se None, usa valor de ITEMS_SKIP_EXISTING do .env (padrão: True)
         """
-        from backend.config import ITEMS_FETCH_THREADS, ITEMS_FETCH_DELAY_PER_THREAD, ITEMS_FETCH_CHECKPOINT, ITEMS_SKIP_EXISTING, is_cancelled
+        from backend.config import ITEMS_FETCH_THREADS, ITEMS_FETCH_CHECKPOINT, ITEMS_SKIP_EXISTING, ITEMS_FETCH_ASYNC, ITEMS_FETCH_CONCURRENCY, is_cancelled
         
         # Usa configuração do .env se não especificado explicitamente
         if skip_existing is None:
@@ -252,7 +277,8 @@ class EditaisService:
         logger.info(f"Found {len(existing_edital_keys)} editais with items already saved")
 
         # Filtra editais que já têm itens salvos (se skip_existing=True)
-        if skip_existing and existing_edital_keys:
+        incremental = bool(skip_existing and existing_edital_keys)
+        if incremental:
             editais_to_process = []
             skipped_count = 0
             for edital in editais:
@@ -278,10 +304,39 @@ class EditaisService:
             # No modo completo (skip_existing=False), começa do zero
             all_itens = []
 
-        logger.info(f"Fetching items for {len(editais)} editais using {ITEMS_FETCH_THREADS} parallel threads...")
+        # Itens coletados desde o último checkpoint (gravados como segmento append-only)
+        pending_itens = []
+
+        # Modo assíncrono (AsyncPNCPClient) quando habilitado e aiohttp disponível
+        use_async = ITEMS_FETCH_ASYNC and async_client.is_available()
+        if ITEMS_FETCH_ASYNC and not use_async:
+            logger.warning("ITEMS_FETCH_ASYNC ativo, mas aiohttp não está instalado. Usando threads.")
+        self._report_progress(itens_editais_done=0, itens_editais_total=len(editais))
+        if use_async:
+            logger.info(f"Fetching items for {len(editais)} editais asynchronously (up to {ITEMS_FETCH_CONCURRENCY} concurrent requests)...")
+        else:
+            logger.info(f"Fetching items for {len(editais)} editais using {ITEMS_FETCH_THREADS} parallel threads...")
         processed_count = 0
         interrupted = False
 
+        def collect(itens):
+            # Acumula os itens de um edital concluído e salva checkpoint a cada N editais
+            nonlocal pending_itens, processed_count
+            # Adiciona todos os itens, sem deduplicação
+            all_itens.extend(itens)
+            pending_itens.extend(itens)
+            processed_count += 1
+            self._count_progress(itens_editais_done=1, itens_collected=len(itens))
+            # Salva checkpoint a cada N editais (apenas os itens novos)
+            if processed_count % ITEMS_FETCH_CHECKPOINT == 0:
+                logger.info(f"Checkpoint: {processed_count}/{len(editais)} editais processed, {len(all_itens)} total items, saving {len(pending_itens)} new...")
+                try:
+                    self.data_manager.append_itens(pending_itens)
+                    pending_itens = []
+                    logger.info(f"Checkpoint saved successfully")
+                except Exception:
+                    logger.exception("Failed to save checkpoint")
+
         # Registra handler de SIGINT para garantir interrupção no Windows
         import signal
         original_handler = signal.getsignal(signal.SIGINT)
@@ -293,41 +348,37 @@ class EditaisService:
             logger.warning("CTRL+C detectado. Finalizando busca de itens...")
         signal.signal(signal.SIGINT, _interrupt_handler)
 
-        # Usa ThreadPoolExecutor para paralelizar a coleta
+        # Usa ThreadPoolExecutor (ou o event loop assíncrono) para paralelizar a coleta
         executor = None
+        futures = {}
         try:
-            executor = ThreadPoolExecutor(max_workers=ITEMS_FETCH_THREADS)
-            # Submit all tasks
-            futures = {}
-            for idx, edital in enumerate(editais, start=1):
-                if is_cancelled() or interrupted:
-                    logger.warning("Cancelamento solicitado. Parando submissão de novas tarefas.")
-                    break
-                future = executor.submit(self._fetch_items_for_single_edital, idx, len(editais), edital, ITEMS_FETCH_DELAY_PER_THREAD)
-                futures[future] = idx
-            
-            # Collect results as they complete and save incrementally
-            for future in as_completed(futures):
-                if is_cancelled() or interrupted:
-                    logger.warning("Cancelamento solicitado. Parando processamento de resultados.")
-                    break
-                try:
-                    itens = future.result(timeout=60)
-                    # Adiciona todos os itens, sem deduplicação
-                    all_itens.extend(itens)
-                    processed_count += 1
-                    # Salva checkpoint a cada N editais
-                    if processed_count % ITEMS_FETCH_CHECKPOINT == 0:
-                        logger.info(f"Checkpoint: {processed_count}/{len(editais)} editais processed, {len(all_itens)} total items, saving...")
-                        try:
-                            self.data_manager.save_itens(all_itens)
-                            logger.info(f"Checkpoint saved successfully")
-                        except Exception:
-                            logger.exception("Failed to save checkpoint")
-                except Exception as e:
-                    idx = futures[future]
-                    logger.error(f"Error in parallel fetch for edital {idx}: {e}")
-                    processed_count += 1
+            if use_async:
+                asyncio.run(self._fetch_itens_async(editais, collect))
+                interrupted = interrupted or is_cancelled()
+            else:
+                executor = ThreadPoolExecutor(max_workers=ITEMS_FETCH_THREADS)
+                # Submit all tasks
+                for idx, edital in enumerate(editais, start=1):
+                    if is_cancelled() or interrupted:
+                        logger.warning("Cancelamento solicitado. Parando submissão de novas tarefas.")
+                        break
+                    future = executor.submit(self._fetch_items_for_single_edital, idx, len(editais), edital)
+                    futures[future] = idx
+                
+                # Collect results as they complete and save incrementally
+                for future in as_completed(futures):
+                    if is_cancelled() or interrupted:
+                        logger.warning("Cancelamento solicitado. Parando processamento de resultados.")
+                        break
+                    try:
+                        itens = future.result(timeout=60)
+                    except Exception as e:
+                        idx = futures[future]
+                        logger.error(f"Error in parallel fetch for edital {idx}: {e}")
+                        processed_count += 1
+                        self._count_progress(itens_editais_done=1)
+                        continue
+                    collect(itens)
 
         except KeyboardInterrupt:
             interrupted = True
@@ -344,7 +395,13 @@ class EditaisService:
         # Salva progresso (parcial ou completo)
         if all_itens:
             try:
-                self.data_manager.save_itens(all_itens)
+                if incremental:
+                    # Modo incremental: grava o restante como segmento e compacta em background
+                    self.data_manager.append_itens(pending_itens)
+                    self.data_manager.compact_itens(background=True)
+                else:
+                    # Modo completo: a lista coletada substitui os itens salvos
+                    self.data_manager.save_itens(all_itens)
                 if interrupted:
                     logger.info(f"Interrupted: saved {len(all_itens)} items collected so far")
                 else:
@@ -355,18 +412,94 @@ class EditaisService:
         logger.info(f"Finished fetching items for all editais. Total itens collected: {len(all_itens)}")
         return all_itens
     
-    def _fetch_items_for_single_edital(self, idx, total, edital, delay_per_request):
+    async def _fetch_itens_async(self, editais, on_result):
+        """
+        Busca itens de todos os editais com AsyncPNCPClient em um único event loop.
+        A concorrência é limitada pelo semáforo do cliente; on_result(itens) é chamado
+        à medida que cada edital termina. is_cancelled() cancela as tasks pendentes.
+        """
+        total = len(editais)
+        async with async_client.AsyncPNCPClient() as client:
+            tasks = [
+                asyncio.ensure_future(self._fetch_items_for_single_edital_async(client, idx, total, edital))
+                for idx, edital in enumerate(editais, start=1)
+            ]
+            watcher = asyncio.ensure_future(async_client.watch_cancellation(tasks))
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    try:
+                        itens = await next_done
+                    except asyncio.CancelledError:
+                        logger.warning("Cancelamento solicitado. Parando processamento de resultados.")
+                        break
+                    on_result(itens)
+            finally:
+                watcher.cancel()
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(watcher, *tasks, return_exceptions=True)
+
+    async def _fetch_items_for_single_edital_async(self, client, idx, total, edital):
+        """
+        Versão assíncrona de _fetch_items_for_single_edital. Não usa delay por requisição:
+        o ritmo é controlado pela concorrência do cliente.
+        """
+        try:
+            cnpj, ano, sequencial = self._edital_identifiers(edital)
+            if not cnpj or not ano or not sequencial:
+                logger.debug(f"Skipping edital {idx}/{total} with missing identifiers: cnpj={cnpj}, ano={ano}, sequencial={sequencial}")
+                return []
+
+            # Primeiro, checa quantidade para evitar chamadas desnecessárias
+            item_count = await client.get_itens_edital_count(cnpj, ano, sequencial)
+            if item_count == 0:
+                logger.debug(f"No items for edital {idx}/{total}: {cnpj}/{ano}/{sequencial} (count=0)")
+                return []
+            logger.info(f"Found {item_count} items for edital {idx}/{total}: {cnpj}/{ano}/{sequencial}")
+            itens = await client.get_itens_edital(cnpj, ano, sequencial, item_count=item_count)
+
+            itens_ajustados = self._link_itens_to_edital(edital, itens)
+            if itens_ajustados:
+                logger.info(f"Completed edital {idx}/{total}: fetched {len(itens_ajustados)} itens")
+            return itens_ajustados
+        except Exception as e:
+            logger.error(f"Error fetching itens for edital {idx}/{total}: {e}")
+            return []
+
+    def _edital_identifiers(self, edital):
+        # Retorna (cnpj, ano, sequencialCompra) usados nos endpoints de itens
+        cnpj = (edital.get("orgaoEntidade", {}) or {}).get("cnpj") or edital.get("cnpjOrgao")
+        ano = edital.get("anoCompra") or edital.get("ano")
+        sequencial = edital.get("sequencialCompra")
+        return cnpj, ano, sequencial
+
+    def _link_itens_to_edital(self, edital, itens):
+        # Vincula todos os itens ao edital, preenchendo sempre os campos oficiais
+        itens_ajustados = []
+        id_c_pncp = edital.get("ID_C_PNCP")
+        numero_controle = edital.get("numeroControlePNCP")
+        for item in itens:
+            item["edital_ID_C_PNCP"] = id_c_pncp
+            item["edital_numeroControlePNCP"] = numero_controle
+            # Garante que edital_ID_C_PNCP seja o primeiro campo
+            novo_item = {"edital_ID_C_PNCP": id_c_pncp, "edital_numeroControlePNCP": numero_controle}
+            novo_item.update({k: v for k, v in item.items() if k not in ["edital_ID_C_PNCP", "edital_numeroControlePNCP"]})
+            itens_ajustados.append(novo_item)
+        return itens_ajustados
+
+    def _fetch_items_for_single_edital(self, idx, total, edital, raise_errors=False):
         from backend.config import is_cancelled
         """
         Busca itens de um edital específico (executa em thread).
+        O ritmo das requisições vem do limitador de taxa compartilhado do cliente.
+        Com raise_errors=True, erros são propagados em vez de virar lista vazia
+        (o pipeline mantém o edital pendente para a próxima execução).
         """
         try:
             if is_cancelled():
                 logger.info(f"Thread de edital {idx}/{total} cancelada antes de iniciar.")
                 return []
-            cnpj = (edital.get("orgaoEntidade", {}) or {}).get("cnpj") or edital.get("cnpjOrgao")
-            ano = edital.get("anoCompra") or edital.get("ano")
-            sequencial = edital.get("sequencialCompra")
+            cnpj, ano, sequencial = self._edital_identifiers(edital)
 
             if not cnpj or not ano or not sequencial:
                 logger.debug(f"Skipping edital {idx}/{total} with missing identifiers: cnpj={cnpj}, ano={ano}, sequencial={sequencial}")
@@ -379,7 +512,6 @@ class EditaisService:
 
             # Primeiro, checa quantidade para evitar chamadas desnecessárias
             item_count = self.client.get_itens_edital_count(cnpj, ano, sequencial)
-            time.sleep(delay_per_request)
             if is_cancelled():
                 logger.info(f"Thread de edital {idx}/{total} cancelada após checar quantidade.")
                 return []
@@ -395,117 +527,80 @@ class EditaisService:
                         logger.info(f"Thread de edital {idx}/{total} cancelada durante paginação.")
                         break
                     page_items = self.client.get_itens_edital_paginated(cnpj, ano, sequencial, page=page)
-                    time.sleep(delay_per_request)
                     if not page_items:
                         break
                     itens.extend(page_items)
                     logger.debug(f"  Edital {idx}/{total}: Page {page}: {len(page_items)} items, total: {len(itens)}")
                     page += 1
 
-            # Vincula todos os itens ao edital, preenchendo sempre os campos oficiais
-            itens_ajustados = []
-            id_c_pncp = edital.get("ID_C_PNCP")
-            numero_controle = edital.get("numeroControlePNCP")
-            for item in itens:
-                item["edital_ID_C_PNCP"] = id_c_pncp
-                item["edital_numeroControlePNCP"] = numero_controle
-                # Garante que edital_ID_C_PNCP seja o primeiro campo
-                novo_item = {"edital_ID_C_PNCP": id_c_pncp, "edital_numeroControlePNCP": numero_controle}
-                novo_item.update({k: v for k, v in item.items() if k not in ["edital_ID_C_PNCP", "edital_numeroControlePNCP"]})
-                itens_ajustados.append(novo_item)
+            itens_ajustados = self._link_itens_to_edital(edital, itens)
             if itens_ajustados:
                 logger.info(f"Completed edital {idx}/{total}: fetched {len(itens_ajustados)} itens")
             return itens_ajustados
 
         except Exception as e:
+            if raise_errors:
+                raise
             logger.error(f"Error fetching itens for edital {idx}/{total}: {e}")
             return []
     
     def get_all_editais_local(self):
-        # Retorna editais salvos localmente
-        return self.data_manager.load_editais()
+        # Retorna editais salvos localmente (lista compartilhada do snapshot: não alterar)
+        return self.data_manager.get_editais_snapshot().records
+
+    def get_editais_snapshot(self):
+        # Snapshot em memória dos editais (registros + índices derivados + geração)
+        return self.data_manager.get_editais_snapshot()
+    
+    def get_itens_snapshot(self):
+        # Snapshot em memória dos itens (base das estatísticas colunares)
+        return self.data_manager.get_itens_snapshot()
+    
+    def search_editais(self, query):
+        # Busca textual ranqueada: [(edital, score)]
+        return self.data_manager.search_editais(query)
+    
+    def get_edital_by_id(self, id_c_pncp):
+        # Busca edital pelo ID_C_PNCP (índice hash / índice SQL)
+        if not id_c_pncp:
+            return None
+        return self.data_manager.get_edital_by_id(id_c_pncp)
     
     def get_edital_by_key(self, edital_key):
         # Busca edital por identificador único (numeroControlePNCP ou ID_C_PNCP)
-        editais = self.data_manager.load_editais()
-        for edital in editais:
-            key = (
-                edital.get("numeroControlePNCP")
-                or edital.get("ID_C_PNCP")
-            )
-            if key == edital_key:
-                return edital
-        return None
+        if not edital_key:
+            return None
+        return (
+            self.data_manager.get_edital_by_numero(edital_key)
+            or self.data_manager.get_edital_by_id(edital_key)
+        )
     
     def get_itens_by_edital(self, numeroControlePNCP=None, id_c_pncp=None):
         # Busca itens apenas por identificador único
-        all_itens = self.data_manager.load_itens()
         if numeroControlePNCP:
-            return [item for item in all_itens if str(item.get("edital_numeroControlePNCP", "")) == str(numeroControlePNCP)]
+            return self.data_manager.get_itens_by_edital_numero(numeroControlePNCP)
         if id_c_pncp:
-            return [item for item in all_itens if str(item.get("edital_ID_C_PNCP", "")) == str(id_c_pncp)]
+            return self.data_manager.get_itens_by_edital_id(id_c_pncp)
         return []
 
     def get_itens_by_edital_id(self, id_c_pncp):
         # Novo método: filtra itens por edital_ID_C_PNCP
-        all_itens = self.data_manager.load_itens()
-        return [
-            item for item in all_itens
-            if str(item.get("edital_ID_C_PNCP", "")) == str(id_c_pncp)
-        ]
+        return self.data_manager.get_itens_by_edital_id(id_c_pncp)
     
+    @PHASE_DURATION.time(phase="remove_expired")
     def remove_expired_editais(self):
         """
         Remove editais cujo prazo de recebimento de propostas já expirou,
         bem como os itens correspondentes.
         Editais sem dataEncerramentoProposta são mantidos por segurança.
         """
-        now = datetime.now()
-        editais = self.data_manager.load_editais()
-        itens = self.data_manager.load_itens()
-
-        editais_ativos = []
-        chaves_ativos = set()
-
-        for edital in editais:
-            data_enc = edital.get("dataEncerramentoProposta")
-            chave = (
-                edital.get("numeroControlePNCP")
-                or edital.get("ID_C_PNCP")
-            )
-            if not data_enc:
-                editais_ativos.append(edital)
-                chaves_ativos.add(chave)
-                continue
-            try:
-                dt = datetime.fromisoformat(data_enc.replace("Z", ""))
-            except Exception:
-                editais_ativos.append(edital)
-                chaves_ativos.add(chave)
-                continue
-            if dt >= now:
-                editais_ativos.append(edital)
-                chaves_ativos.add(chave)
-
-        removidos = len(editais) - len(editais_ativos)
+        removidos, itens_removidos = self.data_manager.delete_expired_editais(datetime.now())
         if removidos == 0:
             logger.info("Nenhum edital expirado encontrado.")
             return {"editais_removidos": 0, "itens_removidos": 0}
 
-        # Filtra itens dos editais que continuam ativos
-        itens_antes = len(itens)
-        itens_ativos = [
-            item for item in itens
-            if (item.get("edital_numeroControlePNCP") or item.get("edital_ID_C_PNCP")) in chaves_ativos
-        ]
-        itens_removidos = itens_antes - len(itens_ativos)
-
-        self.save_editais(editais_ativos)
-        self.data_manager.save_itens(itens_ativos)
-
         logger.info(
-            f"Limpeza de expirados concluída: {removidos} editais e {itens_removidos} itens removidos. "
-            f"Restam {len(editais_ativos)} editais e {len(itens_ativos)} itens."
+            f"Limpeza de expirados concluída: {removidos} editais e {itens_removidos} itens removidos."
         )
         return {"editais_removidos": removidos, "itens_removidos": itens_removidos}
 
@@ -566,7 +661,204 @@ class EditaisService:
         # Garante retorno da lista completa salva
         return self.data_manager.load_editais()
 
-    def sync_editais(self, data_inicial=None, data_final=None, codigo_modalidade=6, filter_by_publication_date=False, days_publication=15):
+    def _edital_timestamp(self, edital):
+        # Converte a data mais relevante do edital (publicação/atualização) para epoch
+        val = edital.get("dataPublicacaoPncp") or edital.get("dataAtualizacao") or edital.get("dataPublicacao") or edital.get("dataInclusao")
+        if not val:
+            return None
+        try:
+            # Try ISO parsing
+            if isinstance(val, (int, float)):
+                return float(val)
+            # remove timezone Z if present
+            s = val.split("Z")[0]
+            # If only date part
+            if len(s) == 10:
+                return datetime.fromisoformat(s + "T00:00:00").timestamp()
+            return datetime.fromisoformat(s).timestamp()
+        except Exception:
+            try:
+                return float(val)
+            except Exception:
+                return None
+
+    def _sync_editais_pipelined(self, data_inicial, data_final, codigo_modalidade, filter_by_publication_date, days_publication):
+        """
+        Sincronização incremental em pipeline (produtor/consumidor).
+
+        Cada página de editais é comparada com os editais locais assim que chega; os
+        editais novos entram em uma fila limitada (SYNC_PIPELINE_QUEUE_SIZE) consumida
+        por ITEMS_FETCH_THREADS threads que buscam os itens enquanto a paginação continua.
+
+        Editais são casados pelo numeroControlePNCP (ou ID_C_PNCP) e um edital atualizado
+        mantém o ID_C_PNCP local, de modo que o merge substitui o registro existente.
+        Checkpoints a cada ITEMS_FETCH_CHECKPOINT editais gravam primeiro os editais
+        pendentes e depois os itens (itens sempre referenciam editais já salvos). O
+        checkpoint de páginas da paginação também grava os pendentes antes de marcar
+        as páginas como concluídas.
+
+        Editais novos entram na lista de pendentes de itens (DataManager.save_itens_pending)
+        antes de serem salvos e só saem dela depois que seus itens foram gravados. Editais
+        cuja busca falhou, foi cancelada ou ficou na fila continuam na lista e são
+        re-enfileirados no início da próxima sincronização.
+
+        Retorna: {added: int, updated: int}
+        """
+        from backend.config import (
+            ITEMS_FETCH_THREADS, ITEMS_FETCH_CHECKPOINT,
+            ITEMS_SKIP_EXISTING, SYNC_PIPELINE_QUEUE_SIZE, is_cancelled
+        )
+        import uuid
+        logger.info(f"Starting pipelined sync for editais ({data_inicial} to {data_final})")
+
+        # Índice dos editais locais por numeroControlePNCP / ID_C_PNCP
+        local_editais = self.data_manager.load_editais()
+        local_by_key = {}
+        for edital in local_editais:
+            for key in (edital.get("numeroControlePNCP"), edital.get("ID_C_PNCP")):
+                if key:
+                    local_by_key.setdefault(str(key), edital)
+
+        state_lock = threading.Lock()
+        flush_lock = threading.Lock()
+        pending_editais = []
+        pending_itens = []
+        # Editais aguardando itens (persistido) e os que já têm itens em pending_itens
+        awaiting = self.data_manager.load_itens_pending()
+        fetched_ids = []
+        totals = {"added": 0, "updated": 0, "itens": 0, "editais_done": 0, "processed": 0}
+
+        def flush():
+            # Grava a lista de pendentes, os editais e os itens (em ordem); só então
+            # os editais cujos itens foram gravados saem da lista de pendentes
+            nonlocal pending_editais, pending_itens, fetched_ids
+            with flush_lock:
+                with state_lock:
+                    editais, pending_editais = pending_editais, []
+                    itens, pending_itens = pending_itens, []
+                    done, fetched_ids = fetched_ids, []
+                    self.data_manager.save_itens_pending(awaiting)
+                if editais:
+                    self.save_editais(editais)
+                if itens:
+                    self.data_manager.append_itens(itens)
+                if done:
+                    with state_lock:
+                        awaiting.difference_update(done)
+                        self.data_manager.save_itens_pending(awaiting)
+
+        def has_itens(edital):
+            numero = edital.get("numeroControlePNCP")
+            if numero and self.data_manager.get_itens_by_edital_numero(numero):
+                return True
+            return bool(self.data_manager.get_itens_by_edital_id(edital["ID_C_PNCP"]))
+
+        def fetch_itens(idx, edital):
+            return self._fetch_items_for_single_edital(idx, pipeline.submitted, edital, raise_errors=True)
+
+        def on_itens(edital, itens):
+            # Executa serializado (lock do pipeline): acumula itens e salva checkpoint
+            with state_lock:
+                pending_itens.extend(itens)
+                fetched_ids.append(edital["ID_C_PNCP"])
+                totals["itens"] += len(itens)
+                totals["editais_done"] += 1
+                checkpoint = totals["editais_done"] % ITEMS_FETCH_CHECKPOINT == 0
+            self._count_progress(itens_editais_done=1, itens_collected=len(itens))
+            if checkpoint:
+                logger.info(f"Pipeline checkpoint: {pipeline.completed}/{pipeline.submitted} editais processed, {totals['itens']} itens")
+                try:
+                    flush()
+                except Exception:
+                    logger.exception("Failed to save pipeline checkpoint")
+
+        pipeline = ItemFetchPipeline(fetch_itens, on_itens, ITEMS_FETCH_THREADS, SYNC_PIPELINE_QUEUE_SIZE).start()
+
+        def submit(edital):
+            if not pipeline.submit(edital):
+                return False
+            self._count_progress(itens_editais_total=1)
+            return True
+
+        # Editais de execuções anteriores que ficaram sem itens voltam para a fila
+        retry = [edital for edital in local_editais if edital.get("ID_C_PNCP") in awaiting]
+        awaiting.intersection_update(edital["ID_C_PNCP"] for edital in retry)
+        if retry:
+            logger.info(f"Re-enqueuing {len(retry)} editais still waiting for itens from a previous sync")
+
+        def on_page(page_num, page_data):
+            # Produtor: classifica os editais da página e enfileira os novos para busca de itens
+            if filter_by_publication_date:
+                page_data = self._filter_editais_by_publication_date(page_data, days=days_publication)
+            to_enqueue = []
+            with state_lock:
+                for remote in page_data:
+                    key = remote.get("numeroControlePNCP") or remote.get("ID_C_PNCP")
+                    local = local_by_key.get(str(key)) if key else None
+                    if local is not None:
+                        remote_ts = self._edital_timestamp(remote)
+                        local_ts = self._edital_timestamp(local)
+                        if not remote_ts or (local_ts and remote_ts <= local_ts):
+                            continue
+                        remote["ID_C_PNCP"] = local.get("ID_C_PNCP") or remote.get("ID_C_PNCP") or str(uuid.uuid4())
+                        local_by_key[str(key)] = remote
+                        pending_editais.append(remote)
+                        totals["updated"] += 1
+                        continue
+                    if not remote.get("ID_C_PNCP"):
+                        remote["ID_C_PNCP"] = str(uuid.uuid4())
+                    if key:
+                        local_by_key[str(key)] = remote
+                    pending_editais.append(remote)
+                    totals["added"] += 1
+                    awaiting.add(remote["ID_C_PNCP"])
+                    to_enqueue.append(remote)
+                totals["processed"] += len(page_data)
+                counts = {"editais_processed": totals["processed"], "editais_added": totals["added"], "editais_updated": totals["updated"]}
+            self._report_progress(**counts)
+            enqueue(to_enqueue)
+
+        def enqueue(editais):
+            for edital in editais:
+                if ITEMS_SKIP_EXISTING and has_itens(edital):
+                    with state_lock:
+                        awaiting.discard(edital["ID_C_PNCP"])
+                    continue
+                if not submit(edital):
+                    break
+
+        try:
+            enqueue(retry)
+            self.client.get_all_editais(
+                data_inicial,
+                data_final,
+                codigo_modalidade,
+                on_checkpoint=lambda editais, page: flush(),
+                on_page=on_page,
+                on_progress=self._report_pages
+            )
+        finally:
+            pipeline.finish()
+            try:
+                flush()
+            except Exception:
+                logger.exception("Failed to save editais/itens after pipelined sync")
+
+        if is_cancelled() or awaiting:
+            logger.warning(
+                f"Pipelined sync: {pipeline.completed}/{pipeline.submitted} editais had itens fetched; "
+                f"{len(awaiting)} editais kept for the next sync"
+            )
+        if totals["itens"] and not is_cancelled():
+            self.data_manager.compact_itens(background=True)
+        logger.info(
+            f"Pipelined sync finished: {totals['added']} added, {totals['updated']} updated, "
+            f"{totals['itens']} itens fetched for {pipeline.completed} editais"
+        )
+        return {"added": totals["added"], "updated": totals["updated"]}
+
+    @PHASE_DURATION.time(phase="sync_editais")
+    def sync_editais(self, data_inicial=None, data_final=None, codigo_modalidade=6, filter_by_publication_date=False, days_publication=15, pipelined=None):
         """
         Sincronização incremental: compara editais remotos e locais.
 
@@ -577,9 +869,17 @@ class EditaisService:
         Args:
             filter_by_publication_date: Se True, filtra por dataPublicacaoPncp após buscar da API
             days_publication: Número de dias para filtro de publicação
+            pipelined: Se True, busca itens em paralelo à paginação (ver _sync_editais_pipelined).
+                       Se None, usa SYNC_PIPELINE do .env (padrão: True)
         
         Retorna: {added: int, updated: int}
         """
+        from backend.config import SYNC_PIPELINE
+        if pipelined is None:
+            pipelined = SYNC_PIPELINE
+        if pipelined:
+            return self._sync_editais_pipelined(data_inicial, data_final, codigo_modalidade, filter_by_publication_date, days_publication)
+
         logger.info(f"Starting incremental sync for editais ({data_inicial} to {data_final})")
         # Busca editais remotos (com checkpoint)
         remote_editais = self.fetch_all_editais(
@@ -604,32 +904,10 @@ class EditaisService:
         updated = 0
         new_editais = []
 
-        from datetime import datetime
-
-        def to_ts(val):
-            # Converte timestamp/datas diversas para epoch
-            if not val:
-                return None
-            try:
-                # Try ISO parsing
-                if isinstance(val, (int, float)):
-                    return float(val)
-                # remove timezone Z if present
-                s = val.split("Z")[0]
-                # If only date part
-                if len(s) == 10:
-                    return datetime.fromisoformat(s + "T00:00:00").timestamp()
-                return datetime.fromisoformat(s).timestamp()
-            except Exception:
-                try:
-                    return float(val)
-                except Exception:
-                    return None
-
         import uuid
         for remote in remote_editais:
             key = self._generate_edital_key(remote)
-            remote_ts = to_ts(remote.get("dataPublicacaoPncp") or remote.get("dataAtualizacao") or remote.get("dataPublicacao") or remote.get("dataInclusao"))
+            remote_ts = self._edital_timestamp(remote)
 
             # Garante UUID para cada edital
             if not remote.get("ID_C_PNCP"):
@@ -637,7 +915,7 @@ class EditaisService:
 
             if key in local_map:
                 idx, local = local_map[key]
-                local_ts = to_ts(local.get("dataPublicacaoPncp") or local.get("dataAtualizacao") or local.get("dataPublicacao") or local.get("dataInclusao"))
+                local_ts = self._edital_timestamp(local)
                 # If remote has newer timestamp, replace local
                 if remote_ts and (not local_ts or remote_ts > local_ts):
                     logger.info(f"Updating local edital {key}: remote is newer ({remote_ts} > {local_ts})")
@@ -658,6 +936,8 @@ class EditaisService:
                 new_editais.append(remote)
                 added += 1
 
+        self._report_progress(editais_added=added, editais_updated=updated)
+
         # Salva editais mesclados
         if added or updated:
             try:
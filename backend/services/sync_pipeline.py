@@ -0,0 +1,131 @@
+"""
+Pipeline produtor/consumidor entre a paginação de editais e a busca de itens.
+
+Este módulo implementa a classe ItemFetchPipeline, usada por
+EditaisService.sync_editais no modo em pipeline: conforme as páginas de editais
+chegam da API, os editais novos são enfileirados em uma fila limitada e um grupo
+de threads consome a fila buscando os itens em paralelo. Assim a fase de itens
+começa junto com a listagem, e o tempo total tende ao da fase mais longa em vez
+da soma das duas.
+
+A fila limitada aplica backpressure: quando os consumidores ficam para trás,
+submit() bloqueia o produtor (a paginação) até haver espaço. Produtor e
+consumidores checam is_cancelled() periodicamente, de modo que Ctrl+C
+interrompe ambos sem deixar threads presas na fila.
+
+Só editais cuja busca terminou sem erro e sem cancelamento chegam a on_itens;
+os demais (falha, cancelamento, ainda na fila) ficam a cargo de quem usa o
+pipeline, que deve guardá-los para uma próxima execução.
+"""
+
+import queue
+import threading
+import time
+import logging
+from backend.config import is_cancelled
+
+logger = logging.getLogger(__name__)
+
+# Intervalo (segundos) entre checagens de cancelamento durante esperas na fila
+_POLL_INTERVAL = 0.2
+
+# Marcador de fim da fila (um por consumidor)
+_STOP = object()
+
+
+class ItemFetchPipeline:
+    """
+    Fila limitada de editais consumida por threads que buscam itens.
+
+    Args:
+        fetch_fn: Função (idx, edital) -> lista de itens (executa nas threads consumidoras)
+        on_itens: Callback (edital, itens) chamado ao fim de cada edital buscado com sucesso;
+                  as chamadas são serializadas, então o callback pode acumular estado e
+                  salvar checkpoints
+        workers: Número de threads consumidoras
+        queue_size: Capacidade da fila (editais aguardando busca de itens)
+    """
+    def __init__(self, fetch_fn, on_itens, workers, queue_size):
+        self._fetch_fn = fetch_fn
+        self._on_itens = on_itens
+        self._queue = queue.Queue(maxsize=max(1, int(queue_size)))
+        self._threads = [
+            threading.Thread(target=self._worker, name=f"itens-pipeline-{n + 1}", daemon=True)
+            for n in range(max(1, int(workers)))
+        ]
+        self._result_lock = threading.Lock()
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        # Tempo total (s) em que o produtor ficou bloqueado pela fila cheia
+        self.producer_wait = 0.0
+
+    def start(self):
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def _put(self, task):
+        # put() bloqueante que desiste se o cancelamento for sinalizado
+        while not is_cancelled():
+            try:
+                self._queue.put(task, timeout=_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def submit(self, edital):
+        """
+        Enfileira um edital para busca de itens. Bloqueia enquanto a fila estiver
+        cheia (backpressure). Retorna False se a operação foi cancelada.
+        """
+        started = time.monotonic()
+        accepted = self._put((self.submitted + 1, edital))
+        self.producer_wait += time.monotonic() - started
+        if accepted:
+            self.submitted += 1
+        return accepted
+
+    def _worker(self):
+        while True:
+            try:
+                task = self._queue.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                if is_cancelled():
+                    return
+                continue
+            if task is _STOP or is_cancelled():
+                return
+            idx, edital = task
+            try:
+                itens = self._fetch_fn(idx, edital)
+            except Exception as e:
+                logger.error(f"Error fetching itens for edital {idx} in pipeline: {e}")
+                with self._result_lock:
+                    self.failed += 1
+                continue
+            if is_cancelled():
+                # Itens possivelmente incompletos: o edital não é dado como concluído
+                return
+            with self._result_lock:
+                self.completed += 1
+                try:
+                    self._on_itens(edital, itens)
+                except Exception:
+                    logger.exception("Error in pipeline result callback")
+
+    def finish(self):
+        """
+        Sinaliza o fim da produção e aguarda os consumidores esvaziarem a fila
+        (ou pararem, em caso de cancelamento).
+        """
+        for _ in self._threads:
+            if not self._put(_STOP):
+                break
+        for thread in self._threads:
+            thread.join()
+        logger.info(
+            f"Item pipeline finished: {self.completed}/{self.submitted} editais processed ({self.failed} failed), "
+            f"producer blocked {self.producer_wait:.1f}s by backpressure"
+        )
@@ -3,27 +3,82 @@ Gerenciamento de dados locais em JSON.
 
 Este módulo implementa a classe DataManager, responsável por salvar e carregar
 editais, contratos e itens em arquivos JSON no disco, garantindo persistência local.
+Com PNCP_STORAGE_BACKEND=sqlite, as mesmas operações são delegadas ao SQLiteStore.
 """
 
 import json
 import os
 import logging
-from backend.config import DATA_DIR
+import time
+from datetime import datetime
+from functools import wraps
+from backend.config import DATA_DIR, STORAGE_BACKEND
+from backend.storage.sqlite_store import SQLiteStore
+from backend.storage.expiration import active_links, is_expired, is_linked
+from backend.storage.item_segments import ItemSegmentStore, MAX_SEGMENTS_BEFORE_COMPACTION
+from backend.storage.snapshot_cache import get_snapshot_cache
+from backend.storage.search_index import get_search_index
+from backend.storage import indexes, facets, parquet_snapshot
+from backend.storage.indexes import upsert_editais as upsert_editais_index, append_itens as append_itens_index
+from backend.monitoring import metrics
 
 logger = logging.getLogger(__name__)
 
+STORAGE_DURATION = metrics.histogram(
+    "storage_operation_duration_seconds", "Duração das leituras/escritas do DataManager",
+    ("operation", "dataset", "backend"),
+)
+STORAGE_BYTES = metrics.counter(
+    "storage_bytes_total", "Bytes lidos/gravados pelo DataManager em arquivos JSON", ("operation", "dataset")
+)
+
+
+def _measured(operation, dataset):
+    """
+    Registra a duração da operação do DataManager e, no backend JSON, os bytes
+    lidos (load), gravados no arquivo principal (save) ou acrescentados em
+    segmentos (append) do dataset.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            before = self._io_state(dataset) if not self._store and operation != "load" else None
+            started = time.perf_counter()
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                STORAGE_DURATION.observe(time.perf_counter() - started, operation=operation, dataset=dataset, backend=self.backend)
+                if not self._store:
+                    nbytes = self._io_bytes(operation, dataset, before)
+                    if nbytes > 0:
+                        STORAGE_BYTES.inc(nbytes, operation=operation, dataset=dataset)
+        return wrapper
+    return decorator
+
 class DataManager:
     """
     Classe responsável por gerenciar a persistência local de dados em arquivos JSON.
     Permite salvar e carregar contratos, editais e itens do sistema PNCP.
+
+    Args:
+        backend: "json" ou "sqlite". Se None, usa PNCP_STORAGE_BACKEND do .env.
     """
-    def __init__(self):
+    def __init__(self, backend=None):
         # Diretório base de dados
         self.data_dir = DATA_DIR
         self.contratos_file = os.path.join(self.data_dir, "contratos.json")
         self.editais_file = os.path.join(self.data_dir, "editais.json")
         self.itens_file = os.path.join(self.data_dir, "itens.json")
+        self.sqlite_file = os.path.join(self.data_dir, "pncp.db")
+        # ID_C_PNCP dos editais já salvos cujos itens ainda não foram gravados (sync em pipeline)
+        self.itens_pending_file = os.path.join(self.data_dir, ".itens_pending.json")
+        # Segmentos JSONL append-only com itens ainda não compactados em itens.json
+        self.itens_segments_dir = os.path.join(self.data_dir, "itens.segments")
         self._ensure_data_dir()
+        self._item_segments = ItemSegmentStore(self.itens_file, self.itens_segments_dir)
+        # Engine de armazenamento (JSON é o padrão; SQLite usa índices nas chaves de vínculo)
+        self.backend = (backend or STORAGE_BACKEND or "json").lower()
+        self._store = SQLiteStore(self.sqlite_file) if self.backend == "sqlite" else None
     
     def _ensure_data_dir(self):
         """
@@ -37,6 +92,10 @@ class DataManager:
         """
         Salva a lista de contratos em disco no formato JSON.
         """
+        if self._store:
+            self._store.save_contratos(contratos)
+            logger.info(f"{len(contratos)} contratos salvos em {self.sqlite_file}")
+            return
         try:
             with open(self.contratos_file, "w", encoding="utf-8") as f:
                 json.dump(contratos, f, ensure_ascii=False, indent=2)
@@ -50,6 +109,8 @@ class DataManager:
         Carrega a lista de contratos do disco.
         Retorna uma lista vazia se o arquivo não existir.
         """
+        if self._store:
+            return self._store.load_contratos()
         if not os.path.exists(self.contratos_file):
             logger.info("Arquivo de contratos não encontrado, retornando lista vazia")
             return []
@@ -63,39 +124,57 @@ class DataManager:
             logger.error(f"Error loading contratos: {e}")
             return []
     
+    @_measured("save", "editais")
     def save_editais(self, editais):
         # Salva editais em disco com merge incremental
         # Se arquivo já existe, faz merge ao invés de sobrescrever
-        existing_editais = []
-        if os.path.exists(self.editais_file):
-            try:
-                with open(self.editais_file, "r", encoding="utf-8") as f:
-                    existing_editais = json.load(f)
-            except Exception:
-                pass
+        if self._store:
+            self._invalidate_snapshot("editais")
+            existing_count, total = self._store.save_editais(editais)
+            logger.info(f"Saved {total} editais to {self.sqlite_file} (merge incremental: {existing_count} existing + {len(editais)} new/updated)")
+            return
+        # Base do merge: snapshot em memória (só relê o arquivo se ele mudou)
+        snapshot = self.get_editais_snapshot()
+        existing_editais = snapshot.records
         
         # Mescla editais por ID_C_PNCP
         # Mantém todos os antigos e só adiciona/atualiza os novos
-        edital_map = {e.get("ID_C_PNCP"): e for e in existing_editais if e.get("ID_C_PNCP")}
-        for edital in editais:
-            if edital.get("ID_C_PNCP"):
-                edital_map[edital["ID_C_PNCP"]] = edital
-        
-        all_editais = list(edital_map.values())
+        merged = upsert_editais_index(snapshot, editais)
+        if merged is not None:
+            all_editais, indexes = merged
+        else:
+            edital_map = {e.get("ID_C_PNCP"): e for e in existing_editais if e.get("ID_C_PNCP")}
+            for edital in editais:
+                if edital.get("ID_C_PNCP"):
+                    edital_map[edital["ID_C_PNCP"]] = edital
+            all_editais, indexes = list(edital_map.values()), {}
         # Nunca sobrescreve com lista vazia - mantém dados existentes se nenhum novo foi adicionado
         if all_editais:
+            # Facetas pré-calculadas no save (incrementais sobre as do snapshot anterior)
+            indexes[facets.FACETS] = facets.facets_after_upsert(
+                snapshot if merged is not None else None, editais, all_editais
+            )
             try:
                 with open(self.editais_file, "w", encoding="utf-8") as f:
                     json.dump(all_editais, f, ensure_ascii=False, indent=2)
                 logger.info(f"Saved {len(all_editais)} editais to {self.editais_file} (merge incremental: {len(existing_editais)} existing + {len(editais)} new/updated)")
             except Exception as e:
+                self._invalidate_snapshot("editais")
                 logger.error(f"Error saving editais: {e}")
                 raise
+            # Índices atualizados só para os editais recebidos (sem reler o arquivo)
+            installed = self._install_snapshot("editais", all_editais, indexes)
+            self._search_index().apply_editais(snapshot.generation, installed.generation, editais)
         else:
             logger.info(f"No editais to save. Keeping {len(existing_editais)} existing editais (merge incremental: {len(existing_editais)} existing + {len(editais)} new/updated)")
     
+    @_measured("load", "editais")
     def load_editais(self):
         # Carrega editais do disco
+        if self._store:
+            editais = self._store.load_editais()
+            logger.info(f"Loaded {len(editais)} editais from storage")
+            return editais
         if not os.path.exists(self.editais_file):
             logger.info("No editais file found, returning empty list")
             return []
@@ -109,49 +188,373 @@ class DataManager:
             logger.error(f"Error loading editais: {e}")
             return []
     
+    @_measured("save", "itens")
     def save_itens(self, itens, append=False):
         # Salva itens em disco
         # Se append=True, acrescenta aos existentes. Se False, sobrescreve com a lista fornecida.
+        # Lista vazia nunca apaga os itens existentes (ex.: coleta em que todas as requisições falharam)
+        if not itens:
+            logger.info(f"No itens to save.")
+            return
+        if self._store:
+            self._invalidate_snapshot("itens")
+            total = self._store.save_itens(itens, append=append)
+            logger.info(f"Saved {total} itens to {self.sqlite_file}")
+            return
         if append:
-            existing_itens = []
-            if os.path.exists(self.itens_file):
-                try:
-                    with open(self.itens_file, "r", encoding="utf-8") as f:
-                        existing_itens = json.load(f)
-                except Exception:
-                    pass
-            all_itens = existing_itens + itens
-        else:
-            all_itens = itens
+            # Grava apenas os novos registros em um segmento JSONL (sem reescrever itens.json)
+            self.append_itens(itens)
+            return
         
-        if all_itens:
-            try:
-                with open(self.itens_file, "w", encoding="utf-8") as f:
-                    json.dump(all_itens, f, ensure_ascii=False)
-                logger.info(f"Saved {len(all_itens)} itens to {self.itens_file}")
-            except Exception as e:
-                logger.error(f"Error saving itens: {e}")
-                raise
+        try:
+            self._item_segments.write_base(itens)
+            logger.info(f"Saved {len(itens)} itens to {self.itens_file}")
+        except Exception as e:
+            self._invalidate_snapshot("itens")
+            logger.error(f"Error saving itens: {e}")
+            raise
+        self._install_snapshot("itens", list(itens))
+
+    @_measured("append", "itens")
+    def append_itens(self, itens):
+        """
+        Acrescenta itens ao armazenamento escrevendo somente os novos registros.
+        No backend JSON cada chamada gera um segmento JSONL; acumulando segmentos
+        demais, a compactação é disparada em background.
+        """
+        if not itens:
+            return
+        if self._store:
+            self._invalidate_snapshot("itens")
+            self._store.save_itens(itens, append=True)
+            logger.info(f"Appended {len(itens)} itens to {self.sqlite_file}")
+            return
+        # Snapshot só é atualizado incrementalmente se estava em dia antes da escrita
+        snapshot = self._fresh_snapshot("itens")
+        try:
+            self._item_segments.append(itens)
+        except Exception as e:
+            self._invalidate_snapshot("itens")
+            logger.error(f"Error appending itens: {e}")
+            raise
+        appended = append_itens_index(snapshot, itens) if snapshot is not None else None
+        if appended is not None:
+            installed = self._install_snapshot("itens", *appended)
+            self._search_index().apply_itens(snapshot.generation, installed.generation, itens)
         else:
-            logger.info(f"No itens to save.")
+            self._invalidate_snapshot("itens")
+        if len(self._item_segments.list_segments()) >= MAX_SEGMENTS_BEFORE_COMPACTION:
+            self.compact_itens(background=True)
+
+    def compact_itens(self, background=False):
+        """
+        Incorpora os segmentos JSONL pendentes ao itens.json (sem efeito no SQLite).
+        """
+        if self._store:
+            return None
+        if background:
+            return self._item_segments.compact_async(self._compact_itens)
+        return self._compact_itens()
+
+    @_measured("compact", "itens")
+    def _compact_itens(self):
+        # A compactação não altera o conteúdo: o snapshot em memória só troca de assinatura
+        snapshot = self._fresh_snapshot("itens")
+        result = self._item_segments.compact()
+        if snapshot is not None and result is not None:
+            get_snapshot_cache().refresh_signature(
+                self._snapshot_key("itens"), snapshot.signature, self._dataset_signature("itens")
+            )
+        return result
     
+    @_measured("load", "itens")
     def load_itens(self):
         # Carrega itens do disco
-        if not os.path.exists(self.itens_file):
-            logger.info("No itens file found, returning empty list")
-            return []
+        if self._store:
+            itens = self._store.load_itens()
+            logger.info(f"Loaded {len(itens)} itens from storage")
+            return itens
+        if not self._item_segments.list_segments():
+            if not os.path.exists(self.itens_file):
+                logger.info("No itens file found, returning empty list")
+                return []
         
         try:
-            with open(self.itens_file, "r", encoding="utf-8") as f:
-                itens = json.load(f)
+            with self._item_segments.lock:
+                itens = list(self._item_segments.iter_records())
             logger.info(f"Loaded {len(itens)} itens from storage")
             return itens
         except Exception as e:
             logger.error(f"Error loading itens: {e}")
             return []
+
+    def iter_itens(self):
+        """
+        Percorre os itens em streaming (base + segmentos no JSON, cursor no SQLite).
+        """
+        if self._store:
+            return self._store.iter_itens()
+        return self._item_segments.iter_records()
     
+    def dataset_signature(self, dataset):
+        """
+        Assinatura atual de "editais" ou "itens" em disco: muda a cada escrita
+        (usada para marcar a origem das exportações).
+        """
+        return self._dataset_signature(dataset)
+
+    def load_itens_pending(self):
+        """
+        Conjunto de ID_C_PNCP de editais salvos que ainda aguardam a busca de itens
+        (falha, cancelamento ou fila não esvaziada em uma sincronização anterior).
+        """
+        if not os.path.exists(self.itens_pending_file):
+            return set()
+        try:
+            with open(self.itens_pending_file, "r", encoding="utf-8") as f:
+                return set(json.load(f))
+        except Exception as e:
+            logger.error(f"Error loading pending itens list: {e}")
+            return set()
+
+    def save_itens_pending(self, ids):
+        # Grava a lista de editais aguardando itens (troca atômica; vazia remove o arquivo)
+        if not ids:
+            if os.path.exists(self.itens_pending_file):
+                os.remove(self.itens_pending_file)
+            return
+        tmp_path = self.itens_pending_file + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(sorted(ids), f)
+        os.replace(tmp_path, self.itens_pending_file)
+
     def get_last_update(self):
         # Retorna timestamp da última atualização de editais
+        if self._store:
+            return self._store.get_last_update()
         if os.path.exists(self.editais_file):
             return os.path.getmtime(self.editais_file)
         return None
+
+    def get_edital_by_id(self, id_c_pncp):
+        # Busca um edital pelo ID_C_PNCP (índice SQL ou índice hash do snapshot)
+        if self._store:
+            return self._store.get_edital_by_id(id_c_pncp)
+        snapshot = self.get_editais_snapshot()
+        pos = indexes.editais_by_id(snapshot).get(indexes.index_key(id_c_pncp))
+        return snapshot.records[pos] if pos is not None else None
+
+    def get_edital_by_numero(self, numero_controle):
+        # Busca um edital pelo numeroControlePNCP (índice SQL ou índice hash do snapshot)
+        if self._store:
+            return self._store.get_edital_by_numero(numero_controle)
+        snapshot = self.get_editais_snapshot()
+        pos = indexes.editais_by_numero(snapshot).get(indexes.index_key(numero_controle))
+        return snapshot.records[pos] if pos is not None else None
+
+    def get_itens_by_edital_id(self, id_c_pncp):
+        # Filtra itens por edital_ID_C_PNCP (índice SQL ou offsets do snapshot)
+        if self._store:
+            return self._store.get_itens_by_edital_id(id_c_pncp)
+        snapshot = self.get_itens_snapshot()
+        offsets = indexes.itens_by_edital_id(snapshot).get(indexes.index_key(id_c_pncp), ())
+        return [snapshot.records[pos] for pos in offsets]
+
+    def get_itens_by_edital_numero(self, numero_controle):
+        # Filtra itens por edital_numeroControlePNCP (índice SQL ou offsets do snapshot)
+        if self._store:
+            return self._store.get_itens_by_edital_numero(numero_controle)
+        snapshot = self.get_itens_snapshot()
+        offsets = indexes.itens_by_edital_numero(snapshot).get(indexes.index_key(numero_controle), ())
+        return [snapshot.records[pos] for pos in offsets]
+
+    def delete_expired_editais(self, now=None):
+        """
+        Remove editais cujo prazo de recebimento de propostas (dataEncerramentoProposta)
+        já expirou e os itens que ficam sem edital. A regra (comparação das datas,
+        vínculo dos itens) é a de backend.storage.expiration, igual nos dois backends.
+        Editais sem data ou com data inválida são mantidos por segurança.
+        Retorna (editais removidos, itens removidos).
+        """
+        now = now or datetime.now()
+        if self._store:
+            self._invalidate_snapshot("editais")
+            self._invalidate_snapshot("itens")
+            return self._store.delete_expired_editais(now)
+
+        # Snapshot anterior (se em dia): base incremental das facetas
+        previous = self._fresh_snapshot("editais")
+
+        editais = self.load_editais()
+        editais_ativos = [edital for edital in editais if not is_expired(edital, now)]
+
+        removidos = len(editais) - len(editais_ativos)
+        if removidos == 0:
+            return 0, 0
+
+        ids, numeros = active_links(editais_ativos)
+        itens = self.load_itens()
+        itens_ativos = [item for item in itens if is_linked(item, ids, numeros)]
+        # Sobrescreve diretamente: save_editais faz merge (manteria os expirados)
+        # e save_itens ignora listas vazias
+        self._invalidate_snapshot("editais")
+        self._invalidate_snapshot("itens")
+        with open(self.editais_file, "w", encoding="utf-8") as f:
+            json.dump(editais_ativos, f, ensure_ascii=False, indent=2)
+        self._item_segments.write_base(itens_ativos)
+        # Facetas: só os editais removidos são descontados dos agregados anteriores
+        ids_ativos = {id(edital) for edital in editais_ativos}
+        expirados = [edital for edital in editais if id(edital) not in ids_ativos]
+        self._install_snapshot("editais", editais_ativos, {
+            facets.FACETS: facets.facets_after_removal(previous, expirados, editais_ativos),
+        })
+        self._install_snapshot("itens", itens_ativos)
+        return removidos, len(itens) - len(itens_ativos)
+
+    # ------------------------------------------------------------------
+    # Snapshots em memória (leituras frequentes da API)
+    # ------------------------------------------------------------------
+
+    def _io_state(self, dataset):
+        # (assinatura do arquivo principal, bytes totais) do dataset em disco
+        main = self.editais_file if dataset == "editais" else self.itens_file
+        files = [main] if dataset == "editais" else [main] + self._item_segments.list_segments()
+        total = 0
+        for path in files:
+            try:
+                total += os.path.getsize(path)
+            except OSError:
+                pass
+        return self._file_signature(main), total
+
+    def _io_bytes(self, operation, dataset, before):
+        signature, total = self._io_state(dataset)
+        if operation == "load":
+            return total
+        if operation == "append":
+            return total - before[1]
+        # save: o arquivo principal foi reescrito
+        return total if signature != before[0] and signature is not None else 0
+
+    def _snapshot_key(self, dataset):
+        if self._store:
+            return f"{self.sqlite_file}:{dataset}"
+        return self.editais_file if dataset == "editais" else self.itens_file
+
+    @staticmethod
+    def _file_signature(path):
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def _dataset_signature(self, dataset):
+        """
+        Assinatura que muda sempre que o dataset é alterado em disco
+        (inclusive por outro processo, como os scripts de manutenção).
+        """
+        if self._store:
+            return self._store.get_generation(dataset)
+        if dataset == "editais":
+            return self._file_signature(self.editais_file)
+        segments = tuple((path, self._file_signature(path)) for path in self._item_segments.list_segments())
+        return (self._file_signature(self.itens_file), segments)
+
+    def _invalidate_snapshot(self, dataset):
+        get_snapshot_cache().invalidate(self._snapshot_key(dataset))
+
+    def _fresh_snapshot(self, dataset):
+        # Snapshot em cache, apenas se ainda corresponde ao armazenamento (sem forçar carga)
+        snapshot = get_snapshot_cache().peek(self._snapshot_key(dataset))
+        if snapshot is not None and snapshot.signature == self._dataset_signature(dataset):
+            return snapshot
+        return None
+
+    def _install_snapshot(self, dataset, records, indexes=None):
+        # Publica os dados recém-gravados como snapshot atual (com a assinatura pós-escrita)
+        return get_snapshot_cache().put(self._snapshot_key(dataset), records, self._dataset_signature(dataset), indexes)
+
+    def get_editais_snapshot(self):
+        """
+        Retorna o snapshot compartilhado (somente leitura) dos editais.
+        Só relê o armazenamento quando os dados mudaram desde a última carga.
+        """
+        return get_snapshot_cache().get(
+            self._snapshot_key("editais"),
+            lambda: self._dataset_signature("editais"),
+            self.load_editais,
+        )
+
+    def get_itens_snapshot(self):
+        """
+        Retorna o snapshot compartilhado (somente leitura) dos itens.
+        """
+        return get_snapshot_cache().get(
+            self._snapshot_key("itens"),
+            lambda: self._dataset_signature("itens"),
+            self.load_itens,
+        )
+
+    # ------------------------------------------------------------------
+    # Snapshots Parquet (somente leitura, gerados com os exports de editais)
+    # ------------------------------------------------------------------
+
+    def snapshot_signatures(self):
+        """
+        Assinaturas atuais de editais e itens, gravadas nos metadados dos
+        snapshots Parquet para saber se ainda correspondem ao armazenamento.
+        """
+        return {f"pncp.{dataset}_signature": repr(self._dataset_signature(dataset)) for dataset in ("editais", "itens")}
+
+    def load_parquet_snapshot(self, dataset, columns=None, months=None, fresh_only=False):
+        """
+        Abre editais.parquet ou itens.parquet com memory-map para análises
+        somente leitura (colunas tipadas, sem decodificar JSON).
+
+        Args:
+            dataset: "editais" ou "itens".
+            columns: Colunas a ler (padrão: todas).
+            months: Meses de publicação ("AAAA-MM") a ler (padrão: todos).
+            fresh_only: Se True, ignora o snapshot quando editais/itens mudaram
+                        desde a exportação que o gerou.
+
+        Returns:
+            pyarrow.Table, ou None se o pyarrow não estiver instalado, o
+            snapshot ainda não existir ou (fresh_only) estiver desatualizado.
+        """
+        if not parquet_snapshot.is_available():
+            return None
+        path = parquet_snapshot.snapshot_path(self.data_dir, dataset)
+        if not os.path.exists(path):
+            return None
+        if fresh_only:
+            metadata = parquet_snapshot.read_metadata(path)
+            if any(metadata.get(key) != value for key, value in self.snapshot_signatures().items()):
+                logger.info(f"Parquet snapshot {path} is out of date, ignoring")
+                return None
+        return parquet_snapshot.read_snapshot(path, columns, months)
+
+    # ------------------------------------------------------------------
+    # Busca textual (índice invertido sobre os snapshots)
+    # ------------------------------------------------------------------
+
+    def _search_index(self):
+        return get_search_index(self._snapshot_key("editais"))
+
+    def search_editais(self, query):
+        """
+        Busca textual em objeto, órgão e descrição dos itens.
+        Retorna [(edital, score)] do mais relevante para o menos relevante.
+        """
+        editais = self.get_editais_snapshot()
+        itens = self.get_itens_snapshot()
+        index = self._search_index()
+        index.ensure(editais, itens)
+        by_id = indexes.editais_by_id(editais)
+        results = []
+        for doc, score in index.search(query):
+            pos = by_id.get(doc)
+            if pos is not None:
+                results.append((editais.records[pos], score))
+        return results
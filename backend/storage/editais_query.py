@@ -0,0 +1,317 @@
+"""
+Consulta paginada, filtrada e ordenada de editais sobre o snapshot em memória.
+
+Este módulo implementa a consulta usada por /api/editais quando o cliente pede
+paginação (page/page_size), ordenação (sort/order) ou filtros. Os filtros e
+ordenações usam índices derivados do snapshot, construídos uma vez por geração
+(DatasetSnapshot.index) e reaproveitados por todas as requisições:
+
+- editais_by_uf: unidadeOrgao.ufSigla -> posições
+- editais_by_orgao_cnpj: orgaoEntidade.cnpj -> posições
+- editais_by_modalidade: modalidadeId e modalidadeNome (minúsculo) -> posições
+- editais_order_<campo>: posições ordenadas pelo campo (valores ausentes no fim),
+  com as chaves ordenadas (busca binária em intervalos de datas) e o rank de cada posição
+
+Uma consulta intersecta os conjuntos de posições dos filtros, ordena apenas as
+posições candidatas pelo rank pré-calculado e devolve a fatia da página, junto
+com os totais para a SPA virtualizar a lista.
+"""
+
+from bisect import bisect_left, bisect_right
+
+from backend.storage.indexes import build_offsets_index, index_key
+
+EDITAIS_BY_UF = "editais_by_uf"
+EDITAIS_BY_ORGAO_CNPJ = "editais_by_orgao_cnpj"
+EDITAIS_BY_MODALIDADE = "editais_by_modalidade"
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# Campos ordenáveis (aceitos pelo nome completo ou pelo apelido)
+SORT_FIELDS = {
+    "publicacao": "dataPublicacaoPncp",
+    "encerramento": "dataEncerramentoProposta",
+    "abertura": "dataAberturaProposta",
+    "valor": "valorTotalEstimado",
+}
+DATE_FIELDS = ("dataPublicacaoPncp", "dataEncerramentoProposta", "dataAberturaProposta")
+
+# Parâmetros que ativam o modo paginado de /api/editais
+QUERY_PARAMS = (
+    "page", "page_size", "sort", "order", "uf", "orgao_cnpj", "modalidade",
+    "data_inicio", "data_fim", "date_field",
+)
+
+
+class EditaisQueryError(ValueError):
+    """Parâmetro de consulta inválido (resposta 400)."""
+
+
+def _uf(edital):
+    unidade = edital.get("unidadeOrgao") or {}
+    uf = unidade.get("ufSigla") if isinstance(unidade, dict) else None
+    return uf.upper() if isinstance(uf, str) and uf else None
+
+
+def _orgao_cnpj(edital):
+    orgao = edital.get("orgaoEntidade") or {}
+    cnpj = orgao.get("cnpj") if isinstance(orgao, dict) else None
+    return index_key(cnpj or edital.get("cnpjOrgao"))
+
+
+def _normalize_cnpj(value):
+    # Aceita CNPJ formatado (12.345.678/0001-90) ou só dígitos
+    digits = "".join(ch for ch in str(value) if ch.isdigit())
+    return digits or str(value)
+
+
+def _sort_value(edital, field):
+    value = edital.get(field)
+    if value in (None, ""):
+        return None
+    if field == "valorTotalEstimado":
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return None
+    # Datas ISO comparáveis como texto (timezone descartado)
+    return str(value).replace("Z", "")[:19]
+
+
+def build_uf_index(records):
+    index = {}
+    for pos, edital in enumerate(records):
+        uf = _uf(edital)
+        if uf is not None:
+            index.setdefault(uf, []).append(pos)
+    return index
+
+
+def build_orgao_cnpj_index(records):
+    index = {}
+    for pos, edital in enumerate(records):
+        cnpj = _orgao_cnpj(edital)
+        if cnpj is not None:
+            index.setdefault(_normalize_cnpj(cnpj), []).append(pos)
+    return index
+
+
+def build_modalidade_index(records):
+    index = build_offsets_index(records, "modalidadeId")
+    for pos, edital in enumerate(records):
+        nome = edital.get("modalidadeNome")
+        if isinstance(nome, str) and nome:
+            index.setdefault(nome.strip().lower(), []).append(pos)
+    return index
+
+
+class SortOrder:
+    """
+    Ordem pré-calculada de um campo: posições ordenadas (valores ausentes no fim),
+    chaves ordenadas dos registros com valor e rank de cada posição.
+    """
+    def __init__(self, records, field):
+        keyed = []
+        missing = []
+        for pos, edital in enumerate(records):
+            value = _sort_value(edital, field)
+            if value is None:
+                missing.append(pos)
+            else:
+                keyed.append((value, pos))
+        keyed.sort()
+        self.keys = [value for value, _ in keyed]
+        self.positions = [pos for _, pos in keyed] + missing
+        self.rank = [0] * len(records)
+        for rank, pos in enumerate(self.positions):
+            self.rank[pos] = rank
+        self._descending = None
+
+    def descending(self):
+        """
+        Posições em ordem decrescente (valores ausentes continuam no fim), calculada uma vez.
+        """
+        if self._descending is None:
+            keyed = len(self.keys)
+            self._descending = self.positions[keyed - 1::-1] + self.positions[keyed:] if keyed else list(self.positions)
+        return self._descending
+
+    def range(self, start=None, end=None):
+        """
+        Posições com valor entre start e end (inclusive; end compara por prefixo).
+        """
+        lo = bisect_left(self.keys, start) if start else 0
+        hi = bisect_right(self.keys, end + "\uffff") if end else len(self.keys)
+        return self.positions[lo:hi]
+
+
+def sort_order(snapshot, field):
+    return snapshot.index(f"editais_order_{field}", lambda records: SortOrder(records, field))
+
+
+def editais_by_uf(snapshot):
+    return snapshot.index(EDITAIS_BY_UF, build_uf_index)
+
+
+def editais_by_orgao_cnpj(snapshot):
+    return snapshot.index(EDITAIS_BY_ORGAO_CNPJ, build_orgao_cnpj_index)
+
+
+def editais_by_modalidade(snapshot):
+    return snapshot.index(EDITAIS_BY_MODALIDADE, build_modalidade_index)
+
+
+def _int_param(args, name, default, minimum, maximum=None):
+    raw = args.get(name)
+    if raw in (None, ""):
+        return default
+    try:
+        value = int(raw)
+    except (TypeError, ValueError):
+        raise EditaisQueryError(f"Parâmetro '{name}' deve ser um número inteiro")
+    if value < minimum:
+        raise EditaisQueryError(f"Parâmetro '{name}' deve ser maior ou igual a {minimum}")
+    return min(value, maximum) if maximum else value
+
+
+def _date_param(args, name):
+    raw = (args.get(name) or "").strip()
+    if not raw:
+        return None
+    if len(raw) == 8 and raw.isdigit():
+        raw = f"{raw[:4]}-{raw[4:6]}-{raw[6:]}"
+    if len(raw) < 10 or raw[4] != "-" or raw[7] != "-" or not (raw[:4] + raw[5:7] + raw[8:10]).isdigit():
+        raise EditaisQueryError(f"Parâmetro '{name}' deve estar no formato YYYY-MM-DD ou YYYYMMDD")
+    return raw.replace("Z", "")[:19]
+
+
+def _sort_field(name):
+    field = SORT_FIELDS.get(name, name)
+    if field not in SORT_FIELDS.values():
+        allowed = ", ".join(sorted(SORT_FIELDS))
+        raise EditaisQueryError(f"Ordenação inválida '{name}' (use: {allowed})")
+    return field
+
+
+def _values(args, name):
+    # Filtros aceitam valores repetidos (?uf=SP&uf=RJ) ou separados por vírgula
+    getlist = getattr(args, "getlist", None)
+    raw = getlist(name) if getlist else [args.get(name)]
+    values = []
+    for item in raw:
+        if item:
+            values.extend(v.strip() for v in str(item).split(",") if v.strip())
+    return values
+
+
+def wants_query(args):
+    """
+    Indica se a requisição pede o modo paginado (algum parâmetro de consulta presente).
+    """
+    return any(name in args for name in QUERY_PARAMS)
+
+
+def parse_query(args, default_page_size=DEFAULT_PAGE_SIZE, max_page_size=MAX_PAGE_SIZE):
+    """
+    Converte os parâmetros da requisição em um dicionário de consulta validado.
+    Levanta EditaisQueryError se algum parâmetro for inválido.
+    """
+    sort = (args.get("sort") or "").strip()
+    order = (args.get("order") or "").strip().lower()
+    descending = False
+    if sort.startswith("-"):
+        sort, descending = sort[1:], True
+    if order:
+        if order not in ("asc", "desc"):
+            raise EditaisQueryError("Parâmetro 'order' deve ser 'asc' ou 'desc'")
+        descending = order == "desc"
+
+    date_field = (args.get("date_field") or "publicacao").strip()
+    date_field = SORT_FIELDS.get(date_field, date_field)
+    if date_field not in DATE_FIELDS:
+        raise EditaisQueryError("Parâmetro 'date_field' deve ser publicacao, encerramento ou abertura")
+
+    query = {
+        "page": _int_param(args, "page", 1, 1),
+        "page_size": _int_param(args, "page_size", default_page_size, 1, max_page_size),
+        "sort": _sort_field(sort) if sort else None,
+        "descending": descending,
+        "uf": [uf.upper() for uf in _values(args, "uf")],
+        "orgao_cnpj": [_normalize_cnpj(cnpj) for cnpj in _values(args, "orgao_cnpj")],
+        "modalidade": [m.lower() for m in _values(args, "modalidade")],
+        "date_field": date_field,
+        "data_inicio": _date_param(args, "data_inicio"),
+        "data_fim": _date_param(args, "data_fim"),
+    }
+    if query["data_inicio"] and query["data_fim"] and query["data_inicio"] > query["data_fim"]:
+        raise EditaisQueryError("Parâmetro 'data_inicio' deve ser anterior a 'data_fim'")
+    return query
+
+
+def _union(index, keys):
+    positions = set()
+    for key in keys:
+        positions.update(index.get(key, ()))
+    return positions
+
+
+def candidate_positions(snapshot, query):
+    """
+    Posições dos editais que atendem aos filtros da consulta, ou None se não
+    houver filtros (todos os editais).
+    """
+    sets = []
+    if query["uf"]:
+        sets.append(_union(editais_by_uf(snapshot), query["uf"]))
+    if query["orgao_cnpj"]:
+        sets.append(_union(editais_by_orgao_cnpj(snapshot), query["orgao_cnpj"]))
+    if query["modalidade"]:
+        sets.append(_union(editais_by_modalidade(snapshot), query["modalidade"]))
+    if query["data_inicio"] or query["data_fim"]:
+        order = sort_order(snapshot, query["date_field"])
+        sets.append(set(order.range(query["data_inicio"], query["data_fim"])))
+    if not sets:
+        return None
+    sets.sort(key=len)
+    positions = sets[0]
+    for other in sets[1:]:
+        positions = positions.intersection(other)
+    return positions
+
+
+def run_query(snapshot, query):
+    """
+    Executa a consulta sobre o snapshot e retorna o corpo da resposta paginada.
+    """
+    records = snapshot.records
+    positions = candidate_positions(snapshot, query)
+    field = query["sort"]
+    descending = query["descending"]
+
+    if field:
+        order = sort_order(snapshot, field)
+        if positions is None:
+            ordered = order.descending() if descending else order.positions
+        else:
+            rank, keyed = order.rank, len(order.keys)
+            if descending:
+                # Valores ausentes continuam no fim também na ordem decrescente
+                key = lambda pos: (rank[pos] >= keyed, -rank[pos])
+            else:
+                key = rank.__getitem__
+            ordered = sorted(positions, key=key)
+    else:
+        ordered = range(len(records)) if positions is None else sorted(positions)
+
+    total = len(ordered)
+    page_size = query["page_size"]
+    start = (query["page"] - 1) * page_size
+    return {
+        "total": total,
+        "total_geral": len(records),
+        "page": query["page"],
+        "page_size": page_size,
+        "pages": (total + page_size - 1) // page_size,
+        "data": [records[pos] for pos in ordered[start:start + page_size]],
+    }
@@ -0,0 +1,57 @@
+"""
+Regra de expiração de editais compartilhada pelos backends JSON e SQLite.
+
+Um edital expira quando dataEncerramentoProposta é anterior ao momento da limpeza.
+As datas são comparadas como hora de parede: o sufixo "Z" e offsets de fuso são
+descartados, e o resultado em ISO sem fuso também é a coluna indexada do SQLite,
+comparável como texto. Datas ausentes ou
+inválidas mantêm o edital por segurança.
+
+Quando algum edital expira, a limpeza remove também os itens que não ficam
+vinculados a nenhum edital restante (pelo edital_ID_C_PNCP ou pelo
+edital_numeroControlePNCP), inclusive itens órfãos de limpezas anteriores.
+"""
+
+from datetime import datetime
+
+
+def encerramento_key(value):
+    """
+    Converte dataEncerramentoProposta para ISO sem fuso (comparável como texto).
+    Retorna None se a data estiver ausente ou não puder ser interpretada.
+    """
+    if not value or not isinstance(value, str):
+        return None
+    try:
+        dt = datetime.fromisoformat(value.replace("Z", ""))
+    except ValueError:
+        return None
+    return dt.replace(tzinfo=None).isoformat()
+
+
+def cutoff_key(now):
+    # Momento da limpeza no mesmo formato de encerramento_key
+    return now.replace(tzinfo=None).isoformat()
+
+
+def is_expired(edital, now):
+    key = encerramento_key(edital.get("dataEncerramentoProposta"))
+    return key is not None and key < cutoff_key(now)
+
+
+def active_links(editais):
+    """
+    Conjuntos (ID_C_PNCP, numeroControlePNCP) dos editais restantes, como texto.
+    """
+    ids = {str(e["ID_C_PNCP"]) for e in editais if e.get("ID_C_PNCP")}
+    numeros = {str(e["numeroControlePNCP"]) for e in editais if e.get("numeroControlePNCP")}
+    return ids, numeros
+
+
+def is_linked(item, ids, numeros):
+    # Item continua vinculado se aponta para um edital restante por qualquer das chaves
+    edital_id = item.get("edital_ID_C_PNCP")
+    numero = item.get("edital_numeroControlePNCP")
+    return (edital_id not in (None, "") and str(edital_id) in ids) or (
+        numero not in (None, "") and str(numero) in numeros
+    )
@@ -0,0 +1,198 @@
+"""
+Agregados por faceta dos editais (/api/editais/facets).
+
+Este módulo implementa a classe EditaisFacets: contagem e soma de
+valorTotalEstimado por UF (unidadeOrgao.ufSigla), modalidade (modalidadeNome),
+órgão (orgaoEntidade.cnpj) e faixa de valor estimado.
+
+Os agregados ficam no snapshot de editais como índice derivado (FACETS) e são
+mantidos de forma incremental: save_editais e delete_expired_editais derivam
+os agregados do novo snapshot a partir dos anteriores, aplicando apenas os
+editais inseridos, atualizados ou removidos. Consultar as facetas custa
+O(número de buckets), independentemente do total de editais.
+"""
+
+from backend.storage.indexes import index_key
+
+FACETS = "editais_facets"
+
+DIMENSIONS = ("uf", "modalidade", "orgao", "faixa_valor")
+
+# Faixas de valorTotalEstimado: (limite superior exclusivo, rótulo)
+VALUE_BANDS = (
+    (10_000, "ate_10mil"),
+    (100_000, "10mil_100mil"),
+    (1_000_000, "100mil_1mi"),
+    (10_000_000, "1mi_10mi"),
+    (float("inf"), "acima_10mi"),
+)
+NO_VALUE = "sem_valor"
+UNKNOWN = "nao_informado"
+
+
+def _value(edital):
+    try:
+        value = float(edital.get("valorTotalEstimado"))
+    except (TypeError, ValueError):
+        return None
+    return value if value == value else None  # descarta NaN
+
+
+def value_band(value):
+    if value is None:
+        return NO_VALUE
+    for limit, label in VALUE_BANDS:
+        if value < limit:
+            return label
+    return VALUE_BANDS[-1][1]
+
+
+def _nested(edital, parent, field):
+    value = edital.get(parent)
+    return value.get(field) if isinstance(value, dict) else None
+
+
+def edital_buckets(edital):
+    """
+    Bucket do edital em cada dimensão (na ordem de DIMENSIONS) e valor estimado.
+    """
+    uf = _nested(edital, "unidadeOrgao", "ufSigla")
+    modalidade = edital.get("modalidadeNome")
+    cnpj = _nested(edital, "orgaoEntidade", "cnpj") or edital.get("cnpjOrgao")
+    value = _value(edital)
+    buckets = (
+        uf.upper() if isinstance(uf, str) and uf else UNKNOWN,
+        modalidade if isinstance(modalidade, str) and modalidade else UNKNOWN,
+        index_key(cnpj) or UNKNOWN,
+        value_band(value),
+    )
+    return buckets, value or 0.0
+
+
+class EditaisFacets:
+    """
+    Contagem e soma de valor por bucket de cada dimensão, com a contribuição de
+    cada edital (por ID_C_PNCP) para permitir atualizações e remoções incrementais.
+    """
+    def __init__(self):
+        self.buckets = {dimension: {} for dimension in DIMENSIONS}
+        self.orgao_names = {}
+        self.total = 0
+        self.valor_total = 0.0
+        self._contributions = {}
+        # False se algum edital não tem ID_C_PNCP (contribuição não pode ser desfeita)
+        self.incremental = True
+
+    @classmethod
+    def from_records(cls, records):
+        facets = cls()
+        for pos, edital in enumerate(records):
+            doc = index_key(edital.get("ID_C_PNCP"))
+            if doc is None:
+                doc = ("_pos", pos)
+                facets.incremental = False
+            facets._add(doc, edital)
+        return facets
+
+    def copy(self):
+        # Cópia para o próximo snapshot (o snapshot anterior continua consistente)
+        facets = EditaisFacets()
+        facets.buckets = {dimension: {k: list(v) for k, v in buckets.items()} for dimension, buckets in self.buckets.items()}
+        facets.orgao_names = dict(self.orgao_names)
+        facets.total = self.total
+        facets.valor_total = self.valor_total
+        facets._contributions = dict(self._contributions)
+        facets.incremental = self.incremental
+        return facets
+
+    def _apply(self, buckets, value, sign):
+        for dimension, key in zip(DIMENSIONS, buckets):
+            entry = self.buckets[dimension].setdefault(key, [0, 0.0])
+            entry[0] += sign
+            entry[1] += sign * value
+            if entry[0] <= 0:
+                del self.buckets[dimension][key]
+        self.total += sign
+        self.valor_total += sign * value
+
+    def _add(self, doc, edital):
+        self._remove(doc)
+        buckets, value = edital_buckets(edital)
+        self._apply(buckets, value, 1)
+        self._contributions[doc] = (buckets, value)
+        razao_social = _nested(edital, "orgaoEntidade", "razaoSocial")
+        if razao_social and buckets[2] != UNKNOWN:
+            self.orgao_names[buckets[2]] = razao_social
+
+    def _remove(self, doc):
+        previous = self._contributions.pop(doc, None)
+        if previous is not None:
+            self._apply(previous[0], previous[1], -1)
+
+    def upserted(self, editais):
+        """
+        Novos agregados com os editais inseridos/atualizados (merge por ID_C_PNCP).
+        """
+        facets = self.copy()
+        for edital in editais:
+            doc = index_key(edital.get("ID_C_PNCP"))
+            if doc is not None:
+                facets._add(doc, edital)
+        return facets
+
+    def removed(self, editais):
+        """
+        Novos agregados sem os editais informados.
+        """
+        facets = self.copy()
+        for edital in editais:
+            doc = index_key(edital.get("ID_C_PNCP"))
+            if doc is not None:
+                facets._remove(doc)
+        return facets
+
+    def to_dict(self, limit=None):
+        """
+        Buckets de cada dimensão ordenados por contagem (decrescente), com até `limit` por dimensão.
+        """
+        result = {"total": self.total, "valor_total": round(self.valor_total, 2)}
+        for dimension, buckets in self.buckets.items():
+            if dimension == "faixa_valor":
+                order = [label for _, label in VALUE_BANDS] + [NO_VALUE]
+                items = [(key, buckets[key]) for key in order if key in buckets]
+            else:
+                items = sorted(buckets.items(), key=lambda entry: (-entry[1][0], entry[0]))
+            rows = []
+            for key, (count, valor) in items[:limit] if limit else items:
+                row = {"key": key, "count": count, "valor_total": round(valor, 2)}
+                if dimension == "orgao" and key in self.orgao_names:
+                    row["razaoSocial"] = self.orgao_names[key]
+                rows.append(row)
+            result[dimension] = rows
+        return result
+
+
+def editais_facets(snapshot):
+    return snapshot.index(FACETS, EditaisFacets.from_records)
+
+
+def facets_after_upsert(snapshot, editais, records):
+    """
+    Agregados do snapshot resultante de um save_editais: incrementais se o snapshot
+    anterior já os tinha (snapshot=None força o cálculo completo), senão calculados
+    a partir dos registros finais.
+    """
+    previous = snapshot.peek_index(FACETS) if snapshot is not None else None
+    if previous is not None and previous.incremental:
+        return previous.upserted(editais)
+    return EditaisFacets.from_records(records)
+
+
+def facets_after_removal(snapshot, removed, records):
+    """
+    Agregados do snapshot resultante de uma remoção (ex.: editais expirados).
+    """
+    previous = snapshot.peek_index(FACETS) if snapshot is not None else None
+    if previous is not None and previous.incremental:
+        return previous.removed(removed)
+    return EditaisFacets.from_records(records)
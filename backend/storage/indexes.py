@@ -0,0 +1,141 @@
+"""
+Índices hash de editais e itens sobre os snapshots em memória.
+
+Este módulo define os índices usados pelas buscas do DataManager (backend JSON):
+
+- editais_by_id: ID_C_PNCP -> posição do edital
+- editais_by_numero: numeroControlePNCP -> posição do edital
+- itens_by_edital_id: edital_ID_C_PNCP -> posições dos itens
+- itens_by_edital_numero: edital_numeroControlePNCP -> posições dos itens
+
+Os índices são construídos uma vez por snapshot e, quando os dados são salvos
+pelo próprio processo, atualizados de forma incremental (apenas as chaves
+afetadas), sem reparsear os arquivos nem percorrer registros não relacionados.
+"""
+
+from backend.storage.item_segments import item_key
+
+EDITAIS_BY_ID = "editais_by_id"
+EDITAIS_BY_NUMERO = "editais_by_numero"
+ITENS_BY_EDITAL_ID = "itens_by_edital_id"
+ITENS_BY_EDITAL_NUMERO = "itens_by_edital_numero"
+
+
+def index_key(value):
+    # Chaves sempre como texto (IDs podem vir como número em dados antigos)
+    return str(value) if value not in (None, "") else None
+
+
+def build_unique_index(records, field):
+    """
+    Mapeia cada valor de `field` para a posição do primeiro registro que o contém.
+    """
+    index = {}
+    for pos, record in enumerate(records):
+        key = index_key(record.get(field))
+        if key is not None:
+            index.setdefault(key, pos)
+    return index
+
+
+def build_offsets_index(records, field):
+    """
+    Mapeia cada valor de `field` para a lista de posições dos registros que o contêm.
+    """
+    index = {}
+    for pos, record in enumerate(records):
+        key = index_key(record.get(field))
+        if key is not None:
+            index.setdefault(key, []).append(pos)
+    return index
+
+
+def editais_by_id(snapshot):
+    return snapshot.index(EDITAIS_BY_ID, lambda records: build_unique_index(records, "ID_C_PNCP"))
+
+
+def editais_by_numero(snapshot):
+    return snapshot.index(EDITAIS_BY_NUMERO, lambda records: build_unique_index(records, "numeroControlePNCP"))
+
+
+def itens_by_edital_id(snapshot):
+    return snapshot.index(ITENS_BY_EDITAL_ID, lambda records: build_offsets_index(records, "edital_ID_C_PNCP"))
+
+
+def itens_by_edital_numero(snapshot):
+    return snapshot.index(ITENS_BY_EDITAL_NUMERO, lambda records: build_offsets_index(records, "edital_numeroControlePNCP"))
+
+
+def upsert_editais(snapshot, editais):
+    """
+    Aplica o merge por ID_C_PNCP sobre o snapshot atual, atualizando os índices
+    apenas para os editais recebidos. Reproduz a semântica do merge do DataManager:
+    editais existentes mantêm a posição, novos são acrescentados ao final.
+
+    Retorna (registros, índices) ou None se o snapshot tiver registros sem
+    ID_C_PNCP ou duplicados (nesse caso o chamador faz o merge completo).
+    """
+    by_id = editais_by_id(snapshot)
+    if len(by_id) != len(snapshot.records):
+        return None
+    records = list(snapshot.records)
+    by_id = dict(by_id)
+    by_numero = dict(editais_by_numero(snapshot))
+
+    for edital in editais:
+        edital_id = index_key(edital.get("ID_C_PNCP"))
+        if edital_id is None:
+            continue
+        pos = by_id.get(edital_id)
+        if pos is None:
+            pos = len(records)
+            records.append(edital)
+            by_id[edital_id] = pos
+        else:
+            old_numero = index_key(records[pos].get("numeroControlePNCP"))
+            if old_numero is not None and by_numero.get(old_numero) == pos:
+                del by_numero[old_numero]
+            records[pos] = edital
+        numero = index_key(edital.get("numeroControlePNCP"))
+        if numero is not None and (numero not in by_numero or pos < by_numero[numero]):
+            by_numero[numero] = pos
+
+    return records, {EDITAIS_BY_ID: by_id, EDITAIS_BY_NUMERO: by_numero}
+
+
+def append_itens(snapshot, itens):
+    """
+    Acrescenta itens ao snapshot atualizando apenas as chaves de edital afetadas.
+
+    Retorna (registros, índices) ou None se algum edital dos novos itens já
+    tiver itens no snapshot, ou se o lote repetir um item (os novos registros
+    substituiriam outros, então o chamador descarta o snapshot e deixa a
+    próxima leitura recarregar).
+    """
+    by_id = itens_by_edital_id(snapshot)
+    by_numero = itens_by_edital_numero(snapshot)
+    new_by_id = {}
+    new_by_numero = {}
+    seen = set()
+    for offset, item in enumerate(itens, start=len(snapshot.records)):
+        edital_id = index_key(item.get("edital_ID_C_PNCP"))
+        if edital_id is not None:
+            if edital_id in by_id:
+                return None
+            key = item_key(item)
+            if key is not None:
+                if key in seen:
+                    return None
+                seen.add(key)
+            new_by_id.setdefault(edital_id, []).append(offset)
+        numero = index_key(item.get("edital_numeroControlePNCP"))
+        if numero is not None:
+            new_by_numero.setdefault(numero, []).append(offset)
+
+    records = snapshot.records + list(itens)
+    merged_by_id = dict(by_id)
+    merged_by_id.update(new_by_id)
+    merged_by_numero = dict(by_numero)
+    for numero, offsets in new_by_numero.items():
+        merged_by_numero[numero] = merged_by_numero.get(numero, []) + offsets
+    return records, {ITENS_BY_EDITAL_ID: merged_by_id, ITENS_BY_EDITAL_NUMERO: merged_by_numero}
@@ -0,0 +1,225 @@
+"""
+Segmentos JSON Lines append-only para itens.
+
+Este módulo implementa a classe ItemSegmentStore, usada pelo DataManager para
+gravar itens de forma incremental: cada checkpoint da coleta cria um novo segmento
+(`itens.segments/000001.jsonl`, `000002.jsonl`, ...) contendo apenas os registros
+novos, em vez de reescrever o itens.json inteiro.
+
+O itens.json continua sendo a base compactada. A leitura percorre a base e os
+segmentos em streaming; quando um item aparece mais de uma vez (mesmo
+edital_ID_C_PNCP + numeroItem), vale o registro mais recente. A compactação
+incorpora os segmentos ao itens.json e remove os segmentos consumidos.
+"""
+
+import json
+import os
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Quantidade de segmentos pendentes que dispara compactação em background
+MAX_SEGMENTS_BEFORE_COMPACTION = 32
+
+# Bytes lidos por vez ao percorrer a base (itens.json) em streaming
+BASE_READ_CHUNK = 1 << 20
+
+_decoder = json.JSONDecoder()
+
+# Um lock por diretório de segmentos (vários DataManager podem coexistir no processo)
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+def _lock_for(path):
+    with _locks_guard:
+        return _locks.setdefault(os.path.abspath(path), threading.RLock())
+
+
+def item_key(item):
+    """
+    Chave que identifica um item para fins de substituição (edital_ID_C_PNCP, numeroItem).
+    Itens sem esses campos nunca são considerados substituídos.
+    """
+    edital_id = item.get("edital_ID_C_PNCP")
+    numero = item.get("numeroItem")
+    if edital_id is None or numero is None:
+        return None
+    return (str(edital_id), str(numero))
+
+
+class ItemSegmentStore:
+    """
+    Armazenamento append-only de itens em segmentos JSON Lines sobre uma base JSON.
+    """
+    def __init__(self, base_file, segments_dir):
+        self.base_file = base_file
+        self.segments_dir = segments_dir
+        self.lock = _lock_for(segments_dir)
+        self._compaction_thread = None
+
+    def list_segments(self):
+        """
+        Retorna os caminhos dos segmentos existentes, em ordem de criação.
+        """
+        if not os.path.isdir(self.segments_dir):
+            return []
+        names = sorted(n for n in os.listdir(self.segments_dir) if n.endswith(".jsonl"))
+        return [os.path.join(self.segments_dir, n) for n in names]
+
+    def append(self, itens):
+        """
+        Grava os itens em um novo segmento. O arquivo é escrito em um temporário
+        e renomeado, de modo que leitores nunca veem um segmento parcial.
+        Retorna o caminho do segmento criado (ou None se a lista estiver vazia).
+        """
+        if not itens:
+            return None
+        with self.lock:
+            os.makedirs(self.segments_dir, exist_ok=True)
+            segments = self.list_segments()
+            seq = int(os.path.basename(segments[-1]).split(".")[0]) + 1 if segments else 1
+            path = os.path.join(self.segments_dir, f"{seq:06d}.jsonl")
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for item in itens:
+                    f.write(json.dumps(item, ensure_ascii=False))
+                    f.write("\n")
+            os.replace(tmp_path, path)
+        logger.info(f"Appended {len(itens)} itens to segment {path}")
+        return path
+
+    @staticmethod
+    def _iter_segment(path):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+    def _iter_base(self):
+        # Decodifica o array JSON da base um registro por vez (memória limitada a
+        # um bloco de leitura + o registro atual, em vez da lista inteira)
+        if not os.path.exists(self.base_file):
+            return
+        with open(self.base_file, "r", encoding="utf-8") as f:
+            buffer, pos, eof = "", 0, False
+            expect_open = True
+            while True:
+                while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                    pos += 1
+                if pos >= len(buffer) - 1 and not eof:
+                    # Garante ao menos um caractere completo à frente antes de decidir
+                    chunk = f.read(BASE_READ_CHUNK)
+                    eof = not chunk
+                    buffer, pos = buffer[pos:] + chunk, 0
+                    continue
+                if pos >= len(buffer):
+                    if expect_open:
+                        return
+                    raise ValueError(f"{self.base_file}: array JSON incompleto")
+                if expect_open:
+                    if buffer[pos] != "[":
+                        raise ValueError(f"{self.base_file}: a base deve ser um array JSON")
+                    expect_open = False
+                    pos += 1
+                    continue
+                if buffer[pos] == "]":
+                    return
+                try:
+                    item, end = _decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                    end = None
+                if end is None or (end == len(buffer) and not eof):
+                    # Registro cortado no fim do bloco: lê mais e decodifica de novo
+                    chunk = f.read(BASE_READ_CHUNK)
+                    eof = not chunk
+                    buffer, pos = buffer[pos:] + chunk, 0
+                    continue
+                yield item
+                pos = end
+
+    def iter_records(self, segments=None):
+        """
+        Percorre a base e os segmentos em streaming, descartando registros substituídos.
+        Apenas as chaves dos segmentos ficam em memória (a base já está compactada).
+        """
+        if segments is None:
+            segments = self.list_segments()
+
+        # 1ª passada: posição da última ocorrência de cada chave nos segmentos
+        latest = {}
+        for seg_idx, path in enumerate(segments):
+            for line_idx, item in enumerate(self._iter_segment(path)):
+                key = item_key(item)
+                if key is not None:
+                    latest[key] = (seg_idx, line_idx)
+
+        for item in self._iter_base():
+            if item_key(item) not in latest:
+                yield item
+        for seg_idx, path in enumerate(segments):
+            for line_idx, item in enumerate(self._iter_segment(path)):
+                key = item_key(item)
+                if key is None or latest[key] == (seg_idx, line_idx):
+                    yield item
+
+    def write_base(self, itens):
+        """
+        Substitui a base pela lista fornecida e descarta todos os segmentos.
+        """
+        with self.lock:
+            self._write_base_file(itens)
+            self._remove_segments(self.list_segments())
+
+    def _write_base_file(self, itens):
+        tmp_path = self.base_file + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(itens, f, ensure_ascii=False)
+        os.replace(tmp_path, self.base_file)
+
+    @staticmethod
+    def _remove_segments(segments):
+        for path in segments:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def compact(self):
+        """
+        Incorpora os segmentos existentes ao itens.json, descartando registros
+        substituídos, e remove os segmentos consumidos. Segmentos criados durante
+        a compactação são preservados para a próxima rodada.
+        Retorna a quantidade de itens na base compactada.
+        """
+        with self.lock:
+            segments = self.list_segments()
+            if not segments:
+                return None
+            merged = list(self.iter_records(segments))
+            self._write_base_file(merged)
+            self._remove_segments(segments)
+        logger.info(f"Compacted {len(segments)} item segments into {self.base_file} ({len(merged)} itens)")
+        return len(merged)
+
+    def compact_async(self, compact_fn=None):
+        """
+        Dispara a compactação em uma thread daemon (no máximo uma por vez por instância).
+        `compact_fn` permite ao chamador envolver compact() (padrão: self.compact).
+        """
+        if self._compaction_thread and self._compaction_thread.is_alive():
+            return self._compaction_thread
+
+        def _run():
+            try:
+                (compact_fn or self.compact)()
+            except Exception:
+                logger.exception("Failed to compact item segments")
+
+        self._compaction_thread = threading.Thread(target=_run, name="itens-compaction", daemon=True)
+        self._compaction_thread.start()
+        return self._compaction_thread
@@ -0,0 +1,399 @@
+"""
+Estatísticas vetorizadas de preços e quantidades dos itens (/api/itens/stats).
+
+Este módulo implementa a classe ItemColumns, uma visão colunar dos itens do
+snapshot: os campos numéricos (valorUnitarioEstimado, quantidade, valorTotal)
+ficam em arrays NumPy float64 (NaN quando ausente) e a unidade de medida e o
+tipo (material/serviço) ficam codificados como categorias (códigos int32 +
+tabela de rótulos). A visão é montada uma única vez por geração do snapshot de
+itens (DatasetSnapshot.index); a partir daí as consultas não percorrem os
+registros em Python:
+
+- filtros por unidade/tipo são comparações sobre os códigos (np.isin);
+- filtro por termos da descrição intersecta listas de posições pré-calculadas
+  por termo (mesma tokenização da busca textual);
+- média, desvio padrão, mínimo/máximo, percentis e outliers (cercas de Tukey,
+  Q1 - k*IQR e Q3 + k*IQR) de cada grupo são calculados de uma vez sobre os
+  valores ordenados por (grupo, valor), com np.add.reduceat e índices de percentil.
+"""
+
+import numpy as np
+
+from backend.storage.search_index import tokenize
+
+ITEM_COLUMNS = "item_columns"
+ITEM_TERMS = "item_terms"
+
+# Campos numéricos (apelido -> campo do item)
+NUMERIC_FIELDS = {
+    "valor_unitario": "valorUnitarioEstimado",
+    "quantidade": "quantidade",
+    "valor_total": "valorTotal",
+}
+# Dimensões categóricas (apelido -> campos do item, em ordem de preferência)
+CATEGORY_FIELDS = {
+    "unidade": ("unidadeMedida",),
+    "material": ("materialOuServicoNome", "materialOuServico"),
+}
+UNKNOWN = "NAO INFORMADO"
+
+DEFAULT_PERCENTILES = (25, 50, 75, 90)
+MAX_PERCENTILES = 10
+DEFAULT_OUTLIER_K = 1.5
+DEFAULT_GROUP_LIMIT = 50
+MAX_GROUP_LIMIT = 1000
+DEFAULT_OUTLIER_LIMIT = 20
+MAX_OUTLIER_LIMIT = 500
+
+# Campos de cada item devolvido na lista de outliers
+OUTLIER_FIELDS = ("edital_ID_C_PNCP", "numeroItem", "descricao", "unidadeMedida", "quantidade", "valorUnitarioEstimado")
+
+
+class ItemStatsError(ValueError):
+    """Parâmetro de estatística inválido (resposta 400)."""
+
+
+def _float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def category_label(value):
+    """
+    Rótulo normalizado de uma categoria (espaços colapsados, maiúsculas).
+    """
+    if value is None:
+        return UNKNOWN
+    label = " ".join(str(value).split()).upper()
+    return label or UNKNOWN
+
+
+def _category_value(item, fields):
+    for field in fields:
+        value = item.get(field)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+class ItemColumns:
+    """
+    Colunas NumPy dos itens de um snapshot (posição no array == posição no snapshot).
+
+    Attributes:
+        size: número de itens
+        values: apelido do campo numérico -> array float64 (NaN se ausente)
+        codes: dimensão -> array int32 com o código da categoria de cada item
+        labels: dimensão -> lista de rótulos (índice == código)
+    """
+    def __init__(self, records):
+        self.size = len(records)
+        self.values = {
+            name: np.fromiter((_float(item.get(field)) for item in records), dtype=np.float64, count=self.size)
+            for name, field in NUMERIC_FIELDS.items()
+        }
+        self.codes = {}
+        self.labels = {}
+        self._lookup = {}
+        self._orders = {}
+        for name, fields in CATEGORY_FIELDS.items():
+            lookup = {}
+            codes = np.fromiter(
+                (lookup.setdefault(category_label(_category_value(item, fields)), len(lookup)) for item in records),
+                dtype=np.int32, count=self.size,
+            )
+            self.codes[name] = codes
+            self.labels[name] = list(lookup)
+            self._lookup[name] = lookup
+
+    def value_order(self, name):
+        """
+        Posições dos itens com valor no campo `name`, ordenadas pelo valor
+        (calculada uma vez por campo; NaN fica de fora).
+        """
+        order = self._orders.get(name)
+        if order is None:
+            values = self.values[name]
+            order = np.argsort(values, kind="stable")
+            order = self._orders[name] = order[:np.count_nonzero(~np.isnan(values))]
+        return order
+
+    def category_codes(self, dimension, values):
+        """
+        Códigos das categorias pedidas (rótulos desconhecidos são ignorados).
+        """
+        lookup = self._lookup[dimension]
+        return np.array(
+            [lookup[label] for label in {category_label(v) for v in values} if label in lookup], dtype=np.int32,
+        )
+
+    def group_codes(self, dimensions, positions):
+        """
+        Código combinado dos grupos (produto das dimensões) para as posições dadas.
+        """
+        codes = np.zeros(len(positions), dtype=np.int64)
+        for dimension in dimensions:
+            codes = codes * len(self.labels[dimension]) + self.codes[dimension][positions]
+        return codes
+
+    def group_labels(self, dimensions, code):
+        # Decodifica o código combinado em {dimensão: rótulo}
+        labels = {}
+        for dimension in reversed(dimensions):
+            code, local = divmod(int(code), len(self.labels[dimension]))
+            labels[dimension] = self.labels[dimension][local]
+        return {dimension: labels[dimension] for dimension in dimensions}
+
+
+def build_item_terms(records):
+    """
+    Índice termo da descrição -> array ordenado de posições dos itens.
+    """
+    postings = {}
+    # Descrições se repetem muito entre editais: tokeniza cada texto uma vez
+    terms_by_text = {}
+    for pos, item in enumerate(records):
+        text = item.get("descricao")
+        terms = terms_by_text.get(text)
+        if terms is None:
+            terms = terms_by_text[text] = set(tokenize(text)) if isinstance(text, str) else ()
+        for term in terms:
+            postings.setdefault(term, []).append(pos)
+    return {term: np.array(positions, dtype=np.int64) for term, positions in postings.items()}
+
+
+def item_columns(snapshot):
+    return snapshot.index(ITEM_COLUMNS, ItemColumns)
+
+
+def item_terms(snapshot):
+    return snapshot.index(ITEM_TERMS, build_item_terms)
+
+
+def _values(args, name):
+    # Aceita valores repetidos (?unidade=UN&unidade=KG) ou separados por vírgula
+    getlist = getattr(args, "getlist", None)
+    raw = getlist(name) if getlist else [args.get(name)]
+    values = []
+    for item in raw:
+        if item:
+            values.extend(v.strip() for v in str(item).split(",") if v.strip())
+    return values
+
+
+def _number_param(args, name, default, cast, minimum, maximum=None):
+    raw = args.get(name)
+    if raw in (None, ""):
+        return default
+    try:
+        value = cast(raw)
+    except (TypeError, ValueError):
+        raise ItemStatsError(f"Parâmetro '{name}' deve ser numérico")
+    if not value >= minimum:
+        raise ItemStatsError(f"Parâmetro '{name}' deve ser maior ou igual a {minimum}")
+    return min(value, maximum) if maximum is not None else value
+
+
+def parse_stats_query(args):
+    """
+    Converte os parâmetros da requisição em um dicionário de consulta validado.
+    Levanta ItemStatsError se algum parâmetro for inválido.
+    """
+    field = (args.get("field") or "valor_unitario").strip()
+    aliases = {name: alias for alias, name in NUMERIC_FIELDS.items()}
+    field = aliases.get(field, field)
+    if field not in NUMERIC_FIELDS:
+        allowed = ", ".join(NUMERIC_FIELDS)
+        raise ItemStatsError(f"Campo inválido '{field}' (use: {allowed})")
+
+    group_by = _values(args, "group_by")
+    for dimension in group_by:
+        if dimension not in CATEGORY_FIELDS:
+            allowed = ", ".join(CATEGORY_FIELDS)
+            raise ItemStatsError(f"Agrupamento inválido '{dimension}' (use: {allowed})")
+
+    percentiles = DEFAULT_PERCENTILES
+    if args.get("percentiles"):
+        try:
+            percentiles = tuple(sorted({float(p) for p in _values(args, "percentiles")}))
+        except ValueError:
+            raise ItemStatsError("Parâmetro 'percentiles' deve conter números entre 0 e 100")
+        if not percentiles or len(percentiles) > MAX_PERCENTILES or not all(0 <= p <= 100 for p in percentiles):
+            raise ItemStatsError(f"Parâmetro 'percentiles' aceita até {MAX_PERCENTILES} números entre 0 e 100")
+
+    return {
+        "field": field,
+        "q": (args.get("q") or "").strip(),
+        "unidade": _values(args, "unidade"),
+        "material": _values(args, "material"),
+        "group_by": tuple(dict.fromkeys(group_by)),
+        "percentiles": percentiles,
+        "k": _number_param(args, "k", DEFAULT_OUTLIER_K, float, 0),
+        "limit": _number_param(args, "limit", DEFAULT_GROUP_LIMIT, int, 1, MAX_GROUP_LIMIT),
+        "outliers": _number_param(args, "outliers", DEFAULT_OUTLIER_LIMIT, int, 0, MAX_OUTLIER_LIMIT),
+    }
+
+
+def candidate_positions(snapshot, columns, query):
+    """
+    Posições (array int64 ordenado) dos itens que atendem aos filtros da consulta,
+    ou None se não houver filtros (todos os itens).
+    """
+    positions = None
+    terms = tokenize(query["q"])
+    if terms:
+        postings = item_terms(snapshot)
+        empty = np.empty(0, dtype=np.int64)
+        for term in sorted(set(terms), key=lambda t: len(postings.get(t, empty))):
+            term_positions = postings.get(term, empty)
+            positions = term_positions if positions is None else np.intersect1d(positions, term_positions, assume_unique=True)
+            if not len(positions):
+                break
+    for dimension in CATEGORY_FIELDS:
+        if not query[dimension]:
+            continue
+        wanted = columns.category_codes(dimension, query[dimension])
+        if positions is None:
+            positions = np.flatnonzero(np.isin(columns.codes[dimension], wanted))
+        elif len(positions):
+            positions = positions[np.isin(columns.codes[dimension][positions], wanted)]
+    return positions
+
+
+def grouped_stats(values, codes, percentiles, k):
+    """
+    Estatísticas por grupo de `values` (sem NaN, já em ordem crescente), agrupados
+    por `codes` (None: um único grupo).
+
+    Retorna (valores ordenados por grupo e valor, ordem aplicada ou None, dicionário
+    de arrays por grupo: group, count, mean, std, min, max, percentiles (matriz
+    grupos x percentis), lower/upper/iqr (cercas de outlier), outliers (contagem)
+    e outside (máscara dos valores ordenados fora das cercas)).
+    """
+    if codes is None:
+        order = None
+        groups, starts, counts = np.zeros(1, dtype=np.int64), np.zeros(1, dtype=np.int64), np.array([len(values)])
+    else:
+        # Ordenação estável por grupo preserva a ordem por valor dentro de cada grupo
+        # (com poucos grupos, o menor dtype inteiro permite radix sort)
+        order = np.argsort(codes.astype(np.min_scalar_type(codes.max()), copy=False), kind="stable")
+        values = values[order]
+        codes = codes[order]
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(codes)) + 1))
+        counts = np.diff(np.append(starts, len(codes)))
+        groups = codes[starts]
+
+    def quantile(q):
+        # Interpolação linear entre vizinhos (mesmo critério de np.percentile)
+        rank = starts + (counts - 1) * q
+        below = np.floor(rank).astype(np.int64)
+        above = np.ceil(rank).astype(np.int64)
+        return values[below] + (values[above] - values[below]) * (rank - below)
+
+    means = np.add.reduceat(values, starts) / counts
+    deviations = values - np.repeat(means, counts)
+    q1, q3 = quantile(0.25), quantile(0.75)
+    iqr = q3 - q1
+    lower, upper = q1 - k * iqr, q3 + k * iqr
+    outside = (values < np.repeat(lower, counts)) | (values > np.repeat(upper, counts))
+    stats = {
+        "group": groups,
+        "count": counts,
+        "mean": means,
+        "std": np.sqrt(np.add.reduceat(deviations * deviations, starts) / counts),
+        "min": values[starts],
+        "max": values[starts + counts - 1],
+        "percentiles": np.stack([quantile(p / 100.0) for p in percentiles], axis=1),
+        "lower": lower,
+        "upper": upper,
+        "iqr": iqr,
+        "outliers": np.add.reduceat(outside.astype(np.int64), starts),
+        "outside": outside,
+    }
+    return values, order, stats
+
+
+def _round(value):
+    return round(float(value), 4)
+
+
+def _group_row(stats, i, percentiles):
+    return {
+        "count": int(stats["count"][i]),
+        "mean": _round(stats["mean"][i]),
+        "std": _round(stats["std"][i]),
+        "min": _round(stats["min"][i]),
+        "max": _round(stats["max"][i]),
+        "percentiles": {f"p{p:g}": _round(v) for p, v in zip(percentiles, stats["percentiles"][i])},
+        "outlier_bounds": [_round(stats["lower"][i]), _round(stats["upper"][i])],
+        "outliers": int(stats["outliers"][i]),
+    }
+
+
+def run_stats(snapshot, query):
+    """
+    Executa a consulta de estatísticas sobre o snapshot de itens e retorna o corpo da resposta.
+    """
+    columns = item_columns(snapshot)
+    candidates = candidate_positions(snapshot, columns, query)
+    # Posições em ordem crescente de valor: a ordem pré-calculada filtrada pela máscara
+    ranked = columns.value_order(query["field"])
+    if candidates is None:
+        positions = ranked
+        missing = columns.size - len(ranked)
+    else:
+        selected = np.zeros(columns.size, dtype=bool)
+        selected[candidates] = True
+        positions = ranked[selected[ranked]]
+        missing = len(candidates) - len(positions)
+    values = columns.values[query["field"]][positions]
+    percentiles = query["percentiles"]
+    result = {
+        "field": NUMERIC_FIELDS[query["field"]],
+        "total": int(len(positions)),
+        "missing": int(missing),
+        "percentiles": [f"p{p:g}" for p in percentiles],
+        "overall": None,
+        "group_by": list(query["group_by"]),
+        "groups": [],
+        "outliers": [],
+    }
+    if not len(positions):
+        return result
+
+    dimensions = query["group_by"]
+    sorted_values, order, stats = grouped_stats(values, None, percentiles, query["k"])
+    result["overall"] = _group_row(stats, 0, percentiles)
+    if dimensions:
+        codes = columns.group_codes(dimensions, positions)
+        sorted_values, order, stats = grouped_stats(values, codes, percentiles, query["k"])
+        # Grupos maiores primeiro; empate pelo código (ordem de aparição)
+        for i in np.lexsort((stats["group"], -stats["count"]))[:query["limit"]]:
+            row = columns.group_labels(dimensions, stats["group"][i])
+            row.update(_group_row(stats, i, percentiles))
+            result["groups"].append(row)
+
+    if query["outliers"]:
+        # Outliers mais distantes da cerca (em múltiplos do IQR do grupo) primeiro
+        outside = np.flatnonzero(stats["outside"])
+        if len(outside):
+            group_of = np.repeat(np.arange(len(stats["count"])), stats["count"])[outside]
+            iqr = np.where(stats["iqr"][group_of] > 0, stats["iqr"][group_of], 1.0)
+            excess = np.maximum(sorted_values[outside] - stats["upper"][group_of], stats["lower"][group_of] - sorted_values[outside]) / iqr
+            top = np.arange(len(excess))
+            if len(top) > query["outliers"]:
+                top = np.argpartition(-excess, query["outliers"] - 1)[:query["outliers"]]
+            top = top[np.argsort(-excess[top], kind="stable")]
+            records = snapshot.records
+            for i in top:
+                offset = outside[i] if order is None else order[outside[i]]
+                item = records[positions[offset]]
+                row = {field: item.get(field) for field in OUTLIER_FIELDS}
+                if dimensions:
+                    row["group"] = columns.group_labels(dimensions, stats["group"][group_of[i]])
+                row["value"] = _round(sorted_values[outside[i]])
+                row["excess_iqr"] = _round(excess[i])
+                result["outliers"].append(row)
+    return result
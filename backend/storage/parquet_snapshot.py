@@ -0,0 +1,414 @@
+"""
+Snapshot colunar (Parquet) de editais e itens.
+
+Este módulo grava editais.parquet e itens.parquet (gerados junto dos exports de
+editais) com esquemas tipados e estáveis, independentes dos campos presentes
+nos dados:
+
+- datas como timestamp (ms, sem fuso; datas com fuso são convertidas para UTC);
+- valores monetários como decimal(18, 4) e quantidades como float64;
+- UF, modalidade, situação, unidade de medida etc. como categorias
+  (dictionary<int32, string>);
+- campos aninhados com o mesmo nome achatado do CSV ("unidadeOrgao.ufSigla").
+
+Os itens levam também UF, modalidade e mês de publicação do edital. As linhas
+de cada arquivo são agrupadas por mês de publicação (coluna mesPublicacao,
+"AAAA-MM"): cada mês ocupa row groups próprios, em ordem, então filtros por
+mês leem apenas os row groups do período. O agrupamento usa buffers por mês
+descarregados em arquivos temporários Arrow IPC, sem manter todos os itens em
+memória de uma vez (só o maior mês, ao gravá-lo).
+
+Os mesmos arquivos servem de snapshot para análises somente leitura:
+read_snapshot abre o Parquet com memory-map (o SO pagina o arquivo sob
+demanda) e lê só as colunas e os row groups pedidos. Os metadados do arquivo
+guardam as assinaturas do armazenamento no momento da exportação, para saber
+se o snapshot ainda corresponde aos dados.
+
+Requer pyarrow (extra "parquet"); sem ele, is_available() retorna False.
+"""
+
+import os
+import tempfile
+from datetime import datetime, timezone
+from decimal import Decimal, InvalidOperation
+
+from backend.storage.indexes import index_key
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Dependência opcional (extra "parquet")
+    pa = pq = None
+
+SNAPSHOT_VERSION = "1"
+MONTH_COLUMN = "mesPublicacao"
+
+# Linhas em memória (todos os meses) antes de descarregar os buffers em disco
+SPILL_ROWS = 200_000
+# Linhas máximas por row group (meses maiores ocupam mais de um)
+ROW_GROUP_MAX_ROWS = 1_000_000
+COMPRESSION = "zstd"
+
+DECIMAL_PRECISION = 18
+DECIMAL_SCALE = 4
+_DECIMAL_QUANTUM = Decimal(1).scaleb(-DECIMAL_SCALE)
+_DECIMAL_LIMIT = Decimal(10) ** (DECIMAL_PRECISION - DECIMAL_SCALE)
+
+# (coluna, tipo); "." separa campos aninhados
+EDITAIS_COLUMNS = (
+    ("ID_C_PNCP", "string"),
+    ("numeroControlePNCP", "string"),
+    ("anoCompra", "int"),
+    ("sequencialCompra", "int"),
+    ("numeroCompra", "string"),
+    ("processo", "string"),
+    ("objetoCompra", "string"),
+    ("informacaoComplementar", "string"),
+    ("modalidadeId", "int"),
+    ("modalidadeNome", "category"),
+    ("modoDisputaNome", "category"),
+    ("situacaoCompraNome", "category"),
+    ("tipoInstrumentoConvocatorioNome", "category"),
+    ("srp", "bool"),
+    ("valorTotalEstimado", "decimal"),
+    ("valorTotalHomologado", "decimal"),
+    ("dataPublicacaoPncp", "timestamp"),
+    ("dataAberturaProposta", "timestamp"),
+    ("dataEncerramentoProposta", "timestamp"),
+    ("dataAtualizacao", "timestamp"),
+    ("orgaoEntidade.cnpj", "string"),
+    ("orgaoEntidade.razaoSocial", "string"),
+    ("unidadeOrgao.codigoUnidade", "string"),
+    ("unidadeOrgao.nomeUnidade", "string"),
+    ("unidadeOrgao.municipioNome", "string"),
+    ("unidadeOrgao.ufSigla", "category"),
+    ("amparoLegal.nome", "category"),
+    ("linkSistemaOrigem", "string"),
+    (MONTH_COLUMN, "category"),
+)
+
+ITENS_COLUMNS = (
+    ("edital_ID_C_PNCP", "string"),
+    ("edital_numeroControlePNCP", "string"),
+    ("numeroItem", "int"),
+    ("descricao", "string"),
+    ("materialOuServicoNome", "category"),
+    ("unidadeMedida", "category"),
+    ("quantidade", "float"),
+    ("valorUnitarioEstimado", "decimal"),
+    ("valorTotal", "decimal"),
+    ("situacaoCompraItemNome", "category"),
+    ("criterioJulgamentoNome", "category"),
+    ("tipoBeneficioNome", "category"),
+    ("orcamentoSigiloso", "bool"),
+    # Copiadas do edital do item
+    ("unidadeOrgao.ufSigla", "category"),
+    ("modalidadeNome", "category"),
+    (MONTH_COLUMN, "category"),
+)
+# Colunas finais de ITENS_COLUMNS que vêm do edital (mesmos tipos de EDITAIS_COLUMNS)
+_ITEM_EDITAL_COLUMNS = ("unidadeOrgao.ufSigla", "modalidadeNome", MONTH_COLUMN)
+
+DATASETS = {"editais": EDITAIS_COLUMNS, "itens": ITENS_COLUMNS}
+
+
+def is_available():
+    """
+    Indica se os snapshots Parquet podem ser gravados/lidos (pyarrow instalado).
+    """
+    return pa is not None
+
+
+def snapshot_path(directory, dataset):
+    # editais.parquet / itens.parquet
+    return os.path.join(directory, f"{dataset}.parquet")
+
+
+def _arrow_type(kind, storage=False):
+    # Tipo Arrow de cada tipo de coluna (storage=True: categorias como texto, antes da codificação)
+    if kind == "category":
+        return pa.string() if storage else pa.dictionary(pa.int32(), pa.string())
+    return {
+        "string": pa.string(),
+        "int": pa.int64(),
+        "bool": pa.bool_(),
+        "float": pa.float64(),
+        "decimal": pa.decimal128(DECIMAL_PRECISION, DECIMAL_SCALE),
+        "timestamp": pa.timestamp("ms"),
+    }[kind]
+
+
+def dataset_schema(dataset, metadata=None):
+    """
+    Esquema Arrow estável de "editais" ou "itens" (com metadados opcionais).
+    """
+    fields = [pa.field(name, _arrow_type(kind)) for name, kind in DATASETS[dataset]]
+    return pa.schema(fields, metadata=metadata)
+
+
+def parse_timestamp(value):
+    """
+    Converte datas do PNCP ("2024-05-10T08:00:00", "2024-05-10", com ou sem
+    fuso/"Z") em datetime sem fuso. Retorna None se não for uma data válida.
+    """
+    if not isinstance(value, str) or not value:
+        return None
+    text = value.strip()
+    if text.endswith("Z"):
+        text = text[:-1] + "+00:00"
+    try:
+        parsed = datetime.fromisoformat(text)
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def to_decimal(value):
+    """
+    Valor monetário como Decimal com 4 casas, ou None se ausente/inválido/fora
+    da precisão do esquema.
+    """
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        number = Decimal(str(value)).quantize(_DECIMAL_QUANTUM)
+    except (InvalidOperation, ValueError):
+        return None
+    if not number.is_finite() or abs(number) >= _DECIMAL_LIMIT:
+        return None
+    return number
+
+
+def _to_int(value):
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        number = int(value)
+    except (TypeError, ValueError, OverflowError):
+        return None
+    return number if -2**63 <= number < 2**63 else None
+
+
+def _to_float(value):
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if number == number else None  # descarta NaN
+
+
+def _to_text(value):
+    if value is None or isinstance(value, str):
+        return value
+    return str(value)
+
+
+_CONVERTERS = {
+    "string": _to_text,
+    "category": lambda value: _to_text(value) if value != "" else None,
+    "int": _to_int,
+    "bool": lambda value: value if isinstance(value, bool) else None,
+    "float": _to_float,
+    "decimal": to_decimal,
+    "timestamp": parse_timestamp,
+}
+
+
+def _getter(name):
+    # Leitura de um campo (aninhado com ".") de um registro
+    parts = name.split(".")
+    if len(parts) == 1:
+        return lambda record: record.get(name)
+
+    def get(record):
+        value = record
+        for part in parts:
+            if not isinstance(value, dict):
+                return None
+            value = value.get(part)
+        return value
+    return get
+
+
+def _row_builder(columns):
+    # Função registro -> lista de valores convertidos para os tipos das colunas
+    readers = [(_getter(name), _CONVERTERS[kind]) for name, kind in columns]
+    return lambda record: [convert(get(record)) for get, convert in readers]
+
+
+def publication_month(edital):
+    """
+    Mês de publicação ("AAAA-MM") do edital, a partir de dataPublicacaoPncp.
+    """
+    published = parse_timestamp(edital.get("dataPublicacaoPncp"))
+    return f"{published.year:04d}-{published.month:02d}" if published else None
+
+
+def _month_order(month):
+    # Meses em ordem cronológica; sem data de publicação por último
+    return (month is None, month or "")
+
+
+class _MonthPartitionedWriter:
+    # Agrupa as linhas por mês (buffers em memória + arquivos Arrow IPC temporários)
+    # e grava cada mês em row groups próprios, em ordem cronológica
+    def __init__(self, dataset, tmp_dir):
+        self.dataset = dataset
+        self.tmp_dir = tmp_dir
+        self.storage_schema = pa.schema(
+            [pa.field(name, _arrow_type(kind, storage=True)) for name, kind in DATASETS[dataset]]
+        )
+        self.rows = 0
+        self._buffers = {}
+        self._buffered = 0
+        self._spills = {}
+
+    def add(self, month, row):
+        buffer = self._buffers.get(month)
+        if buffer is None:
+            buffer = self._buffers[month] = [[] for _ in row]
+        for column, value in zip(buffer, row):
+            column.append(value)
+        self.rows += 1
+        self._buffered += 1
+        if self._buffered >= SPILL_ROWS:
+            self._spill()
+
+    def _batch(self, buffer):
+        arrays = [pa.array(values, type=field.type) for values, field in zip(buffer, self.storage_schema)]
+        return pa.record_batch(arrays, schema=self.storage_schema)
+
+    def _spill(self):
+        for month, buffer in self._buffers.items():
+            spill = self._spills.get(month)
+            if spill is None:
+                path = os.path.join(self.tmp_dir, f"{self.dataset}-{len(self._spills)}.arrow")
+                sink = pa.OSFile(path, "wb")
+                spill = self._spills[month] = (path, sink, pa.ipc.new_stream(sink, self.storage_schema))
+            spill[2].write_batch(self._batch(buffer))
+        self._buffers = {}
+        self._buffered = 0
+
+    def _month_table(self, month, schema):
+        batches = []
+        spill = self._spills.pop(month, None)
+        if spill is not None:
+            path, sink, stream = spill
+            stream.close()
+            sink.close()
+            batches.extend(pa.ipc.open_stream(pa.memory_map(path)).read_all().to_batches())
+        buffer = self._buffers.pop(month, None)
+        if buffer is not None:
+            batches.append(self._batch(buffer))
+        table = pa.Table.from_batches(batches, schema=self.storage_schema).combine_chunks()
+        arrays = [
+            column.dictionary_encode() if pa.types.is_dictionary(field.type) else column
+            for column, field in zip(table.columns, schema)
+        ]
+        return pa.Table.from_arrays(arrays, schema=schema)
+
+    def write(self, path, schema):
+        months = sorted(set(self._buffers) | set(self._spills), key=_month_order)
+        tmp_path = path + ".tmp"
+        try:
+            with pq.ParquetWriter(tmp_path, schema, compression=COMPRESSION) as writer:
+                for month in months:
+                    writer.write_table(self._month_table(month, schema), row_group_size=ROW_GROUP_MAX_ROWS)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+
+def write_snapshots(directory, editais, iter_itens, metadata=None):
+    """
+    Grava editais.parquet e itens.parquet em `directory`.
+
+    Args:
+        directory: Pasta de destino (os arquivos são substituídos atomicamente).
+        editais: Lista de editais.
+        iter_itens: Função que devolve um iterador dos itens (ex.: DataManager.iter_itens).
+        metadata: Pares texto -> texto gravados nos metadados dos dois arquivos
+                  (ex.: assinaturas do armazenamento).
+
+    Returns:
+        Dicionário com as linhas gravadas por dataset.
+    """
+    if pa is None:
+        raise RuntimeError("pyarrow não está instalado. Instale o extra 'parquet' (pip install .[parquet]).")
+    extra = dict(metadata or {})
+    edital_row = _row_builder(EDITAIS_COLUMNS)
+    item_row = _row_builder(ITENS_COLUMNS[:-len(_ITEM_EDITAL_COLUMNS)])
+    edital_position = {name: i for i, (name, _) in enumerate(EDITAIS_COLUMNS)}
+    counts = {}
+    with tempfile.TemporaryDirectory(prefix=".parquet-", dir=directory) as tmp_dir:
+        # Editais (a coluna do mês é derivada, não vem do registro)
+        writer = _MonthPartitionedWriter("editais", tmp_dir)
+        by_id, by_numero = {}, {}
+        for edital in editais:
+            month = publication_month(edital)
+            row = edital_row(edital)
+            row[-1] = month
+            writer.add(month, row)
+            # UF, modalidade e mês herdados pelos itens do edital
+            inherited = [row[edital_position[name]] for name in _ITEM_EDITAL_COLUMNS]
+            uid = index_key(edital.get("ID_C_PNCP"))
+            numero = index_key(edital.get("numeroControlePNCP"))
+            if uid:
+                by_id.setdefault(uid, inherited)
+            if numero:
+                by_numero.setdefault(numero, inherited)
+        writer.write(snapshot_path(directory, "editais"), dataset_schema("editais", _metadata("editais", extra)))
+        counts["editais"] = writer.rows
+
+        # Itens, no mês do respectivo edital (sem edital: grupo sem mês, ao final)
+        writer = _MonthPartitionedWriter("itens", tmp_dir)
+        orphan = [None] * len(_ITEM_EDITAL_COLUMNS)
+        for item in iter_itens():
+            inherited = by_id.get(index_key(item.get("edital_ID_C_PNCP")))
+            if inherited is None:
+                inherited = by_numero.get(index_key(item.get("edital_numeroControlePNCP")), orphan)
+            writer.add(inherited[-1], item_row(item) + inherited)
+        writer.write(snapshot_path(directory, "itens"), dataset_schema("itens", _metadata("itens", extra)))
+        counts["itens"] = writer.rows
+    return counts
+
+
+def _metadata(dataset, extra):
+    metadata = {"pncp.snapshot_version": SNAPSHOT_VERSION, "pncp.dataset": dataset}
+    metadata.update(extra)
+    return metadata
+
+
+def read_metadata(path):
+    """
+    Metadados (texto -> texto) gravados no snapshot.
+    """
+    metadata = pq.read_schema(path, memory_map=True).metadata or {}
+    return {
+        key.decode(): value.decode()
+        for key, value in metadata.items()
+        if key.startswith(b"pncp.")
+    }
+
+
+def read_snapshot(path, columns=None, months=None):
+    """
+    Lê um snapshot Parquet com memory-map.
+
+    Args:
+        path: editais.parquet ou itens.parquet.
+        columns: Colunas a ler (padrão: todas).
+        months: Meses de publicação ("AAAA-MM") a ler; só os row groups desses
+                meses são lidos (padrão: todos).
+
+    Returns:
+        pyarrow.Table com o esquema estável do dataset.
+    """
+    filters = [(MONTH_COLUMN, "in", list(months))] if months is not None else None
+    return pq.read_table(path, columns=columns, filters=filters, memory_map=True)
@@ -0,0 +1,117 @@
+"""
+Projeção de campos (?fields=) dos registros das rotas de listagem.
+
+Este módulo converte uma lista de caminhos pontuados (ex.: "orgaoEntidade.cnpj")
+em uma árvore de projeção e aplica essa árvore aos registros, mantendo apenas os
+campos pedidos (listas de objetos são projetadas elemento a elemento).
+
+Visões nomeadas (PROJECTION_VIEWS) cobrem as telas mais comuns. Quando os campos
+pedidos correspondem a uma visão, os registros projetados são calculados uma vez
+por geração do snapshot (DatasetSnapshot.index) e reaproveitados; projeções
+arbitrárias são aplicadas apenas aos registros da resposta.
+"""
+
+# Visões nomeadas: ?fields=lista equivale à lista de campos correspondente
+PROJECTION_VIEWS = {
+    # Tabela de editais do EditaisPage.jsx
+    "lista": (
+        "ID_C_PNCP", "numeroControlePNCP", "processo", "orgaoEntidade.cnpj",
+        "orgaoEntidade.razaoSocial", "cnpjOrgao", "objetoCompra", "objeto",
+        "valorTotalEstimado", "dataEncerramentoProposta",
+    ),
+    # Tabela de itens de um edital
+    "itens": (
+        "edital_ID_C_PNCP", "numeroItem", "descricao", "quantidade", "unidadeMedida",
+        "valorUnitarioEstimado", "valorTotal",
+    ),
+}
+
+# Máximo de caminhos aceitos em ?fields=
+MAX_FIELDS = 50
+
+
+class ProjectionError(ValueError):
+    """Parâmetro fields inválido (resposta 400)."""
+
+
+def parse_fields(raw):
+    """
+    Converte o parâmetro `fields` (nome de visão ou caminhos separados por vírgula)
+    em uma tupla ordenada de caminhos, ou None se vazio.
+    """
+    if not raw or not raw.strip():
+        return None
+    raw = raw.strip()
+    if raw in PROJECTION_VIEWS:
+        return tuple(sorted(PROJECTION_VIEWS[raw]))
+    paths = set()
+    for path in raw.split(","):
+        path = path.strip()
+        if not path:
+            continue
+        if any(not part for part in path.split(".")):
+            raise ProjectionError(f"Campo inválido em 'fields': '{path}'")
+        paths.add(path)
+    if len(paths) > MAX_FIELDS:
+        raise ProjectionError(f"'fields' aceita no máximo {MAX_FIELDS} campos")
+    return tuple(sorted(paths)) or None
+
+
+def view_name(paths):
+    """
+    Nome da visão com exatamente esses caminhos (ou None).
+    """
+    for name, view_paths in PROJECTION_VIEWS.items():
+        if paths == tuple(sorted(view_paths)):
+            return name
+    return None
+
+
+def compile_projection(paths):
+    """
+    Árvore de projeção: {"orgaoEntidade": {"cnpj": None}, "objetoCompra": None}.
+    Um campo pedido inteiro prevalece sobre subcampos dele.
+    """
+    tree = {}
+    for path in paths:
+        node = tree
+        parts = path.split(".")
+        for part in parts[:-1]:
+            child = node.get(part, {})
+            if child is None:
+                break
+            node = node.setdefault(part, child)
+        else:
+            node[parts[-1]] = None
+    return tree
+
+
+def project(value, tree):
+    """
+    Aplica a árvore de projeção a um registro (dicionários e listas de dicionários).
+    """
+    if isinstance(value, list):
+        return [project(element, tree) for element in value]
+    if not isinstance(value, dict):
+        return value
+    projected = {}
+    for key, subtree in tree.items():
+        if key in value:
+            projected[key] = value[key] if subtree is None else project(value[key], subtree)
+    return projected
+
+
+def project_records(records, paths):
+    tree = compile_projection(paths)
+    return [project(record, tree) for record in records]
+
+
+def projected_snapshot(snapshot, paths):
+    """
+    Registros do snapshot projetados na visão `paths`, calculados uma vez por geração.
+    Só deve ser usado com visões nomeadas (memória limitada ao número de visões).
+    """
+    name = view_name(paths)
+    if name is None:
+        raise ValueError("projected_snapshot só aceita visões nomeadas")
+    return snapshot.index(f"projection:{name}", lambda records: project_records(records, paths))
@@ -0,0 +1,311 @@
+"""
+Índice invertido de busca textual sobre editais e itens (/api/search).
+
+Este módulo implementa a classe SearchIndex, um índice invertido em memória
+(puro Python) sobre o objeto do edital (objetoCompra), o nome do órgão/unidade e
+a descrição dos itens. Cada edital é um documento; os campos têm pesos diferentes
+e os resultados são ordenados por BM25.
+
+A tokenização é adequada ao português: remove acentos (licitação == licitacao),
+ignora stopwords e reduz plurais comuns (licitações -> licitacao, itens -> item),
+aplicando as mesmas regras a documentos e consultas. O último termo da consulta
+também casa por prefixo, permitindo busca enquanto o usuário digita.
+
+O índice é construído na primeira busca a partir dos snapshots de editais e
+itens e, depois disso, atualizado de forma incremental pelo DataManager a cada
+save_editais/append_itens (apenas os documentos afetados). Se os snapshots
+mudarem por outro caminho (outro processo, sobrescrita completa), as gerações
+deixam de bater e o índice é reconstruído na busca seguinte.
+"""
+
+import math
+import re
+import threading
+import unicodedata
+from bisect import bisect_left
+from collections import Counter
+
+from backend.storage.indexes import index_key
+
+# Pesos por campo (BM25F simplificado: frequências ponderadas por campo)
+FIELD_WEIGHTS = {
+    "objeto": 3.0,
+    "orgao": 2.0,
+    "itens": 1.0,
+}
+
+# Parâmetros BM25
+_K1 = 1.2
+_B = 0.75
+
+# Máximo de termos do vocabulário expandidos pelo prefixo do último termo
+_MAX_PREFIX_EXPANSIONS = 50
+_MIN_PREFIX_LENGTH = 3
+
+STOPWORDS = frozenset("""
+a ao aos as ate com como da das de do dos e em entre na nas no nos o os ou para
+pela pelas pelo pelos por que se sem sob sobre sua suas seu seus um uma umas uns
+""".split())
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize_text(text):
+    """
+    Minúsculas e sem acentos (NFKD sem marcas combinantes).
+    """
+    decomposed = unicodedata.normalize("NFKD", str(text))
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).lower()
+
+
+def stem(token):
+    """
+    Redução leve de plurais do português (regras aplicadas igualmente a documentos e consultas).
+    """
+    if len(token) <= 3 or token.isdigit():
+        return token
+    if token.endswith(("oes", "aes")):
+        return token[:-3] + "ao"
+    if token.endswith("ais"):
+        return token[:-3] + "al"
+    if token.endswith("eis"):
+        return token[:-3] + "el"
+    if token.endswith("ns"):
+        return token[:-2] + "m"
+    if token.endswith(("res", "zes")):
+        return token[:-2]
+    if token.endswith("s") and not token.endswith(("us", "is", "ss")):
+        return token[:-1]
+    return token
+
+
+def tokenize(text):
+    """
+    Tokens normalizados de `text`: sem acentos, sem stopwords e com plurais reduzidos.
+    """
+    if not text:
+        return []
+    return [
+        stem(token)
+        for token in _TOKEN_RE.findall(normalize_text(text))
+        if token not in STOPWORDS and (len(token) > 1 or token.isdigit())
+    ]
+
+
+def _nested(record, parent, field):
+    value = record.get(parent)
+    return value.get(field) if isinstance(value, dict) else None
+
+
+def edital_terms(edital):
+    """
+    Frequências ponderadas dos termos dos campos textuais do edital.
+    """
+    terms = Counter()
+    for token in tokenize(edital.get("objetoCompra") or edital.get("objeto")):
+        terms[token] += FIELD_WEIGHTS["objeto"]
+    orgao = " ".join(
+        filter(None, (_nested(edital, "orgaoEntidade", "razaoSocial"), _nested(edital, "unidadeOrgao", "nomeUnidade")))
+    )
+    for token in tokenize(orgao):
+        terms[token] += FIELD_WEIGHTS["orgao"]
+    return terms
+
+
+def item_terms(item):
+    terms = Counter()
+    for token in tokenize(item.get("descricao")):
+        terms[token] += FIELD_WEIGHTS["itens"]
+    return terms
+
+
+class SearchIndex:
+    """
+    Índice invertido de editais (documento = ID_C_PNCP) com ranking BM25.
+
+    Attributes:
+        generations: (geração do snapshot de editais, geração do snapshot de itens)
+                     a que o índice corresponde, ou None se ainda não foi construído.
+    """
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.generations = None
+        self._clear()
+
+    def _clear(self):
+        self._postings = {}
+        self._doc_length = {}
+        self._total_length = 0.0
+        self._edital_terms = {}
+        self._doc_by_numero = {}
+        self._vocabulary = None
+
+    # ------------------------------------------------------------------
+    # Manutenção
+    # ------------------------------------------------------------------
+
+    def _apply(self, doc, terms, sign):
+        # Soma (sign=1) ou remove (sign=-1) as frequências `terms` do documento `doc`
+        if not terms:
+            return
+        for term, weight in terms.items():
+            docs = self._postings.get(term)
+            if docs is None:
+                docs = self._postings[term] = {}
+                self._vocabulary = None
+            value = docs.get(doc, 0.0) + sign * weight
+            if value > 1e-9:
+                docs[doc] = value
+            else:
+                docs.pop(doc, None)
+                if not docs:
+                    del self._postings[term]
+                    self._vocabulary = None
+        delta = sign * sum(terms.values())
+        length = self._doc_length.get(doc, 0.0) + delta
+        if length > 1e-9:
+            self._doc_length[doc] = length
+        else:
+            self._doc_length.pop(doc, None)
+        self._total_length += delta
+
+    def _upsert_edital(self, edital):
+        doc = index_key(edital.get("ID_C_PNCP"))
+        if doc is None:
+            return
+        numero = index_key(edital.get("numeroControlePNCP"))
+        if numero is not None:
+            self._doc_by_numero[numero] = doc
+        terms = edital_terms(edital)
+        self._apply(doc, self._edital_terms.get(doc), -1)
+        self._apply(doc, terms, 1)
+        self._edital_terms[doc] = terms
+
+    def _add_item(self, item):
+        # Itens só são acrescentados: substituições invalidam o snapshot e forçam reconstrução
+        doc = index_key(item.get("edital_ID_C_PNCP"))
+        if doc is None:
+            doc = self._doc_by_numero.get(index_key(item.get("edital_numeroControlePNCP")))
+        if doc is not None:
+            self._apply(doc, item_terms(item), 1)
+
+    def build(self, editais_snapshot, itens_snapshot):
+        """
+        Reconstrói o índice completo a partir dos snapshots de editais e itens.
+        """
+        with self._lock:
+            self._clear()
+            for edital in editais_snapshot.records:
+                self._upsert_edital(edital)
+            for item in itens_snapshot.records:
+                self._add_item(item)
+            self.generations = (editais_snapshot.generation, itens_snapshot.generation)
+
+    def ensure(self, editais_snapshot, itens_snapshot):
+        """
+        Garante que o índice corresponde aos snapshots atuais (reconstrói se não).
+        """
+        generations = (editais_snapshot.generation, itens_snapshot.generation)
+        if self.generations != generations:
+            with self._lock:
+                if self.generations != generations:
+                    self.build(editais_snapshot, itens_snapshot)
+
+    def apply_editais(self, old_generation, new_generation, editais):
+        """
+        Atualiza incrementalmente os editais recebidos, se o índice estava em dia com
+        o snapshot anterior à escrita. Retorna False se o índice não foi atualizado.
+        """
+        with self._lock:
+            if self.generations is None or self.generations[0] != old_generation:
+                return False
+            for edital in editais:
+                self._upsert_edital(edital)
+            self.generations = (new_generation, self.generations[1])
+            return True
+
+    def apply_itens(self, old_generation, new_generation, itens):
+        """
+        Acrescenta incrementalmente itens de editais que ainda não tinham itens.
+        """
+        with self._lock:
+            if self.generations is None or self.generations[1] != old_generation:
+                return False
+            for item in itens:
+                self._add_item(item)
+            self.generations = (self.generations[0], new_generation)
+            return True
+
+    def invalidate(self):
+        with self._lock:
+            self.generations = None
+            self._clear()
+
+    # ------------------------------------------------------------------
+    # Busca
+    # ------------------------------------------------------------------
+
+    def _expand_prefix(self, prefix):
+        # Termos do vocabulário que começam com `prefix` (vocabulário ordenado sob demanda)
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        start = bisect_left(self._vocabulary, prefix)
+        matches = []
+        for term in self._vocabulary[start:start + _MAX_PREFIX_EXPANSIONS]:
+            if not term.startswith(prefix):
+                break
+            matches.append(term)
+        return matches
+
+    def search(self, query):
+        """
+        Retorna [(ID_C_PNCP, score)] dos editais que contêm todos os termos da
+        consulta, do mais relevante para o menos relevante.
+        """
+        raw = [t for t in _TOKEN_RE.findall(normalize_text(query)) if t not in STOPWORDS]
+        terms = [stem(t) for t in raw]
+        if not terms:
+            return []
+        with self._lock:
+            n_docs = len(self._doc_length)
+            if not n_docs:
+                return []
+            avg_length = self._total_length / n_docs
+            scores = None
+            for pos, term in enumerate(terms):
+                alternatives = [term]
+                if pos == len(terms) - 1 and len(raw[pos]) >= _MIN_PREFIX_LENGTH:
+                    alternatives = list(dict.fromkeys([term] + self._expand_prefix(raw[pos])))
+                term_scores = {}
+                for alternative in alternatives:
+                    docs = self._postings.get(alternative)
+                    if not docs:
+                        continue
+                    idf = math.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+                    for doc, tf in docs.items():
+                        norm = _K1 * (1 - _B + _B * self._doc_length[doc] / avg_length)
+                        score = idf * tf * (_K1 + 1) / (tf + norm)
+                        if score > term_scores.get(doc, 0.0):
+                            term_scores[doc] = score
+                if scores is None:
+                    scores = term_scores
+                else:
+                    scores = {doc: score + term_scores[doc] for doc, score in scores.items() if doc in term_scores}
+                if not scores:
+                    return []
+        return sorted(scores.items(), key=lambda entry: (-entry[1], entry[0]))
+
+
+_search_indexes = {}
+_search_indexes_guard = threading.Lock()
+
+
+def get_search_index(key):
+    """
+    Retorna o índice de busca do processo para o dataset `key` (criado vazio sob demanda).
+    """
+    with _search_indexes_guard:
+        index = _search_indexes.get(key)
+        if index is None:
+            index = _search_indexes[key] = SearchIndex()
+        return index
@@ -0,0 +1,139 @@
+"""
+Cache em memória (por processo) dos datasets de editais e itens.
+
+Este módulo implementa a classe SnapshotCache, compartilhada por todas as instâncias
+de DataManager do processo. Cada dataset é mantido como um DatasetSnapshot imutável
+com os registros já parseados e índices derivados (construídos sob demanda).
+
+O snapshot só é recarregado quando a assinatura do armazenamento muda
+(mtime/tamanho dos arquivos JSON ou geração do SQLite), ou quando o próprio
+DataManager invalida a entrada após uma escrita. Assim, rotas de leitura não
+precisam reler e parsear os arquivos a cada requisição.
+"""
+
+import itertools
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class DatasetSnapshot:
+    """
+    Visão somente leitura de um dataset carregado em memória.
+
+    Attributes:
+        records: Lista de registros (não deve ser alterada pelos chamadores).
+        signature: Assinatura do armazenamento no momento da carga.
+        generation: Contador monotônico do processo, incrementado a cada nova carga.
+    """
+    def __init__(self, records, signature, generation):
+        self.records = records
+        self.signature = signature
+        self.generation = generation
+        self._indexes = {}
+        self._lock = threading.Lock()
+
+    def index(self, name, builder):
+        """
+        Retorna o índice derivado `name`, construindo-o uma única vez com builder(records).
+        """
+        try:
+            return self._indexes[name]
+        except KeyError:
+            pass
+        with self._lock:
+            if name not in self._indexes:
+                self._indexes[name] = builder(self.records)
+            return self._indexes[name]
+
+    def peek_index(self, name):
+        """
+        Retorna o índice `name` se já foi construído (sem construí-lo), ou None.
+        """
+        return self._indexes.get(name)
+
+
+class SnapshotCache:
+    """
+    Cache thread-safe de snapshots, indexado por uma chave de dataset (ex.: caminho do arquivo).
+    """
+    def __init__(self):
+        self._snapshots = {}
+        self._key_locks = {}
+        self._guard = threading.Lock()
+        self._generations = itertools.count(1)
+
+    def _lock_for(self, key):
+        with self._guard:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def get(self, key, signature_fn, loader):
+        """
+        Retorna o snapshot de `key`, recarregando com loader() apenas se
+        signature_fn() divergir da assinatura do snapshot em cache.
+        Apenas uma thread recarrega por vez; as demais aguardam o resultado.
+        """
+        signature = signature_fn()
+        snapshot = self._snapshots.get(key)
+        if snapshot is not None and snapshot.signature == signature:
+            return snapshot
+
+        with self._lock_for(key):
+            snapshot = self._snapshots.get(key)
+            signature = signature_fn()
+            if snapshot is not None and snapshot.signature == signature:
+                return snapshot
+            records = loader()
+            snapshot = DatasetSnapshot(records, signature, next(self._generations))
+            self._snapshots[key] = snapshot
+            logger.debug(f"Snapshot reloaded for {key} (generation {snapshot.generation}, {len(records)} records)")
+            return snapshot
+
+    def peek(self, key):
+        """
+        Retorna o snapshot em cache de `key` sem validar a assinatura (ou None).
+        """
+        return self._snapshots.get(key)
+
+    def put(self, key, records, signature, indexes=None):
+        """
+        Instala um snapshot já conhecido (ex.: dados recém-salvos pelo próprio processo),
+        opcionalmente com índices pré-calculados, evitando reler o armazenamento.
+        """
+        with self._lock_for(key):
+            snapshot = DatasetSnapshot(records, signature, next(self._generations))
+            if indexes:
+                snapshot._indexes.update(indexes)
+            self._snapshots[key] = snapshot
+            return snapshot
+
+    def refresh_signature(self, key, old_signature, new_signature):
+        """
+        Atualiza a assinatura de um snapshot cujo conteúdo não mudou (ex.: após
+        compactação), mantendo registros, índices e geração.
+        """
+        with self._lock_for(key):
+            snapshot = self._snapshots.get(key)
+            if snapshot is not None and snapshot.signature == old_signature:
+                snapshot.signature = new_signature
+
+    def invalidate(self, key=None):
+        """
+        Descarta o snapshot de `key` (ou de todos os datasets, se key for None).
+        """
+        with self._guard:
+            if key is None:
+                self._snapshots.clear()
+            else:
+                self._snapshots.pop(key, None)
+
+
+_snapshot_cache = SnapshotCache()
+
+
+def get_snapshot_cache():
+    """
+    Retorna o cache de snapshots compartilhado pelo processo.
+    """
+    return _snapshot_cache
@@ -0,0 +1,338 @@
+"""
+Engine de armazenamento SQLite para editais, itens e contratos.
+
+Este módulo implementa a classe SQLiteStore, usada pelo DataManager quando
+PNCP_STORAGE_BACKEND=sqlite. Os registros continuam sendo dicionários JSON
+(coluna `data`), mas os campos de vínculo ficam em colunas indexadas:
+
+- editais: ID_C_PNCP (chave primária), numeroControlePNCP, dataEncerramentoProposta
+- itens: edital_ID_C_PNCP, edital_numeroControlePNCP
+
+Assim, buscas por identificador, merges incrementais (upsert) e a remoção de
+editais expirados deixam de reescrever o arquivo inteiro.
+
+Inclui também migrate_json_to_sqlite, que importa os arquivos JSON existentes.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import logging
+
+from backend.storage.expiration import cutoff_key, encerramento_key
+from backend.storage.item_segments import ItemSegmentStore, item_key
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS editais (
+    ID_C_PNCP TEXT PRIMARY KEY,
+    numeroControlePNCP TEXT,
+    dataEncerramentoProposta TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_editais_numero ON editais (numeroControlePNCP);
+CREATE INDEX IF NOT EXISTS idx_editais_encerramento ON editais (dataEncerramentoProposta);
+
+CREATE TABLE IF NOT EXISTS itens (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    edital_ID_C_PNCP TEXT,
+    edital_numeroControlePNCP TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_itens_edital_id ON itens (edital_ID_C_PNCP);
+CREATE INDEX IF NOT EXISTS idx_itens_edital_numero ON itens (edital_numeroControlePNCP);
+
+CREATE TABLE IF NOT EXISTS contratos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    data TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def _as_text(value):
+    # Colunas de vínculo são sempre comparadas como texto
+    return str(value) if value not in (None, "") else None
+
+
+class SQLiteStore:
+    """
+    Armazenamento de editais, itens e contratos em um banco SQLite local.
+    Expõe as mesmas operações de leitura/escrita do DataManager, além de buscas indexadas.
+    """
+    def __init__(self, db_path):
+        self.db_path = db_path
+        # Uma conexão por thread (Flask, scheduler e workers usam threads distintas)
+        self._local = threading.local()
+        # Serializa escritas para evitar SQLITE_BUSY entre threads do mesmo processo
+        self._write_lock = threading.Lock()
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._connect().executescript(_SCHEMA)
+
+    def _connect(self):
+        """
+        Retorna a conexão da thread atual, criando-a se necessário.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _set_meta(self, conn, key, value):
+        conn.execute(
+            "INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, str(value)),
+        )
+
+    def _bump_generation(self, conn, dataset):
+        # Contador de escritas por dataset (usado para invalidar snapshots em memória)
+        conn.execute(
+            "INSERT INTO meta (key, value) VALUES (?, '1') "
+            "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1",
+            (f"{dataset}_generation",),
+        )
+
+    def get_generation(self, dataset):
+        """
+        Retorna o contador de escritas de `dataset` ("editais", "itens" ou "contratos").
+        """
+        value = self._get_meta(f"{dataset}_generation")
+        return int(value) if value else 0
+
+    def _get_meta(self, key):
+        row = self._connect().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    @staticmethod
+    def _edital_row(edital):
+        return (
+            edital["ID_C_PNCP"],
+            _as_text(edital.get("numeroControlePNCP")),
+            encerramento_key(edital.get("dataEncerramentoProposta")),
+            json.dumps(edital, ensure_ascii=False),
+        )
+
+    @staticmethod
+    def _item_row(item):
+        return (
+            _as_text(item.get("edital_ID_C_PNCP")),
+            _as_text(item.get("edital_numeroControlePNCP")),
+            json.dumps(item, ensure_ascii=False),
+        )
+
+    # ------------------------------------------------------------------
+    # Editais
+    # ------------------------------------------------------------------
+
+    def save_editais(self, editais):
+        """
+        Mescla editais por ID_C_PNCP (upsert), preservando a ordem de inserção original.
+        Editais sem ID_C_PNCP são ignorados, como no armazenamento JSON.
+        Retorna (quantidade existente antes, quantidade total após o merge).
+        """
+        rows = [self._edital_row(e) for e in editais if e.get("ID_C_PNCP")]
+        with self._write_lock:
+            conn = self._connect()
+            existing = conn.execute("SELECT COUNT(*) FROM editais").fetchone()[0]
+            with conn:
+                conn.executemany(
+                    "INSERT INTO editais (ID_C_PNCP, numeroControlePNCP, dataEncerramentoProposta, data) "
+                    "VALUES (?, ?, ?, ?) ON CONFLICT(ID_C_PNCP) DO UPDATE SET "
+                    "numeroControlePNCP = excluded.numeroControlePNCP, "
+                    "dataEncerramentoProposta = excluded.dataEncerramentoProposta, "
+                    "data = excluded.data",
+                    rows,
+                )
+                if rows:
+                    self._set_meta(conn, "editais_updated_at", time.time())
+                    self._bump_generation(conn, "editais")
+            total = conn.execute("SELECT COUNT(*) FROM editais").fetchone()[0]
+        return existing, total
+
+    def load_editais(self):
+        """
+        Retorna todos os editais na ordem de inserção.
+        """
+        cur = self._connect().execute("SELECT data FROM editais ORDER BY rowid")
+        return [json.loads(row[0]) for row in cur]
+
+    def count_editais(self):
+        return self._connect().execute("SELECT COUNT(*) FROM editais").fetchone()[0]
+
+    def get_edital_by_id(self, id_c_pncp):
+        row = self._connect().execute(
+            "SELECT data FROM editais WHERE ID_C_PNCP = ?", (str(id_c_pncp),)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_edital_by_numero(self, numero_controle):
+        row = self._connect().execute(
+            "SELECT data FROM editais WHERE numeroControlePNCP = ? ORDER BY rowid LIMIT 1",
+            (str(numero_controle),),
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def delete_expired_editais(self, now):
+        """
+        Remove editais expirados e os itens sem edital restante, pela regra de
+        backend.storage.expiration (a mesma do armazenamento JSON).
+        Retorna (editais removidos, itens removidos).
+        """
+        with self._write_lock:
+            conn = self._connect()
+            with conn:
+                editais_removidos = conn.execute(
+                    "DELETE FROM editais WHERE dataEncerramentoProposta < ?", (cutoff_key(now),)
+                ).rowcount
+                if not editais_removidos:
+                    return 0, 0
+                itens_removidos = conn.execute(
+                    "DELETE FROM itens WHERE "
+                    "NOT EXISTS (SELECT 1 FROM editais e WHERE e.ID_C_PNCP = itens.edital_ID_C_PNCP) "
+                    "AND NOT EXISTS (SELECT 1 FROM editais e WHERE e.numeroControlePNCP = itens.edital_numeroControlePNCP)"
+                ).rowcount
+                self._set_meta(conn, "editais_updated_at", time.time())
+                self._bump_generation(conn, "editais")
+                if itens_removidos:
+                    self._bump_generation(conn, "itens")
+        return editais_removidos, itens_removidos
+
+    def get_last_update(self):
+        value = self._get_meta("editais_updated_at")
+        return float(value) if value else None
+
+    # ------------------------------------------------------------------
+    # Itens
+    # ------------------------------------------------------------------
+
+    def save_itens(self, itens, append=False):
+        """
+        Salva itens. Com append=False a tabela é substituída pela lista fornecida;
+        com append=True cada item substitui o registro anterior com a mesma chave
+        (edital_ID_C_PNCP, numeroItem), que passa para o fim da ordem — a mesma regra
+        dos segmentos do armazenamento JSON (checkpoints repetidos e editais
+        rebuscados não duplicam itens). Lista vazia não altera a tabela.
+        Retorna a quantidade total de itens após a operação.
+        """
+        rows = [self._item_row(i) for i in itens]
+        with self._write_lock:
+            conn = self._connect()
+            if not rows:
+                return conn.execute("SELECT COUNT(*) FROM itens").fetchone()[0]
+            with conn:
+                if not append:
+                    conn.execute("DELETE FROM itens")
+                    conn.executemany(
+                        "INSERT INTO itens (edital_ID_C_PNCP, edital_numeroControlePNCP, data) VALUES (?, ?, ?)",
+                        rows,
+                    )
+                else:
+                    for item, row in zip(itens, rows):
+                        key = item_key(item)
+                        if key is not None:
+                            # Índice por edital_ID_C_PNCP restringe a busca aos itens do edital
+                            conn.execute(
+                                "DELETE FROM itens WHERE edital_ID_C_PNCP = ? "
+                                "AND CAST(json_extract(data, '$.numeroItem') AS TEXT) = ?",
+                                key,
+                            )
+                        conn.execute(
+                            "INSERT INTO itens (edital_ID_C_PNCP, edital_numeroControlePNCP, data) VALUES (?, ?, ?)",
+                            row,
+                        )
+                self._bump_generation(conn, "itens")
+            return conn.execute("SELECT COUNT(*) FROM itens").fetchone()[0]
+
+    def load_itens(self):
+        cur = self._connect().execute("SELECT data FROM itens ORDER BY id")
+        return [json.loads(row[0]) for row in cur]
+
+    def iter_itens(self):
+        # Cursor em streaming (não materializa a tabela inteira)
+        for row in self._connect().execute("SELECT data FROM itens ORDER BY id"):
+            yield json.loads(row[0])
+
+    def get_itens_by_edital_id(self, id_c_pncp):
+        cur = self._connect().execute(
+            "SELECT data FROM itens WHERE edital_ID_C_PNCP = ? ORDER BY id", (str(id_c_pncp),)
+        )
+        return [json.loads(row[0]) for row in cur]
+
+    def get_itens_by_edital_numero(self, numero_controle):
+        cur = self._connect().execute(
+            "SELECT data FROM itens WHERE edital_numeroControlePNCP = ? ORDER BY id", (str(numero_controle),)
+        )
+        return [json.loads(row[0]) for row in cur]
+
+    # ------------------------------------------------------------------
+    # Contratos
+    # ------------------------------------------------------------------
+
+    def save_contratos(self, contratos):
+        with self._write_lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM contratos")
+                conn.executemany(
+                    "INSERT INTO contratos (data) VALUES (?)",
+                    [(json.dumps(c, ensure_ascii=False),) for c in contratos],
+                )
+                self._bump_generation(conn, "contratos")
+
+    def load_contratos(self):
+        cur = self._connect().execute("SELECT data FROM contratos ORDER BY id")
+        return [json.loads(row[0]) for row in cur]
+
+
+def migrate_json_to_sqlite(data_dir, db_path=None):
+    """
+    Importa editais.json, itens.json e contratos.json de `data_dir` para o banco SQLite.
+    Os itens incluem os segmentos ainda não compactados (itens.segments), como
+    o DataManager os enxerga. As tabelas de destino são substituídas (mesmo que o
+    arquivo JSON correspondente esteja vazio ou ausente); os arquivos JSON não são
+    alterados.
+    Retorna um dicionário com as contagens importadas.
+    """
+    db_path = db_path or os.path.join(data_dir, "pncp.db")
+
+    def _read(name):
+        path = os.path.join(data_dir, name)
+        if not os.path.exists(path):
+            return []
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    store = SQLiteStore(db_path)
+    editais = _read("editais.json")
+    segments = ItemSegmentStore(os.path.join(data_dir, "itens.json"), os.path.join(data_dir, "itens.segments"))
+    with segments.lock:
+        itens = list(segments.iter_records())
+    contratos = _read("contratos.json")
+
+    with store._write_lock:
+        conn = store._connect()
+        with conn:
+            # Limpeza explícita: save_editais faz merge e save_itens ignora listas vazias
+            conn.execute("DELETE FROM editais")
+            conn.execute("DELETE FROM itens")
+            store._bump_generation(conn, "editais")
+            store._bump_generation(conn, "itens")
+    _, total_editais = store.save_editais(editais)
+    total_itens = store.save_itens(itens)
+    store.save_contratos(contratos)
+
+    sem_id = len(editais) - sum(1 for e in editais if e.get("ID_C_PNCP"))
+    if sem_id:
+        logger.warning(f"{sem_id} editais sem ID_C_PNCP não foram migrados")
+    logger.info(f"Migração concluída: {total_editais} editais, {total_itens} itens, {len(contratos)} contratos -> {db_path}")
+    return {"editais": total_editais, "itens": total_itens, "contratos": len(contratos)}
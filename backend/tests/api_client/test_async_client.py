@@ -0,0 +1,190 @@
+"""
+Testes unitários do cliente assíncrono do PNCP.
+
+Este módulo verifica o limite de concorrência, o retry em rate limit (429),
+a paginação paralela de itens, o cancelamento via is_cancelled() e o cache HTTP
+consultado fora do event loop (inclusive 304 sem cópia em cache), usando uma
+sessão HTTP falsa (sem rede).
+"""
+
+import asyncio
+import json
+import threading
+
+import pytest
+
+from backend.api_client import async_client
+from backend.api_client.async_client import AsyncPNCPClient
+from backend.api_client.rate_limiter import AdaptiveRateLimiter
+from backend.config import request_cancel, reset_cancel
+
+
+def _unlimited():
+    return AdaptiveRateLimiter(initial_rate=1000, min_rate=1000, max_rate=1000)
+
+
+class FakeResponse:
+    def __init__(self, status, body=None, headers=None):
+        self.status = status
+        self.headers = headers or {}
+        self._body = body
+
+    async def read(self):
+        return b"" if self._body is None else json.dumps(self._body).encode("utf-8")
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeSession:
+    # Responde via handler(url, params) e registra a concorrência máxima observada
+    def __init__(self, handler, delay=0.01):
+        self.handler = handler
+        self.delay = delay
+        self.calls = []
+        self.headers = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def get(self, url, params=None, headers=None):
+        session = self
+
+        class _Ctx:
+            async def __aenter__(self):
+                session.calls.append((url, params))
+                session.headers.append(headers or {})
+                session.in_flight += 1
+                session.max_in_flight = max(session.max_in_flight, session.in_flight)
+                await asyncio.sleep(session.delay)
+                session.in_flight -= 1
+                return session.handler(url, params)
+
+            async def __aexit__(self, *exc):
+                return False
+
+        return _Ctx()
+
+
+def _itens_handler(total_itens, size=2):
+    def handler(url, params):
+        if url.endswith("/quantidade"):
+            return FakeResponse(200, total_itens)
+        page = params["pagina"]
+        start = (page - 1) * size
+        return FakeResponse(200, [{"numeroItem": n} for n in range(start + 1, min(start + size, total_itens) + 1)])
+    return handler
+
+
+def test_itens_pages_fetched_concurrently_within_limit():
+    # Páginas previstas pela quantidade são buscadas em paralelo, respeitando o semáforo
+    session = FakeSession(_itens_handler(9))
+    client = AsyncPNCPClient(concurrency=3, session=session, rate_limiter=_unlimited(), http_cache=False)
+
+    async def run():
+        count = await client.get_itens_edital_count("1", 2026, 1)
+        return await client.get_itens_edital("1", 2026, 1, item_count=count, size=2)
+
+    itens = asyncio.run(run())
+    assert [i["numeroItem"] for i in itens] == list(range(1, 10))
+    assert session.max_in_flight == 3
+    assert len(session.calls) == 1 + 5
+
+
+def test_rate_limit_retries_with_retry_after(monkeypatch):
+    # 429 com Retry-After é repetido; 404 em itens equivale a lista vazia
+    responses = [FakeResponse(429, headers={"Retry-After": "0"}), FakeResponse(200, [{"numeroItem": 1}])]
+    session = FakeSession(lambda url, params: responses.pop(0) if responses else FakeResponse(404))
+    client = AsyncPNCPClient(concurrency=2, session=session, rate_limiter=_unlimited(), http_cache=False)
+
+    async def run():
+        first = await client.get_itens_edital_paginated("1", 2026, 1, page=1)
+        missing = await client.get_itens_edital_paginated("1", 2026, 1, page=2)
+        return first, missing
+
+    first, missing = asyncio.run(run())
+    assert first == [{"numeroItem": 1}]
+    assert missing == []
+    assert len(session.calls) == 3
+
+
+def test_cancellation_stops_pending_requests():
+    # Com o cancelamento global sinalizado, watch_cancellation cancela as tasks pendentes
+    session = FakeSession(_itens_handler(1), delay=0.05)
+    client = AsyncPNCPClient(concurrency=1, session=session, rate_limiter=_unlimited(), http_cache=False)
+
+    async def run():
+        tasks = [asyncio.ensure_future(client.get_itens_edital_paginated("1", 2026, n)) for n in range(1, 50)]
+        watcher = asyncio.ensure_future(async_client.watch_cancellation(tasks, interval=0.01))
+        await asyncio.sleep(0.02)
+        request_cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await watcher
+        return tasks
+
+    try:
+        tasks = asyncio.run(run())
+    finally:
+        reset_cancel()
+    assert any(task.cancelled() for task in tasks)
+    assert len(session.calls) < 49
+
+
+def test_cancelled_request_raises():
+    # Requisições não começam após o cancelamento
+    client = AsyncPNCPClient(concurrency=1, session=FakeSession(_itens_handler(1)), rate_limiter=_unlimited(), http_cache=False)
+    request_cancel()
+    try:
+        with pytest.raises(asyncio.CancelledError):
+            asyncio.run(client.get_itens_edital_count("1", 2026, 1))
+    finally:
+        reset_cancel()
+
+
+def test_not_modified_reuses_cached_body(tmp_path):
+    # 304 reaproveita o corpo guardado pelo cache HTTP compartilhado com o PNCPClient
+    from backend.api_client.http_cache import HTTPCache
+
+    cache = HTTPCache(str(tmp_path / "cache.db"), max_bytes=1024 * 1024)
+    responses = [FakeResponse(200, [{"numeroItem": 1}], {"ETag": '"v1"'}), FakeResponse(304)]
+    session = FakeSession(lambda url, params: responses.pop(0))
+    client = AsyncPNCPClient(concurrency=1, session=session, rate_limiter=_unlimited(), http_cache=cache)
+
+    async def run():
+        return [await client.get_itens_edital_paginated("1", 2026, 1) for _ in range(2)]
+
+    assert asyncio.run(run()) == [[{"numeroItem": 1}], [{"numeroItem": 1}]]
+    assert session.headers[1] == {"If-None-Match": '"v1"'}
+    assert cache.stats()["hits"] == 1
+
+
+def test_cache_runs_off_loop_and_unexpected_304_is_retried(tmp_path):
+    # Cache síncrono roda em outra thread; 304 sem cópia em cache repete sem cabeçalhos condicionais
+    from backend.api_client.http_cache import HTTPCache
+
+    class RecordingCache(HTTPCache):
+        threads = []
+
+        def lookup(self, key):
+            self.threads.append(threading.get_ident())
+            return super().lookup(key)
+
+        def miss(self, key, body, etag=None, last_modified=None):
+            self.threads.append(threading.get_ident())
+            return super().miss(key, body, etag, last_modified)
+
+    cache = RecordingCache(str(tmp_path / "cache.db"), max_bytes=1024 * 1024)
+    responses = [FakeResponse(304), FakeResponse(200, [{"numeroItem": 1}], {"ETag": '"v1"'})]
+    session = FakeSession(lambda url, params: responses.pop(0))
+    client = AsyncPNCPClient(concurrency=1, session=session, rate_limiter=_unlimited(), http_cache=cache)
+
+    async def run():
+        return threading.get_ident(), await client.get_itens_edital_paginated("1", 2026, 1)
+
+    loop_thread, itens = asyncio.run(run())
+    assert itens == [{"numeroItem": 1}]
+    assert session.headers == [{}, {}]
+    assert len(cache.threads) == 2 and loop_thread not in cache.threads
+    assert cache.stats()["misses"] == 1
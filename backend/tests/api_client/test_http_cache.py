@@ -0,0 +1,84 @@
+"""
+Testes unitários do cache HTTP condicional.
+
+Este módulo verifica o armazenamento por ETag/Last-Modified, a reutilização do
+corpo em respostas 304, a remoção LRU ao exceder o tamanho máximo e os
+contadores de hits/misses, incluindo a integração com o PNCPClient.
+"""
+
+import json
+
+import requests
+
+from backend.api_client.http_cache import HTTPCache
+from backend.api_client.pncp_client import PNCPClient
+from backend.api_client.rate_limiter import AdaptiveRateLimiter
+
+
+def _response(status, body=None, headers=None):
+    response = requests.Response()
+    response.status_code = status
+    response._content = b"" if body is None else json.dumps(body).encode("utf-8")
+    response.headers.update(headers or {})
+    return response
+
+
+class FakeSession:
+    # Devolve respostas em sequência e registra os headers enviados
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.sent_headers = []
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        self.sent_headers.append(headers or {})
+        return self.responses.pop(0)
+
+
+def test_store_lookup_and_key_order(tmp_path):
+    # Chave independe da ordem dos parâmetros; respostas sem validadores não são guardadas
+    cache = HTTPCache(str(tmp_path / "cache.db"), max_bytes=1024)
+    key = cache.make_key("http://x/itens", {"pagina": 1, "tamanhoPagina": 50})
+    assert key == cache.make_key("http://x/itens", {"tamanhoPagina": 50, "pagina": 1})
+
+    cache.miss("sem-validador", b"[]")
+    assert cache.lookup("sem-validador") is None
+
+    cache.miss(key, b"[1]", etag='"v1"')
+    entry = cache.lookup(key)
+    assert entry.body == b"[1]"
+    assert entry.conditional_headers() == {"If-None-Match": '"v1"'}
+
+
+def test_lru_eviction_respects_max_bytes(tmp_path):
+    # Ao exceder o limite, as entradas menos usadas recentemente saem primeiro
+    cache = HTTPCache(str(tmp_path / "cache.db"), max_bytes=100)
+    for name in ("a", "b", "c"):
+        cache.miss(name, b"x" * 40, etag=name)
+    assert cache.lookup("a") is None
+    assert cache.lookup("c") is not None
+    stats = cache.stats()
+    assert stats["evictions"] >= 1
+    assert stats["size_bytes"] <= 100
+
+
+def test_client_reuses_cached_body_on_304(tmp_path):
+    # Segunda requisição é condicional e o 304 devolve o corpo em cache
+    cache = HTTPCache(str(tmp_path / "cache.db"), max_bytes=1024 * 1024)
+    client = PNCPClient(
+        rate_limiter=AdaptiveRateLimiter(initial_rate=1000, min_rate=1000, max_rate=1000),
+        http_cache=cache,
+    )
+    client.session = FakeSession([
+        _response(200, {"data": [1, 2]}, {"ETag": '"v1"', "Last-Modified": "Wed, 01 Jan 2026 00:00:00 GMT"}),
+        _response(304),
+    ])
+
+    assert client._make_request("/contratacoes/proposta", {"pagina": 1}) == {"data": [1, 2]}
+    assert client._make_request("/contratacoes/proposta", {"pagina": 1}) == {"data": [1, 2]}
+
+    assert client.session.sent_headers[0] == {}
+    assert client.session.sent_headers[1]["If-None-Match"] == '"v1"'
+    assert client.session.sent_headers[1]["If-Modified-Since"] == "Wed, 01 Jan 2026 00:00:00 GMT"
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+    assert stats["bytes_saved"] == len(json.dumps({"data": [1, 2]}))
@@ -0,0 +1,131 @@
+"""
+Testes do checkpoint por página da coleta de editais.
+
+Este módulo verifica a serialização em intervalos, a conversão do formato antigo
+(last_checkpoint_page), o descarte de checkpoints de outra consulta ou de outro dia
+e a integração com PNCPClient.get_all_editais: páginas que falham são re-enfileiradas
+no fim da execução e, se esgotarem as tentativas, ficam pendentes para a próxima;
+páginas só entram no checkpoint depois que on_checkpoint grava seus editais.
+"""
+
+import json
+
+import backend.api_client.pncp_client as pncp_module
+from backend.api_client.page_checkpoint import PageCheckpoint, pages_to_ranges, ranges_to_pages
+from backend.api_client.pncp_client import PNCPClient
+from backend.api_client.rate_limiter import AdaptiveRateLimiter
+
+QUERY = {"data_inicial": "20260101", "data_final": "20260131", "codigo_modalidade": None}
+
+
+def test_ranges_round_trip():
+    # Conjunto de páginas compactado em intervalos e expandido de volta
+    pages = {1, 2, 3, 7, 9, 10}
+    assert pages_to_ranges(pages) == [[1, 3], [7, 7], [9, 10]]
+    assert ranges_to_pages(pages_to_ranges(pages)) == pages
+
+
+def test_load_legacy_stale_and_retries(tmp_path):
+    # Formato antigo vira 1..N; consulta diferente descarta; falhas persistem
+    path = str(tmp_path / "checkpoint.json")
+    with open(path, "w") as f:
+        json.dump({"last_checkpoint_page": 4}, f)
+    assert PageCheckpoint.load(path, QUERY, 10).missing() == [5, 6, 7, 8, 9, 10]
+
+    checkpoint = PageCheckpoint(path, QUERY, 10, completed={1, 2, 5})
+    assert checkpoint.mark_failed(3) == 1
+    assert checkpoint.mark_failed(3) == 2
+    checkpoint.save()
+    with open(path) as f:
+        assert json.load(f)["last_checkpoint_page"] == 2
+
+    loaded = PageCheckpoint.load(path, QUERY, 10)
+    assert loaded.completed == {1, 2, 5}
+    assert loaded.retries == {3: 2}
+    assert PageCheckpoint.load(path, dict(QUERY, data_final="20260228"), 10).completed == set()
+    assert PageCheckpoint.load(path, QUERY, 11).completed == set()
+
+
+def test_checkpoint_from_previous_day_is_discarded(tmp_path):
+    # A rotina diária repete a mesma consulta: coleta parcial de outro dia não é reaproveitada
+    path = str(tmp_path / "checkpoint.json")
+    PageCheckpoint(path, QUERY, 10, completed={1, 2, 3}, run_date="2026-01-01").save()
+    assert PageCheckpoint.load(path, QUERY, 10).completed == set()
+
+
+def _client(tmp_path, monkeypatch, fail):
+    # Cliente com get_editais falso: `fail(page)` decide se a página falha (None)
+    monkeypatch.setattr(pncp_module, "EDITAIS_CHECKPOINT_FILE", str(tmp_path / "checkpoint.json"))
+    monkeypatch.setattr(pncp_module.time, "sleep", lambda s: None)
+    client = PNCPClient(
+        rate_limiter=AdaptiveRateLimiter(initial_rate=1000, min_rate=1000, max_rate=1000),
+        http_cache=False,
+    )
+    client.calls = []
+
+    def get_editais(page=1, **kwargs):
+        client.calls.append(page)
+        if fail(page):
+            return None
+        return {"totalPaginas": 6, "totalRegistros": 6, "data": [{"pagina": page}]}
+
+    client.get_editais = get_editais
+    return client
+
+
+def test_failed_page_is_requeued(tmp_path, monkeypatch):
+    # Página 3 falha uma vez, é re-enfileirada no fim e a coleta termina completa
+    failures = {3: 1}
+
+    def fail(page):
+        if failures.get(page):
+            failures[page] -= 1
+            return True
+        return False
+
+    client = _client(tmp_path, monkeypatch, fail)
+    editais = client.get_all_editais(data_inicial="20260101", data_final="20260131")
+
+    assert sorted(e["pagina"] for e in editais) == [1, 2, 3, 4, 5, 6]
+    assert client.calls.count(3) == 2
+    assert client.calls[-1] == 3
+    with open(tmp_path / "checkpoint.json") as f:
+        assert json.load(f) == {"last_checkpoint_page": 1}
+
+
+def test_exhausted_page_resumes_on_next_run(tmp_path, monkeypatch):
+    # Página que sempre falha fica pendente; a próxima execução busca só ela
+    client = _client(tmp_path, monkeypatch, lambda page: page == 4)
+    saved = []
+    editais = client.get_all_editais(
+        data_inicial="20260101", data_final="20260131", on_checkpoint=lambda editais, page: saved.append(len(editais))
+    )
+
+    assert sorted(e["pagina"] for e in editais) == [1, 2, 3, 5, 6]
+    assert saved == [5]
+    assert client.calls.count(4) == pncp_module.EDITAIS_PAGE_MAX_RETRIES
+    checkpoint = PageCheckpoint.load(str(tmp_path / "checkpoint.json"), QUERY, 6)
+    assert checkpoint.missing() == [4]
+
+    retry = _client(tmp_path, monkeypatch, lambda page: False)
+    editais = retry.get_all_editais(data_inicial="20260101", data_final="20260131")
+    assert retry.calls == [1, 4]
+    assert [e["pagina"] for e in editais] == [1, 4]
+
+
+def test_pages_not_stored_are_fetched_again(tmp_path, monkeypatch):
+    # Sem on_checkpoint (ou se ele falha), nenhuma página é marcada como concluída
+    client = _client(tmp_path, monkeypatch, lambda page: page == 4)
+    client.get_all_editais(data_inicial="20260101", data_final="20260131")
+    assert PageCheckpoint.load(str(tmp_path / "checkpoint.json"), QUERY, 6).completed == set()
+
+    def broken_checkpoint(editais, page):
+        raise OSError("disk full")
+
+    client = _client(tmp_path, monkeypatch, lambda page: page == 4)
+    client.get_all_editais(data_inicial="20260101", data_final="20260131", on_checkpoint=broken_checkpoint)
+    assert PageCheckpoint.load(str(tmp_path / "checkpoint.json"), QUERY, 6).completed == set()
+
+    retry = _client(tmp_path, monkeypatch, lambda page: False)
+    retry.get_all_editais(data_inicial="20260101", data_final="20260131")
+    assert sorted(retry.calls) == [1, 2, 3, 4, 5, 6]
@@ -0,0 +1,71 @@
+"""
+Testes unitários do limitador de taxa adaptativo (AIMD).
+
+Este módulo verifica o espaçamento das reservas do token bucket, o aumento
+aditivo em sucessos, a redução multiplicativa em 429/5xx e a pausa global
+aplicada pelo Retry-After, usando um relógio falso.
+"""
+
+from backend.api_client.rate_limiter import AdaptiveRateLimiter, parse_retry_after
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def _limiter(clock, **kwargs):
+    params = dict(initial_rate=2, min_rate=0.5, max_rate=10, increase=1.0, decrease_factor=0.5, clock=clock)
+    params.update(kwargs)
+    return AdaptiveRateLimiter(**params)
+
+
+def test_reservations_are_spaced_by_rate():
+    # Rajada inicial de 1 segundo; depois as reservas são espaçadas por 1/rate
+    clock = FakeClock()
+    limiter = _limiter(clock)
+    assert [limiter.reserve() for _ in range(4)] == [0.0, 0.0, 0.5, 1.0]
+    clock.now += 1.0
+    assert limiter.reserve() == 0.5
+
+
+def test_aimd_increase_and_decrease():
+    # Sucessos aumentam a taxa aos poucos; 429/5xx cortam pela metade (uma vez por cooldown)
+    clock = FakeClock()
+    limiter = _limiter(clock)
+    for _ in range(4):
+        limiter.on_success()
+    assert 2.0 < limiter.rate < 4.0
+
+    rate = limiter.rate
+    limiter.record_status(503)
+    limiter.record_status(429)
+    assert limiter.rate == rate * 0.5
+
+    clock.now += 2.0
+    for _ in range(10):
+        limiter.record_status(429)
+        clock.now += 2.0
+    assert limiter.rate == 0.5
+    assert limiter.stats()["throttled"] == 11
+
+
+def test_retry_after_pauses_all_requests():
+    # Retry-After bloqueia todas as reservas até o prazo
+    clock = FakeClock()
+    limiter = _limiter(clock, initial_rate=10)
+    limiter.on_throttle(retry_after=3)
+    assert limiter.stats()["blocked_for"] == 3.0
+    assert limiter.reserve() >= 3.0
+    clock.now += 10.0
+    assert limiter.reserve() == 0.0
+
+
+def test_parse_retry_after():
+    # Header ausente ou inválido é ignorado
+    assert parse_retry_after("5") == 5.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") is None
@@ -0,0 +1,82 @@
+"""
+Testes da exportação CSV em streaming.
+
+Este módulo verifica o achatamento das chaves aninhadas e o esquema de colunas
+(mesma ordem do pd.json_normalize + pd.concat usados antes), a sanitização e
+o texto das células e os arquivos gerados pelo Exporter a partir dos itens do
+armazenamento, comparados com a exportação via pandas.
+"""
+
+import pandas as pd
+
+from backend.export import exporter as exporter_module
+from backend.export.csv_stream import CsvLineFormatter, CsvSchema, cell_value, csv_text, flatten, write_lines
+from backend.export.normalizer import normalize_records
+from backend.storage import data_manager as dm_module
+
+
+EDITAIS = [
+    {
+        "ID_C_PNCP": "e1",
+        "orgaoEntidade": {"cnpj": "1", "razaoSocial": "Órgão\n  A"},
+        "objetoCompra": "Compra\x01 de papel",
+        "valorTotalEstimado": 10.5,
+        "srp": True,
+        "vazio": {},
+    },
+    {"ID_C_PNCP": "e2", "objetoCompra": "Outra", "valorTotalEstimado": None, "amparo": {"lei": {"n": 14133}}},
+]
+
+ITENS = [
+    {"edital_ID_C_PNCP": "e1", "numeroItem": 1, "descricao": "Caneta  azul ", "quantidade": 2.0, "tags": ["a", "b"]},
+    {"edital_ID_C_PNCP": "e2", "numeroItem": 1, "descricao": "Papel", "quantidade": None, "material": True},
+]
+
+
+def test_flatten_and_schema_follow_json_normalize():
+    # Campos simples primeiro, aninhados depois; dicionários vazios descartados
+    assert list(flatten(EDITAIS[0])) == [
+        "ID_C_PNCP", "objetoCompra", "valorTotalEstimado", "srp", "orgaoEntidade.cnpj", "orgaoEntidade.razaoSocial",
+    ]
+    schema = CsvSchema().observe_all(EDITAIS).observe_all(ITENS)
+    expected = pd.concat([pd.json_normalize(EDITAIS), pd.json_normalize(ITENS)], sort=False).columns.tolist()
+    assert schema.columns == expected
+
+
+def test_cells_and_lines_match_pandas_text(tmp_path):
+    # None/NaN viram célula vazia, textos saem normalizados e números como no pandas
+    formatter = CsvLineFormatter()
+    values = [cell_value(v) for v in ("Caneta  azul ", None, float("nan"), 2.0, 3, True, ["a", "b"], 'aspas "x", vírgula')]
+    line = formatter.line([csv_text(v) for v in values])
+    assert line == 'Caneta azul,,,2.0,3,True,"[\'a\', \'b\']","aspas ""x"", vírgula"\n'
+
+    path = str(tmp_path / "out.csv")
+    assert write_lines(path, [formatter.line(["tipo", "descricao"]), line], encoding="utf-8") == 2
+    assert (tmp_path / "out.csv").read_text(encoding="utf-8").startswith("tipo,descricao\nCaneta azul,")
+    assert not (tmp_path / "out.csv.tmp").exists()
+
+
+def test_export_editais_matches_pandas(tmp_path, monkeypatch):
+    # editais.csv e editais.xlsx têm o mesmo conteúdo da exportação antiga (json_normalize + concat)
+    monkeypatch.setattr(dm_module, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(exporter_module, "EXPORT_DIR", str(tmp_path / "exports"))
+    manager = dm_module.DataManager(backend="json")
+    manager.save_itens(ITENS[:1])
+    manager.append_itens(ITENS[1:])
+
+    exporter_module.Exporter().export_editais(EDITAIS)
+
+    df = pd.json_normalize(normalize_records(EDITAIS))
+    df.insert(0, "tipo", "edital")
+    df_itens = pd.json_normalize(normalize_records(ITENS))
+    df_itens.insert(0, "tipo", "item")
+    pd.concat([df, df_itens], ignore_index=True, sort=False).to_csv(
+        tmp_path / "pandas.csv", index=False, encoding="utf-8-sig"
+    )
+    streamed = pd.read_csv(tmp_path / "exports" / "editais.csv", encoding="utf-8-sig")
+    expected = pd.read_csv(tmp_path / "pandas.csv", encoding="utf-8-sig")
+    pd.testing.assert_frame_equal(streamed, expected, check_dtype=False)
+    for sheet, frame in (("Editais", df), ("Itens Editais", df_itens)):
+        written = pd.read_excel(tmp_path / "exports" / "editais.xlsx", sheet_name=sheet)
+        assert written.columns.tolist() == frame.columns.tolist()
+        assert len(written) == len(frame)
@@ -0,0 +1,138 @@
+"""
+Testes do cache incremental das exportações de editais.
+
+Este módulo verifica que uma exportação com a mesma origem é pulada sem ler os
+itens, que apenas os blocos de editais alterados são recalculados (inclusive
+remoções, itens órfãos e mudança de esquema) e que o resultado incremental é
+idêntico a uma exportação completa.
+"""
+
+import copy
+import csv
+import io
+
+from backend.export import exporter as exporter_module
+from backend.export.export_cache import ORPHANS, EditaisExportCache
+from backend.storage import data_manager as dm_module
+
+EDITAIS = [
+    {"ID_C_PNCP": "e1", "objetoCompra": "Papel", "orgaoEntidade": {"cnpj": "1"}},
+    {"ID_C_PNCP": "e2", "objetoCompra": "Caneta", "orgaoEntidade": {"cnpj": "2"}},
+    {"numeroControlePNCP": "n3", "objetoCompra": "Toner"},
+]
+ITENS = [
+    {"edital_ID_C_PNCP": "e1", "numeroItem": 1, "descricao": "A4"},
+    {"edital_ID_C_PNCP": "e2", "numeroItem": 1, "descricao": "Azul"},
+    {"edital_numeroControlePNCP": "n3", "numeroItem": 1, "descricao": "Preto"},
+    {"edital_ID_C_PNCP": "x9", "numeroItem": 1, "descricao": "Sem edital"},
+    {"edital_ID_C_PNCP": "e1", "numeroItem": 2, "descricao": "A3"},
+]
+
+
+class _Source:
+    # Itens em memória contando quantas vezes foram percorridos
+    def __init__(self, itens):
+        self.itens = itens
+        self.reads = 0
+
+    def __call__(self):
+        self.reads += 1
+        return iter(self.itens)
+
+
+def _export(cache, editais, source, signature):
+    plan = cache.plan(editais, source, signature)
+    if not plan.up_to_date:
+        cache.rebuild(plan, source)
+        cache.mark_exported(plan)
+    return plan, "".join(cache.csv_lines(plan))
+
+
+def test_unchanged_source_is_skipped(tmp_path):
+    # Mesmos editais e mesma assinatura dos itens: nenhum item é lido
+    cache = EditaisExportCache(str(tmp_path / "cache.db"))
+    source = _Source(ITENS)
+    plan, _ = _export(cache, EDITAIS, source, "g1")
+    assert plan.full and plan.changed == {"id:e1", "id:e2", "num:n3", ORPHANS}
+    assert source.reads == 2
+
+    plan, _ = _export(cache, EDITAIS, source, "g1")
+    assert plan.up_to_date
+    assert source.reads == 2
+    assert cache.source == plan.source
+
+
+def test_only_changed_blocks_are_rebuilt(tmp_path):
+    # Edital alterado, item novo e edital removido recalculam só os blocos afetados
+    cache = EditaisExportCache(str(tmp_path / "cache.db"))
+    _export(cache, EDITAIS, _Source(ITENS), "g1")
+
+    editais = copy.deepcopy([EDITAIS[0], EDITAIS[2]])
+    editais[0]["objetoCompra"] = "Papel reciclado"
+    itens = ITENS + [{"edital_ID_C_PNCP": "e2", "numeroItem": 2, "descricao": "Vermelha"}]
+    plan, csv_text = _export(cache, editais, _Source(itens), "g2")
+
+    # e2 saiu (sem mudar as colunas): seus itens agora são órfãos; n3 é reaproveitado
+    assert not plan.full
+    assert plan.changed == {"id:e1", ORPHANS}
+    assert plan.removed == {"id:e2"}
+    fresh = EditaisExportCache(str(tmp_path / "fresh.db"))
+    assert csv_text == _export(fresh, editais, _Source(itens), "g2")[1]
+    rows = list(csv.reader(io.StringIO(csv_text)))
+    assert [row[2] for row in rows[1:3]] == ["Papel reciclado", "Toner"]
+    # Itens na ordem dos editais (e do armazenamento dentro de cada edital); órfãos no fim
+    column = rows[0].index("descricao")
+    assert [row[column] for row in rows[3:]] == ["A4", "A3", "Preto", "Azul", "Sem edital", "Vermelha"]
+
+def test_new_column_rebuilds_everything(tmp_path):
+    # Campo novo muda o esquema: todos os blocos são recalculados
+    cache = EditaisExportCache(str(tmp_path / "cache.db"))
+    _export(cache, EDITAIS, _Source(ITENS), "g1")
+    itens = ITENS + [{"edital_ID_C_PNCP": "e2", "numeroItem": 2, "descricao": "X", "marca": "Y"}]
+
+    plan, csv_text = _export(cache, EDITAIS, _Source(itens), "g2")
+
+    assert plan.full
+    assert csv_text.splitlines()[0].endswith(",marca")
+
+
+def test_exporter_skips_and_tags_exports(tmp_path, monkeypatch):
+    # Segunda exportação sem mudanças é pulada; a tag da origem acompanha os arquivos
+    monkeypatch.setattr(dm_module, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(exporter_module, "EXPORT_DIR", str(tmp_path / "exports"))
+    dm_module.DataManager(backend="json").save_itens(ITENS)
+    exporter = exporter_module.Exporter()
+    skipped = exporter_module.EXPORT_CACHE_RESULTS.value(result="skipped")
+
+    exporter.export_editais(EDITAIS)
+    tag = exporter.editais_export_tag()
+    mtime = (tmp_path / "exports" / "editais.csv").stat().st_mtime_ns
+    exporter.export_editais(EDITAIS)
+
+    assert tag is not None and exporter.editais_export_tag() == tag
+    assert (tmp_path / "exports" / "editais.csv").stat().st_mtime_ns == mtime
+    assert exporter_module.EXPORT_CACHE_RESULTS.value(result="skipped") == skipped + 1
+
+    (tmp_path / "exports" / "editais.xlsx").unlink()
+    exporter.export_editais(EDITAIS)
+    assert (tmp_path / "exports" / "editais.xlsx").exists()
+
+
+def test_export_tag_during_rebuild(tmp_path, monkeypatch):
+    # Com o rebuild segurando a escrita, a tag continua legível; cache ilegível devolve None
+    monkeypatch.setattr(dm_module, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(exporter_module, "EXPORT_DIR", str(tmp_path))
+    exporter = exporter_module.Exporter()
+    cache = EditaisExportCache(str(tmp_path / exporter_module.EXPORT_CACHE_FILE))
+    _export(cache, EDITAIS, _Source(ITENS), "g1")
+
+    writer = EditaisExportCache(cache.db_path)
+    writer._conn.execute("BEGIN EXCLUSIVE")
+    writer._conn.execute("DELETE FROM meta")
+    assert exporter.editais_export_tag() == cache.source
+    writer._conn.rollback()
+    writer.close()
+    cache.close()
+
+    (tmp_path / exporter_module.EXPORT_CACHE_FILE).write_bytes(b"not a database" * 100)
+    assert exporter.editais_export_tag() is None
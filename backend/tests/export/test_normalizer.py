@@ -0,0 +1,37 @@
+"""
+Testes da normalização de registros para exportação.
+
+Este módulo verifica a verificação rápida de strings já normalizadas e a
+normalização recursiva de listas de registros, sem alterar a original.
+"""
+
+from backend.export.normalizer import is_normalized, normalize_records, normalize_str
+
+RECORDS = [
+    {
+        "id": i,
+        "objeto": f"Compra\n de  papel {i} " if i % 3 == 0 else f"Compra {i}",
+        "orgao": {"nome": "Órgão\x01 A", "cnpj": "1"},
+        "lista": ["a  b", {"x": " y "}, 3],
+    }
+    for i in range(25)
+]
+
+
+def test_precheck_skips_clean_strings():
+    # Strings limpas passam pela verificação rápida e voltam sem alteração
+    assert is_normalized("Caneta azul 0,7mm")
+    for dirty in ("a  b", " a", "a ", "a\nb", "a\x0bb", "a\xa0b"):
+        assert not is_normalized(dirty)
+    assert normalize_str("Compra\r\n de\x01  papel ") == "Compra de papel"
+    assert is_normalized(normalize_str(" a\n\n b "))
+
+
+def test_normalize_records_nested():
+    # Dicionários e listas aninhados são normalizados; a lista original fica intacta
+    normalized = normalize_records(RECORDS)
+    assert normalized[0]["objeto"] == "Compra de papel 0"
+    assert normalized[0]["orgao"] == {"nome": "Órgão A", "cnpj": "1"}
+    assert normalized[0]["lista"] == ["a b", {"x": "y"}, 3]
+    assert [r["id"] for r in normalized] == list(range(25))
+    assert RECORDS[0]["objeto"] == "Compra\n de  papel 0 "
@@ -0,0 +1,62 @@
+"""
+Testes da exportação XLSX em streaming (workbook write-only).
+
+Este módulo verifica a sanitização das células na escrita (caracteres ilegais,
+textos iniciados por "="), a continuação em novas abas ao atingir o limite de
+linhas e as estatísticas de linhas por segundo.
+"""
+
+from openpyxl import load_workbook
+
+from backend.export.csv_stream import cell_value
+from backend.export.xlsx_stream import sheet_title, write_workbook
+
+
+def _rows(path, title):
+    return [list(row) for row in load_workbook(path, read_only=True)[title].iter_rows(values_only=True)]
+
+
+def test_cells_are_sanitized_on_write(tmp_path):
+    # Caracteres ilegais removidos, números preservados e "=" gravado como texto
+    path = str(tmp_path / "out.xlsx")
+    rows = [
+        ["item"] + [cell_value(v) for v in ("Caneta\x01\x0b azul\n", 2.5, float("nan"), "1")],
+        ["item"] + [cell_value(v) for v in ("=SUM(A1:A2)", 3, None, "2")],
+    ]
+    write_workbook(path, [("Itens", ["tipo", "descricao", "valor", "vazio", "orgao.cnpj"], rows)])
+
+    assert _rows(path, "Itens") == [
+        ["tipo", "descricao", "valor", "vazio", "orgao.cnpj"],
+        ["item", "Caneta azul", 2.5, None, "1"],
+        ["item", "=SUM(A1:A2)", 3, None, "2"],
+    ]
+    workbook = load_workbook(path)
+    assert workbook["Itens"]["B3"].data_type == "s"
+    assert not (tmp_path / "out.xlsx.tmp").exists()
+
+
+def test_rows_roll_over_into_continuation_sheets(tmp_path):
+    # Com 3 linhas por aba (cabeçalho + 2), 5 itens ocupam 3 abas, cada uma com cabeçalho
+    path = str(tmp_path / "out.xlsx")
+    rows = [["item", i] for i in range(5)]
+
+    stats = write_workbook(
+        path,
+        [("Editais", ["tipo", "id"], []), ("Itens Editais", ["tipo", "numeroItem"], rows)],
+        max_rows=3,
+    )
+
+    assert stats["rows"] == 5
+    assert stats["rows_per_second"] > 0
+    assert stats["sheets"]["Editais"] == {"rows": 0, "titles": ["Editais"]}
+    assert stats["sheets"]["Itens Editais"]["titles"] == ["Itens Editais", "Itens Editais (2)", "Itens Editais (3)"]
+    assert load_workbook(path, read_only=True).sheetnames == ["Editais", "Itens Editais", "Itens Editais (2)", "Itens Editais (3)"]
+    assert _rows(path, "Editais") == [["tipo", "id"]]
+    assert _rows(path, "Itens Editais (3)") == [["tipo", "numeroItem"], ["item", 4]]
+
+
+def test_sheet_title_fits_excel_limit():
+    # Nomes de aba têm no máximo 31 caracteres, inclusive o sufixo de continuação
+    assert sheet_title("Itens Editais", 1) == "Itens Editais"
+    title = sheet_title("X" * 40, 12)
+    assert len(title) == 31 and title.endswith(" (12)")
@@ -0,0 +1,45 @@
+"""
+Testes dos scripts de manutenção com segmentos de itens pendentes.
+
+Este módulo verifica que os scripts que reescrevem o itens.json incorporam antes
+os segmentos ainda não compactados (itens.segments), para que eles não tragam
+de volta itens removidos nem desfaçam as correções.
+"""
+
+import importlib.util
+import json
+import os
+
+from backend.storage import data_manager as dm_module
+
+SCRIPTS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../scripts/data"))
+
+
+def _load_script(name):
+    spec = importlib.util.spec_from_file_location(name, os.path.join(SCRIPTS_DIR, f"{name}.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_remove_expired_drops_items_from_pending_segments(tmp_path, monkeypatch):
+    # O item expirado que só existe em um segmento não volta depois da remoção
+    monkeypatch.setattr(dm_module, "DATA_DIR", str(tmp_path))
+    manager = dm_module.DataManager(backend="json")
+    manager.save_editais([
+        {"ID_C_PNCP": "old", "dataEncerramentoProposta": "2020-01-01T10:00:00"},
+        {"ID_C_PNCP": "new", "dataEncerramentoProposta": "2099-01-01T10:00:00"},
+    ])
+    manager.save_itens([{"edital_ID_C_PNCP": "new", "numeroItem": 1}])
+    manager.append_itens([{"edital_ID_C_PNCP": "old", "numeroItem": 1}, {"edital_ID_C_PNCP": "new", "numeroItem": 2}])
+
+    script = _load_script("remove_expired_editais")
+    monkeypatch.setattr(script, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(script, "EDITAIS_PATH", str(tmp_path / "editais.json"))
+    monkeypatch.setattr(script, "ITENS_PATH", str(tmp_path / "itens.json"))
+    script.main()
+
+    itens = dm_module.DataManager(backend="json").load_itens()
+    assert sorted((i["edital_ID_C_PNCP"], i["numeroItem"]) for i in itens) == [("new", 1), ("new", 2)]
+    backups = os.listdir(tmp_path / "backup_itens")
+    assert len(json.loads((tmp_path / "backup_itens" / backups[0]).read_text(encoding="utf-8"))) == 3
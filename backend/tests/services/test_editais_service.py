@@ -36,3 +36,16 @@ def test_get_itens_by_edital_filters():
     service.data_manager.load_itens = lambda: itens
     result = service.get_itens_by_edital("1", "2026", "10")
     assert result == [itens[0]]
+
+
+def test_get_edital_by_id_uses_index(tmp_path):
+    # Busca direta por ID_C_PNCP (inclusive com "/") sem percorrer a lista
+    from backend.storage import data_manager as dm_module
+
+    dm_module.DATA_DIR = str(tmp_path)
+    service = EditaisService()
+    service.save_editais([{"ID_C_PNCP": "a/1", "numeroControlePNCP": "N-1"}, {"ID_C_PNCP": "b", "numeroControlePNCP": "N-2"}])
+
+    assert service.get_edital_by_id("a/1")["numeroControlePNCP"] == "N-1"
+    assert service.get_edital_by_id("x") is None
+    assert service.get_edital_by_id(None) is None
@@ -0,0 +1,140 @@
+"""
+Testes do modo em pipeline da sincronização de editais.
+
+Este módulo verifica que a busca de itens começa enquanto as páginas de editais
+ainda estão chegando, que a fila limitada aplica backpressure ao produtor, que
+editais atualizados mantêm o ID_C_PNCP local, que editais cuja busca de itens
+falhou ficam pendentes e são re-enfileirados na sincronização seguinte e que o
+cancelamento interrompe produtor e consumidores.
+"""
+
+import threading
+import time
+
+import backend.config as config
+from backend.config import request_cancel, reset_cancel
+from backend.services.editais_service import EditaisService
+from backend.services.sync_pipeline import ItemFetchPipeline
+from backend.storage import data_manager as dm_module
+
+
+def _edital(n, data="2026-01-10"):
+    return {
+        "numeroControlePNCP": f"N-{n}",
+        "orgaoEntidade": {"cnpj": "1"},
+        "anoCompra": 2026,
+        "sequencialCompra": n,
+        "dataPublicacaoPncp": data,
+    }
+
+
+class FakeClient:
+    # Entrega páginas via on_page, registrando o momento em que a última página foi entregue
+    def __init__(self, pages):
+        self.pages = pages
+        self.last_page_at = None
+
+    def get_all_editais(self, data_inicial=None, data_final=None, codigo_modalidade=None, on_page=None, **kwargs):
+        for page_num, page in enumerate(self.pages, start=1):
+            time.sleep(0.05)
+            on_page(page_num, [dict(e) for e in page])
+        self.last_page_at = time.monotonic()
+        return [e for page in self.pages for e in page]
+
+
+def test_itens_fetched_while_pages_arrive(tmp_path, monkeypatch):
+    # Itens do primeiro edital são buscados antes da última página chegar
+    dm_module.DATA_DIR = str(tmp_path)
+    monkeypatch.setattr(config, "ITEMS_SKIP_EXISTING", True)
+    service = EditaisService()
+    service.client = FakeClient([[_edital(1), _edital(2)], [_edital(3)], [_edital(4)]])
+    fetched_at = {}
+
+    def fake_fetch(idx, total, edital, **kwargs):
+        fetched_at[edital["numeroControlePNCP"]] = time.monotonic()
+        return [{"edital_ID_C_PNCP": edital["ID_C_PNCP"], "edital_numeroControlePNCP": edital["numeroControlePNCP"], "numeroItem": 1}]
+
+    service._fetch_items_for_single_edital = fake_fetch
+    result = service.sync_editais(pipelined=True)
+
+    assert result == {"added": 4, "updated": 0}
+    assert min(fetched_at.values()) < service.client.last_page_at
+    assert len(service.data_manager.load_editais()) == 4
+    assert len(service.data_manager.load_itens()) == 4
+    assert len(service.data_manager.get_itens_by_edital_numero("N-3")) == 1
+
+
+def test_updated_edital_keeps_local_id(tmp_path):
+    # Edital mais novo substitui o local (mesmo ID_C_PNCP) e não tem itens rebuscados
+    dm_module.DATA_DIR = str(tmp_path)
+    service = EditaisService()
+    service.save_editais([dict(_edital(1), ID_C_PNCP="local-1")])
+    service.client = FakeClient([[_edital(1, data="2026-02-01"), _edital(1, data="2025-01-01")]])
+    calls = []
+    service._fetch_items_for_single_edital = lambda idx, total, edital, **kwargs: calls.append(edital) or []
+
+    result = service.sync_editais(pipelined=True)
+
+    assert result == {"added": 0, "updated": 1}
+    assert calls == []
+    editais = service.data_manager.load_editais()
+    assert [(e["ID_C_PNCP"], e["dataPublicacaoPncp"]) for e in editais] == [("local-1", "2026-02-01")]
+
+
+def test_failed_itens_are_retried_next_sync(tmp_path, monkeypatch):
+    # Edital salvo cuja busca de itens falhou fica pendente e é o único buscado na próxima execução
+    monkeypatch.setattr(dm_module, "DATA_DIR", str(tmp_path))
+    service = EditaisService()
+    service.client = FakeClient([[_edital(1), _edital(2)]])
+    calls = []
+    failures = {"N-2": 1}
+
+    def flaky_fetch(idx, total, edital, **kwargs):
+        calls.append(edital["numeroControlePNCP"])
+        if failures.get(edital["numeroControlePNCP"]):
+            failures[edital["numeroControlePNCP"]] -= 1
+            raise RuntimeError("API fora do ar")
+        return [{"edital_ID_C_PNCP": edital["ID_C_PNCP"], "edital_numeroControlePNCP": edital["numeroControlePNCP"], "numeroItem": 1}]
+
+    service._fetch_items_for_single_edital = flaky_fetch
+    assert service.sync_editais(pipelined=True) == {"added": 2, "updated": 0}
+    assert len(service.data_manager.load_editais()) == 2
+    assert len(service.data_manager.load_itens()) == 1
+    pending = service.data_manager.load_itens_pending()
+    assert pending == {service.data_manager.get_edital_by_numero("N-2")["ID_C_PNCP"]}
+
+    calls.clear()
+    assert service.sync_editais(pipelined=True) == {"added": 0, "updated": 0}
+    assert calls == ["N-2"]
+    assert len(service.data_manager.get_itens_by_edital_numero("N-2")) == 1
+    assert service.data_manager.load_itens_pending() == set()
+
+
+def test_pipeline_backpressure_and_cancellation():
+    # Fila de 1 posição bloqueia o produtor; cancelamento libera produtor e consumidores
+    release = threading.Event()
+    done = []
+
+    def slow_fetch(idx, edital):
+        release.wait(1)
+        return [edital]
+
+    pipeline = ItemFetchPipeline(slow_fetch, lambda edital, itens: done.append(edital), workers=1, queue_size=1).start()
+    try:
+        assert pipeline.submit("a")
+        assert pipeline.submit("b")
+        timer = threading.Timer(0.3, release.set)
+        timer.start()
+        assert pipeline.submit("c")
+        assert pipeline.producer_wait > 0.1
+        pipeline.finish()
+        assert done == ["a", "b", "c"]
+
+        blocked = ItemFetchPipeline(lambda idx, edital: time.sleep(5), lambda e, i: None, workers=1, queue_size=1).start()
+        blocked.submit("x")
+        blocked.submit("y")
+        threading.Timer(0.2, request_cancel).start()
+        assert blocked.submit("z") is False
+        assert blocked.submitted == 2
+    finally:
+        reset_cancel()
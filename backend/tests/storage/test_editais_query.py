@@ -0,0 +1,68 @@
+"""
+Testes da consulta paginada de editais (/api/editais).
+
+Este módulo verifica paginação e totais, ordenação ascendente/descendente com
+valores ausentes no fim, filtros por UF, órgão, modalidade e intervalo de datas
+e a validação dos parâmetros.
+"""
+
+import pytest
+
+from backend.storage.editais_query import EditaisQueryError, parse_query, run_query, wants_query
+from backend.storage.snapshot_cache import DatasetSnapshot
+
+
+def _snapshot():
+    editais = [
+        {
+            "ID_C_PNCP": f"id{i}",
+            "unidadeOrgao": {"ufSigla": ["SP", "RJ", "MG"][i % 3]},
+            "orgaoEntidade": {"cnpj": f"0000000000000{i % 2}"},
+            "modalidadeId": 6 if i % 2 else 8,
+            "modalidadeNome": "Pregão - Eletrônico" if i % 2 else "Dispensa",
+            "valorTotalEstimado": None if i == 4 else i * 10.0,
+            "dataPublicacaoPncp": f"2026-01-{i + 1:02d}T10:00:00",
+        }
+        for i in range(10)
+    ]
+    return DatasetSnapshot(editais, signature=None, generation=1)
+
+
+def _ids(body):
+    return [e["ID_C_PNCP"] for e in body["data"]]
+
+
+def test_pagination_and_totals():
+    # Página 2 de 4 com totais para a SPA virtualizar a lista
+    body = run_query(_snapshot(), parse_query({"page": "2", "page_size": "3"}))
+    assert _ids(body) == ["id3", "id4", "id5"]
+    assert (body["total"], body["total_geral"], body["pages"]) == (10, 10, 4)
+
+
+def test_sort_keeps_missing_values_last():
+    # Valor ausente (id4) fica no fim nas duas direções
+    snapshot = _snapshot()
+    assert _ids(run_query(snapshot, parse_query({"sort": "valor"})))[-2:] == ["id9", "id4"]
+    assert _ids(run_query(snapshot, parse_query({"sort": "-valor"})))[:2] == ["id9", "id8"]
+    assert _ids(run_query(snapshot, parse_query({"sort": "valor", "order": "desc", "uf": "MG"}))) == ["id8", "id5", "id2"]
+    assert _ids(run_query(snapshot, parse_query({"sort": "valor", "order": "desc", "uf": "RJ"}))) == ["id7", "id1", "id4"]
+
+
+def test_filters_intersect():
+    # UF (lista), modalidade (código ou nome), CNPJ formatado e intervalo de datas
+    snapshot = _snapshot()
+    assert _ids(run_query(snapshot, parse_query({"uf": "sp,RJ", "modalidade": "6"}))) == ["id1", "id3", "id7", "id9"]
+    assert _ids(run_query(snapshot, parse_query({"modalidade": "dispensa", "orgao_cnpj": "00.000.000/0000-00"})))[:2] == ["id0", "id2"]
+    body = run_query(snapshot, parse_query({"data_inicio": "20260103", "data_fim": "2026-01-05", "sort": "publicacao", "order": "desc"}))
+    assert _ids(body) == ["id4", "id3", "id2"]
+    assert body["total"] == 3
+
+
+def test_invalid_params():
+    # Parâmetros inválidos levantam EditaisQueryError (400 na rota)
+    assert not wants_query({})
+    assert wants_query({"page": "1"})
+    for args in ({"page": "0"}, {"page_size": "x"}, {"sort": "nome"}, {"order": "up"}, {"data_inicio": "01/02/2026"}):
+        with pytest.raises(EditaisQueryError):
+            parse_query(args)
+    assert parse_query({"page_size": "100000"})["page_size"] == 500
@@ -0,0 +1,69 @@
+"""
+Testes dos agregados por faceta dos editais (/api/editais/facets).
+
+Este módulo verifica a contagem e soma de valor por UF, modalidade, órgão e
+faixa de valor, e a manutenção incremental dos agregados a cada save_editais e
+delete_expired_editais (sem recalcular a partir de todos os editais).
+"""
+
+from datetime import datetime
+
+from backend.storage import data_manager as dm_module
+from backend.storage import facets as facets_module
+from backend.storage.data_manager import DataManager
+from backend.storage.facets import EditaisFacets
+
+
+def _edital(id_c, uf, valor, cnpj="11111111000111", encerramento="2030-01-01T00:00:00"):
+    return {
+        "ID_C_PNCP": id_c,
+        "numeroControlePNCP": f"N-{id_c}",
+        "unidadeOrgao": {"ufSigla": uf},
+        "orgaoEntidade": {"cnpj": cnpj, "razaoSocial": f"Órgão {cnpj[:2]}"},
+        "modalidadeNome": "Pregão - Eletrônico",
+        "valorTotalEstimado": valor,
+        "dataEncerramentoProposta": encerramento,
+    }
+
+
+def _buckets(result, dimension):
+    return {row["key"]: (row["count"], row["valor_total"]) for row in result[dimension]}
+
+
+def test_facets_from_records():
+    # Contagem e soma por dimensão; faixas na ordem crescente e sem valor por último
+    facets = EditaisFacets.from_records([
+        _edital("1", "MG", 5000), _edital("2", "mg", 250000), _edital("3", "SP", None, cnpj="22222222000122"),
+    ])
+    result = facets.to_dict()
+    assert result["total"] == 3
+    assert result["valor_total"] == 255000
+    assert result["uf"][0] == {"key": "MG", "count": 2, "valor_total": 255000}
+    assert [row["key"] for row in result["faixa_valor"]] == ["ate_10mil", "100mil_1mi", "sem_valor"]
+    assert result["orgao"][0]["razaoSocial"] == "Órgão 11"
+    assert len(facets.to_dict(limit=1)["orgao"]) == 1
+
+
+def test_facets_maintained_incrementally(tmp_path, monkeypatch):
+    # Atualizações movem o edital de bucket e expirados são descontados sem recalcular tudo
+    dm_module.DATA_DIR = str(tmp_path)
+    dm = DataManager(backend="json")
+    dm.save_editais([_edital("1", "MG", 5000), _edital("2", "SP", 50000, encerramento="2020-01-01T00:00:00")])
+    assert _buckets(facets_module.editais_facets(dm.get_editais_snapshot()).to_dict(), "uf") == {
+        "MG": (1, 5000), "SP": (1, 50000),
+    }
+
+    def fail(records):
+        raise AssertionError("agregados recalculados a partir de todos os editais")
+
+    monkeypatch.setattr(EditaisFacets, "from_records", staticmethod(fail))
+    dm.save_editais([_edital("1", "RJ", 20000), _edital("3", "RJ", 1000)])
+    result = facets_module.editais_facets(dm.get_editais_snapshot()).to_dict()
+    assert result["total"] == 3
+    assert _buckets(result, "uf") == {"RJ": (2, 21000), "SP": (1, 50000)}
+    assert _buckets(result, "faixa_valor") == {"ate_10mil": (1, 1000), "10mil_100mil": (2, 70000)}
+
+    assert dm.delete_expired_editais(now=datetime(2025, 1, 1)) == (1, 0)
+    result = facets_module.editais_facets(dm.get_editais_snapshot()).to_dict()
+    assert result["total"] == 2
+    assert _buckets(result, "uf") == {"RJ": (2, 21000)}
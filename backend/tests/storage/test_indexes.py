@@ -0,0 +1,74 @@
+"""
+Testes unitários dos índices de editais e itens.
+
+Este módulo verifica que as buscas do DataManager (backend JSON) usam os índices
+do snapshot e que salvamentos incrementais atualizam os índices sem recarregar
+os arquivos.
+"""
+
+from backend.storage import data_manager as dm_module
+from backend.storage import indexes
+from backend.storage.data_manager import DataManager
+
+
+def _edital(id_c, numero):
+    return {"ID_C_PNCP": id_c, "numeroControlePNCP": numero}
+
+
+def _item(id_c, numero_item):
+    return {"edital_ID_C_PNCP": id_c, "edital_numeroControlePNCP": f"N-{id_c}", "numeroItem": numero_item}
+
+
+def test_lookups_use_indexes(tmp_path):
+    # Buscas por ID/número retornam os registros corretos a partir dos índices
+    dm_module.DATA_DIR = str(tmp_path)
+    dm = DataManager(backend="json")
+    dm.save_editais([_edital("1", "N-1"), _edital(2, "N-2")])
+    dm.save_itens([_item("1", 1), _item("1", 2), _item("2", 1)])
+
+    assert dm.get_edital_by_id("2")["numeroControlePNCP"] == "N-2"
+    assert dm.get_edital_by_numero("N-1")["ID_C_PNCP"] == "1"
+    assert dm.get_edital_by_id("x") is None
+    assert [i["numeroItem"] for i in dm.get_itens_by_edital_id("1")] == [1, 2]
+    assert len(dm.get_itens_by_edital_numero("N-2")) == 1
+    assert dm.get_itens_by_edital_id("x") == []
+
+
+def test_save_editais_updates_indexes_incrementally(tmp_path):
+    # Upsert mantém posições, atualiza o número alterado e não relê o arquivo
+    dm_module.DATA_DIR = str(tmp_path)
+    dm = DataManager(backend="json")
+    dm.save_editais([_edital("1", "N-1"), _edital("2", "N-2")])
+    dm.get_edital_by_id("1")
+
+    dm.save_editais([_edital("2", "N-2b"), _edital("3", "N-3")])
+    snapshot = dm.get_editais_snapshot()
+    assert [e["ID_C_PNCP"] for e in snapshot.records] == ["1", "2", "3"]
+    assert snapshot._indexes[indexes.EDITAIS_BY_ID] == {"1": 0, "2": 1, "3": 2}
+    assert dm.get_edital_by_numero("N-2") is None
+    assert dm.get_edital_by_numero("N-2b")["ID_C_PNCP"] == "2"
+
+    # Conteúdo em disco é o mesmo que o snapshot instalado
+    assert DataManager(backend="json").load_editais() == snapshot.records
+
+
+def test_append_itens_updates_or_invalidates_snapshot(tmp_path):
+    # Itens de editais novos entram no snapshot; itens de editais já conhecidos forçam recarga
+    dm_module.DATA_DIR = str(tmp_path)
+    dm = DataManager(backend="json")
+    dm.save_itens([_item("1", 1)])
+    before = dm.get_itens_snapshot()
+
+    dm.append_itens([_item("2", 1), _item("2", 2)])
+    after = dm.get_itens_snapshot()
+    assert after is not before
+    assert after._indexes[indexes.ITENS_BY_EDITAL_ID] == {"1": [0], "2": [1, 2]}
+
+    dm.append_itens([_item("1", 1)])
+    assert [i["edital_ID_C_PNCP"] for i in dm.get_itens_by_edital_id("1")] == ["1"]
+    assert len(dm.get_itens_snapshot().records) == 3
+
+    # Compactação preserva o snapshot (só a assinatura muda)
+    snapshot = dm.get_itens_snapshot()
+    dm.compact_itens()
+    assert dm.get_itens_snapshot() is snapshot
@@ -0,0 +1,65 @@
+"""
+Testes unitários dos segmentos JSONL append-only de itens.
+
+Este módulo verifica a gravação incremental de segmentos, a leitura em streaming
+com descarte de registros substituídos e a compactação em itens.json.
+"""
+
+import json
+from backend.storage import data_manager as dm_module
+from backend.storage.data_manager import DataManager
+from backend.storage.item_segments import ItemSegmentStore
+
+
+def test_append_writes_only_new_records(tmp_path):
+    # save_itens(append=True) não reescreve o itens.json
+    dm_module.DATA_DIR = str(tmp_path)
+    manager = DataManager(backend="json")
+    manager.save_itens([{"edital_ID_C_PNCP": "a", "numeroItem": 1}])
+    base_mtime = (tmp_path / "itens.json").stat().st_mtime_ns
+
+    manager.save_itens([{"edital_ID_C_PNCP": "b", "numeroItem": 1}], append=True)
+
+    assert (tmp_path / "itens.json").stat().st_mtime_ns == base_mtime
+    assert len(list((tmp_path / "itens.segments").glob("*.jsonl"))) == 1
+    assert [i["edital_ID_C_PNCP"] for i in manager.load_itens()] == ["a", "b"]
+
+
+def test_reader_drops_superseded_records(tmp_path):
+    # A ocorrência mais recente de (edital_ID_C_PNCP, numeroItem) prevalece
+    store = ItemSegmentStore(str(tmp_path / "itens.json"), str(tmp_path / "segs"))
+    store.write_base([{"edital_ID_C_PNCP": "a", "numeroItem": 1, "v": 0}, {"edital_ID_C_PNCP": "a", "numeroItem": 2, "v": 0}])
+    store.append([{"edital_ID_C_PNCP": "a", "numeroItem": 1, "v": 1}, {"sem": "chave"}])
+    store.append([{"edital_ID_C_PNCP": "a", "numeroItem": 1, "v": 2}])
+
+    records = list(store.iter_records())
+
+    assert records == [
+        {"edital_ID_C_PNCP": "a", "numeroItem": 2, "v": 0},
+        {"sem": "chave"},
+        {"edital_ID_C_PNCP": "a", "numeroItem": 1, "v": 2},
+    ]
+
+
+def test_compact_merges_segments_into_base(tmp_path):
+    # Compactação incorpora segmentos ao itens.json e remove os arquivos consumidos
+    store = ItemSegmentStore(str(tmp_path / "itens.json"), str(tmp_path / "segs"))
+    store.append([{"edital_ID_C_PNCP": "a", "numeroItem": 1}])
+    store.append([{"edital_ID_C_PNCP": "b", "numeroItem": 1}])
+
+    assert store.compact() == 2
+    assert store.list_segments() == []
+    with open(tmp_path / "itens.json", encoding="utf-8") as f:
+        assert len(json.load(f)) == 2
+    assert store.compact() is None
+
+
+def test_base_is_decoded_in_chunks(tmp_path, monkeypatch):
+    # A base é lida em blocos: registros cortados entre blocos são remontados
+    from backend.storage import item_segments
+    monkeypatch.setattr(item_segments, "BASE_READ_CHUNK", 7)
+    records = [{"edital_ID_C_PNCP": f"e{i}", "numeroItem": i, "descricao": "a ] } \" ç" * i} for i in range(20)]
+    (tmp_path / "itens.json").write_text(json.dumps(records, indent=2, ensure_ascii=False), encoding="utf-8")
+    store = ItemSegmentStore(str(tmp_path / "itens.json"), str(tmp_path / "segs"))
+
+    assert list(store.iter_records()) == records
@@ -0,0 +1,71 @@
+"""
+Testes das estatísticas colunares de itens (/api/itens/stats).
+
+Este módulo verifica que média, percentis e outliers calculados sobre as colunas
+NumPy batem com o cálculo direto (np.percentile), e os filtros por descrição e
+unidade e o agrupamento por unidade.
+"""
+
+import numpy as np
+import pytest
+
+from backend.storage import item_stats
+from backend.storage.snapshot_cache import DatasetSnapshot
+
+
+def _item(pos, descricao, unidade, valor):
+    return {
+        "edital_ID_C_PNCP": f"E{pos % 3}",
+        "numeroItem": pos,
+        "descricao": descricao,
+        "unidadeMedida": unidade,
+        "materialOuServicoNome": "Material",
+        "quantidade": 10,
+        "valorUnitarioEstimado": valor,
+    }
+
+
+def _snapshot(records):
+    return DatasetSnapshot(records, signature=None, generation=1)
+
+
+def _stats(snapshot, **args):
+    return item_stats.run_stats(snapshot, item_stats.parse_stats_query(args))
+
+
+def test_stats_match_numpy_and_group_by_unit():
+    # Estatísticas por grupo iguais às de np.percentile; outlier identificado pelas cercas de Tukey
+    papel = [10.0, 11.0, 12.0, 12.5, 13.0, 250.0]
+    caneta = [2.0, 2.5, 3.0]
+    records = [_item(i, "Papel sulfite A4", "resma", v) for i, v in enumerate(papel)]
+    records += [_item(10 + i, "Caneta esferográfica", " Unidade ", v) for i, v in enumerate(caneta)]
+    records.append(_item(20, "Papel sem preço", "RESMA", None))
+    snapshot = _snapshot(records)
+
+    result = _stats(snapshot, group_by="unidade", percentiles="50,90")
+    assert result["total"] == 9 and result["missing"] == 1
+    assert result["overall"]["mean"] == pytest.approx(np.mean(papel + caneta), abs=1e-4)
+    resma, unidade = result["groups"]
+    assert resma["unidade"] == "RESMA" and resma["count"] == 6
+    assert unidade["unidade"] == "UNIDADE"
+    assert resma["percentiles"]["p90"] == pytest.approx(np.percentile(papel, 90), abs=1e-4)
+    assert resma["std"] == pytest.approx(np.std(papel), abs=1e-4)
+    assert resma["outliers"] == 1 and unidade["outliers"] == 0
+    assert [row["value"] for row in result["outliers"]] == [250.0]
+    assert result["outliers"][0]["group"] == {"unidade": "RESMA"}
+
+
+def test_stats_filters_by_description_and_unit():
+    # q usa a tokenização da busca (sem acentos, plurais); filtros restringem as posições
+    snapshot = _snapshot([
+        _item(0, "Papéis A4", "resma", 10.0),
+        _item(1, "Papel A3", "resma", 20.0),
+        _item(2, "Papel A4", "caixa", 100.0),
+        _item(3, "Caneta", "unidade", 2.0),
+    ])
+    assert _stats(snapshot, q="papel a4")["total"] == 2
+    assert _stats(snapshot, q="papel", unidade="Resma")["overall"]["max"] == 20.0
+    empty = _stats(snapshot, q="inexistente")
+    assert empty["total"] == 0 and empty["overall"] is None
+    with pytest.raises(item_stats.ItemStatsError):
+        item_stats.parse_stats_query({"group_by": "orgao"})
@@ -0,0 +1,100 @@
+"""
+Testes dos snapshots Parquet de editais e itens.
+
+Este módulo verifica os esquemas tipados (timestamps, decimais, categorias),
+o agrupamento em row groups por mês de publicação (inclusive com descarga dos
+buffers em disco), a gravação pelo Exporter e a leitura com memory-map pelo
+DataManager, com filtro por mês e detecção de snapshot desatualizado.
+"""
+
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+from backend.export import exporter as exporter_module
+from backend.storage import data_manager as dm_module
+from backend.storage import parquet_snapshot
+
+EDITAIS = [
+    {
+        "ID_C_PNCP": "e1", "dataPublicacaoPncp": "2024-02-10T08:30:00", "modalidadeNome": "Pregão - Eletrônico",
+        "unidadeOrgao": {"ufSigla": "SP"}, "valorTotalEstimado": 1500.123456, "srp": True, "anoCompra": "2024",
+    },
+    {"ID_C_PNCP": "e2", "dataPublicacaoPncp": "2024-01-05", "modalidadeNome": "Dispensa", "unidadeOrgao": {"ufSigla": "RJ"}},
+    {"numeroControlePNCP": "n3", "dataPublicacaoPncp": "data inválida", "valorTotalEstimado": "abc"},
+]
+ITENS = [
+    {"edital_ID_C_PNCP": "e1", "numeroItem": 1, "descricao": "Papel", "quantidade": "10", "valorUnitarioEstimado": 2.5},
+    {"edital_ID_C_PNCP": "e2", "numeroItem": 1, "descricao": "Caneta", "unidadeMedida": "UN", "valorTotal": 7},
+    {"edital_numeroControlePNCP": "n3", "numeroItem": 1, "descricao": "Toner"},
+    {"edital_ID_C_PNCP": "x9", "numeroItem": 1, "descricao": "Sem edital"},
+    {"edital_ID_C_PNCP": "e1", "numeroItem": 2, "descricao": "Envelope"},
+]
+
+
+def _row_groups(path):
+    # (mês, linhas) de cada row group, na ordem do arquivo
+    parquet = pq.ParquetFile(path)
+    groups = []
+    for i in range(parquet.metadata.num_row_groups):
+        months = set(parquet.read_row_group(i, columns=["mesPublicacao"]).column(0).to_pylist())
+        assert len(months) == 1
+        groups.append((months.pop(), parquet.metadata.row_group(i).num_rows))
+    return groups
+
+
+def test_typed_schema_and_month_row_groups(tmp_path, monkeypatch):
+    # Tipos estáveis e um row group por mês (cronológico; sem data por último), mesmo após descarga em disco
+    monkeypatch.setattr(parquet_snapshot, "SPILL_ROWS", 2)
+    counts = parquet_snapshot.write_snapshots(str(tmp_path), EDITAIS, lambda: iter(ITENS), {"pncp.teste": "1"})
+
+    assert counts == {"editais": 3, "itens": 5}
+    editais = pq.read_table(tmp_path / "editais.parquet")
+    assert editais.schema.field("dataPublicacaoPncp").type == pa.timestamp("ms")
+    assert editais.schema.field("valorTotalEstimado").type == pa.decimal128(18, 4)
+    assert pa.types.is_dictionary(editais.schema.field("unidadeOrgao.ufSigla").type)
+    first = editais.to_pylist()[0]
+    assert first["ID_C_PNCP"] == "e2" and first["dataPublicacaoPncp"] == datetime(2024, 1, 5)
+    e1 = editais.to_pylist()[1]
+    assert e1["valorTotalEstimado"] == Decimal("1500.1235") and e1["anoCompra"] == 2024 and e1["srp"] is True
+    assert editais.to_pylist()[2]["valorTotalEstimado"] is None
+    assert _row_groups(tmp_path / "editais.parquet") == [("2024-01", 1), ("2024-02", 1), (None, 1)]
+
+    itens = pq.read_table(tmp_path / "itens.parquet")
+    assert itens.schema == parquet_snapshot.dataset_schema("itens")
+    assert _row_groups(tmp_path / "itens.parquet") == [("2024-01", 1), ("2024-02", 2), (None, 2)]
+    rows = {row["descricao"]: row for row in itens.to_pylist()}
+    assert rows["Papel"]["quantidade"] == 10.0 and rows["Papel"]["valorUnitarioEstimado"] == Decimal("2.5")
+    assert rows["Papel"]["unidadeOrgao.ufSigla"] == "SP" and rows["Papel"]["modalidadeNome"] == "Pregão - Eletrônico"
+    assert rows["Sem edital"]["mesPublicacao"] is None
+    assert parquet_snapshot.read_metadata(str(tmp_path / "itens.parquet"))["pncp.teste"] == "1"
+    assert not list(tmp_path.glob(".parquet-*"))
+
+
+def test_exporter_writes_snapshot_read_by_data_manager(tmp_path, monkeypatch):
+    # O Exporter grava os Parquet; o DataManager lê com filtro por mês e detecta dados mais novos
+    monkeypatch.setattr(dm_module, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(exporter_module, "EXPORT_DIR", str(tmp_path))
+    manager = dm_module.DataManager(backend="json")
+    manager.save_editais(EDITAIS)
+    manager.save_itens(ITENS)
+    exporter_module.Exporter().export_editais(EDITAIS)
+
+    assert manager.load_parquet_snapshot("contratos") is None
+    table = manager.load_parquet_snapshot("itens", columns=["descricao"], months=["2024-02"], fresh_only=True)
+    assert table.column("descricao").to_pylist() == ["Papel", "Envelope"]
+    assert manager.load_parquet_snapshot("editais").num_rows == 3
+
+    # Itens novos: o snapshot continua legível, mas não passa em fresh_only
+    manager.append_itens([{"edital_ID_C_PNCP": "e2", "numeroItem": 2, "descricao": "Lápis"}])
+    assert manager.load_parquet_snapshot("itens", fresh_only=True) is None
+    assert manager.load_parquet_snapshot("itens").num_rows == 5
+
+    # Parquet removido: a exportação não é pulada e o regrava
+    (tmp_path / "itens.parquet").unlink()
+    exporter_module.Exporter().export_editais(EDITAIS)
+    assert manager.load_parquet_snapshot("itens", fresh_only=True).num_rows == 6
@@ -0,0 +1,56 @@
+"""
+Testes da projeção de campos (?fields=).
+
+Este módulo verifica caminhos pontuados (inclusive dentro de listas), a
+precedência do campo inteiro sobre subcampos, as visões nomeadas com cache por
+geração do snapshot e a validação do parâmetro.
+"""
+
+import pytest
+
+from backend.storage import projection
+from backend.storage.snapshot_cache import DatasetSnapshot
+
+EDITAL = {
+    "ID_C_PNCP": "1",
+    "objetoCompra": "Aquisição",
+    "orgaoEntidade": {"cnpj": "123", "razaoSocial": "Prefeitura", "poderId": "E"},
+    "fontesOrcamentarias": [{"codigo": 1, "nome": "Tesouro"}, {"codigo": 2, "nome": "Convênio"}],
+    "amparoLegal": {"codigo": 1},
+}
+
+
+def test_project_dotted_paths():
+    # Subcampos, listas de objetos e campo inteiro prevalecendo sobre subcampo
+    fields = projection.parse_fields("ID_C_PNCP, orgaoEntidade.cnpj,fontesOrcamentarias.nome,inexistente.x")
+    assert projection.project_records([EDITAL], fields) == [{
+        "ID_C_PNCP": "1",
+        "orgaoEntidade": {"cnpj": "123"},
+        "fontesOrcamentarias": [{"nome": "Tesouro"}, {"nome": "Convênio"}],
+    }]
+    fields = projection.parse_fields("orgaoEntidade.cnpj,orgaoEntidade")
+    assert projection.project_records([EDITAL], fields) == [{"orgaoEntidade": EDITAL["orgaoEntidade"]}]
+
+
+def test_named_view_cached_per_snapshot():
+    # Visão nomeada (por nome ou pela mesma lista de campos) é calculada uma vez por geração
+    fields = projection.parse_fields("lista")
+    assert projection.view_name(fields) == "lista"
+    assert projection.view_name(projection.parse_fields(",".join(reversed(projection.PROJECTION_VIEWS["lista"])))) == "lista"
+    assert projection.view_name(projection.parse_fields("ID_C_PNCP")) is None
+
+    snapshot = DatasetSnapshot([EDITAL], signature=None, generation=1)
+    first = projection.projected_snapshot(snapshot, fields)
+    assert first is projection.projected_snapshot(snapshot, fields)
+    assert first == [{
+        "ID_C_PNCP": "1",
+        "objetoCompra": "Aquisição",
+        "orgaoEntidade": {"cnpj": "123", "razaoSocial": "Prefeitura"},
+    }]
+
+
+def test_invalid_fields():
+    # Segmentos vazios são rejeitados; parâmetro vazio desativa a projeção
+    assert projection.parse_fields("  ") is None
+    with pytest.raises(projection.ProjectionError):
+        projection.parse_fields("orgaoEntidade..cnpj")
@@ -0,0 +1,54 @@
+"""
+Testes do índice de busca textual (/api/search).
+
+Este módulo verifica a tokenização sem acentos com redução de plurais, o
+ranking por relevância (objeto pesa mais que descrição de itens), a busca por
+prefixo do último termo e a atualização incremental a cada save_editais/append_itens.
+"""
+
+from backend.storage import data_manager as dm_module
+from backend.storage.data_manager import DataManager
+from backend.storage.search_index import SearchIndex, tokenize
+
+
+def _edital(id_c, objeto, orgao="Prefeitura Municipal"):
+    return {
+        "ID_C_PNCP": id_c,
+        "numeroControlePNCP": f"N-{id_c}",
+        "objetoCompra": objeto,
+        "orgaoEntidade": {"razaoSocial": orgao},
+    }
+
+
+def _item(id_c, numero_item, descricao):
+    return {"edital_ID_C_PNCP": id_c, "edital_numeroControlePNCP": f"N-{id_c}", "numeroItem": numero_item, "descricao": descricao}
+
+
+def test_tokenize_portuguese():
+    # Sem acentos, sem stopwords e com plurais reduzidos
+    assert tokenize("Aquisição de Computadores e Licitações") == ["aquisicao", "computador", "licitacao"]
+    assert tokenize("itens materiais pães") == ["item", "material", "pao"]
+    assert tokenize(None) == []
+
+
+def test_search_ranks_and_updates_incrementally(tmp_path, monkeypatch):
+    # Objeto pesa mais que itens; novos editais/itens entram sem reconstruir o índice
+    dm_module.DATA_DIR = str(tmp_path)
+    dm = DataManager(backend="json")
+    dm.save_editais([_edital("1", "Aquisição de computadores"), _edital("2", "Serviços de limpeza")])
+    dm.append_itens([_item("2", 1, "Computador para a recepção")])
+
+    assert [(e["ID_C_PNCP"]) for e, _ in dm.search_editais("computador")] == ["1", "2"]
+    assert [e["ID_C_PNCP"] for e, _ in dm.search_editais("LIMPEZA serviço")] == ["2"]
+    assert [e["ID_C_PNCP"] for e, _ in dm.search_editais("comput")] == ["1", "2"]
+    assert dm.search_editais("de") == []
+
+    builds = []
+    monkeypatch.setattr(SearchIndex, "build", lambda self, *args: builds.append(args))
+    dm.save_editais([_edital("1", "Aquisição de mobiliário"), _edital("3", "Manutenção predial", orgao="Câmara")])
+    dm.append_itens([_item("3", 1, "Tinta acrílica para paredes")])
+
+    assert [e["ID_C_PNCP"] for e, _ in dm.search_editais("computadores")] == ["2"]
+    assert [e["ID_C_PNCP"] for e, _ in dm.search_editais("mobiliario")] == ["1"]
+    assert [e["ID_C_PNCP"] for e, _ in dm.search_editais("camara parede")] == ["3"]
+    assert builds == []
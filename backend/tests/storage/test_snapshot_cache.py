@@ -0,0 +1,63 @@
+"""
+Testes unitários do cache de snapshots em memória.
+
+Este módulo verifica que os datasets só são recarregados quando a assinatura
+do armazenamento muda e que índices derivados são construídos uma única vez.
+"""
+
+from backend.storage import data_manager as dm_module
+from backend.storage.data_manager import DataManager
+from backend.storage.snapshot_cache import SnapshotCache
+
+
+def test_reload_only_when_signature_changes():
+    # Loader só é chamado novamente quando a assinatura muda
+    cache = SnapshotCache()
+    calls = []
+    signature = {"value": 1}
+
+    def loader():
+        calls.append(1)
+        return [len(calls)]
+
+    first = cache.get("k", lambda: signature["value"], loader)
+    assert cache.get("k", lambda: signature["value"], loader) is first
+    signature["value"] = 2
+    second = cache.get("k", lambda: signature["value"], loader)
+
+    assert len(calls) == 2
+    assert second.records == [2]
+    assert second.generation > first.generation
+
+
+def test_derived_index_built_once():
+    # Índices derivados são memoizados por snapshot
+    cache = SnapshotCache()
+    snapshot = cache.get("k", lambda: 1, lambda: [1, 2, 3])
+    builds = []
+
+    def builder(records):
+        builds.append(1)
+        return sum(records)
+
+    assert snapshot.index("soma", builder) == 6
+    assert snapshot.index("soma", builder) == 6
+    assert len(builds) == 1
+
+
+def test_data_manager_snapshot_follows_writes(tmp_path):
+    # Snapshot do DataManager acompanha escritas feitas por qualquer instância
+    dm_module.DATA_DIR = str(tmp_path)
+    reader = DataManager(backend="json")
+    writer = DataManager(backend="json")
+
+    writer.save_editais([{"ID_C_PNCP": "a"}])
+    first = reader.get_editais_snapshot()
+    assert reader.get_editais_snapshot() is first
+
+    writer.save_editais([{"ID_C_PNCP": "b"}])
+    assert [e["ID_C_PNCP"] for e in reader.get_editais_snapshot().records] == ["a", "b"]
+
+    writer.save_itens([{"edital_ID_C_PNCP": "a"}])
+    writer.append_itens([{"edital_ID_C_PNCP": "b"}])
+    assert len(reader.get_itens_snapshot().records) == 2
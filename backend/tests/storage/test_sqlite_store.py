@@ -0,0 +1,182 @@
+"""
+Testes unitários do SQLiteStore e do DataManager com backend SQLite.
+
+Este módulo verifica merge por ID_C_PNCP, buscas indexadas, remoção de editais
+expirados, a substituição de itens repetidos no append (igual ao backend JSON)
+e a migração a partir dos arquivos JSON existentes.
+"""
+
+import json
+from datetime import datetime
+from backend.storage import data_manager as dm_module
+from backend.storage.data_manager import DataManager
+from backend.storage.sqlite_store import SQLiteStore, migrate_json_to_sqlite
+
+
+def test_save_editais_merges_by_id(tmp_path):
+    # Upsert mantém a ordem original e atualiza o registro existente
+    store = SQLiteStore(str(tmp_path / "pncp.db"))
+    store.save_editais([{"ID_C_PNCP": "a", "v": 1}, {"ID_C_PNCP": "b", "v": 1}])
+    existing, total = store.save_editais([{"ID_C_PNCP": "a", "v": 2}, {"ID_C_PNCP": "c", "v": 1}])
+
+    assert (existing, total) == (2, 3)
+    assert store.load_editais() == [
+        {"ID_C_PNCP": "a", "v": 2},
+        {"ID_C_PNCP": "b", "v": 1},
+        {"ID_C_PNCP": "c", "v": 1},
+    ]
+
+
+def test_indexed_lookups(tmp_path):
+    # Busca por ID_C_PNCP, numeroControlePNCP e itens por edital
+    store = SQLiteStore(str(tmp_path / "pncp.db"))
+    store.save_editais([{"ID_C_PNCP": "a", "numeroControlePNCP": "N-1"}])
+    store.save_itens([
+        {"edital_ID_C_PNCP": "a", "numeroItem": 1},
+        {"edital_ID_C_PNCP": "b", "numeroItem": 1},
+        {"edital_ID_C_PNCP": "a", "numeroItem": 2},
+    ])
+
+    assert store.get_edital_by_id("a")["numeroControlePNCP"] == "N-1"
+    assert store.get_edital_by_numero("N-1")["ID_C_PNCP"] == "a"
+    assert store.get_edital_by_id("x") is None
+    assert [i["numeroItem"] for i in store.get_itens_by_edital_id("a")] == [1, 2]
+
+
+def test_delete_expired_editais(tmp_path):
+    # Remove expirados e seus itens; mantém editais sem data ou com data inválida
+    store = SQLiteStore(str(tmp_path / "pncp.db"))
+    store.save_editais([
+        {"ID_C_PNCP": "old", "dataEncerramentoProposta": "2020-01-01T10:00:00"},
+        {"ID_C_PNCP": "new", "dataEncerramentoProposta": "2099-01-01T10:00:00"},
+        {"ID_C_PNCP": "nodate"},
+        {"ID_C_PNCP": "invalid", "dataEncerramentoProposta": "01/01/2020"},
+    ])
+    store.save_itens([{"edital_ID_C_PNCP": "old"}, {"edital_ID_C_PNCP": "new"}])
+
+    assert store.delete_expired_editais(datetime(2026, 1, 1)) == (1, 1)
+    assert [e["ID_C_PNCP"] for e in store.load_editais()] == ["new", "nodate", "invalid"]
+    assert store.load_itens() == [{"edital_ID_C_PNCP": "new"}]
+
+
+def test_data_manager_sqlite_backend(tmp_path):
+    # DataManager delega ao SQLiteStore mantendo a mesma API
+    dm_module.DATA_DIR = str(tmp_path)
+    manager = DataManager(backend="sqlite")
+
+    manager.save_editais([{"ID_C_PNCP": "a"}])
+    manager.save_itens([{"edital_ID_C_PNCP": "a"}])
+    manager.save_itens([{"edital_ID_C_PNCP": "a"}], append=True)
+
+    assert manager.load_editais() == [{"ID_C_PNCP": "a"}]
+    assert len(manager.load_itens()) == 2
+    assert manager.get_last_update() is not None
+    assert not (tmp_path / "editais.json").exists()
+
+
+def test_migrate_json_to_sqlite(tmp_path):
+    # Migração a partir dos arquivos JSON
+    (tmp_path / "editais.json").write_text(json.dumps([{"ID_C_PNCP": "a"}, {"sem": "id"}]), encoding="utf-8")
+    (tmp_path / "itens.json").write_text(json.dumps([{"edital_ID_C_PNCP": "a"}]), encoding="utf-8")
+
+    result = migrate_json_to_sqlite(str(tmp_path))
+
+    assert result == {"editais": 1, "itens": 1, "contratos": 0}
+    store = SQLiteStore(str(tmp_path / "pncp.db"))
+    assert store.get_itens_by_edital_id("a") == [{"edital_ID_C_PNCP": "a"}]
+
+
+def test_migrate_includes_pending_segments(tmp_path, monkeypatch):
+    # Itens ainda em itens.segments (não compactados) também são migrados
+    monkeypatch.setattr(dm_module, "DATA_DIR", str(tmp_path))
+    manager = DataManager(backend="json")
+    manager.save_itens([{"edital_ID_C_PNCP": "a", "numeroItem": 1, "v": 1}])
+    manager.append_itens([{"edital_ID_C_PNCP": "a", "numeroItem": 1, "v": 2}, {"edital_ID_C_PNCP": "b", "numeroItem": 1}])
+
+    assert migrate_json_to_sqlite(str(tmp_path))["itens"] == 2
+    assert SQLiteStore(str(tmp_path / "pncp.db")).get_itens_by_edital_id("a") == [{"edital_ID_C_PNCP": "a", "numeroItem": 1, "v": 2}]
+
+
+def test_migrate_replaces_itens_when_json_empty(tmp_path):
+    # itens.json ausente substitui os itens antigos do SQLite por nenhum
+    (tmp_path / "editais.json").write_text(json.dumps([{"ID_C_PNCP": "a"}]), encoding="utf-8")
+    SQLiteStore(str(tmp_path / "pncp.db")).save_itens([{"edital_ID_C_PNCP": "velho"}])
+
+    assert migrate_json_to_sqlite(str(tmp_path))["itens"] == 0
+    assert SQLiteStore(str(tmp_path / "pncp.db")).load_itens() == []
+
+
+def test_delete_expired_same_rule_on_both_backends(tmp_path, monkeypatch):
+    # Mesma limpeza nos dois backends: offsets descartados, órfãos removidos, vínculo por ID ou número
+    editais = [
+        {"ID_C_PNCP": "old", "numeroControlePNCP": "N-old", "dataEncerramentoProposta": "2020-01-01T10:00:00"},
+        {"ID_C_PNCP": "offset", "dataEncerramentoProposta": "2025-12-31T23:30:00-03:00"},
+        {"ID_C_PNCP": "zulu", "dataEncerramentoProposta": "2026-01-01T00:30:00Z"},
+        {"ID_C_PNCP": "new", "numeroControlePNCP": "N-new", "dataEncerramentoProposta": "2099-01-01T10:00:00+00:00"},
+        {"ID_C_PNCP": "nodate"},
+        {"ID_C_PNCP": "invalid", "dataEncerramentoProposta": "01/01/2020"},
+    ]
+    itens = [
+        {"edital_ID_C_PNCP": "old", "numeroItem": 1},
+        {"edital_ID_C_PNCP": "offset", "numeroItem": 1},
+        {"edital_ID_C_PNCP": "new", "numeroItem": 1},
+        {"edital_numeroControlePNCP": "N-new", "numeroItem": 2},
+        {"edital_ID_C_PNCP": "zulu", "numeroItem": 1},
+        {"edital_ID_C_PNCP": "orfao", "numeroItem": 1},
+    ]
+    results = {}
+    for backend in ("json", "sqlite"):
+        data_dir = tmp_path / backend
+        data_dir.mkdir()
+        monkeypatch.setattr(dm_module, "DATA_DIR", str(data_dir))
+        manager = DataManager(backend=backend)
+        manager.save_editais(editais)
+        manager.save_itens(itens)
+        removed = manager.delete_expired_editais(now=datetime(2026, 1, 1))
+        results[backend] = (
+            removed,
+            sorted(e["ID_C_PNCP"] for e in manager.load_editais()),
+            sorted(json.dumps(i, sort_keys=True) for i in manager.load_itens()),
+        )
+
+    assert results["json"] == results["sqlite"]
+    assert results["json"][0] == (2, 3)
+    assert results["json"][1] == ["invalid", "new", "nodate", "zulu"]
+
+
+def test_empty_save_keeps_itens(tmp_path, monkeypatch):
+    # Lista vazia (ex.: coleta sem nenhum item) não apaga os itens já salvos
+    monkeypatch.setattr(dm_module, "DATA_DIR", str(tmp_path))
+    manager = DataManager(backend="sqlite")
+    manager.save_itens([{"edital_ID_C_PNCP": "a"}])
+
+    manager.save_itens([])
+    assert manager._store.save_itens([]) == 1
+
+    assert manager.load_itens() == [{"edital_ID_C_PNCP": "a"}]
+
+
+def test_append_replaces_items_like_json_backend(tmp_path, monkeypatch):
+    # Mesma sequência de appends (checkpoint repetido, edital rebuscado) nos dois backends
+    appends = [
+        [{"edital_ID_C_PNCP": "a", "numeroItem": 1, "v": 2}, {"edital_ID_C_PNCP": "c", "numeroItem": 1}],
+        [{"edital_ID_C_PNCP": "a", "numeroItem": "2", "v": 2}, {"edital_ID_C_PNCP": "a", "descricao": "sem número"}],
+        [{"edital_ID_C_PNCP": "a", "numeroItem": 1, "v": 3}, {"edital_ID_C_PNCP": "c", "numeroItem": 1}],
+    ]
+    loaded = {}
+    for backend in ("json", "sqlite"):
+        monkeypatch.setattr(dm_module, "DATA_DIR", str(tmp_path / backend))
+        manager = DataManager(backend=backend)
+        manager.save_itens([
+            {"edital_ID_C_PNCP": "a", "numeroItem": 1, "v": 1},
+            {"edital_ID_C_PNCP": "a", "numeroItem": 2, "v": 1},
+            {"edital_ID_C_PNCP": "b", "numeroItem": 1},
+        ])
+        for itens in appends:
+            manager.append_itens([dict(item) for item in itens])
+        loaded[backend] = manager.load_itens()
+
+    assert loaded["sqlite"] == loaded["json"]
+    assert [(i["edital_ID_C_PNCP"], i.get("numeroItem"), i.get("v")) for i in loaded["sqlite"]] == [
+        ("b", 1, None), ("a", "2", 2), ("a", None, None), ("a", 1, 3), ("c", 1, None),
+    ]
@@ -0,0 +1,66 @@
+"""
+Testes da compressão de respostas (gzip/brotli).
+
+Este módulo verifica a negociação por Accept-Encoding, o limite mínimo de
+tamanho, a ETag distinta por codificação, o cache do corpo comprimido por
+geração do snapshot e o uso de irmãos pré-comprimidos dos arquivos estáticos.
+"""
+
+import gzip
+
+from flask import Flask, request
+
+from backend.storage.snapshot_cache import DatasetSnapshot
+from backend.web import compression
+
+app = Flask(__name__)
+
+
+def test_compress_response_threshold_and_etag():
+    # Corpo grande é comprimido e a ETag ganha o sufixo; corpo pequeno fica intacto
+    body = '{"data": "' + "x" * 5000 + '"}'
+    with app.test_request_context(headers={"Accept-Encoding": "gzip;q=0.8, identity"}):
+        response = app.response_class(body, mimetype="application/json")
+        response.set_etag("abc")
+        compression.compress_response(response, request)
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert response.get_etag() == ("abc-gzip", False)
+        assert gzip.decompress(response.get_data()).decode() == body
+
+        small = compression.compress_response(app.response_class("{}", mimetype="application/json"), request)
+        assert "Content-Encoding" not in small.headers
+
+    with app.test_request_context():
+        response = compression.compress_response(app.response_class(body, mimetype="application/json"), request)
+        assert "Content-Encoding" not in response.headers
+
+
+def test_compressed_body_cached_per_snapshot(monkeypatch):
+    # Mesma geração reaproveita o corpo comprimido
+    calls = []
+    original = compression.compress
+    monkeypatch.setattr(compression, "compress", lambda body, encoding: calls.append(encoding) or original(body, encoding))
+    snapshot = DatasetSnapshot([], signature=None, generation=1)
+    body = "[" + ",".join(["1"] * 2000) + "]"
+    with app.test_request_context(headers={"Accept-Encoding": "gzip"}):
+        for _ in range(3):
+            response = compression.cached_compressed_response(app.response_class, request, snapshot, "lista", body, "application/json")
+    assert calls == ["gzip"]
+    assert gzip.decompress(response.get_data()).decode() == body
+
+
+def test_send_static_prefers_precompressed(tmp_path):
+    # Irmão .gz é servido com o tipo do original; sem Accept-Encoding, o original
+    (tmp_path / "app-1a2b3c4d.js").write_text("console.log(1)")
+    (tmp_path / "app-1a2b3c4d.js.gz").write_bytes(gzip.compress(b"console.log(1)"))
+    with app.test_request_context(headers={"Accept-Encoding": "br, gzip"}):
+        response = compression.send_static(request, str(tmp_path), "app-1a2b3c4d.js")
+        response.direct_passthrough = False
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert response.mimetype == "text/javascript"
+        assert gzip.decompress(response.get_data()) == b"console.log(1)"
+    with app.test_request_context():
+        response = compression.send_static(request, str(tmp_path), "app-1a2b3c4d.js")
+        response.direct_passthrough = False
+        assert "Content-Encoding" not in response.headers
+        assert response.get_data() == b"console.log(1)"
@@ -0,0 +1,95 @@
+"""
+Testes das métricas em memória expostas em /metrics.
+
+Este módulo verifica o formato de texto do Prometheus gerado pelo registro
+(HELP/TYPE, rótulos, buckets cumulativos dos histogramas), a validação de nomes
+e rótulos, a normalização dos endpoints do PNCP usada como rótulo e a
+instrumentação das leituras/escritas do DataManager.
+"""
+
+import pytest
+
+from backend.api_client.pncp_client import endpoint_label
+from backend.monitoring.metrics import Counter, Gauge, Histogram, MetricsRegistry
+from backend.storage import data_manager as dm_module
+
+
+def test_render_counter_and_gauge():
+    # Amostras ordenadas por rótulos, com HELP/TYPE e escape de aspas
+    registry = MetricsRegistry()
+    requests = registry.register(Counter, "app_requests_total", "Requisições", ("status",))
+    running = registry.register(Gauge, "app_running", "Em andamento")
+    requests.inc(status=200)
+    requests.inc(2, status=200)
+    requests.inc(status='a"b')
+    running.inc()
+    running.inc()
+    running.dec()
+    text = registry.render()
+    assert "# HELP app_requests_total Requisições" in text
+    assert "# TYPE app_requests_total counter" in text
+    assert 'app_requests_total{status="200"} 3' in text
+    assert 'app_requests_total{status="a\\"b"} 1' in text
+    assert "app_running 1" in text
+    assert text.endswith("\n")
+
+
+def test_histogram_cumulative_buckets():
+    # Buckets cumulativos (le inclusivo), +Inf, soma e contagem
+    registry = MetricsRegistry()
+    latency = registry.register(Histogram, "op_seconds", "Duração", ("op",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.observe(value, op="x")
+    with latency.time(op="y"):
+        pass
+    text = registry.render()
+    assert 'op_seconds_bucket{op="x",le="0.1"} 2' in text
+    assert 'op_seconds_bucket{op="x",le="1"} 3' in text
+    assert 'op_seconds_bucket{op="x",le="+Inf"} 4' in text
+    assert 'op_seconds_sum{op="x"} 3.65' in text
+    assert 'op_seconds_count{op="x"} 4' in text
+    assert latency.count(op="y") == 1
+
+
+def test_metric_validation():
+    # Contadores exigem _total, só aumentam e rótulos devem bater com os declarados
+    registry = MetricsRegistry()
+    with pytest.raises(ValueError):
+        registry.register(Counter, "app_requests", "Sem sufixo")
+    counter = registry.register(Counter, "app_errors_total", "Erros", ("kind",))
+    with pytest.raises(ValueError):
+        counter.inc(-1, kind="x")
+    with pytest.raises(ValueError):
+        counter.inc(other="x")
+    assert registry.register(Counter, "app_errors_total", "Erros", ("kind",)) is counter
+    with pytest.raises(ValueError):
+        registry.register(Gauge, "app_errors_total", "Erros", ("kind",))
+
+
+def test_endpoint_label_normalizes_ids():
+    # Host, query string e segmentos numéricos não viram rótulos distintos
+    assert endpoint_label("https://pncp.gov.br/api/consulta/v1/contratacoes/proposta?pagina=3") == (
+        "/api/consulta/v1/contratacoes/proposta"
+    )
+    assert endpoint_label("https://pncp.gov.br/api/pncp/v1/orgaos/00394460000141/compras/2024/15/itens") == (
+        "/api/pncp/v1/orgaos/:id/compras/:id/:id/itens"
+    )
+
+
+def test_data_manager_storage_metrics(tmp_path):
+    # Escritas/leituras do backend JSON registram duração e bytes por operação
+    dm_module.DATA_DIR = str(tmp_path)
+    manager = dm_module.DataManager(backend="json")
+    saved = dm_module.STORAGE_BYTES.value(operation="save", dataset="itens")
+    appended = dm_module.STORAGE_BYTES.value(operation="append", dataset="itens")
+    loads = dm_module.STORAGE_DURATION.count(operation="load", dataset="itens", backend="json")
+
+    manager.save_itens([{"edital_ID_C_PNCP": "a", "numeroItem": 1}])
+    after_save = dm_module.STORAGE_BYTES.value(operation="save", dataset="itens")
+    assert after_save > saved
+    manager.save_itens([{"edital_ID_C_PNCP": "a", "numeroItem": 2}], append=True)
+    # O append delega para append_itens: conta bytes de append, não de save
+    assert dm_module.STORAGE_BYTES.value(operation="save", dataset="itens") == after_save
+    assert dm_module.STORAGE_BYTES.value(operation="append", dataset="itens") > appended
+    assert len(manager.load_itens()) == 2
+    assert dm_module.STORAGE_DURATION.count(operation="load", dataset="itens", backend="json") == loads + 1
@@ -0,0 +1,44 @@
+"""
+Testes das respostas NDJSON em streaming.
+
+Este módulo verifica a detecção do modo streaming (?stream=1 ou Accept) e que o
+corpo é gerado em blocos, um registro por linha, sem montar a lista inteira.
+"""
+
+import json
+
+from flask import Flask, request
+
+from backend.web import streaming
+
+app = Flask(__name__)
+
+
+def test_wants_ndjson():
+    # ?stream=1 ou Accept: application/x-ndjson; navegador (*/*) continua em JSON
+    with app.test_request_context("/?stream=1"):
+        assert streaming.wants_ndjson(request)
+    with app.test_request_context(headers={"Accept": "application/x-ndjson"}):
+        assert streaming.wants_ndjson(request)
+    with app.test_request_context(headers={"Accept": "text/html,*/*;q=0.8"}):
+        assert not streaming.wants_ndjson(request)
+
+
+def test_ndjson_response_streams_in_batches():
+    # Registros consumidos sob demanda pelo gerador, em blocos de batch_size linhas
+    consumed = []
+
+    def records():
+        for n in range(5):
+            consumed.append(n)
+            yield {"n": n}
+
+    chunks = streaming.iter_ndjson(records(), json.dumps, batch_size=2)
+    assert next(chunks) == '{"n": 0}\n{"n": 1}\n'
+    assert consumed == [0, 1]
+    assert list(chunks) == ['{"n": 2}\n{"n": 3}\n', '{"n": 4}\n']
+
+    response = streaming.ndjson_response(app.response_class, [{"n": 1}], json.dumps, total=1)
+    assert response.is_streamed
+    assert response.headers["X-Total-Count"] == "1"
+    assert response.mimetype == "application/x-ndjson"
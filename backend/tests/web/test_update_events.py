@@ -0,0 +1,98 @@
+"""
+Testes do progresso das execuções de atualização via Server-Sent Events.
+
+Este módulo verifica o estado publicado por UpdateProgress (contadores, fase e
+estimativa de término) e o stream SSE: estado atual ao conectar, eventos a cada
+mudança, evento final "end" e retomada com Last-Event-ID, além do update_id
+devolvido pelo disparo assíncrono do DailyJob.
+"""
+
+import json
+import threading
+import time
+
+from backend.scheduler.progress import ProgressRegistry, UpdateProgress
+from backend.web import streaming
+
+
+def _parse(chunks):
+    # Converte os blocos SSE em [(id, event, data)], ignorando keepalives
+    events = []
+    for chunk in chunks:
+        if chunk.startswith(":"):
+            continue
+        fields = dict(line.split(": ", 1) for line in chunk.strip().split("\n"))
+        events.append((int(fields["id"]), fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def test_progress_state_and_eta():
+    # ETA da fase = tempo na fase * restante / feito; fim marca status e fase final
+    now = [0.0]
+    progress = UpdateProgress("u1", "daily", clock=lambda: now[0])
+    progress.update(phase="editais", pages_total=10)
+    now[0] = 20.0
+    progress.update(pages_fetched=4)
+    sequence, state = progress.snapshot()
+    assert sequence == 2
+    assert state["eta_seconds"] == 30.0
+    assert state["rate_limit"]["rate"] > 0
+    progress.increment(itens_collected=5)
+    progress.increment(itens_collected=3, itens_editais_total=1)
+    assert progress.snapshot()[1]["itens_collected"] == 8
+    progress.finish()
+    state = progress.snapshot()[1]
+    assert state["status"] == "completed" and state["phase"] == "concluido"
+    progress.update(pages_fetched=9)  # ignorado depois do fim
+    assert progress.snapshot()[1]["pages_fetched"] == 4
+
+
+def test_sse_stream_until_end_and_resume():
+    # Stream recebe o estado atual, as mudanças e o evento final; Last-Event-ID retoma
+    registry = ProgressRegistry(limit=1)
+    progress = registry.start("u1", "incremental")
+    stream = streaming.iter_progress_events(progress, json.dumps, keepalive=5, min_interval=0)
+    first = next(stream)
+
+    def job():
+        progress.update(phase="editais", pages_fetched=1, pages_total=2)
+        progress.finish(error=RuntimeError("API fora do ar"))
+
+    threading.Thread(target=job).start()
+    events = _parse([first] + list(stream))
+    assert events[0][1] == "progress" and events[0][2]["phase"] == "iniciando"
+    assert events[-1][1] == "end"
+    assert events[-1][2]["status"] == "failed" and events[-1][2]["error"] == "API fora do ar"
+    assert [event_id for event_id, _, _ in events] == sorted(event_id for event_id, _, _ in events)
+
+    resumed = _parse(streaming.iter_progress_events(progress, json.dumps, last_event_id=events[-1][0], min_interval=0))
+    assert [event for _, event, _ in resumed] == ["end"]
+
+    registry.start("u2", "daily")
+    assert registry.get("u1") is None
+
+
+def test_async_trigger_returns_update_id_and_ends_stream(tmp_path, monkeypatch):
+    # Execução que falha logo ainda tem update_id e evento final; com outra em andamento, nada é registrado
+    from backend.scheduler import job as job_module
+    from backend.storage import data_manager as dm_module
+
+    monkeypatch.setattr(dm_module, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(job_module, "get_progress_registry", lambda: registry)
+    registry = ProgressRegistry(limit=5)
+    daily_job = job_module.DailyJob()
+
+    def broken_sync(**kwargs):
+        raise RuntimeError("API fora do ar")
+
+    daily_job.editais_service.sync_editais = broken_sync
+    update_id = daily_job.run_incremental_async()
+    events = _parse(streaming.iter_progress_events(registry.get(update_id), json.dumps, min_interval=0))
+    assert events[-1][1] == "end" and events[-1][2]["error"] == "API fora do ar"
+
+    while daily_job.is_running:
+        time.sleep(0.01)
+    daily_job.is_running = True
+    assert daily_job.run_incremental_async() is None
+    assert daily_job.run_now_async() is None
+    assert registry.get(update_id) is not None and len(registry._updates) == 1
@@ -8,18 +8,28 @@ e gerenciamento de sessões de usuário.
 
 import os
 import re
+import hashlib
+import hmac
 import logging
+import time
 from datetime import datetime, timedelta
+from functools import wraps
 
-from flask import Flask, jsonify, send_file, request, send_from_directory
+from flask import Flask, g, jsonify, send_file, request, send_from_directory
 from flask_cors import CORS
 from flask_login import LoginManager, login_user, login_required, logout_user, current_user
 from flask_wtf.csrf import CSRFProtect
 
 import backend.storage.auth_db as auth_db
 from backend.web.clerk_auth import clerk_login_required
+from backend.web import compression, streaming
+from backend.api_client.rate_limiter import get_rate_limiter
+from backend.api_client.http_cache import get_http_cache
+from backend.monitoring import metrics
+from backend.scheduler.progress import get_progress_registry
 from backend.services.editais_service import EditaisService
 from backend.storage.data_manager import DataManager
+from backend.storage import editais_query, facets, item_stats, parquet_snapshot, projection
 from backend.storage.auth_db import (
     init_db,
     get_user_by_id,
@@ -37,6 +47,9 @@ from backend.config import (
     SESSION_COOKIE_HTTPONLY,
     SESSION_COOKIE_SAMESITE,
     DATABASE_URL,
+    STATIC_ASSETS_MAX_AGE,
+    METRICS_ENABLED,
+    METRICS_TOKEN,
 )
 from backend.export.exporter import Exporter
 
@@ -145,8 +158,91 @@ def unauthorized():
         return jsonify({"error": "unauthorized"}), 401
     return _serve_spa()
 
+# Arquivos gerados pelo build do Vite com hash no nome (ex.: index-BX3k_a9Q.js)
+_HASHED_ASSET_RE = re.compile(r"-(?=[A-Za-z0-9_-]*[A-Z0-9])[A-Za-z0-9_-]{8,}\.[A-Za-z0-9]+$")
+
+
+def _dataset_etag(*datasets):
+    """
+    ETag forte da requisição atual: assinatura de armazenamento dos datasets usados
+    (contador de geração no SQLite, mtime/tamanho dos arquivos no JSON) + rota e
+    parâmetros. Igual entre processos e reinícios enquanto os dados não mudarem.
+    """
+    signatures = []
+    for dataset in datasets:
+        if dataset == "editais":
+            signatures.append(editais_service.get_editais_snapshot().signature)
+        else:
+            signatures.append(data_manager.get_itens_snapshot().signature)
+    variant = (request.path, sorted(request.args.items(multi=True)), streaming.wants_ndjson(request), signatures)
+    return hashlib.sha1(repr(variant).encode("utf-8")).hexdigest()[:32]
+
+
+def conditional_dataset(*datasets):
+    """
+    Decorator de rotas de dados: envia ETag derivado da geração dos datasets e
+    responde 304 a If-None-Match correspondente, sem montar o corpo da resposta.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            etag = _dataset_etag(*datasets)
+            for candidate in compression.encoded_etags(etag):
+                if request.if_none_match.contains(candidate):
+                    response = app.response_class(status=304)
+                    response.set_etag(candidate)
+                    return response
+            response = app.make_response(f(*args, **kwargs))
+            if response.status_code == 200:
+                encoding = response.headers.get("Content-Encoding")
+                response.set_etag(f"{etag}-{encoding}" if encoding else etag)
+            return response
+        return decorated
+    return decorator
+
+
+HTTP_REQUEST_DURATION = metrics.histogram(
+    "http_request_duration_seconds", "Duração das requisições HTTP por rota", ("method", "route", "status")
+)
+
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+
+@app.after_request
+def observe_request(response):
+    # Registrado antes de compress_response para rodar por último (inclui a compressão);
+    # a rota é o padrão da URL (ex.: /api/editais/<path:edital_key>), não o caminho pedido
+    started = g.pop("request_started", None)
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        HTTP_REQUEST_DURATION.observe(
+            time.perf_counter() - started, method=request.method, route=route, status=response.status_code
+        )
+    return response
+
+
+@app.after_request
+def compress_response(response):
+    # gzip/brotli negociado para respostas acima de COMPRESSION_MIN_SIZE
+    return compression.compress_response(response, request)
+
+
 @app.after_request
 def add_header(response):
+    if request.path.startswith("/assets/") and response.status_code in (200, 304):
+        if _HASHED_ASSET_RE.search(request.path):
+            # Nome com hash muda a cada build: pode ficar em cache indefinidamente
+            response.headers["Cache-Control"] = f"public, max-age={STATIC_ASSETS_MAX_AGE}, immutable"
+        else:
+            response.headers["Cache-Control"] = "public, no-cache"
+        return response
+    if response.headers.get("ETag"):
+        # Rotas de dados: o navegador guarda a resposta, mas revalida sempre (If-None-Match -> 304)
+        response.headers["Cache-Control"] = "private, no-cache"
+        return response
     # Evita cache no navegador
     response.headers["Cache-Control"] = "no-cache, no-store, must-revalidate"
     response.headers["Pragma"] = "no-cache"
@@ -203,20 +299,141 @@ def api_secure_clerk():
 def spa():
     return _serve_spa()
 
+def _itens_response(itens):
+    # Itens de um edital em JSON ou NDJSON, com projeção opcional (?fields=)
+    try:
+        fields = projection.parse_fields(request.args.get("fields"))
+    except projection.ProjectionError as e:
+        return jsonify({"error": str(e)}), 400
+    if fields:
+        itens = projection.project_records(itens, fields)
+    if streaming.wants_ndjson(request):
+        return _ndjson(itens, len(itens))
+    return jsonify({"total": len(itens), "data": itens})
+
+
+def _ndjson(records, total):
+    # Lista em NDJSON (um registro por linha, enviado em blocos por um gerador)
+    return streaming.ndjson_response(app.response_class, records, app.json.dumps, total)
+
+
 @app.route("/api/editais")
 @clerk_login_required
+@conditional_dataset("editais")
 def api_editais():
-    # Retorna editais em JSON
-    editais = editais_service.get_all_editais_local()
-    return jsonify({"total": len(editais), "data": editais})
+    # Retorna editais em JSON (corpo serializado uma vez por snapshot).
+    # Com page/page_size, sort/order ou filtros, retorna apenas a página pedida e os totais.
+    # Com fields=, retorna apenas os campos pedidos (visões nomeadas ficam em cache por geração).
+    snapshot = editais_service.get_editais_snapshot()
+    try:
+        fields = projection.parse_fields(request.args.get("fields"))
+    except projection.ProjectionError as e:
+        return jsonify({"error": str(e)}), 400
+    if editais_query.wants_query(request.args):
+        try:
+            query = editais_query.parse_query(request.args)
+        except editais_query.EditaisQueryError as e:
+            return jsonify({"error": str(e)}), 400
+        result = editais_query.run_query(snapshot, query)
+        if fields:
+            result["data"] = projection.project_records(result["data"], fields)
+        if streaming.wants_ndjson(request):
+            return _ndjson(result["data"], result["total"])
+        return jsonify(result)
+
+    view = projection.view_name(fields) if fields else None
+    if view:
+        records = projection.projected_snapshot(snapshot, fields)
+    elif fields:
+        tree = projection.compile_projection(fields)
+        records = (projection.project(edital, tree) for edital in snapshot.records)
+    else:
+        records = snapshot.records
+    if streaming.wants_ndjson(request):
+        return _ndjson(records, len(snapshot.records))
+    if fields and not view:
+        return jsonify({"total": len(snapshot.records), "data": list(records)})
+
+    name = f"api_editais_json:{view}" if view else "api_editais_json"
+    body = snapshot.index(
+        name,
+        lambda editais: app.json.dumps({"total": len(editais), "data": records}),
+    )
+    # Corpo comprimido também é guardado no snapshot (uma compressão por geração)
+    return compression.cached_compressed_response(
+        app.response_class, request, snapshot, name, body, "application/json"
+    )
+
+
+@app.route("/api/search")
+@clerk_login_required
+@conditional_dataset("editais", "itens")
+def api_search():
+    # Busca textual (objeto, órgão, descrição dos itens) com resultados ranqueados e paginados
+    query = (request.args.get("q") or "").strip()
+    if not query:
+        return jsonify({"error": "Parâmetro 'q' é obrigatório"}), 400
+    try:
+        page = max(1, int(request.args.get("page", 1)))
+        page_size = min(max(1, int(request.args.get("page_size", 20))), editais_query.MAX_PAGE_SIZE)
+    except ValueError:
+        return jsonify({"error": "Parâmetros 'page' e 'page_size' devem ser números inteiros"}), 400
+    results = editais_service.search_editais(query)
+    start = (page - 1) * page_size
+    return jsonify({
+        "query": query,
+        "total": len(results),
+        "page": page,
+        "page_size": page_size,
+        "pages": (len(results) + page_size - 1) // page_size,
+        "data": [dict(edital, score=round(score, 4)) for edital, score in results[start:start + page_size]],
+    })
+
+
+@app.route("/api/editais/facets")
+@clerk_login_required
+@conditional_dataset("editais")
+def api_editais_facets():
+    # Contagem e soma de valor por UF, modalidade, órgão e faixa de valor (agregados pré-calculados)
+    try:
+        limit = int(request.args.get("limit", 100))
+    except ValueError:
+        return jsonify({"error": "Parâmetro 'limit' deve ser um número inteiro"}), 400
+    result = facets.editais_facets(editais_service.get_editais_snapshot()).to_dict(limit=max(0, limit))
+    return jsonify(result)
+
+
+@app.route("/api/editais/by-id/<path:id_c_pncp>")
+@clerk_login_required
+@conditional_dataset("editais", "itens")
+def api_edital_by_id(id_c_pncp):
+    # Edital por ID_C_PNCP (índice hash) com os itens embutidos em uma única resposta.
+    # itens_page/itens_page_size paginam os itens (padrão: todos).
+    edital = editais_service.get_edital_by_id(id_c_pncp)
+    if not edital:
+        return jsonify({"error": "Edital não encontrado"}), 404
+    itens = editais_service.get_itens_by_edital_id(id_c_pncp)
+    try:
+        page = max(1, int(request.args.get("itens_page", 1)))
+        page_size = int(request.args.get("itens_page_size", 0)) or len(itens) or 1
+    except ValueError:
+        return jsonify({"error": "Parâmetros 'itens_page' e 'itens_page_size' devem ser números inteiros"}), 400
+    page_size = max(1, page_size)
+    start = (page - 1) * page_size
+    return jsonify({
+        "data": dict(edital, itens=itens[start:start + page_size]),
+        "itens_total": len(itens),
+        "itens_page": page,
+        "itens_page_size": page_size,
+        "itens_pages": (len(itens) + page_size - 1) // page_size,
+    })
 
 
 @app.route("/api/editais/<path:edital_key>")
 @clerk_login_required
+@conditional_dataset("editais")
 def api_edital_detail(edital_key):
-    parts = edital_key.split("_")
-    if len(parts) != 3:
-        return jsonify({"error": "Edital não encontrado"}), 404
+    # Busca por numeroControlePNCP ou ID_C_PNCP (índices hash do snapshot)
     edital = editais_service.get_edital_by_key(edital_key)
     if not edital:
         return jsonify({"error": "Edital não encontrado"}), 404
@@ -225,6 +442,7 @@ def api_edital_detail(edital_key):
 
 @app.route("/api/editais/<path:edital_key>/itens")
 @clerk_login_required
+@conditional_dataset("editais", "itens")
 def api_edital_itens(edital_key):
     # Busca itens por ID_C_PNCP (vinculo único)
     edital = editais_service.get_edital_by_key(edital_key)
@@ -234,19 +452,34 @@ def api_edital_itens(edital_key):
     if not id_c_pncp:
         return jsonify({"error": "Edital sem ID_C_PNCP"}), 404
     itens = editais_service.get_itens_by_edital_id(id_c_pncp)
-    return jsonify({"total": len(itens), "data": itens})
+    return _itens_response(itens)
+
+
+@app.route("/api/itens/stats")
+@clerk_login_required
+@conditional_dataset("itens")
+def api_itens_stats():
+    # Estatísticas vetorizadas (média, percentis, outliers) de preço/quantidade dos itens,
+    # com filtros por termos da descrição (q), unidade e material e agrupamento (group_by)
+    try:
+        query = item_stats.parse_stats_query(request.args)
+    except item_stats.ItemStatsError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(item_stats.run_stats(editais_service.get_itens_snapshot(), query))
 
 
 @app.route("/api/itens/<path:id_c_pncp>")
 @clerk_login_required
+@conditional_dataset("itens")
 def api_itens_by_id_c_pncp(id_c_pncp):
     # Busca itens diretamente por ID_C_PNCP
     itens = editais_service.get_itens_by_edital_id(id_c_pncp)
-    return jsonify({"total": len(itens), "data": itens})
+    return _itens_response(itens)
 
 
 @app.route("/api/editais/count")
 @clerk_login_required
+@conditional_dataset("editais")
 def api_editais_count():
     """Retorna apenas a contagem de editais (tempo real)."""
     editais = editais_service.get_all_editais_local()
@@ -270,10 +503,23 @@ def api_status():
         "total_editais": len(editais),
         "last_update": datetime.fromtimestamp(last_update).isoformat() if last_update else None,
         "scheduler": daily_job.get_status() if daily_job else None,
+        "rate_limiter": get_rate_limiter().stats(),
+        "http_cache": get_http_cache().stats() if get_http_cache() else None,
         **user_info
     }
     return jsonify(status)
 
+@app.route("/metrics")
+def prometheus_metrics():
+    # Métricas do processo no formato de texto do Prometheus (sem login Clerk: o
+    # scraper usa METRICS_TOKEN; sem token configurado a rota não é exposta)
+    if not METRICS_ENABLED or not METRICS_TOKEN:
+        return jsonify({"error": "Not found"}), 404
+    provided = request.headers.get("Authorization", "")
+    if not hmac.compare_digest(provided.encode(), f"Bearer {METRICS_TOKEN}".encode()):
+        return jsonify({"error": "Unauthorized"}), 401
+    return app.response_class(metrics.render(), mimetype=None, content_type=metrics.CONTENT_TYPE)
+
 @app.route("/api/trigger-update", methods=["POST"])
 @csrf.exempt
 @login_required
@@ -283,26 +529,42 @@ def trigger_update():
         if daily_job.is_running:
             return jsonify({"status": "error", "message": "Update already in progress"}), 409
         # Start incremental sync by default when triggered manually
-        started = False
+        # (update_id vem do próprio disparo: a execução pode terminar antes desta resposta)
         if hasattr(daily_job, 'run_incremental_async'):
-            started = daily_job.run_incremental_async()
+            update_id = daily_job.run_incremental_async()
         else:
-            started = daily_job.run_now_async()
-        if started:
+            update_id = daily_job.run_now_async()
+        if update_id:
             return jsonify({
                 "status": "success",
                 "message": "Update started in background",
-                "update_id": daily_job.current_update_id
+                "update_id": update_id
             })
         else:
-            return jsonify({"status": "error", "message": "Could not start update"}), 500
+            return jsonify({"status": "error", "message": "Update already in progress"}), 409
     return jsonify({"status": "error", "message": "Scheduler not available"}), 500
 
+@app.route("/api/updates/<update_id>/events")
+@clerk_login_required
+def api_update_events(update_id):
+    # Progresso de uma execução (update_id de /api/trigger-update) como Server-Sent Events:
+    # um evento "progress" por mudança de estado e um evento "end" ao término
+    progress = get_progress_registry().get(update_id)
+    if progress is None:
+        return jsonify({"error": "Atualização não encontrada"}), 404
+    try:
+        last_event_id = int(request.headers["Last-Event-ID"])
+    except (KeyError, ValueError):
+        last_event_id = None
+    return streaming.progress_response(app.response_class, progress, app.json.dumps, last_event_id)
+
 @app.route("/download/<filename>")
 @clerk_login_required
 def download_file(filename):
-    # Download de arquivos CSV/XLSX exportados (gerados no startup/background)
+    # Download de arquivos CSV/XLSX/Parquet exportados (gerados no startup/background)
     allowed_files = ["editais.csv", "editais.xlsx"]
+    if parquet_snapshot.is_available():
+        allowed_files += ["editais.parquet", "itens.parquet"]
     if filename not in allowed_files:
         return jsonify({"error": "File not found"}), 404
     file_path = os.path.join(DATA_DIR, filename)
@@ -316,7 +578,9 @@ def download_file(filename):
             return jsonify({"error": "File not available yet. Export is still running, try again in a few seconds."}), 503
     if not os.path.exists(file_path):
         return jsonify({"error": "File not available yet. Export is still running, try again in a few seconds."}), 503
-    return send_file(file_path, as_attachment=True)
+    # ETag = origem dos dados exportados (If-None-Match -> 304 enquanto a exportação não mudar)
+    tag = exporter.editais_export_tag()
+    return send_file(file_path, as_attachment=True, etag=f"{tag}-{filename}" if tag else True)
 
 
 @app.route("/login", methods=["GET", "POST"])
@@ -410,7 +674,7 @@ def spa_routes(edital_key=None):
 
 @app.route("/assets/<path:filename>")
 def serve_assets(filename):
-    return send_from_directory(os.path.join(REACT_DIST_DIR, "assets"), filename)
+    return compression.send_static(request, os.path.join(REACT_DIST_DIR, "assets"), filename)
 
 
 @app.route("/<path:path>")
@@ -418,7 +682,7 @@ def serve_spa_fallback(path):
     """Serve index.html para qualquer rota não-API (SPA fallback)."""
     full_path = os.path.join(REACT_DIST_DIR, path)
     if os.path.exists(full_path) and os.path.isfile(full_path):
-        return send_from_directory(REACT_DIST_DIR, path)
+        return compression.send_static(request, REACT_DIST_DIR, path)
     return _serve_spa()
 
 if __name__ == "__main__":
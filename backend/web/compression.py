@@ -0,0 +1,154 @@
+"""
+Compressão de respostas HTTP (gzip/brotli) negociada por Accept-Encoding.
+
+Este módulo é usado pela aplicação Flask para:
+
+- comprimir respostas de API acima de COMPRESSION_MIN_SIZE bytes (after_request),
+  preferindo brotli quando o pacote opcional `brotli` está instalado;
+- guardar o corpo já comprimido da lista completa de editais por geração do
+  snapshot, para não recomprimir o mesmo JSON a cada requisição;
+- servir irmãos pré-comprimidos (.br/.gz) dos arquivos estáticos do build.
+
+Respostas em streaming, de arquivos (send_file) ou já codificadas não são alteradas.
+"""
+
+import gzip
+import mimetypes
+import os
+import logging
+from flask import send_from_directory
+from werkzeug.security import safe_join
+from backend.config import COMPRESSION_ENABLED, COMPRESSION_MIN_SIZE
+
+try:
+    import brotli
+except ImportError:  # Extra opcional: pip install .[compression]
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+# Tipos que valem a pena comprimir (imagens, planilhas e zips já são comprimidos)
+_COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "text/",
+    "image/svg+xml",
+)
+
+# Extensão do arquivo pré-comprimido de cada codificação
+_STATIC_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+
+def available_encodings():
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate(accept_encodings, encodings=None):
+    """
+    Escolhe a codificação aceita pelo cliente (maior qualidade; brotli no empate)
+    entre `encodings` (padrão: as disponíveis). Retorna None se nenhuma for aceita.
+    """
+    best, best_quality = None, 0
+    for encoding in encodings or available_encodings():
+        quality = accept_encodings[encoding]
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(body, encoding):
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def _is_compressible(response):
+    mimetype = response.mimetype or ""
+    return any(mimetype.startswith(prefix) for prefix in _COMPRESSIBLE_TYPES)
+
+
+def _tag_encoding(response, encoding):
+    # Representações diferentes precisam de ETags fortes diferentes
+    response.headers["Content-Encoding"] = encoding
+    response.vary.add("Accept-Encoding")
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(f"{etag}-{encoding}", weak=weak)
+
+
+def encoded_etags(etag):
+    """
+    ETags possíveis de uma representação (sem compressão e com cada codificação).
+    """
+    return [etag] + [f"{etag}-{encoding}" for encoding in ("br", "gzip")]
+
+
+def compress_response(response, request):
+    """
+    Comprime a resposta (after_request) se o cliente aceitar e o corpo for grande o bastante.
+    """
+    if (
+        not COMPRESSION_ENABLED
+        or response.status_code != 200
+        or response.direct_passthrough
+        or response.is_streamed
+        or "Content-Encoding" in response.headers
+        or not _is_compressible(response)
+    ):
+        return response
+    response.vary.add("Accept-Encoding")
+    encoding = negotiate(request.accept_encodings)
+    if encoding is None:
+        return response
+    body = response.get_data()
+    if len(body) < COMPRESSION_MIN_SIZE:
+        return response
+    response.set_data(compress(body, encoding))
+    _tag_encoding(response, encoding)
+    return response
+
+
+def cached_compressed_response(response_class, request, snapshot, name, body, mimetype):
+    """
+    Resposta com `body` comprimido uma única vez por geração do snapshot
+    (índice derivado "<name>:<codificação>"), ou sem compressão se não couber.
+    """
+    encoding = negotiate(request.accept_encodings) if COMPRESSION_ENABLED else None
+    if encoding is None or len(body) < COMPRESSION_MIN_SIZE:
+        return response_class(body, mimetype=mimetype)
+    compressed = snapshot.index(f"{name}:{encoding}", lambda records: compress(body, encoding))
+    response = response_class(compressed, mimetype=mimetype)
+    response.headers["Content-Encoding"] = encoding
+    response.vary.add("Accept-Encoding")
+    return response
+
+
+def send_static(request, directory, filename, **kwargs):
+    """
+    send_from_directory que prefere o irmão pré-comprimido (.br/.gz) do arquivo,
+    se existir e o cliente aceitar a codificação.
+    """
+    candidates = []
+    for encoding, suffix in _STATIC_SUFFIXES.items():
+        path = safe_join(directory, filename + suffix)
+        if path is not None and os.path.isfile(path):
+            candidates.append(encoding)
+    encoding = negotiate(request.accept_encodings, candidates) if candidates else None
+    if encoding is None:
+        response = send_from_directory(directory, filename, **kwargs)
+        if candidates:
+            response.vary.add("Accept-Encoding")
+        return response
+    response = send_from_directory(directory, filename + _STATIC_SUFFIXES[encoding], **kwargs)
+    # Tipo do arquivo original (não application/gzip)
+    mimetype, _ = mimetypes.guess_type(filename)
+    if mimetype:
+        response.mimetype = mimetype
+    _tag_encoding(response, encoding)
+    return response
@@ -0,0 +1,111 @@
+"""
+Respostas em streaming (NDJSON) para listagens grandes.
+
+Este módulo é usado pelas rotas de listagem quando o cliente pede
+`Accept: application/x-ndjson` ou `?stream=1`: em vez de montar o JSON inteiro
+em memória, cada registro é serializado em uma linha e enviado em blocos por um
+gerador, de modo que a memória por requisição não cresce com o tamanho do dataset.
+O total de registros, quando conhecido, vai no header X-Total-Count.
+
+Também monta respostas Server-Sent Events (text/event-stream) para acompanhar o
+progresso das execuções de atualização sem polling.
+"""
+
+import time
+
+NDJSON_MIMETYPE = "application/x-ndjson"
+SSE_MIMETYPE = "text/event-stream"
+
+# Comentário de keepalive do SSE a cada N segundos sem eventos (proxies fecham conexões ociosas)
+SSE_KEEPALIVE_SECONDS = 15
+# Intervalo mínimo entre eventos enviados (eventos intermediários são agregados no estado mais recente)
+SSE_MIN_INTERVAL = 0.5
+
+# Registros serializados por bloco enviado ao cliente
+STREAM_BATCH_SIZE = 500
+
+
+def wants_ndjson(request):
+    """
+    Indica se a requisição pede NDJSON (?stream=1 ou Accept: application/x-ndjson).
+    """
+    if (request.args.get("stream") or "").lower() in ("1", "true", "yes"):
+        return True
+    return request.accept_mimetypes.best_match(["application/json", NDJSON_MIMETYPE]) == NDJSON_MIMETYPE
+
+
+def iter_ndjson(records, dumps, batch_size=STREAM_BATCH_SIZE):
+    """
+    Gera o corpo NDJSON em blocos de `batch_size` linhas.
+    """
+    lines = []
+    for record in records:
+        lines.append(dumps(record))
+        if len(lines) >= batch_size:
+            lines.append("")
+            yield "\n".join(lines)
+            lines = []
+    if lines:
+        lines.append("")
+        yield "\n".join(lines)
+
+
+def ndjson_response(response_class, records, dumps, total=None):
+    """
+    Resposta NDJSON em streaming a partir de um iterável de registros.
+    """
+    response = response_class(iter_ndjson(records, dumps), mimetype=NDJSON_MIMETYPE)
+    if total is not None:
+        response.headers["X-Total-Count"] = str(total)
+    response.vary.add("Accept")
+    return response
+
+
+def sse_event(data, dumps, event=None, event_id=None):
+    """
+    Formata um evento SSE (data em JSON, uma única linha).
+    """
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if event:
+        lines.append(f"event: {event}")
+    lines.append(f"data: {dumps(data)}")
+    return "\n".join(lines) + "\n\n"
+
+
+def iter_progress_events(progress, dumps, last_event_id=None, keepalive=SSE_KEEPALIVE_SECONDS, min_interval=SSE_MIN_INTERVAL):
+    """
+    Gera os eventos SSE de uma execução (UpdateProgress) até o evento final.
+    O primeiro evento é o estado atual (omitido se o cliente já o recebeu, pelo
+    Last-Event-ID); depois, cada mudança (no máximo um evento a cada `min_interval`
+    segundos). Encerra depois do evento "end".
+    """
+    sequence, state = progress.snapshot()
+    if last_event_id is not None and sequence <= last_event_id and not progress.finished:
+        state = None
+    while True:
+        if state is not None:
+            event = "end" if state["status"] != "running" else "progress"
+            yield sse_event(state, dumps, event=event, event_id=sequence)
+            if event == "end":
+                return
+            if min_interval:
+                time.sleep(min_interval)
+        changed = progress.wait(sequence, keepalive)
+        if changed is None:
+            state = None
+            yield ": keepalive\n\n"
+        else:
+            sequence, state = changed
+
+
+def progress_response(response_class, progress, dumps, last_event_id=None):
+    """
+    Resposta SSE em streaming com o progresso de uma execução.
+    """
+    response = response_class(iter_progress_events(progress, dumps, last_event_id), mimetype=SSE_MIMETYPE)
+    response.headers["Cache-Control"] = "no-cache"
+    # Desativa o buffer de proxies (nginx) para os eventos chegarem imediatamente
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
@@ -0,0 +1,43 @@
+import { useCallback } from 'react';
+import { useAuth } from '../App';
+
+// Hook para acompanhar o progresso de uma atualização (/api/updates/<id>/events).
+// O endpoint é Server-Sent Events; como EventSource não envia o header Authorization,
+// o stream é lido com fetch e os eventos são decodificados aqui.
+// followUpdate(updateId, onEvent) chama onEvent(estado) a cada evento e resolve com o estado final.
+export function useUpdateEvents() {
+  const { clerkToken } = useAuth();
+
+  const followUpdate = useCallback(
+    async (updateId, onEvent) => {
+      if (!clerkToken) throw new Error('Usuário não autenticado');
+      const res = await fetch(`/api/updates/${encodeURIComponent(updateId)}/events`, {
+        headers: { Authorization: `Bearer ${clerkToken}`, Accept: 'text/event-stream' },
+      });
+      if (!res.ok || !res.body) throw new Error('Erro ao acompanhar atualização');
+      const reader = res.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      let last = null;
+      for (;;) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        // Eventos SSE são separados por linha em branco
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+          const chunk = buffer.slice(0, boundary);
+          buffer = buffer.slice(boundary + 2);
+          const data = chunk.split('\n').find((line) => line.startsWith('data: '));
+          if (!data) continue; // keepalive
+          last = JSON.parse(data.slice(6));
+          onEvent(last);
+        }
+      }
+      return last;
+    },
+    [clerkToken]
+  );
+
+  return followUpdate;
+}
@@ -1,4 +1,5 @@
 import { useClerkApi } from '../hooks/useClerkApi';
+import { useUpdateEvents } from '../hooks/useUpdateEvents';
 import React, { useCallback, useEffect, useMemo, useState } from 'react'
 import { Link, useNavigate } from 'react-router-dom'
 import { formatCNPJ, getEditalCnpj, getEditalRazaoSocial, getEditalObjeto, getEditalKey, formatCurrencyBRL, fetchJson } from '../App'
@@ -14,6 +15,8 @@ const EditaisPage = () => {
   const [loading, setLoading] = useState(false)
   const [editais, setEditais] = useState([])
   const [search, setSearch] = useState('')
+  const [updateProgress, setUpdateProgress] = useState(null)
+  const followUpdate = useUpdateEvents();
   const navigate = useNavigate();
 
   // Redireciona para login se não autenticado
@@ -28,7 +31,8 @@ const EditaisPage = () => {
   const loadEditais = useCallback(async () => {
     if (authStatus !== 'authenticated' || !clerkToken) return;
     try {
-      const data = await fetchWithClerk('/api/editais')
+      // Visão 'lista': apenas os campos usados na tabela (payload reduzido)
+      const data = await fetchWithClerk('/api/editais?fields=lista')
       setEditais(data.data || [])
     } catch (err) {
       setMessage(err.message)
@@ -48,6 +52,13 @@ const EditaisPage = () => {
       const data = await fetchJson('/api/trigger-update', { method: 'POST' })
       setMessage(data.message || 'Atualização iniciada.')
       await refreshStatus()
+      if (data.update_id) {
+        // Progresso ao vivo (SSE) em vez de polling de /api/status
+        const final = await followUpdate(data.update_id, setUpdateProgress)
+        if (final?.status === 'failed') setMessage(final.error || 'Falha na atualização.')
+        await refreshStatus()
+        await loadEditais()
+      }
     } catch (err) {
       setMessage(err.message)
     } finally {
@@ -116,6 +127,13 @@ const EditaisPage = () => {
           <h2>Status</h2>
           <p>Total de editais: {statusInfo?.total_editais ?? editais.length}</p>
           <p>Última atualização: {formatDateTime(statusInfo?.last_update)}</p>
+          {updateProgress && updateProgress.status === 'running' && (
+            <p>
+              Atualizando ({updateProgress.phase}): {updateProgress.pages_fetched}/{updateProgress.pages_total ?? '?'} páginas,{' '}
+              {updateProgress.editais_processed} editais, {updateProgress.itens_collected} itens
+              {updateProgress.eta_seconds != null && ` — ~${Math.ceil(updateProgress.eta_seconds)}s restantes`}
+            </p>
+          )}
         </div>
         <div className="actions">
           <button className="btn" onClick={handleTriggerUpdate} disabled={loading}>
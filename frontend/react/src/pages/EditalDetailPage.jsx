@@ -28,37 +28,27 @@ const EditalDetailPage = () => {
     if (authStatus !== 'authenticated' || !clerkToken) return;
     let isMounted = true;
     setLoading(true);
-    // Busca o edital correspondente ao ID_C_PNCP
-    fetchWithClerk(`/api/editais`)
-      .then(editaisData => {
-        const editalEncontrado = (editaisData.data || []).find(e => String(e.ID_C_PNCP) === String(id_c_pncp));
-        if (isMounted) setEdital(editalEncontrado || null);
+    // Busca o edital pelo ID_C_PNCP com os itens embutidos (uma única requisição)
+    fetchWithClerk(`/api/editais/by-id/${encodeURIComponent(id_c_pncp)}`)
+      .then(editalData => {
+        const { itens: itensEdital, ...editalEncontrado } = editalData.data || {};
+        if (isMounted) {
+          setEdital(editalData.data ? editalEncontrado : null);
+          setItens(itensEdital || []);
+        }
       })
       .catch(err => {
-        if (isMounted) setMessage(err.message);
+        if (isMounted) {
+          setEdital(null);
+          setItens([]);
+          setMessage(err.message);
+        }
       })
       .finally(() => {
         if (isMounted) setLoading(false);
       });
     return () => { isMounted = false; };
-  }, [id_c_pncp, fetchWithClerk, authStatus, clerkToken]);
-
-  useEffect(() => {
-    if (authStatus !== 'authenticated' || !clerkToken || !edital) return;
-    let isMounted = true;
-    if (id_c_pncp) {
-      fetchWithClerk(`/api/itens/${id_c_pncp}`)
-        .then(itensData => {
-          if (isMounted) setItens(itensData.data || []);
-        })
-        .catch(err => {
-          if (isMounted) setMessage(err.message);
-        });
-    } else {
-      setItens([]);
-    }
-    return () => { isMounted = false; };
-  }, [edital, id_c_pncp, setMessage, fetchWithClerk, authStatus, clerkToken]);
+  }, [id_c_pncp, setMessage, fetchWithClerk, authStatus, clerkToken]);
 
   return (
     <div className="stack">